@@ -18,7 +18,7 @@ import hashlib
 import json
 import logging
 import os
-import ssl
+import time
 from typing import Any
 
 import boto3
@@ -26,7 +26,7 @@ import create_env_variables  # noqa: F401  # type: ignore[reportMissingImports]
 import jwt
 import requests
 from botocore.exceptions import ClientError
-from cachetools import cached, TTLCache
+from cachetools import cached, TLRUCache, TTLCache
 from utilities.audit_logging_utils import (
     get_matched_audit_prefix,
     get_method_and_path_from_method_arn,
@@ -43,6 +43,22 @@ ddb_resource = boto3.resource("dynamodb", region_name=os.environ["AWS_REGION"])
 token_table = ddb_resource.Table(os.environ.get("TOKEN_TABLE_NAME", ""))  # nosec B105
 TOKEN_EXPIRATION_NAME = "tokenExpiration"  # nosec B105
 
+# OIDC discovery documents and signing keys are cached across warm invocations. An unknown key ID triggers a
+# refresh, at most once per JWKS_MIN_REFRESH_INTERVAL, so tokens signed with a rotated key are accepted promptly
+# without letting arbitrary key IDs hammer the identity provider.
+OIDC_CACHE_TTL = int(os.environ.get("OIDC_CACHE_TTL", "3600"))
+JWKS_MIN_REFRESH_INTERVAL = int(os.environ.get("JWKS_MIN_REFRESH_INTERVAL", "60"))
+OIDC_REQUEST_TIMEOUT = int(os.environ.get("OIDC_REQUEST_TIMEOUT", "10"))
+
+# API Gateway calls this authorizer on every request (its own result cache is disabled), so token table lookups are
+# cached per Lambda execution environment, keyed by token hash. A warm environment serves many requests, and
+# API_TOKEN_CACHE_TTL is how long a revoked token can still be accepted by it. Hashes that are not in the table are
+# kept for API_TOKEN_NEGATIVE_CACHE_TTL, which is also how long a newly created token may be refused.
+API_TOKEN_CACHE_TTL = int(os.environ.get("API_TOKEN_CACHE_TTL", "60"))
+API_TOKEN_NEGATIVE_CACHE_TTL = int(os.environ.get("API_TOKEN_NEGATIVE_CACHE_TTL", "10"))
+API_TOKEN_CACHE_MAX_SIZE = int(os.environ.get("API_TOKEN_CACHE_MAX_SIZE", "1000"))
+API_TOKEN_CACHE_METRICS_NAMESPACE = "LISA/Authorizer"
+
 
 @authorization_wrapper
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
@@ -157,13 +173,79 @@ def _get_token_info(token: str) -> Any:
     return ddb_response.get("Item", None)
 
 
+# Marks token hashes that are not in the token table
+_TOKEN_NOT_FOUND: dict[str, Any] = {}
+
+
+def _token_cache_ttu(token_hash: str, token_info: dict[str, Any], now: float) -> float:
+    """TLRUCache time-to-use callback for ``token_cache``.
+
+    A found token's entry is dropped at its ``tokenExpiration`` if that comes before the TTL, since
+    ``is_valid_api_token`` rejects it from then on and it would only take up a cache slot.
+    """
+    if token_info is _TOKEN_NOT_FOUND:
+        return now + API_TOKEN_NEGATIVE_CACHE_TTL
+    expires = now + API_TOKEN_CACHE_TTL
+    try:
+        return min(expires, float(token_info.get(TOKEN_EXPIRATION_NAME) or expires))
+    except (TypeError, ValueError):
+        return expires
+
+
+token_cache: TLRUCache = TLRUCache(maxsize=API_TOKEN_CACHE_MAX_SIZE, ttu=_token_cache_ttu, timer=time.time)
+token_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _emit_token_cache_metric(hit: bool) -> None:
+    """Record a token cache lookup as a CloudWatch embedded metric.
+
+    The metric is written to stdout in Embedded Metric Format, so CloudWatch Logs extracts it without an extra API
+    call on the authorization path.
+    """
+    token_cache_stats["hits" if hit else "misses"] += 1
+    print(
+        json.dumps(
+            {
+                "_aws": {
+                    "Timestamp": int(time.time() * 1000),
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": API_TOKEN_CACHE_METRICS_NAMESPACE,
+                            "Dimensions": [[]],
+                            "Metrics": [
+                                {"Name": "TokenCacheHit", "Unit": "Count"},
+                                {"Name": "TokenCacheMiss", "Unit": "Count"},
+                            ],
+                        }
+                    ],
+                },
+                "TokenCacheHit": int(hit),
+                "TokenCacheMiss": int(not hit),
+            }
+        )
+    )
+
+
+def _get_cached_token_info(token_hash: str) -> dict[str, Any] | None:
+    """Return the token entry for a hash, reading DynamoDB only on a cache miss."""
+    cached_info = token_cache.get(token_hash)
+    if cached_info is not None:
+        _emit_token_cache_metric(hit=True)
+        return None if cached_info is _TOKEN_NOT_FOUND else cached_info
+
+    _emit_token_cache_metric(hit=False)
+    token_info = _get_token_info(token_hash)
+    token_cache[token_hash] = token_info if token_info else _TOKEN_NOT_FOUND
+    return token_info or None
+
+
 def is_valid_api_token(token: str) -> dict | None:
     """Validate API token and return token info if valid."""
     if not token:
         return None
 
     token_hash = hashlib.sha256(token.encode()).hexdigest()
-    token_info = _get_token_info(token_hash)
+    token_info = _get_cached_token_info(token_hash)
 
     if not token_info:
         return None
@@ -182,7 +264,84 @@ def is_valid_api_token(token: str) -> dict | None:
         logger.info(f"Token expired at {token_expiration}")
         return None
 
-    return token_info  # type: ignore[no-any-return]
+    return token_info
+
+
+class OidcSigningKeyCache:
+    """OIDC discovery document and JWKS signing keys for one authority, cached with a TTL.
+
+    If the identity provider cannot be reached when the cache expires, the previously fetched keys keep being used
+    until a refresh succeeds.
+    """
+
+    def __init__(
+        self, authority: str, ttl: float = OIDC_CACHE_TTL, min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL
+    ) -> None:
+        self.authority = authority
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: dict[str | None, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._attempted_at: float | None = None
+
+    def _get_json(self, url: str) -> dict[str, Any]:
+        cert_path = os.getenv("SSL_CERT_FILE", None)
+        try:
+            resp = requests.get(url, verify=cert_path or True, timeout=OIDC_REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            raise jwt.exceptions.PyJWKClientConnectionError(f"Failed to fetch {url}: {e}") from e
+        if resp.status_code != 200:
+            raise jwt.exceptions.PyJWKClientConnectionError(
+                f"Failed to fetch {url}: HTTP {resp.status_code} {resp.content!r}"
+            )
+        data: dict[str, Any] = resp.json()
+        return data
+
+    def refresh(self) -> None:
+        """Fetch the discovery document and the JWKS it points to."""
+        self._attempted_at = time.monotonic()
+        logger.info(f"Fetching OIDC signing keys from {self.authority}/.well-known/openid-configuration")
+        oidc_metadata = self._get_json(f"{self.authority}/.well-known/openid-configuration")
+        jwk_set = jwt.PyJWKSet.from_dict(self._get_json(oidc_metadata["jwks_uri"]))
+        self._keys = {key.key_id: key for key in jwk_set.keys}
+        self._fetched_at = self._attempted_at
+
+    def _try_refresh(self) -> None:
+        """Refresh, keeping the current keys if the identity provider cannot be reached and some are cached."""
+        try:
+            self.refresh()
+        except (jwt.exceptions.PyJWTError, KeyError, ValueError) as e:
+            if not self._keys:
+                raise
+            logger.warning(f"Failed to refresh OIDC signing keys, using cached keys: {e}")
+
+    def get_signing_key(self, kid: str | None) -> jwt.PyJWK:
+        """Return the signing key with ID ``kid``, refreshing the keys if they expired or ``kid`` is unknown."""
+        now = time.monotonic()
+        expired = self._fetched_at is None or now - self._fetched_at >= self.ttl
+        unknown_kid = kid not in self._keys
+        recently_attempted = self._attempted_at is not None and now - self._attempted_at < self.min_refresh_interval
+        if not self._keys or ((expired or unknown_kid) and not recently_attempted):
+            if unknown_kid and not expired:
+                logger.info(f"Unknown signing key ID {kid}, refreshing OIDC signing keys")
+            self._try_refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.exceptions.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+
+_signing_key_caches: dict[str, OidcSigningKeyCache] = {}
+
+
+def get_signing_key_cache(authority: str) -> OidcSigningKeyCache:
+    """Return the module-level signing key cache for ``authority``, reused across warm invocations."""
+    cache = _signing_key_caches.get(authority)
+    if cache is None:
+        cache = OidcSigningKeyCache(authority, ttl=OIDC_CACHE_TTL, min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL)
+        _signing_key_caches[authority] = cache
+    return cache
 
 
 def id_token_is_valid(*, id_token: str, client_id: str, authority: str) -> dict[str, Any] | None:
@@ -190,25 +349,10 @@ def id_token_is_valid(*, id_token: str, client_id: str, authority: str) -> dict[
     if not jwt.algorithms.has_crypto:
         logger.error("No crypto support for JWT, please install the cryptography dependency")
         return None
-    logger.info(f"{authority}/.well-known/openid-configuration")
-
-    cert_path = os.getenv("SSL_CERT_FILE", None)
-    resp = requests.get(
-        f"{authority}/.well-known/openid-configuration",
-        verify=cert_path or True,
-        timeout=120,
-    )
-    if resp.status_code != 200:
-        logger.error("Could not get OIDC metadata: %s", resp.content)
-        return None
 
-    oidc_metadata = resp.json()
     try:
-        ctx = ssl.create_default_context()
-        if cert_path:
-            ctx.load_verify_locations(cert_path)
-        jwks_client = jwt.PyJWKClient(oidc_metadata["jwks_uri"], cache_jwk_set=True, lifespan=360, ssl_context=ctx)
-        signing_key = jwks_client.get_signing_key_from_jwt(id_token)
+        kid = jwt.get_unverified_header(id_token).get("kid")
+        signing_key = get_signing_key_cache(authority).get_signing_key(kid)
         data: dict = jwt.decode(
             id_token,
             signing_key.key,
@@ -225,7 +369,7 @@ def id_token_is_valid(*, id_token: str, client_id: str, authority: str) -> dict[
             },
         )
         return data
-    except jwt.exceptions.PyJWTError as e:
+    except (jwt.exceptions.PyJWTError, KeyError, ValueError) as e:
         logger.exception(e)
         return None
 
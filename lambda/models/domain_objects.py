@@ -33,7 +33,7 @@ from pydantic import BaseModel, ConfigDict, Field, NonNegativeInt, PositiveInt
 from pydantic.functional_validators import AfterValidator, field_validator, model_validator
 from utilities.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MIN_PAGE_SIZE
 from utilities.healthcheck_validator import validate_healthcheck_command
-from utilities.time import now, utc_now
+from utilities.time import format_timestamp, now, parse_timestamp, utc_now
 from utilities.validation import (
     validate_all_fields_defined,
     validate_any_fields_defined,
@@ -694,6 +694,8 @@ class ChunkingStrategyType(StrEnum):
     """Defines supported document chunking strategies."""
 
     FIXED = auto()
+    TOKEN = auto()
+    STRUCTURED = auto()
     NONE = auto()
 
 
@@ -728,9 +730,9 @@ class IngestionStatus(StrEnum):
 
 
 class FixedChunkingStrategy(BaseModel):
-    """Defines parameters for fixed-size document chunking."""
+    """Defines parameters for fixed-size document chunking, with sizes in characters."""
 
-    type: ChunkingStrategyType = ChunkingStrategyType.FIXED
+    type: Literal[ChunkingStrategyType.FIXED] = ChunkingStrategyType.FIXED
     size: int = Field(ge=100, le=10000)
     overlap: int = Field(ge=0)
 
@@ -744,13 +746,62 @@ class FixedChunkingStrategy(BaseModel):
         return self
 
 
+class TokenChunkingStrategy(BaseModel):
+    """Defines parameters for document chunking with sizes in embedding-model tokens."""
+
+    type: Literal[ChunkingStrategyType.TOKEN] = ChunkingStrategyType.TOKEN
+    size: int = Field(ge=50, le=8192)
+    overlap: int = Field(ge=0)
+    encoding: str = Field(default="cl100k_base", min_length=1, description="tiktoken encoding used to count tokens")
+
+    @model_validator(mode="after")
+    def validate_overlap(self) -> Self:
+        """Validates overlap is not more than half of chunk size."""
+        if self.overlap > self.size / 2:
+            raise ValueError(
+                f"chunk overlap ({self.overlap}) must be less than or equal to half of chunk size ({self.size / 2})"
+            )
+        return self
+
+
+class StructuredChunkingStrategy(BaseModel):
+    """Defines parameters for chunking along document structure: pages, headings and paragraphs.
+
+    Chunks never span a PDF page or a heading section. Whole paragraphs are packed into chunks of up to size tokens,
+    and only a paragraph longer than that is split, with overlap tokens carried between its pieces.
+    """
+
+    type: Literal[ChunkingStrategyType.STRUCTURED] = ChunkingStrategyType.STRUCTURED
+    size: int = Field(ge=50, le=8192)
+    overlap: int = Field(ge=0)
+    encoding: str = Field(default="cl100k_base", min_length=1, description="tiktoken encoding used to count tokens")
+
+    @model_validator(mode="after")
+    def validate_overlap(self) -> Self:
+        """Validates overlap is not more than half of chunk size."""
+        if self.overlap > self.size / 2:
+            raise ValueError(
+                f"chunk overlap ({self.overlap}) must be less than or equal to half of chunk size ({self.size / 2})"
+            )
+        return self
+
+
 class NoneChunkingStrategy(BaseModel):
     """Defines parameters for no-chunking strategy - documents ingested as-is."""
 
-    type: ChunkingStrategyType = ChunkingStrategyType.NONE
+    type: Literal[ChunkingStrategyType.NONE] = ChunkingStrategyType.NONE
 
 
-ChunkingStrategy = Union[FixedChunkingStrategy, NoneChunkingStrategy]
+# The literal type fields select the model; data without a type validates as FixedChunkingStrategy, listed first
+ChunkingStrategy = Union[FixedChunkingStrategy, TokenChunkingStrategy, StructuredChunkingStrategy, NoneChunkingStrategy]
+
+# Chunking strategy model for each strategy type, for parsing configurations by their type name
+CHUNKING_STRATEGY_MODELS: dict[ChunkingStrategyType, type[ChunkingStrategy]] = {
+    ChunkingStrategyType.FIXED: FixedChunkingStrategy,
+    ChunkingStrategyType.TOKEN: TokenChunkingStrategy,
+    ChunkingStrategyType.STRUCTURED: StructuredChunkingStrategy,
+    ChunkingStrategyType.NONE: NoneChunkingStrategy,
+}
 
 
 class RagSubDocument(BaseModel):
@@ -758,6 +809,8 @@ class RagSubDocument(BaseModel):
 
     document_id: str
     subdocs: list[str] = Field(default_factory=lambda: [])
+    # Content hash of each subdoc's chunk, in the same order as subdocs
+    subdoc_hashes: list[str] = Field(default_factory=lambda: [])
     index: int | None = Field(default=None)
     sk: str | None = None
 
@@ -777,6 +830,7 @@ class RagDocument(BaseModel):
     source: str
     username: str
     subdocs: list[str] = Field(default_factory=lambda: [], exclude=True)
+    subdoc_hashes: list[str] = Field(default_factory=lambda: [], exclude=True)
     chunk_strategy: ChunkingStrategy
     ingestion_type: IngestionType = Field(default_factory=lambda: IngestionType.MANUAL)
     upload_date: int = Field(default_factory=lambda: now())
@@ -801,7 +855,10 @@ class RagDocument(BaseModel):
         for start_index in range(0, total_subdocs, chunk_size):
             end_index = min(start_index + chunk_size, total_subdocs)
             yield RagSubDocument(
-                document_id=self.document_id, subdocs=self.subdocs[start_index:end_index], index=start_index
+                document_id=self.document_id,
+                subdocs=self.subdocs[start_index:end_index],
+                subdoc_hashes=self.subdoc_hashes[start_index:end_index],
+                index=start_index,
             )
 
     @staticmethod
@@ -823,6 +880,16 @@ class RagDocument(BaseModel):
         return joined_docs
 
 
+class IngestionDocumentResult(BaseModel):
+    """Outcome of one document of a batch ingestion job."""
+
+    s3_path: str
+    status: IngestionStatus
+    job_id: str | None = Field(default=None, description="Ingestion job created for the document")
+    document_id: str | None = Field(default=None, description="RAG document ID, set when ingestion succeeded")
+    error_message: str | None = Field(default=None)
+
+
 class IngestionJob(BaseModel):
     """Represents an ingestion job entity for DynamoDB storage."""
 
@@ -853,6 +920,12 @@ class IngestionJob(BaseModel):
     document_ids: list[str] | None = Field(
         default=None, description="List of document IDs from completed batch operations"
     )
+    document_results: list[IngestionDocumentResult] | None = Field(
+        default=None, description="Per-document outcome of batch ingestion operations"
+    )
+    manifest_job_ids: list[str] | None = Field(
+        default=None, description="Saved document ingestion jobs processed by a batch ingestion manifest job"
+    )
 
     def __init__(self, **data: Any) -> None:
         super().__init__(**data)
@@ -882,6 +955,21 @@ class IngestionJob(BaseModel):
         return self
 
 
+@dataclass(frozen=True, order=True)
+class Watermark:
+    """Position of the newest object processed by a scheduled pipeline, ordered by modification time and then key."""
+
+    last_modified: datetime
+    last_key: str = ""
+
+    def to_dict(self) -> dict[str, str]:
+        return {"lastModified": format_timestamp(self.last_modified), "lastKey": self.last_key}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Watermark:
+        return cls(last_modified=parse_timestamp(data["lastModified"]), last_key=data.get("lastKey", ""))
+
+
 class PaginatedResponse(BaseModel):
     """Base class for paginated API responses."""
 
@@ -1139,6 +1227,11 @@ class PipelineConfig(BaseModel):
     )
     s3Bucket: str = Field(min_length=1, description="S3 bucket for pipeline source")
     s3Prefix: str = Field(description="S3 prefix for pipeline source")
+    s3InventoryManifest: str | None = Field(
+        default=None,
+        description="S3 Inventory manifest, or inventory destination prefix, read by daily pipelines instead of "
+        "listing the bucket",
+    )
     trigger: PipelineTrigger = Field(description="Pipeline trigger type")
     metadata: CollectionMetadata | None = Field(
         default_factory=lambda: CollectionMetadata(tags=[]), description="Metadata for the pipeline including tags"
@@ -1411,6 +1504,73 @@ class BedrockKnowledgeBaseConfig(BaseModel):
     )
 
 
+class SearchMode(StrEnum):
+    """Defines how a similarity search ranks documents."""
+
+    VECTOR = "vector"
+    HYBRID = "hybrid"
+
+
+class HybridSearchConfig(BaseModel):
+    """Configuration for fusing full-text and vector search results with reciprocal-rank fusion."""
+
+    enabled: bool = Field(default=False, description="Use hybrid search when a request does not choose a mode")
+    vectorWeight: float = Field(default=1.0, ge=0, description="Weight of the vector ranking in the fused score")
+    lexicalWeight: float = Field(default=1.0, ge=0, description="Weight of the full-text ranking in the fused score")
+    rrfK: PositiveInt = Field(default=60, description="Rank constant k in 1 / (k + rank)")
+    candidateMultiplier: int = Field(
+        default=4, ge=1, le=20, description="Each ranking contributes topK * candidateMultiplier candidates"
+    )
+
+
+class RerankerType(StrEnum):
+    """Defines the rerankers available for similarity search."""
+
+    CROSS_ENCODER = "cross_encoder"
+    TERM_OVERLAP = "term_overlap"
+    STUB = "stub"
+
+
+class RerankConfig(BaseModel):
+    """Configuration for reranking similarity search candidates before the top results are returned."""
+
+    enabled: bool = Field(default=True, description="Rerank searches that do not opt out")
+    type: RerankerType = Field(default=RerankerType.TERM_OVERLAP, description="Reranker that scores the candidates")
+    modelName: str | None = Field(default=None, description="Reranking model served by LISA (cross_encoder only)")
+    candidates: int = Field(default=20, ge=1, le=100, description="Candidates retrieved and reranked per search")
+    latencyBudgetMs: PositiveInt = Field(
+        default=500, description="Rerank time after which results are returned in vector order"
+    )
+
+    @model_validator(mode="after")
+    def validate_model_name(self) -> Self:
+        """Validates that the cross-encoder reranker names its model."""
+        if self.type == RerankerType.CROSS_ENCODER and not self.modelName:
+            raise ValueError("modelName is required for the cross_encoder reranker")
+        return self
+
+
+class BatchSimilaritySearchRequest(BaseModel):
+    """Request model for running several similarity searches against one collection."""
+
+    queries: list[str] = Field(min_length=1, max_length=50, description="Search queries, answered in order")
+    collectionId: str | None = Field(default=None, description="Collection to search")
+    modelName: str | None = Field(default=None, description="Embedding model, required without collectionId")
+    topK: int = Field(default=3, ge=1, le=100, description="Number of results per query")
+    score: bool = Field(default=False, description="Include similarity scores in result metadata")
+    searchMode: SearchMode | None = Field(default=None, description="Search mode; the repository's default when None")
+    rerank: bool | None = Field(default=None, description="Rerank candidates; the repository's default when None")
+    rerankBudgetMs: PositiveInt | None = Field(default=None, description="Latency budget for reranking all queries")
+
+    @field_validator("queries")
+    @classmethod
+    def validate_queries(cls, queries: list[str]) -> list[str]:
+        """Validates that no query is blank."""
+        if any(not query.strip() for query in queries):
+            raise ValueError("Queries must not be empty")
+        return queries
+
+
 class VectorStoreConfig(BaseModel):
     """Represents a vector store/repository configuration."""
 
@@ -1430,6 +1590,8 @@ class VectorStoreConfig(BaseModel):
     bedrockKnowledgeBaseConfig: BedrockKnowledgeBaseConfig | None = Field(
         default=None, description="Bedrock Knowledge Base configuration with data sources"
     )
+    hybridSearch: HybridSearchConfig | None = Field(default=None, description="Hybrid search configuration")
+    rerank: RerankConfig | None = Field(default=None, description="Reranking configuration")
     # Status and timestamps
     status: VectorStoreStatus | None = Field(default=None, description="Repository Status")
     createdBy: str = Field(description="Creation user")
@@ -1449,6 +1611,8 @@ class UpdateVectorStoreRequest(BaseModel):
     bedrockKnowledgeBaseConfig: BedrockKnowledgeBaseConfig | None = Field(
         default=None, description="Bedrock Knowledge Base configuration"
     )
+    hybridSearch: HybridSearchConfig | None = Field(default=None, description="Hybrid search configuration")
+    rerank: RerankConfig | None = Field(default=None, description="Reranking configuration")
 
 
 class KnowledgeBaseMetadata(BaseModel):
@@ -25,7 +25,7 @@ import boto3
 import create_env_variables  # noqa: F401
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
-from cachetools import cached, TTLCache  # type: ignore[import-untyped,unused-ignore]
+from cachetools import cached, TTLCache
 from models.domain_objects import DeleteResponse, SuccessResponse
 from pydantic import BaseModel, Field, field_validator
 from session.repository import delete_user_session, get_all_user_sessions
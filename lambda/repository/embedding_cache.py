@@ -0,0 +1,299 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Content-addressed cache for embedding vectors.
+
+Embeddings are keyed by the model, the embedding input type and a SHA-256 hash of the normalized text, so re-ingesting
+an unchanged document or repeating a query reuses the vectors computed the first time. Lookups are batched: only the
+texts missing from the cache are sent to the embedding endpoint.
+
+Configuration (environment variables):
+    EMBEDDING_CACHE_BACKEND – "memory", "disk" or "dynamodb"; unset or "none" disables the cache (default)
+    EMBEDDING_CACHE_MAX_ENTRIES – max vectors held by the in-memory backend (default 10000)
+    EMBEDDING_CACHE_DIR – directory for the disk backend (default /tmp/lisa-embedding-cache)
+    EMBEDDING_CACHE_TABLE_NAME – table for the DynamoDB backend, with a string partition key "cacheKey"
+    EMBEDDING_CACHE_TTL_DAYS – expiry written to the table's "expiresAt" TTL attribute, 0 for none (default 30)
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import boto3
+from cachetools import LRUCache
+from utilities.common_functions import retry_config
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_BACKEND = os.environ.get("EMBEDDING_CACHE_BACKEND", "").lower()
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lisa-embedding-cache"))
+EMBEDDING_CACHE_TABLE_NAME = os.environ.get("EMBEDDING_CACHE_TABLE_NAME", "")
+EMBEDDING_CACHE_TTL_DAYS = int(os.environ.get("EMBEDDING_CACHE_TTL_DAYS", "30"))
+
+# DynamoDB BatchGetItem accepts at most 100 keys per request
+_DDB_BATCH_GET_LIMIT = 100
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing, so equivalent Unicode forms and surrounding whitespace share a cache entry."""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def embedding_cache_key(model_name: str, text: str, input_type: str | None = None) -> str:
+    """Return the content-addressed cache key for embedding ``text`` with ``model_name``."""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_name}:{input_type or ''}:{digest}"
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("d", vector).tobytes()
+
+
+def _unpack(data: bytes) -> list[float]:
+    vector = array("d")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class EmbeddingCacheBackend(ABC):
+    """Storage for cached embedding vectors."""
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Return the cached vectors for ``keys``, omitting keys that are not cached."""
+
+    @abstractmethod
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        """Store vectors by key."""
+
+
+class InMemoryEmbeddingCacheBackend(EmbeddingCacheBackend):
+    """Per-process LRU cache, shared by every embedding client in a warm Lambda."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._cache: LRUCache = LRUCache(maxsize=max(max_entries, 1))
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        with self._lock:
+            return {key: self._cache[key] for key in keys if key in self._cache}
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        with self._lock:
+            self._cache.update(vectors)
+
+
+class DiskEmbeddingCacheBackend(EmbeddingCacheBackend):
+    """Vectors stored as one file per key under a local directory, e.g. on a mounted file system."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.bin")
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        vectors = {}
+        for key in keys:
+            try:
+                with open(self._path(key), "rb") as f:
+                    vectors[key] = _unpack(f.read())
+            except FileNotFoundError:
+                continue
+        return vectors
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        for key, vector in vectors.items():
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial vector
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_pack(vector))
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+
+class DynamoDBEmbeddingCacheBackend(EmbeddingCacheBackend):
+    """Vectors stored in a DynamoDB table shared by every ingestion and query Lambda."""
+
+    def __init__(self, table_name: str, ttl_days: int = 30, dynamodb_resource: Any | None = None) -> None:
+        self._dynamodb = dynamodb_resource or boto3.resource(
+            "dynamodb", region_name=os.environ["AWS_REGION"], config=retry_config
+        )
+        self.table_name = table_name
+        self._table = self._dynamodb.Table(table_name)
+        self.ttl_days = ttl_days
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        vectors: dict[str, list[float]] = {}
+        for start in range(0, len(keys), _DDB_BATCH_GET_LIMIT):
+            request_items = {
+                self.table_name: {
+                    "Keys": [{"cacheKey": key} for key in keys[start : start + _DDB_BATCH_GET_LIMIT]],
+                    "ProjectionExpression": "cacheKey, embedding",
+                }
+            }
+            delay = 0.1
+            for _attempt in range(5):
+                resp = self._dynamodb.batch_get_item(RequestItems=request_items)
+                for item in resp.get("Responses", {}).get(self.table_name, []):
+                    vectors[item["cacheKey"]] = _unpack(bytes(item["embedding"]))
+                request_items = resp.get("UnprocessedKeys", {})
+                if not request_items:
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 5)
+            else:
+                logger.warning("BatchGetItem: gave up retrying UnprocessedKeys after 5 attempts")
+        return vectors
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        expires_at = int(time.time()) + self.ttl_days * 86400 if self.ttl_days > 0 else None
+        with self._table.batch_writer() as batch:
+            for key, vector in vectors.items():
+                item: dict[str, Any] = {"cacheKey": key, "embedding": _pack(vector)}
+                if expires_at:
+                    item["expiresAt"] = expires_at
+                batch.put_item(Item=item)
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Cache effectiveness counters for one process."""
+
+    hits: int = 0
+    misses: int = 0
+    # Time spent computing embeddings for misses, used to estimate the time hits saved
+    compute_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated embedding time avoided by hits, at the average cost of a miss."""
+        return self.hits * self.compute_seconds / self.misses if self.misses else 0.0
+
+
+class EmbeddingCache:
+    """Serve embeddings from a backend and compute only the misses.
+
+    Backend failures are logged and treated as misses, so an unavailable cache never fails ingestion or search.
+    """
+
+    def __init__(self, backend: EmbeddingCacheBackend) -> None:
+        self.backend = backend
+        self.stats = EmbeddingCacheStats()
+        self._stats_lock = threading.Lock()
+
+    def embed(
+        self,
+        model_name: str,
+        texts: list[str],
+        compute: Callable[[list[str]], list[list[float]]],
+        input_type: str | None = None,
+    ) -> list[list[float]]:
+        """Return embeddings for ``texts``, calling ``compute`` once with the distinct texts that are not cached."""
+        keys = [embedding_cache_key(model_name, text, input_type) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+
+        try:
+            cached = self.backend.get_many(unique_keys)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed, computing all embeddings: {e}")
+            cached = {}
+
+        # One text per missing key; duplicates within the request are embedded once
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        computed: dict[str, list[float]] = {}
+        elapsed = 0.0
+        if missing:
+            start = time.perf_counter()
+            vectors = compute(list(missing.values()))
+            elapsed = time.perf_counter() - start
+            computed = dict(zip(missing.keys(), vectors))
+            try:
+                self.backend.put_many(computed)
+            except Exception as e:
+                logger.warning(f"Failed to store {len(computed)} embeddings in cache: {e}")
+
+        with self._stats_lock:
+            self.stats.hits += len(texts) - len(missing)
+            self.stats.misses += len(missing)
+            self.stats.compute_seconds += elapsed
+        logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses for {model_name}")
+
+        return [cached[key] if key in cached else computed[key] for key in keys]
+
+
+def create_embedding_cache_backend(name: str) -> EmbeddingCacheBackend | None:
+    """Create the backend named by EMBEDDING_CACHE_BACKEND, or None if caching is disabled."""
+    if name in ("", "none"):
+        return None
+    if name == "memory":
+        return InMemoryEmbeddingCacheBackend(EMBEDDING_CACHE_MAX_ENTRIES)
+    if name == "disk":
+        return DiskEmbeddingCacheBackend(EMBEDDING_CACHE_DIR)
+    if name == "dynamodb":
+        if not EMBEDDING_CACHE_TABLE_NAME:
+            logger.warning("EMBEDDING_CACHE_TABLE_NAME is not set, embedding cache disabled")
+            return None
+        return DynamoDBEmbeddingCacheBackend(EMBEDDING_CACHE_TABLE_NAME, EMBEDDING_CACHE_TTL_DAYS)
+    logger.warning(f"Unknown EMBEDDING_CACHE_BACKEND {name!r}, embedding cache disabled")
+    return None
+
+
+_embedding_cache: EmbeddingCache | None = None
+_embedding_cache_configured = False
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the process-wide embedding cache, or None if caching is disabled."""
+    global _embedding_cache, _embedding_cache_configured
+    with _embedding_cache_lock:
+        if not _embedding_cache_configured:
+            backend = create_embedding_cache_backend(EMBEDDING_CACHE_BACKEND)
+            _embedding_cache = EmbeddingCache(backend) if backend else None
+            _embedding_cache_configured = True
+        return _embedding_cache
+
+
+def set_embedding_cache(cache: EmbeddingCache | None) -> None:
+    """Replace the process-wide embedding cache, e.g. to enable a backend in a benchmark or test."""
+    global _embedding_cache, _embedding_cache_configured
+    with _embedding_cache_lock:
+        _embedding_cache = cache
+        _embedding_cache_configured = True
@@ -14,12 +14,17 @@
 
 import logging
 import os
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import boto3
 import requests
+from cachetools import TTLCache
 from pydantic import BaseModel, ConfigDict, field_validator
+from repository.embedding_cache import get_embedding_cache
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from utilities.auth import get_management_key
@@ -35,10 +40,29 @@ lisa_api_endpoint = ""
 
 # Max texts per embedding API call — TEI containers enforce a 256 limit
 MAX_EMBEDDING_BATCH_SIZE = 256
+# Max embedding batches in flight at once for a single embed_documents call, bounded by the HTTP connection pool
+EMBEDDING_BATCH_CONCURRENCY = int(os.environ.get("EMBEDDING_BATCH_CONCURRENCY", "4"))
+HTTP_POOL_MAXSIZE = 20
+# Max embedding requests in flight at once across the whole process, so documents ingested concurrently cannot
+# overload the embedding server or exhaust the HTTP connection pool
+EMBEDDING_MAX_IN_FLIGHT = int(os.environ.get("EMBEDDING_MAX_IN_FLIGHT", "8"))
 # Retry configuration for transient embedding failures
 MAX_RETRIES = 3
 INITIAL_BACKOFF_SECONDS = 1.0
 
+# The management key, REST API endpoint and certificate path are resolved once per process and shared by every
+# RagEmbeddings instance, so a warm Lambda builds embedding clients without any AWS calls. They are re-resolved after
+# EMBEDDING_CLIENT_CONFIG_TTL seconds, or immediately when the embedding API rejects the management key.
+EMBEDDING_CLIENT_CONFIG_TTL = int(os.environ.get("EMBEDDING_CLIENT_CONFIG_TTL", "900"))
+AUTH_FAILURE_STATUS_CODES = (401, 403)
+
+_client_config: TTLCache = TTLCache(maxsize=3, ttl=EMBEDDING_CLIENT_CONFIG_TTL)
+_client_config_lock = threading.Lock()
+_MISSING = object()
+
+# Held only for the HTTP call itself, so requests backing off before a retry do not occupy a slot
+_in_flight_requests = threading.BoundedSemaphore(max(1, min(EMBEDDING_MAX_IN_FLIGHT, HTTP_POOL_MAXSIZE)))
+
 # Module-level session with connection pooling for better performance
 # This reuses TCP connections across multiple embedding requests
 _http_session: requests.Session | None = None
@@ -57,7 +81,7 @@ def _get_http_session() -> requests.Session:
         )
         adapter = HTTPAdapter(
             pool_connections=10,  # Number of connection pools
-            pool_maxsize=20,  # Max connections per pool
+            pool_maxsize=HTTP_POOL_MAXSIZE,  # Max connections per pool
             max_retries=retry_strategy,
         )
         _http_session.mount("http://", adapter)
@@ -65,6 +89,24 @@ def _get_http_session() -> requests.Session:
     return _http_session
 
 
+def _get_client_config(name: str, resolve: Callable[[], Any]) -> Any:
+    """Return a cached client setting, resolving it on a miss."""
+    with _client_config_lock:
+        value = _client_config.get(name, _MISSING)
+        if value is _MISSING:
+            # Keep the resolved value rather than reading it back, as it may already have expired
+            value = _client_config[name] = resolve()
+        return value
+
+
+def invalidate_client_config() -> None:
+    """Drop the cached management key, endpoint and certificate path so the next client re-resolves them."""
+    with _client_config_lock:
+        _client_config.clear()
+        get_rest_api_container_endpoint.cache_clear()
+        get_cert_path.cache_clear()
+
+
 class RagEmbeddings(BaseModel):
     """
     Handles document embeddings through LiteLLM using management credentials.
@@ -77,6 +119,7 @@ class RagEmbeddings(BaseModel):
     lisa_api_endpoint: str
     base_url: str
     cert_path: str | bool
+    uses_management_key: bool = False
 
     @field_validator("model_name")
     @classmethod
@@ -91,13 +134,15 @@ class RagEmbeddings(BaseModel):
             # Use management token if id_token is not provided
             if id_token is None:
                 logger.info("Using management key for ingestion")
-                init_data["token"] = get_management_key()
+                init_data["token"] = _get_client_config("management_key", get_management_key)
+                init_data["uses_management_key"] = True
             else:
                 init_data["token"] = id_token
 
-            init_data["lisa_api_endpoint"] = get_rest_api_container_endpoint()
-            init_data["base_url"] = get_rest_api_container_endpoint()
-            init_data["cert_path"] = get_cert_path(iam_client)
+            endpoint = _get_client_config("endpoint", get_rest_api_container_endpoint)
+            init_data["lisa_api_endpoint"] = endpoint
+            init_data["base_url"] = endpoint
+            init_data["cert_path"] = _get_client_config("cert_path", lambda: get_cert_path(iam_client))
 
             super().__init__(**init_data)
             logger.info("Successfully initialized pipeline embeddings")
@@ -108,7 +153,9 @@ class RagEmbeddings(BaseModel):
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         """
         Generate embeddings for a list of documents, automatically batching
-        to stay within the embedding server's max batch size.
+        to stay within the embedding server's max batch size. Up to
+        EMBEDDING_BATCH_CONCURRENCY batches are sent at once; results keep
+        the order of the input texts.
 
         Uses input_type="passage" so litellm applies the correct model-specific
         prefix for document indexing (e.g. "passage: " for E5 models).
@@ -128,17 +175,31 @@ class RagEmbeddings(BaseModel):
 
         logger.info(f"Embedding {len(texts)} documents using {self.model_name}")
 
-        all_embeddings: list[list[float]] = []
+        # Only texts missing from the embedding cache, if one is configured, are sent to the embedding API
+        cache = get_embedding_cache()
+        if cache is not None:
+            return cache.embed(self.model_name, texts, self._embed_uncached_documents)
+        return self._embed_uncached_documents(texts)
+
+    def _embed_uncached_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts through the embedding API, sending batches concurrently."""
         batch_size = MAX_EMBEDDING_BATCH_SIZE
+        batches = [texts[batch_start : batch_start + batch_size] for batch_start in range(0, len(texts), batch_size)]
+        total_batches = len(batches)
 
-        for batch_start in range(0, len(texts), batch_size):
-            batch = texts[batch_start : batch_start + batch_size]
-            batch_num = batch_start // batch_size + 1
-            total_batches = (len(texts) + batch_size - 1) // batch_size
+        def embed_batch(batch_num: int, batch: list[str]) -> list[list[float]]:
             logger.info(f"Embedding batch {batch_num}/{total_batches} ({len(batch)} texts)")
+            return self._embed_batch_with_retry(batch)
+
+        concurrency = max(1, min(EMBEDDING_BATCH_CONCURRENCY, HTTP_POOL_MAXSIZE, total_batches))
+        if concurrency == 1:
+            batch_results = [embed_batch(batch_num, batch) for batch_num, batch in enumerate(batches, start=1)]
+        else:
+            # Executor.map yields results in submission order, so embeddings line up with their texts
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                batch_results = list(executor.map(embed_batch, range(1, total_batches + 1), batches))
 
-            batch_embeddings = self._embed_batch_with_retry(batch)
-            all_embeddings.extend(batch_embeddings)
+        all_embeddings: list[list[float]] = [embedding for batch in batch_results for embedding in batch]
 
         if len(all_embeddings) != len(texts):
             raise Exception(f"Embedding count mismatch: expected {len(texts)}, got {len(all_embeddings)}")
@@ -177,19 +238,13 @@ class RagEmbeddings(BaseModel):
         if input_type is not None:
             request_data["input_type"] = input_type
 
-        session = _get_http_session()
-        try:
-            response = session.post(
-                url,
-                json=request_data,
-                headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"},
-                verify=self.cert_path,
-                timeout=300,
-            )
-        except requests.Timeout:
-            raise Exception("Embedding request timed out after 5 minutes")
-        except requests.RequestException as e:
-            raise Exception(f"Embedding HTTP request failed: {e}") from e
+        response = self._post(url, request_data)
+        if response.status_code in AUTH_FAILURE_STATUS_CODES and self.uses_management_key:
+            # The management key may have been rotated since it was cached
+            logger.warning(f"Embedding request rejected with status {response.status_code}, refreshing management key")
+            invalidate_client_config()
+            self.token = _get_client_config("management_key", get_management_key)
+            response = self._post(url, request_data)
 
         if response.status_code != 200:
             logger.error(f"Embedding request failed with status {response.status_code}: {response.text}")
@@ -198,6 +253,23 @@ class RagEmbeddings(BaseModel):
         result = response.json()
         return self._parse_embeddings(result, expected_count=len(texts))
 
+    def _post(self, url: str, request_data: dict[str, Any]) -> requests.Response:
+        """POST a request to the embedding API over the shared session."""
+        session = _get_http_session()
+        try:
+            with _in_flight_requests:
+                return session.post(
+                    url,
+                    json=request_data,
+                    headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"},
+                    verify=self.cert_path,
+                    timeout=300,
+                )
+        except requests.Timeout:
+            raise Exception("Embedding request timed out after 5 minutes")
+        except requests.RequestException as e:
+            raise Exception(f"Embedding HTTP request failed: {e}") from e
+
     @staticmethod
     def _parse_embeddings(result: Any, expected_count: int) -> list[list[float]]:
         """Extract embedding vectors from the API response."""
@@ -234,5 +306,19 @@ class RagEmbeddings(BaseModel):
             raise ValidationError("Invalid query text")
 
         logger.info("Embedding single query text")
+        cache = get_embedding_cache()
+        if cache is not None:
+            return cache.embed(self.model_name, [text], self._embed_batch_with_retry)[0]
         result = self._embed_batch_with_retry([text])
         return result[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embed several query texts, sharing requests the way embed_documents batches passages."""
+        if not texts or any(not text or not isinstance(text, str) for text in texts):
+            raise ValidationError("Invalid query text")
+
+        logger.info(f"Embedding {len(texts)} query texts")
+        cache = get_embedding_cache()
+        if cache is not None:
+            return cache.embed(self.model_name, texts, self._embed_uncached_documents)
+        return self._embed_uncached_documents(texts)
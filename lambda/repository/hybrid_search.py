@@ -0,0 +1,81 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Hybrid search helpers: search mode resolution and reciprocal-rank fusion.
+
+Dense retrieval misses exact identifiers, error codes and part numbers that a full-text index matches directly.
+Hybrid search runs both rankings and fuses them with reciprocal-rank fusion (RRF), which only uses each document's
+rank, so the vector store's distance scores and the full-text relevance scores never need to be put on one scale:
+
+    score(d) = sum over rankings r of weight_r / (k + rank_r(d))
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.documents import Document
+from models.domain_objects import HybridSearchConfig, SearchMode
+
+
+def resolve_hybrid_search_config(repository: dict[str, Any], search_mode: str | None) -> HybridSearchConfig | None:
+    """Return the repository's hybrid search config if the search should be hybrid, otherwise None.
+
+    Args:
+        repository: Repository configuration
+        search_mode: Mode requested by the caller; the repository's default is used when None
+
+    Raises:
+        ValueError: If search_mode is not a known SearchMode
+    """
+    config = HybridSearchConfig.model_validate(repository.get("hybridSearch") or {})
+    if search_mode is None:
+        return config if config.enabled else None
+    return config if SearchMode(search_mode) == SearchMode.HYBRID else None
+
+
+def document_key(doc: Document) -> tuple[str, str]:
+    """Identify a chunk across rankings by its source and content, since stores assign ids differently."""
+    return str((doc.metadata or {}).get("source", "")), doc.page_content
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]], weights: Sequence[float], k: int = 60
+) -> list[tuple[Document, float]]:
+    """Fuse rankings of documents into one list ordered by weighted RRF score.
+
+    Args:
+        rankings: Documents from each retriever, best first
+        weights: Weight of each ranking
+        k: Rank constant; larger values flatten the difference between top and lower ranks
+
+    Returns:
+        (document, fused score) pairs, best first. Ties keep the order in which documents were first seen.
+    """
+    if len(rankings) != len(weights):
+        raise ValueError("Each ranking needs a weight")
+
+    scores: dict[tuple[str, str], float] = {}
+    documents: dict[tuple[str, str], Document] = {}
+    for ranking, weight in zip(rankings, weights):
+        seen: set[tuple[str, str]] = set()
+        for rank, doc in enumerate(ranking, start=1):
+            key = document_key(doc)
+            if key in seen:
+                continue
+            seen.add(key)
+            documents.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [(documents[key], scores[key]) for key in ordered]
@@ -20,9 +20,10 @@ from datetime import timedelta
 from typing import Any
 
 import boto3
-from models.domain_objects import IngestionJob, IngestionStatus
+from botocore.exceptions import ClientError
+from models.domain_objects import IngestionJob, IngestionStatus, Watermark
 from utilities.common_functions import retry_config
-from utilities.time import utc_now
+from utilities.time import format_timestamp, utc_now
 
 logger = logging.getLogger(__name__)
 
@@ -122,6 +123,34 @@ class IngestionJobRepository:
 
         return job
 
+    def find_watermark(self, pipeline_id: str) -> Watermark | None:
+        """Return the discovery watermark persisted for a scheduled pipeline, if it has run before."""
+        item = _get_ingestion_job_table().get_item(Key={"id": pipeline_id}).get("Item")
+        if not item:
+            return None
+        return Watermark.from_dict(item)
+
+    def save_watermark(self, pipeline_id: str, watermark: Watermark) -> None:
+        """Persist a scheduled pipeline's discovery watermark.
+
+        The write only moves the watermark forward, so an overlapping run that finished first is never rolled back.
+        Watermark items carry no repository_id and therefore stay out of the job listing indexes.
+        """
+        item = {"id": pipeline_id, **watermark.to_dict(), "updatedDate": format_timestamp(utc_now())}
+        try:
+            _get_ingestion_job_table().put_item(
+                Item=item,
+                ConditionExpression=(
+                    "attribute_not_exists(id) OR lastModified < :last_modified OR "
+                    "(lastModified = :last_modified AND lastKey <= :last_key)"
+                ),
+                ExpressionAttributeValues={":last_modified": item["lastModified"], ":last_key": item["lastKey"]},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            logger.info(f"Watermark for {pipeline_id} is already past {item['lastModified']} {item['lastKey']}")
+
     def list_jobs_by_repository(
         self,
         repository_id: str,
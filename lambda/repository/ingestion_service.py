@@ -11,16 +11,38 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+"""Submission of document ingestion and deletion jobs to AWS Batch.
+
+Configuration (environment variables):
+    INGESTION_MANIFEST_SIZE – documents listed in each manifest job of a bulk ingestion (default 100)
+"""
+
 import logging
 import os
 from typing import Any
+from uuid import uuid4
 
 import boto3
-from models.domain_objects import Enum, FixedChunkingStrategy, IngestDocumentRequest, IngestionJob, IngestionType
+from models.domain_objects import (
+    CHUNKING_STRATEGY_MODELS,
+    ChunkingStrategyType,
+    Enum,
+    FixedChunkingStrategy,
+    IngestDocumentRequest,
+    IngestionJob,
+    IngestionType,
+    JobActionType,
+)
+from repository.ingestion_job_repo import IngestionJobRepository
 from repository.metadata_generator import MetadataGenerator
 
 logger = logging.getLogger(__name__)
 
+INGESTION_MANIFEST_SIZE = int(os.environ.get("INGESTION_MANIFEST_SIZE", "100"))
+
+# AWS Batch limit on the child jobs of one array job
+BATCH_ARRAY_MAX_SIZE = 10000
+
 
 class IngestionAction(str, Enum):
     Ingest = "ingest"
@@ -28,20 +50,73 @@ class IngestionAction(str, Enum):
 
 
 class DocumentIngestionService:
+    def __init__(self, ingestion_job_repository: IngestionJobRepository | None = None) -> None:
+        self.ingestion_job_repository = ingestion_job_repository or IngestionJobRepository()
+
     def _submit_job(self, job: IngestionJob, action: IngestionAction) -> None:
+        self._submit(job.id, action)
+
+    def _submit(self, job_id: str, action: IngestionAction, array_size: int = 1) -> None:
         # Submit AWS Batch job
         batch_client = boto3.client("batch", region_name=os.environ["AWS_REGION"])
+        array_args: dict[str, Any] = {}
+        if array_size > 1:
+            # Child jobs read their index from AWS_BATCH_JOB_ARRAY_INDEX and process job "<job_id>-<index>"
+            array_args["arrayProperties"] = {"size": array_size}
         response = batch_client.submit_job(
-            jobName=f"document-{action.value}-{job.id}",
+            jobName=f"document-{action.value}-{job_id}",
             jobQueue=os.environ["LISA_INGESTION_JOB_QUEUE_NAME"],
             jobDefinition=os.environ["LISA_INGESTION_JOB_DEFINITION_NAME"],
-            parameters={"DOCUMENT_ID": job.id, "ACTION": action},
+            parameters={"DOCUMENT_ID": job_id, "ACTION": action},
+            **array_args,
         )
-        logger.info(f"Submitted {action} job for document {job.id}: {response['jobId']}")
+        logger.info(f"Submitted {action} job for document {job_id}: {response['jobId']}")
 
     def submit_create_job(self, job: IngestionJob) -> None:
         self._submit_job(job, IngestionAction("ingest"))
 
+    def submit_create_jobs(self, jobs: list[IngestionJob]) -> None:
+        """Submit ingestion of several saved document jobs as AWS Batch array jobs.
+
+        The documents are split into manifest jobs of up to INGESTION_MANIFEST_SIZE documents, and each array child
+        ingests one manifest, so container start-up and client creation are paid once per manifest rather than once
+        per document. Each document job's status is written back as its document is processed.
+        """
+        if len(jobs) == 1:
+            self.submit_create_job(jobs[0])
+            return
+
+        manifests = [jobs[i : i + INGESTION_MANIFEST_SIZE] for i in range(0, len(jobs), INGESTION_MANIFEST_SIZE)]
+        for start in range(0, len(manifests), BATCH_ARRAY_MAX_SIZE):
+            group = manifests[start : start + BATCH_ARRAY_MAX_SIZE]
+            array_id = str(uuid4())
+            for index, documents in enumerate(group):
+                self.ingestion_job_repository.save(self._manifest_job(f"{array_id}-{index}", documents))
+
+            if len(group) == 1:
+                # An array job needs at least two children
+                self._submit(f"{array_id}-0", IngestionAction.Ingest)
+            else:
+                self._submit(array_id, IngestionAction.Ingest, array_size=len(group))
+            logger.info(f"Submitted {sum(len(documents) for documents in group)} documents in {len(group)} manifests")
+
+    @staticmethod
+    def _manifest_job(job_id: str, documents: list[IngestionJob]) -> IngestionJob:
+        """Build a batch ingestion job listing the document jobs one worker processes."""
+        first = documents[0]
+        return IngestionJob(
+            id=job_id,
+            repository_id=first.repository_id,
+            collection_id=first.collection_id,
+            embedding_model=first.embedding_model,
+            chunk_strategy=first.chunk_strategy,
+            s3_path=first.s3_path,
+            username=first.username,
+            ingestion_type=first.ingestion_type,
+            job_type=JobActionType.DOCUMENT_BATCH_INGESTION,
+            manifest_job_ids=[document.id for document in documents],
+        )
+
     def create_delete_job(self, job: IngestionJob) -> None:
         self._submit_job(job, IngestionAction("delete"))
 
@@ -68,9 +143,13 @@ class DocumentIngestionService:
         chunk_strategy = None
         if collection and request.chunkingStrategy and collection.get("allowChunkingOverride"):
             try:
+                # Strategy type names are matched case-insensitively, so "FIXED" overrides like "fixed"
+                chunk_type = str(request.chunkingStrategy.get("type", "")).lower()
                 chunk_strategy = (
-                    FixedChunkingStrategy(**request.chunkingStrategy)
-                    if request.chunkingStrategy.get("type", "").upper() == "FIXED"
+                    CHUNKING_STRATEGY_MODELS[ChunkingStrategyType(chunk_type)].model_validate(
+                        {**request.chunkingStrategy, "type": chunk_type}
+                    )
+                    if chunk_type in CHUNKING_STRATEGY_MODELS
                     else collection.get("chunkingStrategy")
                 )
             except Exception:
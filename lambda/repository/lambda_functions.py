@@ -17,6 +17,7 @@
 import json
 import logging
 import os
+import time
 import urllib.parse
 from types import SimpleNamespace
 from typing import Any, cast
@@ -25,6 +26,7 @@ import boto3
 from boto3.dynamodb.types import TypeSerializer
 from botocore.config import Config
 from models.domain_objects import (
+    BatchSimilaritySearchRequest,
     FilterParams,
     IngestDocumentRequest,
     IngestionJob,
@@ -35,6 +37,7 @@ from models.domain_objects import (
     PaginationResult,
     RagCollectionConfig,
     RagDocument,
+    SearchMode,
     SortParams,
     UpdateVectorStoreRequest,
     VectorStoreConfig,
@@ -46,8 +49,10 @@ from repository.ingestion_job_repo import IngestionJobRepository
 from repository.ingestion_service import DocumentIngestionService
 from repository.metadata_generator import MetadataGenerator
 from repository.rag_document_repo import RagDocumentRepository
+from repository.rerankers import get_reranker, rerank_documents, rerank_documents_batch, resolve_rerank_config
 from repository.s3_metadata_manager import S3MetadataManager
 from repository.services import RepositoryServiceFactory
+from repository.vector_store_clients import vector_store_client_registry
 from repository.vector_store_repo import VectorStoreRepository
 from utilities.auth import (
     admin_only,
@@ -147,34 +152,35 @@ def enrich_metadata_with_document_id(
     Returns:
         Documents with enriched metadata including document_id
     """
-    for doc in docs:
-        metadata = doc.get("metadata", {})
+    sources = [doc.get("metadata", {}).get("source") for doc in docs]
+    if not search_collection_id or not any(sources):
+        logger.debug(f"Missing sources or collection_id ({search_collection_id}), skipping enrichment")
+        return docs
 
-        # Look up document_id from RAG document table using source path
-        source = metadata.get("source")
-
-        if source and search_collection_id:
-            try:
-                # Query RAG document table by source using the ACTUAL collection_id from search
-                # Not the metadata's collectionId which may be "default" in vector store
-                rag_doc = doc_repo.find_one_by_source(
-                    repository_id=repository_id, collection_id=search_collection_id, source=source
-                )
-
-                if rag_doc:
-                    metadata["document_id"] = rag_doc.document_id
-                    logger.info(f"Enriched metadata with document_id: {rag_doc.document_id} for source: {source}")
-                else:
-                    logger.warning(
-                        f"No RAG document found for source: {source} "
-                        f"in repository: {repository_id}, collection: {search_collection_id}"
-                    )
-
-            except Exception as e:
-                logger.error(f"Failed to enrich metadata for source {source}: {e}")
-                # Continue without document_id - frontend will handle gracefully
+    try:
+        # Resolve every hit's source in one batched lookup, using the ACTUAL collection_id from search
+        # Not the metadata's collectionId which may be "default" in vector store
+        document_ids = doc_repo.find_document_ids_by_source(
+            repository_id=repository_id,
+            collection_id=search_collection_id,
+            sources=[source for source in sources if source],
+        )
+    except Exception as e:
+        logger.error(f"Failed to enrich metadata for sources {sources}: {e}")
+        # Continue without document_id - frontend will handle gracefully
+        return docs
+
+    for doc, source in zip(docs, sources):
+        if not source:
+            continue
+        if source in document_ids:
+            doc["metadata"]["document_id"] = document_ids[source]
+            logger.info(f"Enriched metadata with document_id: {document_ids[source]} for source: {source}")
         else:
-            logger.debug(f"Missing source ({source}) or collection_id ({search_collection_id}), skipping enrichment")
+            logger.warning(
+                f"No RAG document found for source: {source} "
+                f"in repository: {repository_id}, collection: {search_collection_id}"
+            )
 
     return docs
 
@@ -196,11 +202,18 @@ def similarity_search(event: dict, context: dict) -> dict[str, Any]:
             - queryStringParameters.repositoryType: Type of repository
             - queryStringParameters.topK (optional): Number of results to return (default: 3)
             - queryStringParameters.score (optional): Include similarity scores (default: false)
+            - queryStringParameters.searchMode (optional): "vector" or "hybrid" (default: the repository's
+                hybridSearch setting)
+            - queryStringParameters.rerank (optional): Rerank over-fetched candidates down to topK (default: the
+                repository's rerank setting)
+            - queryStringParameters.rerankBudgetMs (optional): Latency budget for the rerank stage, after which
+                results keep their vector order (default: the repository's rerank.latencyBudgetMs)
         context (dict): The Lambda context object
 
     Returns:
         Dict[str, Any]: A dictionary containing:
             - docs: List of matching documents with their content and metadata
+            - latency (only when reranking ran): retrieveMs, rerankMs and rerankStatus of the search stages
 
     Raises:
         ValidationError: If required parameters are missing or invalid
@@ -212,34 +225,26 @@ def similarity_search(event: dict, context: dict) -> dict[str, Any]:
     include_score = query_string_params.get("score", "false").lower() == "true"  # type: ignore[union-attr]
     repository_id = path_params.get("repositoryId")  # type: ignore[union-attr]
     collection_id = query_string_params.get("collectionId")  # type: ignore[union-attr]
+    search_mode = query_string_params.get("searchMode")  # type: ignore[union-attr]
+    if search_mode is not None and search_mode not in {mode.value for mode in SearchMode}:
+        raise ValidationError(f"searchMode must be one of: {', '.join(mode.value for mode in SearchMode)}")
+    rerank_param = query_string_params.get("rerank")  # type: ignore[union-attr]
+    if rerank_param is not None and rerank_param.lower() not in {"true", "false"}:
+        raise ValidationError("rerank must be true or false")
+    rerank = rerank_param.lower() == "true" if rerank_param is not None else None
+    rerank_budget_param = query_string_params.get("rerankBudgetMs")  # type: ignore[union-attr]
+    if rerank_budget_param is not None and (not rerank_budget_param.isdigit() or int(rerank_budget_param) < 1):
+        raise ValidationError("rerankBudgetMs must be a positive integer")
 
     repository = get_repository(event, repository_id=repository_id)
-
-    # Get user context for collection access
-    username, is_admin, groups = get_user_context(event)
-    effective_admin = is_admin or is_rag_admin(event)
-
-    is_default = collection_id is not None and collection_id == repository.get("embeddingModelId")
-    # Determine embedding model
-    model_name = (
-        collection_service.get_collection_model(
-            repository_id=repository_id,
-            collection_id=collection_id if not is_default else None,  # type: ignore[arg-type]
-            username=username,
-            user_groups=groups,
-            is_admin=effective_admin,
-        )
-        if collection_id
-        else query_string_params.get("modelName")  # type: ignore[union-attr]
+    model_name = _resolve_search_model(
+        event,
+        repository,
+        repository_id,
+        collection_id,
+        query_string_params.get("modelName"),  # type: ignore[union-attr]
     )
 
-    if RepositoryType.is_type(repository, RepositoryType.BEDROCK_KB):
-        # No collectionId will query the entire Knowledge base. Reserve for Admins.
-        if collection_id is None and not is_admin:
-            raise ValidationError("collectionId is required when searching Bedrock Knowledge Bases")
-    elif not model_name:
-        raise ValidationError("modelName is required when collectionId is not provided")
-
     # Use repository service for similarity search
     service = RepositoryServiceFactory.create_service(repository)
 
@@ -247,15 +252,35 @@ def similarity_search(event: dict, context: dict) -> dict[str, Any]:
     search_collection_id = collection_id or model_name
     logger.info(f"Searching in collection: {search_collection_id} with embedding model: {model_name}")
 
+    # Reranking over-fetches candidates and reorders them down to top_k
+    rerank_config = resolve_rerank_config(repository, rerank)
+    candidates = max(top_k, rerank_config.candidates) if rerank_config else top_k
+
     # Delegate to service for retrieval - service handles repository-specific logic
+    retrieve_start = time.perf_counter()
     docs = service.retrieve_documents(
         query=query,
         collection_id=search_collection_id,  # type: ignore[arg-type]
-        top_k=top_k,
+        top_k=candidates,
         model_name=model_name,  # type: ignore[arg-type]
         include_score=include_score,
         bedrock_agent_client=bedrock_client,
+        search_mode=search_mode,
     )
+    retrieve_ms = (time.perf_counter() - retrieve_start) * 1000
+
+    latency = None
+    if rerank_config:
+        budget_ms = int(rerank_budget_param) if rerank_budget_param else rerank_config.latencyBudgetMs
+        docs, outcome = rerank_documents(
+            get_reranker(rerank_config), query, docs, top_k, budget_ms / 1000, include_score=include_score
+        )
+        latency = {
+            "retrieveMs": round(retrieve_ms, 1),
+            "rerankMs": round(outcome.latency_ms, 1),
+            "rerankStatus": outcome.status,
+        }
+        logger.info(f"Search latency for {search_collection_id} with {len(docs)}/{candidates} documents: {latency}")
 
     # Enrich metadata with documentId for documents that don't have it
     # Pass the actual search_collection_id (not the metadata's collectionId which may be "default")
@@ -271,11 +296,148 @@ def similarity_search(event: dict, context: dict) -> dict[str, Any]:
         for doc in docs
     ]
 
-    doc_return = {"docs": doc_content}
+    doc_return: dict[str, Any] = {"docs": doc_content}
+    if latency:
+        doc_return["latency"] = latency
     logger.info(f"Returning: {doc_return}")
     return doc_return
 
 
+@api_wrapper
+def batch_similarity_search(event: dict, context: dict) -> dict[str, Any]:
+    """Return documents matching each of several queries against one collection.
+
+    The repository, collection and embedding model are resolved once for the batch, the queries are embedded
+    together, and the searches share one vector store client.
+
+    Args:
+        event (dict): The Lambda event object containing:
+            - pathParameters.repositoryId: Repository to search
+            - body: JSON BatchSimilaritySearchRequest with queries and the similarity search options
+              (collectionId, modelName, topK, score, searchMode, rerank, rerankBudgetMs); the queries are reranked
+              concurrently and rerankBudgetMs bounds the rerank stage of the whole batch
+        context (dict): The Lambda context object
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - results: One entry per query, in query order, with the query and its docs
+            - latency (only when reranking ran): retrieveMs and rerankMs for the batch; each result also
+              reports its rerankStatus
+
+    Raises:
+        ValidationError: If required parameters are missing or invalid
+    """
+    repository_id = (event.get("pathParameters") or {}).get("repositoryId")
+    if not repository_id:
+        raise ValidationError("repositoryId is required")
+    try:
+        request = BatchSimilaritySearchRequest(**json.loads(event.get("body") or "{}"))
+    except json.JSONDecodeError as e:
+        raise ValidationError(f"Invalid JSON in request body: {e}")
+    except Exception as e:
+        raise ValidationError(f"Invalid request: {e}")
+
+    repository = get_repository(event, repository_id=repository_id)
+    model_name = _resolve_search_model(event, repository, repository_id, request.collectionId, request.modelName)
+    service = RepositoryServiceFactory.create_service(repository)
+    search_collection_id = request.collectionId or model_name
+    logger.info(
+        f"Batch searching {len(request.queries)} queries in collection: {search_collection_id} "
+        f"with embedding model: {model_name}"
+    )
+
+    rerank_config = resolve_rerank_config(repository, request.rerank)
+    candidates = max(request.topK, rerank_config.candidates) if rerank_config else request.topK
+
+    retrieve_start = time.perf_counter()
+    results = service.retrieve_documents_batch(
+        queries=request.queries,
+        collection_id=search_collection_id,  # type: ignore[arg-type]
+        top_k=candidates,
+        model_name=model_name,  # type: ignore[arg-type]
+        include_score=request.score,
+        bedrock_agent_client=bedrock_client,
+        search_mode=request.searchMode,
+    )
+    retrieve_ms = (time.perf_counter() - retrieve_start) * 1000
+
+    statuses: list[str | None] = [None] * len(results)
+    latency = None
+    if rerank_config:
+        reranker = get_reranker(rerank_config)
+        budget_ms = request.rerankBudgetMs or rerank_config.latencyBudgetMs
+        rerank_start = time.perf_counter()
+        reranked = rerank_documents_batch(
+            reranker, request.queries, results, request.topK, budget_ms / 1000, include_score=request.score
+        )
+        rerank_ms = (time.perf_counter() - rerank_start) * 1000
+        for i, (docs, outcome) in enumerate(reranked):
+            results[i] = docs
+            statuses[i] = outcome.status
+        latency = {"retrieveMs": round(retrieve_ms, 1), "rerankMs": round(rerank_ms, 1)}
+        logger.info(f"Batch search latency for {search_collection_id}: {latency}")
+
+    # One enrichment pass resolves document ids for every query's results
+    enrich_metadata_with_document_id(
+        [doc for docs in results for doc in docs], repository_id, search_collection_id  # type: ignore[arg-type]
+    )
+
+    query_results = []
+    for query, docs, status in zip(request.queries, results, statuses):
+        query_result: dict[str, Any] = {
+            "query": query,
+            "docs": [
+                {"Document": {"page_content": doc.get("page_content", ""), "metadata": doc.get("metadata", {})}}
+                for doc in docs
+            ],
+        }
+        if status:
+            query_result["rerankStatus"] = status
+        query_results.append(query_result)
+
+    batch_return: dict[str, Any] = {"results": query_results}
+    if latency:
+        batch_return["latency"] = latency
+    return batch_return
+
+
+def _resolve_search_model(
+    event: dict[str, Any],
+    repository: dict[str, Any],
+    repository_id: str,
+    collection_id: str | None,
+    model_name: str | None,
+) -> str | None:
+    """Return the embedding model for a search: the collection's model, or the requested one without a collection.
+
+    Raises:
+        ValidationError: If the search names neither a collection nor a model, or a non-admin searches a whole
+            Bedrock Knowledge Base
+    """
+    # Get user context for collection access
+    username, is_admin, groups = get_user_context(event)
+    effective_admin = is_admin or is_rag_admin(event)
+
+    is_default = collection_id is not None and collection_id == repository.get("embeddingModelId")
+    # Determine embedding model
+    if collection_id:
+        model_name = collection_service.get_collection_model(
+            repository_id=repository_id,
+            collection_id=collection_id if not is_default else None,  # type: ignore[arg-type]
+            username=username,
+            user_groups=groups,
+            is_admin=effective_admin,
+        )
+
+    if RepositoryType.is_type(repository, RepositoryType.BEDROCK_KB):
+        # No collectionId will query the entire Knowledge base. Reserve for Admins.
+        if collection_id is None and not is_admin:
+            raise ValidationError("collectionId is required when searching Bedrock Knowledge Bases")
+    elif not model_name:
+        raise ValidationError("modelName is required when collectionId is not provided")
+    return model_name
+
+
 def get_repository(event: dict[str, Any], repository_id: str) -> dict[str, Any]:
     """Ensures a user has access to the repository or else raises an HTTPException.
 
@@ -435,7 +597,8 @@ def create_bedrock_collection(event: dict, context: dict) -> dict[str, Any]:
 
 def create_default_collection(event: dict, context: dict) -> dict[str, Any]:
     """Persist the default collection for a non-Bedrock repository after stack creation.
-    Called by the state machine for OpenSearch/PGVector repositories.
+    Called by the state machine for OpenSearch/PGVector repositories. With hybridSearch configured, also creates what
+    hybrid search needs in the store.
     """
     try:
         rag_config = event.get("ragConfig", {})
@@ -446,6 +609,13 @@ def create_default_collection(event: dict, context: dict) -> dict[str, Any]:
         repository = vs_repo.find_repository_by_id(repository_id)
         service = RepositoryServiceFactory.create_service(repository)
 
+        if repository.get("hybridSearch"):
+            try:
+                service.prepare_hybrid_search()
+            except Exception as e:
+                # Hybrid search still works without it, only slower
+                logger.error(f"Failed to prepare hybrid search for {repository_id}: {e}", exc_info=True)
+
         if not service.should_create_default_collection():
             return {"skipped": True, "reason": "repository type does not support default collections"}
 
@@ -1118,6 +1288,7 @@ def ingest_documents(event: dict, context: dict) -> dict:
 
     # Create jobs
     jobs = []
+    created_jobs: list[IngestionJob] = []
     for key in request.keys:
         job = ingestion_service.create_ingestion_job(
             repository=repository,
@@ -1142,8 +1313,10 @@ def ingest_documents(event: dict, context: dict) -> dict:
                 logger.info(f"Uploaded metadata file for {key}")
             except Exception as e:
                 logger.error(f"Failed to upload metadata file for {key}: {e}")
-        ingestion_service.submit_create_job(job)
+        created_jobs.append(job)
         jobs.append({"jobId": job.id, "documentId": job.document_id, "status": job.status, "s3Path": job.s3_path})
+    # Large uploads run as Batch array jobs over manifests of documents rather than one Batch job per document
+    ingestion_service.submit_create_jobs(created_jobs)
 
     collection_id = job.collection_id
     collection_name: str | None = None
@@ -1720,11 +1893,18 @@ def update_repository(event: dict, context: dict) -> dict[str, Any]:
                 # or if any other pipeline configuration changed
                 require_deployment = new_pipelines != current_pipelines
 
+    # The deployment creates what hybrid search needs in the store, such as PGVector's full-text index
+    if "hybridSearch" in updates and updates["hybridSearch"] != current_config.get("hybridSearch"):
+        if repository_type == RepositoryType.PGVECTOR:
+            logger.info(f"Hybrid search settings changed for repository {repository_id}")
+            require_deployment = True
+
     # Set status based on deployment requirement
     status = VectorStoreStatus.UPDATE_IN_PROGRESS if require_deployment else VectorStoreStatus.UPDATE_COMPLETE
 
     # Update repository
     updated_config: dict[str, Any] = vs_repo.update(repository_id, updates, status=status)
+    vector_store_client_registry.evict(repository_id)
 
     # Trigger infrastructure deployment if pipeline changed
     if require_deployment:
@@ -1819,6 +1999,8 @@ def delete(event: dict, context: dict) -> Any:
         logger.error(f"Error listing/deleting collections for repository {repository_id}: {str(e)}")
         # Continue with repository deletion even if collection cleanup fails
 
+    vector_store_client_registry.evict(repository_id)
+
     if repository.get("legacy", False) is True:
         _remove_legacy(repository_id)
         vs_repo.delete(repository_id=repository_id)
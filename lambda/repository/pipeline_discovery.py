@@ -0,0 +1,212 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Incremental discovery of new and modified objects for scheduled pipeline ingestion.
+
+Each scheduled pipeline keeps a high-water mark: the ``(LastModified, Key)`` of the newest object already submitted.
+A run returns the objects ordered after that mark, so runs can be any distance apart. Objects modified within the
+settle window before a run are left for the next run.
+
+An object can still appear behind the mark after it was advanced: a multipart upload's LastModified is the time the
+upload started rather than when it completed, and S3 Inventory reports are eventually consistent. Each run therefore
+also re-scans an overlap window behind the mark and returns the keys it finds there separately, for the caller to
+drop those already ingested before submitting the rest. Objects that land behind the mark by more than the overlap
+window are not picked up.
+
+S3 cannot filter a listing by modification time, so listing a prefix still reads every key under it. For very large
+buckets the objects can instead be read from the latest S3 Inventory report, which is a handful of compressed CSV
+objects rather than one LIST request per thousand keys.
+
+Configuration (environment variables):
+    INGESTION_WATERMARK_LOOKBACK_HOURS – how far back the first run of a pipeline looks (default 24)
+    INGESTION_WATERMARK_SETTLE_SECONDS – objects modified this recently are left for the next run (default 60)
+    INGESTION_WATERMARK_OVERLAP_HOURS – how far behind the watermark each run re-scans for late objects (default 24)
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+from urllib.parse import unquote_plus
+
+from botocore.exceptions import ClientError
+from models.domain_objects import Watermark
+from utilities.time import parse_timestamp, utc_now
+
+logger = logging.getLogger(__name__)
+
+INGESTION_WATERMARK_LOOKBACK_HOURS = int(os.environ.get("INGESTION_WATERMARK_LOOKBACK_HOURS", "24"))
+INGESTION_WATERMARK_SETTLE_SECONDS = int(os.environ.get("INGESTION_WATERMARK_SETTLE_SECONDS", "60"))
+INGESTION_WATERMARK_OVERLAP_HOURS = int(os.environ.get("INGESTION_WATERMARK_OVERLAP_HOURS", "24"))
+
+_INVENTORY_MANIFEST = "manifest.json"
+
+
+@dataclass
+class DiscoveryResult:
+    """Keys found after a watermark, and the watermark to persist once they have been submitted.
+
+    ``late_keys`` are objects within the overlap window behind the watermark. Most of them were submitted by an
+    earlier run, so callers should drop the ones already ingested.
+    """
+
+    since: Watermark
+    watermark: Watermark
+    keys: list[str] = field(default_factory=list)
+    late_keys: list[str] = field(default_factory=list)
+
+
+def pipeline_watermark_id(repository_id: str, bucket: str, prefix: str | None) -> str:
+    """Return the ingestion job table id under which a pipeline's watermark is stored."""
+    return f"pipeline-watermark#{repository_id}#{bucket}/{prefix or ''}"
+
+
+def parse_s3_uri(uri: str) -> tuple[str, str]:
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Invalid S3 URI: {uri}")
+    bucket, _, key = uri[len("s3://") :].partition("/")
+    return bucket, key
+
+
+def list_objects(s3_client: Any, bucket: str, prefix: str | None) -> Iterator[tuple[str, datetime]]:
+    """Yield the key and modification time of every object under a prefix."""
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix or ""):
+        if "Contents" not in page:
+            logger.info(f"No contents found in page for {bucket}/{prefix}")
+            continue
+        for obj in page["Contents"]:
+            yield obj["Key"], obj["LastModified"]
+
+
+def resolve_inventory_manifest(s3_client: Any, uri: str) -> tuple[str, str]:
+    """Locate an inventory manifest.
+
+    The URI either names a manifest.json directly, or the destination prefix of an inventory configuration
+    (``s3://<destination>/<prefix>/<source-bucket>/<config-id>/``), in which case the manifest of the most recent
+    report is used.
+    """
+    bucket, key = parse_s3_uri(uri)
+    if key.endswith(_INVENTORY_MANIFEST):
+        return bucket, key
+
+    prefix = f"{key.rstrip('/')}/" if key else ""
+    reports: list[str] = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        reports.extend(common["Prefix"] for common in page.get("CommonPrefixes", []))
+
+    # Report folders are named by their UTC creation time, so the newest sorts last
+    for report in sorted(reports, reverse=True):
+        manifest_key = f"{report}{_INVENTORY_MANIFEST}"
+        try:
+            s3_client.head_object(Bucket=bucket, Key=manifest_key)
+        except ClientError:
+            # A report is only complete once its manifest has been written
+            continue
+        return bucket, manifest_key
+
+    raise ValueError(f"No S3 Inventory manifest found under {uri}")
+
+
+def list_inventory_objects(
+    s3_client: Any, manifest_uri: str, bucket: str, prefix: str | None
+) -> Iterator[tuple[str, datetime]]:
+    """Yield the key and modification time of every current object under a prefix listed in an S3 Inventory report.
+
+    Only CSV reports that include the LastModifiedDate field are supported.
+    """
+    manifest_bucket, manifest_key = resolve_inventory_manifest(s3_client, manifest_uri)
+    logger.info(f"Reading S3 Inventory manifest s3://{manifest_bucket}/{manifest_key}")
+    manifest = json.loads(s3_client.get_object(Bucket=manifest_bucket, Key=manifest_key)["Body"].read())
+
+    if manifest.get("fileFormat", "CSV").upper() != "CSV":
+        raise ValueError(f"Unsupported S3 Inventory format: {manifest.get('fileFormat')}")
+    columns = [column.strip() for column in manifest.get("fileSchema", "").split(",")]
+    if "Key" not in columns or "LastModifiedDate" not in columns:
+        raise ValueError("S3 Inventory reports must include the Key and LastModifiedDate fields")
+    column = {name: index for index, name in enumerate(columns)}
+
+    # Report files live in the inventory destination bucket, named as an ARN in the manifest
+    files_bucket = manifest.get("destinationBucket", manifest_bucket).split(":::")[-1]
+    for inventory_file in manifest.get("files", []):
+        body = s3_client.get_object(Bucket=files_bucket, Key=inventory_file["key"])["Body"]
+        with gzip.GzipFile(fileobj=body) as compressed, io.TextIOWrapper(compressed, encoding="utf-8") as text:
+            for row in csv.reader(text):
+                if "Bucket" in column and row[column["Bucket"]] != bucket:
+                    continue
+                if "IsLatest" in column and row[column["IsLatest"]] == "false":
+                    continue
+                if "IsDeleteMarker" in column and row[column["IsDeleteMarker"]] == "true":
+                    continue
+                key = unquote_plus(row[column["Key"]])
+                if prefix and not key.startswith(prefix):
+                    continue
+                yield key, parse_timestamp(row[column["LastModifiedDate"]])
+
+
+def discover_modified_objects(
+    s3_client: Any,
+    bucket: str,
+    prefix: str | None,
+    watermark: Watermark | None,
+    until: datetime | None = None,
+    inventory_manifest: str | None = None,
+) -> DiscoveryResult:
+    """Find objects ordered after a watermark, and objects that arrived late within the overlap window behind it.
+
+    Args:
+        s3_client: S3 client used to list the bucket or read the inventory report
+        bucket: Source bucket
+        prefix: Source prefix
+        watermark: Watermark persisted by the previous run; without one, objects modified within
+            INGESTION_WATERMARK_LOOKBACK_HOURS are returned
+        until: Objects modified after this time are left for the next run
+        inventory_manifest: Optional S3 URI of an inventory manifest.json, or of the inventory destination
+            prefix holding the dated reports, to read instead of listing the bucket
+
+    Returns:
+        DiscoveryResult with the new keys, the late keys to check against already ingested documents, and the
+        watermark to persist once they have been submitted
+    """
+    since = watermark or Watermark(utc_now() - timedelta(hours=INGESTION_WATERMARK_LOOKBACK_HOURS))
+    result = DiscoveryResult(since=since, watermark=since)
+    # The first run has nothing behind its lookback to re-scan
+    overlap_start = since.last_modified - timedelta(hours=INGESTION_WATERMARK_OVERLAP_HOURS) if watermark else None
+
+    if inventory_manifest:
+        objects = list_inventory_objects(s3_client, inventory_manifest, bucket, prefix)
+    else:
+        objects = list_objects(s3_client, bucket, prefix)
+
+    for key, last_modified in objects:
+        position = Watermark(last_modified, key)
+        if position <= since:
+            if overlap_start is not None and last_modified >= overlap_start:
+                result.late_keys.append(key)
+            continue
+        if until is not None and last_modified > until:
+            logger.debug(f"Deferring {key} modified at {last_modified} to the next run")
+            continue
+        logger.info(f"Found modified file: {key} (Last Modified: {last_modified})")
+        result.keys.append(key)
+        result.watermark = max(result.watermark, position)
+
+    return result
@@ -12,13 +12,31 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-"""Batch container processing functions for pipeline document ingestion."""
+"""Batch container processing functions for pipeline document ingestion.
 
+A batch ingestion job lists either S3 paths or, as a manifest job, saved document ingestion jobs. Manifest jobs are
+submitted by DocumentIngestionService.submit_create_jobs; the status of each of their document jobs is written back as
+it is processed. The documents of one job share the process-wide vector store clients and embedding configuration.
+
+Configuration (environment variables):
+    INGESTION_DOCUMENT_CONCURRENCY – documents of a batch ingestion job processed at once (default 4). Embedding
+        requests from all of them share the process-wide EMBEDDING_MAX_IN_FLIGHT limit.
+    INGESTION_CHUNK_BATCH_SIZE – chunks of a document read, embedded and written at a time (default 256)
+"""
+
+import hashlib
+import json
 import logging
 import os
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 
 import boto3
 from models.domain_objects import (
+    IngestionDocumentResult,
     IngestionJob,
     IngestionStatus,
     IngestionType,
@@ -37,7 +55,7 @@ from repository.services.repository_service_factory import RepositoryServiceFact
 from repository.vector_store_repo import VectorStoreRepository
 from utilities.bedrock_kb import get_datasource_bucket_for_collection, ingest_document_to_kb, S3DocumentDiscoveryService
 from utilities.common_functions import retry_config
-from utilities.file_processing import generate_chunks
+from utilities.file_processing import iter_chunks
 from utilities.repository_types import RepositoryType
 from utilities.time import now
 
@@ -54,6 +72,9 @@ session = boto3.Session()
 s3 = boto3.client("s3", region_name=os.environ["AWS_REGION"], config=retry_config)
 bedrock_agent = boto3.client("bedrock-agent", region_name=os.environ["AWS_REGION"], config=retry_config)
 
+INGESTION_DOCUMENT_CONCURRENCY = int(os.environ.get("INGESTION_DOCUMENT_CONCURRENCY", "4"))
+INGESTION_CHUNK_BATCH_SIZE = int(os.environ.get("INGESTION_CHUNK_BATCH_SIZE", "256"))
+
 
 def pipeline_ingest(job: IngestionJob) -> None:
     """
@@ -69,9 +90,9 @@ def pipeline_ingest(job: IngestionJob) -> None:
 
 def pipeline_ingest_document(job: IngestionJob) -> None:
     """Ingest a single document."""
-    texts: list[str] = []
-    metadatas: list[dict] = []
     all_ids: list[str] = []
+    chunk_hashes: list[str] = []
+    stored_ids: list[str] = []
     try:
         # chunk and save chunks in vector store
         repository = vs_repo.find_repository_by_id(job.repository_id)
@@ -196,33 +217,78 @@ def pipeline_ingest_document(job: IngestionJob) -> None:
             return  # Early return for Bedrock KB path
 
         # Non-Bedrock KB path
-        documents = generate_chunks(job)
         if not job.collection_id and job.metadata:
             job.collection_id = job.metadata.get("collectionId")
-        texts, metadatas = prepare_chunks(documents, job.repository_id, job.collection_id)  # type: ignore[arg-type]
-        all_ids = store_chunks_in_vectorstore(
-            texts=texts,
-            metadatas=metadatas,
-            repository_id=job.repository_id,
-            collection_id=job.collection_id,  # type: ignore[arg-type]
-            embedding_model=job.embedding_model,  # type: ignore[arg-type]
-        )
 
-        # remove old
-        for rag_document in list(
+        # On re-ingest, chunks that are unchanged since the previous version keep their vector store entries
+        previous_documents = list(
             rag_document_repository.find_by_source(
                 job.repository_id,
                 job.collection_id,  # type: ignore[arg-type]
                 job.s3_path,
                 join_docs=True,
             )
-        ):
+        )
+        baseline = next(
+            (doc for doc in previous_documents if doc.subdocs and len(doc.subdoc_hashes) == len(doc.subdocs)), None
+        )
+        available = index_previous_chunks(baseline)
+
+        # Chunks are hashed, matched, embedded and written a batch at a time as they are read, so only one batch of
+        # chunk text is held in memory however large the document is
+        chunks = iter_chunks(job)
+        try:
+            while documents := list(islice(chunks, INGESTION_CHUNK_BATCH_SIZE)):
+                texts, metadatas = prepare_chunks(
+                    documents, job.repository_id, job.collection_id  # type: ignore[arg-type]
+                )
+                batch_hashes = [
+                    chunk_content_hash(text, metadata, job.embedding_model)  # type: ignore[arg-type]
+                    for text, metadata in zip(texts, metadatas)
+                ]
+                batch_ids = match_unchanged_chunks(batch_hashes, available)
+                changed = [i for i, chunk_id in enumerate(batch_ids) if chunk_id is None]
+                if changed:
+                    new_ids = store_chunks_in_vectorstore(
+                        texts=[texts[i] for i in changed],
+                        metadatas=[metadatas[i] for i in changed],
+                        repository_id=job.repository_id,
+                        collection_id=job.collection_id,  # type: ignore[arg-type]
+                        embedding_model=job.embedding_model,  # type: ignore[arg-type]
+                    )
+                    stored_ids.extend(new_ids)
+                    if len(new_ids) != len(changed):
+                        raise Exception(f"Vector store returned {len(new_ids)} ids for {len(changed)} chunks")
+                    for i, new_id in zip(changed, new_ids):
+                        batch_ids[i] = new_id
+                all_ids.extend(chunk_id for chunk_id in batch_ids if chunk_id is not None)
+                chunk_hashes.extend(batch_hashes)
+        except Exception:
+            # Chunks stored before the failure belong to no document
+            if stored_ids:
+                delete_chunks_from_vectorstore(
+                    stored_ids, job.repository_id, job.collection_id, job.embedding_model  # type: ignore[arg-type]
+                )
+            raise
+        if not all_ids:
+            raise Exception("Failed to store any documents in vector store")
+
+        vanished_ids = [subdoc_id for ids in available.values() for subdoc_id in ids]
+        logger.info(f"Re-used {len(all_ids) - len(stored_ids)} unchanged chunks, stored {len(stored_ids)} new chunks")
+
+        # remove old
+        for rag_document in previous_documents:
             prev_job = ingestion_job_repository.find_by_document(rag_document.document_id)
 
             if prev_job:
                 ingestion_job_repository.update_status(prev_job, IngestionStatus.DELETE_IN_PROGRESS)
             if not RepositoryType.is_type(repository, RepositoryType.BEDROCK_KB):
-                remove_document_from_vectorstore(rag_document)
+                if rag_document is baseline:
+                    # Only chunks missing from the new version are removed
+                    if vanished_ids:
+                        remove_document_from_vectorstore(rag_document, subdoc_ids=vanished_ids)
+                else:
+                    remove_document_from_vectorstore(rag_document)
             rag_document_repository.delete_by_id(rag_document.document_id)
 
             if prev_job:
@@ -239,6 +305,7 @@ def pipeline_ingest_document(job: IngestionJob) -> None:
             document_name=os.path.basename(job.s3_path),
             source=job.s3_path,
             subdocs=all_ids,
+            subdoc_hashes=chunk_hashes,
             chunk_strategy=job.chunk_strategy,
             username=job.username,
             ingestion_type=ingestion_type,
@@ -261,70 +328,61 @@ def pipeline_ingest_document(job: IngestionJob) -> None:
 
 def pipeline_ingest_documents(job: IngestionJob) -> None:
     """
-    Ingest multiple documents in batch (up to 100 at a time).
+    Ingest multiple documents in batch.
 
-    Processes documents from s3_paths field containing list of S3 paths.
-    If s3_paths is empty, triggers S3 bucket scan to discover existing documents.
+    Processes the saved document jobs listed in manifest_job_ids, or else the documents in the s3_paths field (up to
+    100), INGESTION_DOCUMENT_CONCURRENCY at a time, and records each document's outcome in the job's
+    document_results.
+    If both are empty, triggers S3 bucket scan to discover existing documents.
     """
     try:
         logger.info(f"Starting batch ingestion for job {job.id}")
 
         # Check if this is an S3 discovery scan job (empty s3_paths)
-        if not job.s3_paths:
+        if not job.s3_paths and not job.manifest_job_ids:
             # Handle S3 bucket scanning for existing documents
             _handle_s3_discovery_scan(job)
             return
 
-        # Normal batch ingestion path
-        # Extract document list from s3_paths field
+        ingest_one: Callable[[str], IngestionDocumentResult]
+        if job.manifest_job_ids:
+            items = list(dict.fromkeys(job.manifest_job_ids))
+            ingest_one = _ingest_manifest_document
+        else:
+            # Extract document list from s3_paths field
+            document_paths = job.s3_paths
+            if not isinstance(document_paths, list):
+                raise ValueError("'s3_paths' must be a list")
 
-        document_paths = job.s3_paths
-        if not isinstance(document_paths, list):
-            raise ValueError("'s3_paths' must be a list")
+            if len(document_paths) > 100:
+                raise ValueError(f"Batch size {len(document_paths)} exceeds maximum of 100 documents")
 
-        if len(document_paths) > 100:
-            raise ValueError(f"Batch size {len(document_paths)} exceeds maximum of 100 documents")
+            # Documents sharing a path would race to replace each other's chunks, so each path is ingested once
+            items = list(dict.fromkeys(document_paths))
+            if len(items) < len(document_paths):
+                logger.info(f"Skipping {len(document_paths) - len(items)} duplicate paths in batch")
+            ingest_one = partial(_ingest_batch_document, job)
 
-        logger.info(f"Processing {len(document_paths)} documents in batch")
+        concurrency = max(1, min(INGESTION_DOCUMENT_CONCURRENCY, len(items)))
+        logger.info(f"Processing {len(items)} documents in batch, {concurrency} at a time")
 
         # Update job status
         ingestion_job_repository.update_status(job, IngestionStatus.INGESTION_IN_PROGRESS)
 
-        # Process each document and collect document IDs
-        successful = 0
-        failed = 0
-        errors = []
-        document_ids = []
-
-        for s3_path in document_paths:
-            try:
-                # Create individual job for each document
-                doc_job = IngestionJob(
-                    repository_id=job.repository_id,
-                    collection_id=job.collection_id,
-                    embedding_model=job.embedding_model,
-                    chunk_strategy=job.chunk_strategy,
-                    s3_path=s3_path,
-                    username=job.username,
-                    metadata=job.metadata,
-                    ingestion_type=job.ingestion_type,
-                    job_type=JobActionType.DOCUMENT_INGESTION,
-                )
+        # Most of each document's time is spent waiting on S3, the embedding API and the vector store
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # Executor.map yields results in submission order, so results line up with their documents
+            results = list(executor.map(ingest_one, items))
 
-                # Process the document
-                pipeline_ingest_document(doc_job)
-                successful += 1
-                document_ids.append(doc_job.document_id)
-                logger.info(f"Successfully ingested document {s3_path}")
-
-            except Exception as e:
-                failed += 1
-                error_msg = f"Failed to ingest {s3_path}: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                errors.append(error_msg)
+        successful = sum(1 for result in results if result.status == IngestionStatus.INGESTION_COMPLETED)
+        failed = len(results) - successful
 
-        # Update job with document IDs
-        job.document_ids = document_ids  # type: ignore[assignment]
+        # Record each document's outcome on the job
+        job.document_ids = [result.document_id for result in results if result.document_id]
+        job.document_results = results
+        if failed:
+            job.error_message = f"{failed} of {len(results)} documents failed to ingest"
+        ingestion_job_repository.save(job)
 
         if failed == 0:
             ingestion_job_repository.update_status(job, IngestionStatus.INGESTION_COMPLETED)
@@ -340,6 +398,71 @@ def pipeline_ingest_documents(job: IngestionJob) -> None:
         raise Exception(error_msg)
 
 
+def _ingest_batch_document(job: IngestionJob, s3_path: str) -> IngestionDocumentResult:
+    """Ingest one document of a batch job, returning its outcome instead of raising."""
+    # Create individual job for each document
+    doc_job = IngestionJob(
+        repository_id=job.repository_id,
+        collection_id=job.collection_id,
+        embedding_model=job.embedding_model,
+        chunk_strategy=job.chunk_strategy,
+        s3_path=s3_path,
+        username=job.username,
+        metadata=job.metadata,
+        ingestion_type=job.ingestion_type,
+        job_type=JobActionType.DOCUMENT_INGESTION,
+    )
+    try:
+        pipeline_ingest_document(doc_job)
+    except Exception as e:
+        logger.error(f"Failed to ingest {s3_path}: {str(e)}", exc_info=True)
+        return IngestionDocumentResult(
+            s3_path=s3_path, status=IngestionStatus.INGESTION_FAILED, job_id=doc_job.id, error_message=str(e)
+        )
+
+    logger.info(f"Successfully ingested document {s3_path}")
+    return IngestionDocumentResult(
+        s3_path=s3_path,
+        status=IngestionStatus.INGESTION_COMPLETED,
+        job_id=doc_job.id,
+        document_id=doc_job.document_id,
+    )
+
+
+def _ingest_manifest_document(job_id: str) -> IngestionDocumentResult:
+    """Ingest one saved document job of a manifest job, writing its status back and returning its outcome."""
+    try:
+        doc_job = ingestion_job_repository.find_by_id(job_id)
+    except Exception as e:
+        logger.error(f"Failed to load ingestion job {job_id}: {str(e)}")
+        return IngestionDocumentResult(
+            s3_path="", status=IngestionStatus.INGESTION_FAILED, job_id=job_id, error_message=str(e)
+        )
+
+    if doc_job.status == IngestionStatus.INGESTION_COMPLETED:
+        # A retried manifest job leaves documents ingested by the earlier attempt alone
+        logger.info(f"Document {doc_job.s3_path} already ingested by job {job_id}")
+    else:
+        ingestion_job_repository.update_status(doc_job, IngestionStatus.INGESTION_IN_PROGRESS)
+        try:
+            pipeline_ingest_document(doc_job)
+        except Exception as e:
+            logger.error(f"Failed to ingest {doc_job.s3_path}: {str(e)}", exc_info=True)
+            doc_job.status = IngestionStatus.INGESTION_FAILED
+            doc_job.error_message = str(e)
+            ingestion_job_repository.save(doc_job)
+            return IngestionDocumentResult(
+                s3_path=doc_job.s3_path, status=IngestionStatus.INGESTION_FAILED, job_id=job_id, error_message=str(e)
+            )
+
+    return IngestionDocumentResult(
+        s3_path=doc_job.s3_path,
+        status=IngestionStatus.INGESTION_COMPLETED,
+        job_id=job_id,
+        document_id=doc_job.document_id,
+    )
+
+
 def _handle_s3_discovery_scan(job: IngestionJob) -> None:
     """
     Handle S3 bucket scanning for existing documents.
@@ -407,8 +530,11 @@ def _handle_s3_discovery_scan(job: IngestionJob) -> None:
         raise Exception(error_msg)
 
 
-def remove_document_from_vectorstore(doc: RagDocument) -> None:
-    """Delete document from vector store using repository service."""
+def remove_document_from_vectorstore(doc: RagDocument, subdoc_ids: list[str] | None = None) -> None:
+    """Delete document from vector store using repository service.
+
+    Deletes all of the document's chunks, or only ``subdoc_ids`` if given.
+    """
     vs_repo = VectorStoreRepository()
     repository = vs_repo.find_repository_by_id(doc.repository_id)
 
@@ -418,7 +544,40 @@ def remove_document_from_vectorstore(doc: RagDocument) -> None:
         collection_id=doc.collection_id,
         embeddings=embeddings,
     )
-    vector_store.delete(doc.subdocs)  # type: ignore[union-attr]
+    vector_store.delete(doc.subdocs if subdoc_ids is None else subdoc_ids)  # type: ignore[union-attr]
+
+
+def chunk_content_hash(text: str, metadata: dict, embedding_model: str) -> str:
+    """Hash a chunk's text, metadata and embedding model.
+
+    The chunk's "part" number is part of the metadata that is stored with its vector, so a chunk that moved within
+    the document does not match and is embedded again rather than keeping a stale part number.
+    """
+    content = {"text": text, "metadata": metadata, "model": embedding_model}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def index_previous_chunks(previous: RagDocument | None) -> defaultdict[str, deque[str]]:
+    """Index the subdoc ids of a document's previous version by content hash, for match_unchanged_chunks."""
+    available: defaultdict[str, deque[str]] = defaultdict(deque)
+    if previous is not None:
+        for subdoc_id, subdoc_hash in zip(previous.subdocs, previous.subdoc_hashes):
+            available[subdoc_hash].append(subdoc_id)
+    return available
+
+
+def match_unchanged_chunks(chunk_hashes: list[str], available: dict[str, deque[str]]) -> list[str | None]:
+    """Match new chunks to identical chunks of a document's previous version.
+
+    Returns the subdoc id to re-use for each chunk, or None for chunks that must be embedded and stored. Matched ids
+    are taken out of ``available``, so the ids left in it once every chunk has been matched are the previous chunks
+    that vanished.
+    """
+    chunk_ids: list[str | None] = []
+    for chunk_hash in chunk_hashes:
+        ids = available.get(chunk_hash)
+        chunk_ids.append(ids.popleft() if ids else None)
+    return chunk_ids
 
 
 def batch_texts(texts: list[str], metadatas: list[dict], batch_size: int = 256) -> list[tuple[list[str], list[dict]]]:
@@ -472,3 +631,22 @@ def store_chunks_in_vectorstore(
         raise Exception("Failed to store any documents in vector store")
 
     return all_ids
+
+
+def delete_chunks_from_vectorstore(
+    ids: list[str], repository_id: str, collection_id: str, embedding_model: str
+) -> None:
+    """Delete stored chunks that no document refers to, logging rather than raising on failure."""
+    try:
+        vs_repo = VectorStoreRepository()
+        repository = vs_repo.find_repository_by_id(repository_id)
+
+        service = RepositoryServiceFactory.create_service(repository)
+        embeddings = RagEmbeddings(model_name=embedding_model)
+        vs = service.get_vector_store_client(
+            collection_id=collection_id,
+            embeddings=embeddings,
+        )
+        vs.delete(ids)  # type: ignore[union-attr]
+    except Exception as e:
+        logger.error(f"Failed to delete {len(ids)} orphaned chunks from collection {collection_id}: {e}", exc_info=True)
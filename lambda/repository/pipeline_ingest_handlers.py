@@ -21,6 +21,9 @@ from typing import Any, cast
 
 import boto3
 from models.domain_objects import (
+    CHUNKING_STRATEGY_MODELS,
+    ChunkingStrategy,
+    ChunkingStrategyType,
     FixedChunkingStrategy,
     IngestionJob,
     IngestionStatus,
@@ -31,6 +34,11 @@ from repository.collection_service import CollectionService
 from repository.ingestion_job_repo import IngestionJobRepository
 from repository.ingestion_service import DocumentIngestionService
 from repository.metadata_generator import MetadataGenerator
+from repository.pipeline_discovery import (
+    discover_modified_objects,
+    INGESTION_WATERMARK_SETTLE_SECONDS,
+    pipeline_watermark_id,
+)
 from repository.rag_document_repo import RagDocumentRepository
 from repository.vector_store_repo import VectorStoreRepository
 from utilities.auth import get_username
@@ -53,12 +61,13 @@ bedrock_agent = boto3.client("bedrock-agent", region_name=os.environ["AWS_REGION
 ssm_client = boto3.client("ssm", region_name=os.environ["AWS_REGION"], config=retry_config)
 
 
-def extract_chunk_strategy(pipeline_config: dict) -> FixedChunkingStrategy | NoneChunkingStrategy:
+def extract_chunk_strategy(pipeline_config: dict) -> ChunkingStrategy:
     if "chunkingStrategy" in pipeline_config and pipeline_config["chunkingStrategy"]:
         chunking_strategy = pipeline_config["chunkingStrategy"]
         chunk_type = chunking_strategy.get("type", "fixed")
-        if chunk_type == "fixed":
-            return cast(FixedChunkingStrategy, FixedChunkingStrategy.model_validate(chunking_strategy))
+        if chunk_type in CHUNKING_STRATEGY_MODELS:
+            model = CHUNKING_STRATEGY_MODELS[ChunkingStrategyType(chunk_type)]
+            return cast(ChunkingStrategy, model.model_validate(chunking_strategy))
         else:
             raise ValueError(f"Unsupported chunking strategy type: {chunk_type}")
     elif "chunkSize" in pipeline_config and "chunkOverlap" in pipeline_config:
@@ -188,8 +197,21 @@ def handle_pipeline_ingest_event(event: dict[str, Any], context: Any) -> None:
     logger.info(f"Submitted ingestion job for document {s3_path} in repository {repository_id}")
 
 
+def drop_ingested_keys(repository_id: str, collection_id: str, bucket: str, keys: list[str]) -> list[str]:
+    """Return the keys that have no document in the collection yet, using the document source index."""
+    if not keys:
+        return []
+    ingested = rag_document_repository.find_document_ids_by_source(
+        repository_id, collection_id, [f"s3://{bucket}/{key}" for key in keys]
+    )
+    late_keys = [key for key in keys if f"s3://{bucket}/{key}" not in ingested]
+    if late_keys:
+        logger.info(f"Found {len(late_keys)} objects that arrived behind the watermark in {bucket}")
+    return late_keys
+
+
 def handle_pipline_ingest_schedule(event: dict[str, Any], context: Any) -> None:
-    """Lists objects modified in the last 24 hours and submits ingestion jobs."""
+    """Lists objects modified since the pipeline's previous run and submits ingestion jobs."""
     logger.debug(f"Received event: {event}")
 
     detail = event.get("detail", {})
@@ -213,30 +235,21 @@ def handle_pipline_ingest_schedule(event: dict[str, Any], context: Any) -> None:
     try:
         logger.info(f"Processing request for bucket: {bucket}, prefix: {prefix}")
 
-        twenty_four_hours_ago = utc_now() - timedelta(hours=24)
-        modified_keys = []
-        paginator = s3.get_paginator("list_objects_v2")
+        pipeline_id = pipeline_watermark_id(repository_id, bucket, prefix)
+        watermark = ingestion_job_repository.find_watermark(pipeline_id)
+        inventory_manifest = pipeline_config.get("s3InventoryManifest")
+        until = utc_now() - timedelta(seconds=INGESTION_WATERMARK_SETTLE_SECONDS)
 
-        logger.info(f"Listing objects in {bucket}{prefix} modified after {twenty_four_hours_ago}")
+        logger.info(f"Listing objects in {bucket}{prefix} after {watermark} up to {until}")
 
         try:
-            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                if "Contents" not in page:
-                    logger.info(f"No contents found in page for {bucket}{prefix}")
-                    continue
-                for obj in page["Contents"]:
-                    last_modified = obj["LastModified"]
-                    if last_modified >= twenty_four_hours_ago:
-                        logger.info(f"Found modified file: {obj['Key']} (Last Modified: {last_modified})")
-                        modified_keys.append(obj["Key"])
-                    else:
-                        logger.debug(
-                            f"Skipping file {obj['Key']} - Last modified {last_modified}"
-                            f" before cutoff {twenty_four_hours_ago}"
-                        )
+            discovery = discover_modified_objects(
+                s3, bucket, prefix, watermark, until=until, inventory_manifest=inventory_manifest
+            )
         except Exception as e:
             logger.error(f"Error during S3 list operation: {str(e)}", exc_info=True)
             raise
+        modified_keys = discovery.keys + drop_ingested_keys(repository_id, embedding_model, bucket, discovery.late_keys)
 
         merged_metadata = MetadataGenerator.merge_metadata(
             repository=repository,
@@ -245,6 +258,7 @@ def handle_pipline_ingest_schedule(event: dict[str, Any], context: Any) -> None:
             for_bedrock_kb=False,
         )
 
+        jobs = []
         for key in modified_keys:
             job = IngestionJob(
                 repository_id=repository_id,
@@ -256,7 +270,11 @@ def handle_pipline_ingest_schedule(event: dict[str, Any], context: Any) -> None:
                 metadata=merged_metadata,
             )
             ingestion_job_repository.save(job)
-            ingestion_service.submit_create_job(job)
+            jobs.append(job)
+        ingestion_service.submit_create_jobs(jobs)
+
+        # Only advance once the jobs are submitted, so a failed run is retried from the same position
+        ingestion_job_repository.save_watermark(pipeline_id, discovery.watermark)
 
         logger.info(f"Found {len(modified_keys)} modified files in {bucket}{prefix}")
     except Exception as e:
@@ -34,13 +34,24 @@ def delete(job: IngestionJob) -> None:
     pipeline_delete(job)
 
 
-if __name__ == "__main__":
-    import sys
+def resolve_job_id(job_id: str) -> str:
+    """Return the id of the job to process, which for a child of an AWS Batch array job is its manifest job."""
+    array_index = os.environ.get("AWS_BATCH_JOB_ARRAY_INDEX")
+    return f"{job_id}-{array_index}" if array_index is not None else job_id
 
-    if len(sys.argv) > 2:
-        job = ingestion_job_repository.find_by_id(sys.argv[2])
 
-        if sys.argv[1] == "ingest":
+def main(argv: list[str]) -> None:
+    """Run the command line ``[program, ACTION, DOCUMENT_ID]``, where ACTION is "ingest" or "delete"."""
+    if len(argv) > 2:
+        job = ingestion_job_repository.find_by_id(resolve_job_id(argv[2]))
+
+        if argv[1] == "ingest":
             ingest(job)
-        elif sys.argv[1] == "delete":
+        elif argv[1] == "delete":
             delete(job)
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv)
@@ -11,13 +11,15 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import hashlib
 import logging
 import os
+import time
 from collections.abc import Generator
 from concurrent.futures import as_completed, ThreadPoolExecutor
 
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 from models.domain_objects import IngestionType, RagDocument, RagSubDocument
 from repository.vector_store_repo import VectorStoreRepository
@@ -26,12 +28,19 @@ logger = logging.getLogger(__name__)
 
 MAX_SUBDOCS = 1000
 
+# Source index entries live in the document table under a separate partition per collection, keyed by a hash of the
+# document source, so a set of sources can be resolved to document ids with BatchGetItem instead of a query each.
+SOURCE_INDEX_PK_PREFIX = "source#"
+# DynamoDB BatchGetItem accepts at most 100 keys per request
+BATCH_GET_LIMIT = 100
+
 
 class RagDocumentRepository:
     """RAG Document repository for DynamoDB"""
 
     def __init__(self, document_table_name: str, sub_document_table_name: str):
         dynamodb = boto3.resource("dynamodb")
+        self.dynamodb = dynamodb
         self.doc_table = dynamodb.Table(document_table_name)
         self.subdoc_table = dynamodb.Table(sub_document_table_name)
         self.s3_client = boto3.client("s3", region_name=os.environ["AWS_REGION"])
@@ -63,6 +72,7 @@ class RagDocumentRepository:
             # Check if document exists before trying to delete it
             if document is not None:
                 self.doc_table.delete_item(Key={"pk": document.pk, "document_id": document.document_id})
+                self._delete_source_index(document)
             else:
                 logging.warning(f"Document with ID {document_id} not found, skipping deletion from doc table")
         except ClientError as e:
@@ -85,6 +95,9 @@ class RagDocumentRepository:
             chunked_docs = list(document.chunk_doc(chunk_size=MAX_SUBDOCS))
             # Save document to metadata table
             self.doc_table.put_item(Item=document.model_dump())
+            self._put_source_index(
+                document.repository_id, document.collection_id, document.source, document.document_id
+            )
             # Save subdocs to separate table
             with self.subdoc_table.batch_writer() as batch:
                 for chunk in chunked_docs:
@@ -224,11 +237,90 @@ class RagDocumentRepository:
             logging.error(f"Error finding document by source: {e}")
             return None
 
+    def find_document_ids_by_source(self, repository_id: str, collection_id: str, sources: list[str]) -> dict[str, str]:
+        """Resolve document sources to document ids using the source index.
+
+        Repeated sources are looked up once, and up to 100 sources are read per BatchGetItem. Sources missing from
+        the index, such as documents saved before it existed, fall back to find_one_by_source and are added to the
+        index for later lookups.
+
+        Args:
+            repository_id: Repository identifier
+            collection_id: Collection identifier
+            sources: S3 source paths, e.g. from similarity search results
+
+        Returns:
+            Mapping of source to document id for the sources that have a document
+        """
+        keys = {source: self._source_index_key(repository_id, collection_id, source) for source in sources if source}
+        source_by_hash = {key["document_id"]: source for source, key in keys.items()}
+        key_list = list(keys.values())
+        document_ids: dict[str, str] = {}
+
+        for start in range(0, len(key_list), BATCH_GET_LIMIT):
+            request_items = {
+                self.doc_table.name: {
+                    "Keys": key_list[start : start + BATCH_GET_LIMIT],
+                    "ProjectionExpression": "document_id, target_document_id",
+                }
+            }
+            delay = 0.1
+            for _attempt in range(5):
+                response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get("Responses", {}).get(self.doc_table.name, []):
+                    document_ids[source_by_hash[item["document_id"]]] = item["target_document_id"]
+                request_items = response.get("UnprocessedKeys", {})
+                if not request_items:
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 5)
+            else:
+                logger.warning("BatchGetItem: gave up retrying UnprocessedKeys after 5 attempts")
+
+        for source in keys.keys() - document_ids.keys():
+            document = self.find_one_by_source(repository_id, collection_id, source)
+            if document:
+                document_ids[source] = document.document_id
+                self._put_source_index(repository_id, collection_id, source, document.document_id)
+
+        return document_ids
+
+    @staticmethod
+    def _source_index_key(repository_id: str, collection_id: str, source: str) -> dict[str, str]:
+        pk = RagDocument.createPartitionKey(repository_id, collection_id)
+        return {
+            "pk": f"{SOURCE_INDEX_PK_PREFIX}{pk}",
+            "document_id": hashlib.sha256(source.encode("utf-8")).hexdigest(),
+        }
+
+    def _put_source_index(self, repository_id: str, collection_id: str, source: str, document_id: str) -> None:
+        """Point the source index entry for ``source`` at ``document_id``."""
+        self.doc_table.put_item(
+            Item={
+                **self._source_index_key(repository_id, collection_id, source),
+                "source": source,
+                "target_document_id": document_id,
+            }
+        )
+
+    def _delete_source_index(self, document: RagDocument) -> None:
+        """Remove the source index entry for a deleted document, unless it already points at a newer document."""
+        try:
+            self.doc_table.delete_item(
+                Key=self._source_index_key(document.repository_id, document.collection_id, document.source),
+                ConditionExpression=Attr("target_document_id").eq(document.document_id),
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
     def _yield_documents(self, items: list[dict], join_docs: bool) -> Generator[RagDocument]:
         for item in items:
             document = RagDocument(**item)
             if join_docs:
-                document.subdocs = self._get_subdoc_ids(self.find_subdocs_by_id(document.document_id))
+                entries = self.find_subdocs_by_id(document.document_id)
+                document.subdocs = self._get_subdoc_ids(entries)
+                document.subdoc_hashes = self._get_subdoc_hashes(entries)
             yield document
 
     def list_all(
@@ -350,6 +442,14 @@ class RagDocumentRepository:
         """
         return [doc for entry in entries for doc in entry.subdocs]
 
+    def _get_subdoc_hashes(self, entries: list[RagSubDocument]) -> list[str]:
+        """Map subdocument content hashes, in the same order as _get_subdoc_ids.
+
+        Documents ingested before content hashes were recorded have none, so the result is only usable when it is
+        as long as the subdoc list.
+        """
+        return [subdoc_hash for entry in entries for subdoc_hash in entry.subdoc_hashes]
+
     def delete_s3_object(self, uri: str) -> None:
         """Delete an object and its metadata file from S3.
 
@@ -405,6 +505,23 @@ class RagDocumentRepository:
                     doc_ids.append(item["document_id"])
                     batch.delete_item(Key={"pk": item["pk"], "document_id": item["document_id"]})
 
+        # Remove the collection's source index entries
+        index_pk = f"{SOURCE_INDEX_PK_PREFIX}{pk}"
+        response = self.doc_table.query(
+            KeyConditionExpression=Key("pk").eq(index_pk), ProjectionExpression="pk,document_id"
+        )
+        while True:
+            with self.doc_table.batch_writer() as batch:
+                for item in response["Items"]:
+                    batch.delete_item(Key={"pk": item["pk"], "document_id": item["document_id"]})
+            if "LastEvaluatedKey" not in response:
+                break
+            response = self.doc_table.query(
+                KeyConditionExpression=Key("pk").eq(index_pk),
+                ProjectionExpression="pk,document_id",
+                ExclusiveStartKey=response["LastEvaluatedKey"],
+            )
+
         # Delete subdocuments in parallel
         def delete_subdocs(doc_id: str) -> None:
             response = self.subdoc_table.query(
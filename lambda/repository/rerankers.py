@@ -0,0 +1,271 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Second-stage reranking of similarity search results.
+
+A reranked search over-fetches candidates from the repository and lets a reranker reorder them before the top results
+are returned. Rerankers:
+
+    cross_encoder – a cross-encoder model served behind the LISA API's /rerank route
+    term_overlap  – BM25 over the candidate set, scored locally on the CPU without any model
+    stub          – deterministic scores for tests, with an optional delay
+
+The rerank stage runs under a latency budget. When the reranker fails or overruns the budget, the candidates are
+returned in their original (vector) order.
+
+Configuration (environment variables):
+    RERANK_MAX_WORKERS – threads available to rerank calls, including calls that overran their budget (default 4)
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from models.domain_objects import RerankConfig, RerankerType
+from repository.embeddings import _get_http_session, RagEmbeddings
+
+logger = logging.getLogger(__name__)
+
+RERANK_MAX_WORKERS = int(os.environ.get("RERANK_MAX_WORKERS", "4"))
+
+# Rerank calls run here so the caller can stop waiting when the budget runs out
+_executor = ThreadPoolExecutor(max_workers=RERANK_MAX_WORKERS, thread_name_prefix="rerank")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Reranker(ABC):
+    """Scores candidate texts against a query; higher scores rank first."""
+
+    @abstractmethod
+    def score(self, query: str, texts: list[str], timeout: float) -> list[float]:
+        """Return one relevance score per text.
+
+        Args:
+            query: Search query
+            texts: Candidate texts
+            timeout: Seconds the caller will wait; remote rerankers should not outlive it
+        """
+        pass
+
+
+class CrossEncoderReranker(Reranker):
+    """Score with a cross-encoder model served through the LISA API's /rerank route (Cohere request format)."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+    def score(self, query: str, texts: list[str], timeout: float) -> list[float]:
+        # RagEmbeddings resolves the API endpoint, management key and certificate from the shared client config
+        client = RagEmbeddings(model_name=self.model_name)
+        response = _get_http_session().post(
+            f"{client.base_url}/rerank",
+            json={"model": self.model_name, "query": query, "documents": texts, "top_n": len(texts)},
+            headers={"Authorization": f"Bearer {client.token}", "Content-Type": "application/json"},
+            verify=client.cert_path,
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            raise Exception(f"Rerank request failed with status {response.status_code}: {response.text}")
+
+        scores = [0.0] * len(texts)
+        for result in response.json().get("results", []):
+            scores[result["index"]] = float(result["relevance_score"])
+        return scores
+
+
+class TermOverlapReranker(Reranker):
+    """Score with BM25, using the candidate set as the corpus for term statistics."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, texts: list[str], timeout: float) -> list[float]:
+        documents = [Counter(_tokenize(text)) for text in texts]
+        if not documents:
+            return []
+        average_length = sum(sum(doc.values()) for doc in documents) / len(documents) or 1.0
+        terms = set(_tokenize(query))
+        document_frequency = {term: sum(1 for doc in documents if term in doc) for term in terms}
+
+        scores = []
+        for doc in documents:
+            length = sum(doc.values())
+            score = 0.0
+            for term in terms:
+                frequency = doc.get(term, 0)
+                if not frequency:
+                    continue
+                df = document_frequency[term]
+                idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                score += idf * frequency * (self.k1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+
+class StubReranker(Reranker):
+    """Deterministic pseudo-random scores derived from the query and text, for tests and benchmarks."""
+
+    def __init__(self, delay_seconds: float = 0.0) -> None:
+        self.delay_seconds = delay_seconds
+
+    def score(self, query: str, texts: list[str], timeout: float) -> list[float]:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        return [
+            int.from_bytes(hashlib.sha256(f"{query}\0{text}".encode()).digest()[:8], "big") / 2**64 for text in texts
+        ]
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def get_reranker(config: RerankConfig) -> Reranker:
+    """Build the reranker a repository's rerank config names."""
+    if config.type == RerankerType.CROSS_ENCODER:
+        return CrossEncoderReranker(config.modelName)  # type: ignore[arg-type]
+    if config.type == RerankerType.STUB:
+        return StubReranker()
+    return TermOverlapReranker()
+
+
+def resolve_rerank_config(repository: dict[str, Any], rerank: bool | None) -> RerankConfig | None:
+    """Return the rerank config to apply to a search, or None to skip reranking.
+
+    Args:
+        repository: Repository configuration
+        rerank: Caller's choice; the repository's rerank setting is used when None
+    """
+    configured = repository.get("rerank")
+    config = RerankConfig.model_validate(configured or {})
+    if rerank is None:
+        return config if configured and config.enabled else None
+    return config if rerank else None
+
+
+@dataclass
+class RerankOutcome:
+    """What the rerank stage did and how long it took."""
+
+    status: str  # "reranked", "budget_exceeded" or "failed"
+    latency_ms: float
+
+
+def rerank_documents(
+    reranker: Reranker,
+    query: str,
+    documents: list[dict[str, Any]],
+    top_k: int,
+    budget_seconds: float,
+    include_score: bool = False,
+) -> tuple[list[dict[str, Any]], RerankOutcome]:
+    """Rerank retrieved documents and keep the top_k, falling back to their original order.
+
+    Args:
+        reranker: Reranker that scores the documents
+        query: Search query
+        documents: Candidates in vector order, as returned by retrieve_documents
+        top_k: Number of documents to return
+        budget_seconds: Time the rerank stage may take before the original order is used
+        include_score: Whether to add each document's rerank_score to its metadata
+
+    Returns:
+        The top_k documents and the outcome of the rerank stage
+    """
+    return rerank_documents_batch(reranker, [query], [documents], top_k, budget_seconds, include_score)[0]
+
+
+def rerank_documents_batch(
+    reranker: Reranker,
+    queries: list[str],
+    results: list[list[dict[str, Any]]],
+    top_k: int,
+    budget_seconds: float,
+    include_score: bool = False,
+) -> list[tuple[list[dict[str, Any]], RerankOutcome]]:
+    """Rerank the retrieved documents of several queries at once, under one shared budget.
+
+    The queries are scored concurrently, and every query still being scored when the budget runs out falls back to
+    its original order, so the whole stage takes about budget_seconds at most.
+
+    Args:
+        reranker: Reranker that scores the documents
+        queries: Search queries
+        results: Each query's candidates in vector order, as returned by retrieve_documents
+        top_k: Number of documents to return per query
+        budget_seconds: Time the rerank stage may take, for all queries together
+        include_score: Whether to add each document's rerank_score to its metadata
+
+    Returns:
+        The top_k documents and the outcome of the rerank stage for each query, in query order
+    """
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+    futures = [
+        (
+            _executor.submit(reranker.score, query, [doc.get("page_content", "") for doc in documents], budget_seconds)
+            if documents
+            else None
+        )
+        for query, documents in zip(queries, results)
+    ]
+
+    reranked: list[tuple[list[dict[str, Any]], RerankOutcome]] = []
+    for future, documents in zip(futures, results):
+        if future is None:
+            reranked.append(([], RerankOutcome("reranked", 0.0)))
+            continue
+        try:
+            scores = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except TimeoutError:
+            future.cancel()
+            latency_ms = (time.perf_counter() - start) * 1000
+            logger.warning(f"Rerank exceeded its {budget_seconds * 1000:.0f} ms budget, returning vector order")
+            reranked.append((documents[:top_k], RerankOutcome("budget_exceeded", latency_ms)))
+            continue
+        except Exception as e:
+            latency_ms = (time.perf_counter() - start) * 1000
+            logger.warning(f"Rerank failed, returning vector order: {e}", exc_info=True)
+            reranked.append((documents[:top_k], RerankOutcome("failed", latency_ms)))
+            continue
+        latency_ms = (time.perf_counter() - start) * 1000
+        reranked.append(
+            (_top_documents(documents, scores, top_k, include_score), RerankOutcome("reranked", latency_ms))
+        )
+    return reranked
+
+
+def _top_documents(
+    documents: list[dict[str, Any]], scores: list[float], top_k: int, include_score: bool
+) -> list[dict[str, Any]]:
+    # sorted is stable, so equal scores keep the vector order
+    order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)[:top_k]
+    top = []
+    for i in order:
+        doc = documents[i]
+        if include_score:
+            doc = {**doc, "metadata": {**doc.get("metadata", {}), "rerank_score": scores[i]}}
+        top.append(doc)
+    return top
@@ -29,6 +29,7 @@ from models.domain_objects import (
     NoneChunkingStrategy,
     RagCollectionConfig,
     RagDocument,
+    SearchMode,
 )
 from repository.rag_document_repo import RagDocumentRepository
 from utilities.bedrock_kb import bulk_delete_documents_from_kb, delete_document_from_kb
@@ -240,6 +241,7 @@ class BedrockKBRepositoryService(RepositoryService):
         model_name: str,
         include_score: bool = False,
         bedrock_agent_client: Any | None = None,
+        search_mode: str | None = None,
     ) -> list[dict[str, Any]]:
         """Retrieve documents from Bedrock KB using retrieve API.
 
@@ -250,6 +252,7 @@ class BedrockKBRepositoryService(RepositoryService):
             model_name: Embedding model name (not used for Bedrock KB)
             include_score: Whether to include similarity scores in metadata
             bedrock_agent_client: Bedrock agent client for KB operations
+            search_mode: "vector" or "hybrid" overrides the knowledge base's search type (SEMANTIC or HYBRID)
 
         Returns:
             List of documents with page_content and metadata
@@ -283,6 +286,10 @@ class BedrockKBRepositoryService(RepositoryService):
             },
         }
 
+        if search_mode is not None:
+            override = "HYBRID" if SearchMode(search_mode) == SearchMode.HYBRID else "SEMANTIC"
+            retrieve_params["retrievalConfiguration"]["vectorSearchConfiguration"]["overrideSearchType"] = override
+
         # Add data source filter if collection_id is provided
         # collection_id corresponds to the data source ID in Bedrock KB
         if collection_id:
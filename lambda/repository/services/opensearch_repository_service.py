@@ -17,14 +17,16 @@
 import json
 import logging
 import os
-from typing import Any
+from typing import Any, cast
 
 import boto3
 from langchain_community.vectorstores import OpenSearchVectorSearch
+from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
 from opensearchpy import RequestsHttpConnection
 from repository.embeddings import RagEmbeddings
+from repository.vector_store_clients import vector_store_client_registry
 from requests_aws4auth import AWS4Auth
 from utilities.common_functions import retry_config
 from utilities.repository_types import RepositoryType
@@ -43,73 +45,26 @@ class OpenSearchRepositoryService(VectorStoreRepositoryService):
     Only implements OpenSearch-specific index management.
     """
 
-    def retrieve_documents(
-        self,
-        query: str,
-        collection_id: str,
-        top_k: int,
-        model_name: str,
-        include_score: bool = False,
-        bedrock_agent_client: Any = None,
-    ) -> list[dict[str, Any]]:
-        """Retrieve documents from OpenSearch with index existence check.
-
-        Args:
-            query: Search query
-            collection_id: Collection to search
-            top_k: Number of results to return
-            model_name: Embedding model name to use for query embedding
-            include_score: Whether to include similarity scores in metadata
-            bedrock_agent_client: Not used for OpenSearch
-
-        Returns:
-            List of documents with page_content and metadata
-        """
-        # Create embeddings and vector store client once
-        embeddings = RagEmbeddings(model_name=model_name)
-        vector_store = self._get_vector_store_client(
-            collection_id=collection_id,
-            embeddings=embeddings,
-        )
-
-        # Check if index exists before searching
+    def _collection_exists(self, vector_store: VectorStore, collection_id: str) -> bool:
+        """Check that the collection's index exists, since searching a missing index fails."""
         if hasattr(vector_store, "client") and hasattr(vector_store.client, "indices"):
-            if not vector_store.client.indices.exists(index=collection_id):
-                logger.info(f"Collection {collection_id} does not exist. Returning empty docs.")
-                return []
-
-        # Perform similarity search
-        results = vector_store.similarity_search_with_score(query, k=top_k)
-
-        documents = []
-        for i, (doc, score) in enumerate(results):
-            doc_dict = {
-                "page_content": doc.page_content,
-                "metadata": doc.metadata.copy() if doc.metadata else {},
-            }
-
-            if include_score:
-                # OpenSearch scores are already normalized (0-1 range)
-                normalized_score = self._normalize_similarity_score(score)
-                doc_dict["metadata"]["similarity_score"] = normalized_score
-
-                logger.info(
-                    f"Result {i + 1}: Raw Score={score:.4f}, Similarity={normalized_score:.4f}, "
-                    f"Content: {doc.page_content[:200]}..."
-                )
-                logger.info(f"Result {i + 1} metadata: {doc.metadata}")
-
-            documents.append(doc_dict)
-
-        # Warn if all scores are low (possible embedding model mismatch)
-        if include_score and results:
-            max_score = max(self._normalize_similarity_score(score) for _, score in results)
-            if max_score < 0.3:
-                logger.warning(
-                    f"All similarity scores < 0.3 for query '{query}' - " "possible embedding model mismatch"
-                )
-
-        return documents
+            return bool(vector_store.client.indices.exists(index=collection_id))
+        return True
+
+    def _lexical_search(self, vector_store: VectorStore, query: str, k: int) -> list[tuple[Document, float]]:
+        """Rank the index's chunks with a BM25 match query on the chunk text."""
+        store = cast(OpenSearchVectorSearch, vector_store)
+        response = store.client.search(
+            index=store.index_name,
+            body={"size": k, "query": {"match": {"text": query}}, "_source": {"excludes": ["vector_field"]}},
+        )
+        return [
+            (
+                Document(page_content=hit["_source"].get("text", ""), metadata=hit["_source"].get("metadata") or {}),
+                hit["_score"],
+            )
+            for hit in response["hits"]["hits"]
+        ]
 
     def _drop_collection_index(self, collection_id: str) -> None:
         """Drop OpenSearch index for collection."""
@@ -142,6 +97,8 @@ class OpenSearchRepositoryService(VectorStoreRepositoryService):
     def _get_vector_store_client(self, collection_id: str, embeddings: Embeddings) -> VectorStore:
         """Get OpenSearch vector store client.
 
+        Clients are cached per process, so warm invocations reuse the client's HTTP connection pool.
+
         Args:
             collection_id: Collection identifier
             embeddings: Embeddings adapter
@@ -152,12 +109,23 @@ class OpenSearchRepositoryService(VectorStoreRepositoryService):
         Raises:
             ValueError: If repository is not registered or not an OpenSearch repository
         """
+        return vector_store_client_registry.get_client(
+            repository_id=self.repository_id,  # type: ignore[arg-type]
+            collection_id=collection_id,
+            embeddings=embeddings,
+            load_config=self._get_connection_info,
+            build_client=self._build_vector_store_client,
+            close_client=self._close_vector_store_client,
+        )
+
+    def _get_connection_info(self) -> dict[str, Any]:
+        """Read the repository's connection info from SSM Parameter Store."""
         prefix = os.environ.get("REGISTERED_REPOSITORIES_PS_PREFIX")
         parameter_name = f"{prefix}{self.repository_id}"
 
         try:
             connection_info = ssm_client.get_parameter(Name=parameter_name)
-            connection_info = json.loads(connection_info["Parameter"]["Value"])
+            return cast(dict[str, Any], json.loads(connection_info["Parameter"]["Value"]))
         except ssm_client.exceptions.ParameterNotFound:
             logger.error(
                 f"Repository '{self.repository_id}' not found in SSM Parameter Store. "
@@ -169,16 +137,18 @@ class OpenSearchRepositoryService(VectorStoreRepositoryService):
                 f"Please register the repository before performing operations."
             )
 
+    def _build_vector_store_client(
+        self, connection_info: dict[str, Any], collection_id: str, embeddings: Embeddings
+    ) -> VectorStore:
+        """Build an OpenSearch client that signs each request with the current session credentials."""
         if not RepositoryType.is_type(connection_info, RepositoryType.OPENSEARCH):
             raise ValueError(f"Repository {self.repository_id} is not an OpenSearch repository")
 
-        credentials = session.get_credentials()
+        # Refreshable credentials keep a long-lived client signing with unexpired keys
         auth = AWS4Auth(
-            credentials.access_key,
-            credentials.secret_key,
-            session.region_name,
-            "es",
-            session_token=credentials.token,
+            region=session.region_name,
+            service="es",
+            refreshable_credentials=session.get_credentials(),
         )
 
         opensearch_endpoint = f"https://{connection_info.get('endpoint')}"
@@ -196,3 +166,9 @@ class OpenSearchRepositoryService(VectorStoreRepositoryService):
             connection_class=RequestsHttpConnection,
             engine="faiss",
         )
+
+    def _close_vector_store_client(self, vector_store: VectorStore) -> None:
+        """Close the HTTP connections of an evicted OpenSearch client."""
+        client = getattr(vector_store, "client", None)
+        if client is not None:
+            client.close()
@@ -17,14 +17,20 @@
 import json
 import logging
 import os
+from typing import Any, cast
+from urllib.parse import quote_plus
 
 import boto3
+import sqlalchemy
 from langchain_community.vectorstores import PGVector
+from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
 from repository.embeddings import RagEmbeddings
+from repository.vector_store_clients import vector_store_client_registry
+from sqlalchemy.orm import Session
 from utilities.common_functions import get_lambda_role_name, retry_config
-from utilities.rds_auth import generate_auth_token
+from utilities.rds_auth import IamAuthTokenProvider
 from utilities.repository_types import RepositoryType
 
 from .vector_store_repository_service import VectorStoreRepositoryService
@@ -33,6 +39,11 @@ logger = logging.getLogger(__name__)
 ssm_client = boto3.client("ssm", region_name=os.environ["AWS_REGION"], config=retry_config)
 secretsmanager_client = boto3.client("secretsmanager", region_name=os.environ["AWS_REGION"], config=retry_config)
 
+# Postgres text search configuration used to parse chunks and queries for hybrid search
+PGVECTOR_TEXT_SEARCH_CONFIG = os.environ.get("PGVECTOR_TEXT_SEARCH_CONFIG", "english")
+# GIN index over to_tsvector(PGVECTOR_TEXT_SEARCH_CONFIG, document), created by prepare_hybrid_search
+_TEXT_SEARCH_INDEX = "ix_langchain_pg_embedding_document_fts"
+
 
 class PGVectorRepositoryService(VectorStoreRepositoryService):
     """Service for PGVector repository operations.
@@ -77,9 +88,43 @@ class PGVectorRepositoryService(VectorStoreRepositoryService):
         """
         return max(0.0, 1.0 - (score / 2.0))
 
+    def _lexical_search(self, vector_store: VectorStore, query: str, k: int) -> list[tuple[Document, float]]:
+        """Rank the collection's chunks by Postgres full-text relevance (ts_rank_cd over to_tsvector).
+
+        Query terms are OR'ed, like an OpenSearch match query, so a chunk containing only the identifier from a
+        longer question still matches.
+        """
+        store = cast(PGVector, vector_store)
+        embedding_store = store.EmbeddingStore
+        ts_vector = sqlalchemy.func.to_tsvector(PGVECTOR_TEXT_SEARCH_CONFIG, embedding_store.document)
+        and_query = sqlalchemy.cast(
+            sqlalchemy.func.plainto_tsquery(PGVECTOR_TEXT_SEARCH_CONFIG, query), sqlalchemy.Text
+        )
+        ts_query = sqlalchemy.func.to_tsquery(PGVECTOR_TEXT_SEARCH_CONFIG, sqlalchemy.func.replace(and_query, "&", "|"))
+        rank = sqlalchemy.func.ts_rank_cd(ts_vector, ts_query).label("rank")
+
+        with Session(store._bind) as session:
+            collection = store.get_collection(session)
+            if collection is None:
+                return []
+            rows = (
+                session.query(embedding_store, rank)
+                .filter(embedding_store.collection_id == collection.uuid, ts_vector.op("@@")(ts_query))
+                .order_by(rank.desc())
+                .limit(k)
+                .all()
+            )
+
+        return [
+            (Document(page_content=row.EmbeddingStore.document, metadata=row.EmbeddingStore.cmetadata), row.rank)
+            for row in rows
+        ]
+
     def _get_vector_store_client(self, collection_id: str, embeddings: Embeddings) -> VectorStore:
         """Get PGVector vector store client.
 
+        Clients are cached per process, so warm invocations reuse the repository's connection pool.
+
         Args:
             collection_id: Collection identifier
             embeddings: Embeddings adapter
@@ -90,12 +135,23 @@ class PGVectorRepositoryService(VectorStoreRepositoryService):
         Raises:
             ValueError: If repository is not registered or not a PGVector repository
         """
+        return vector_store_client_registry.get_client(
+            repository_id=self.repository_id,  # type: ignore[arg-type]
+            collection_id=collection_id,
+            embeddings=embeddings,
+            load_config=self._get_connection_info,
+            build_client=self._build_vector_store_client,
+            close_client=self._close_vector_store_client,
+        )
+
+    def _get_connection_info(self) -> dict[str, Any]:
+        """Read the repository's connection info from SSM Parameter Store."""
         prefix = os.environ.get("REGISTERED_REPOSITORIES_PS_PREFIX")
         parameter_name = f"{prefix}{self.repository_id}"
 
         try:
             connection_info = ssm_client.get_parameter(Name=parameter_name)
-            connection_info = json.loads(connection_info["Parameter"]["Value"])
+            return cast(dict[str, Any], json.loads(connection_info["Parameter"]["Value"]))
         except ssm_client.exceptions.ParameterNotFound:
             logger.error(
                 f"Repository '{self.repository_id}' not found in SSM Parameter Store. "
@@ -107,27 +163,47 @@ class PGVectorRepositoryService(VectorStoreRepositoryService):
                 f"Please register the repository before performing operations."
             )
 
+    def _build_vector_store_client(
+        self, connection_info: dict[str, Any], collection_id: str, embeddings: Embeddings
+    ) -> VectorStore:
+        """Build a PGVector client backed by its own connection pool."""
         if not RepositoryType.is_type(connection_info, RepositoryType.PGVECTOR):
             raise ValueError(f"Repository {self.repository_id} is not a PGVector repository")
 
+        connection_string, engine = self._create_engine(connection_info)
+        return PGVector(
+            collection_name=collection_id,
+            connection_string=connection_string,
+            embedding_function=embeddings,
+            connection=engine,  # type: ignore[arg-type]
+        )
+
+    def _create_engine(self, connection_info: dict[str, Any]) -> tuple[str, sqlalchemy.engine.Engine]:
+        """Create a connection pool for the repository's database.
+
+        Returns:
+            The connection string and the engine
+        """
+        token_provider = None
         # Check if using password auth (passwordSecretId present) or IAM auth
         if "passwordSecretId" in connection_info:
             # Password auth: get credentials from Secrets Manager
             secrets_response = secretsmanager_client.get_secret_value(SecretId=connection_info.get("passwordSecretId"))
-            user = connection_info.get("username")
+            user = connection_info["username"]
             password = json.loads(secrets_response.get("SecretString")).get("password")
             use_ssl = False
         else:
-            # IAM auth: generate auth token
+            # IAM auth: each new pooled connection asks the provider for a current token
             user = get_lambda_role_name()
-            password = generate_auth_token(connection_info.get("dbHost"), connection_info.get("dbPort"), user)
+            token_provider = IamAuthTokenProvider(connection_info["dbHost"], connection_info["dbPort"], user)
+            password = quote_plus(token_provider())
             use_ssl = True  # IAM auth requires SSL
 
         connection_string = PGVector.connection_string_from_db_params(
             driver="psycopg2",
-            host=connection_info.get("dbHost"),
-            port=connection_info.get("dbPort"),
-            database=connection_info.get("dbName"),
+            host=connection_info["dbHost"],
+            port=connection_info["dbPort"],
+            database=connection_info["dbName"],
             user=user,
             password=password,
         )
@@ -135,8 +211,85 @@ class PGVectorRepositoryService(VectorStoreRepositoryService):
         if use_ssl:
             connection_string = f"{connection_string}?sslmode=require"
 
-        return PGVector(
-            collection_name=collection_id,
-            connection_string=connection_string,
-            embedding_function=embeddings,
-        )
+        # pool_pre_ping replaces connections the server closed while the Lambda environment was frozen
+        engine = sqlalchemy.create_engine(connection_string, pool_pre_ping=True)
+        if token_provider is not None:
+
+            def _set_iam_token(dialect: Any, conn_rec: Any, cargs: Any, cparams: dict[str, Any]) -> None:
+                cparams["password"] = token_provider()
+
+            sqlalchemy.event.listen(engine, "do_connect", _set_iam_token)
+
+        return connection_string, engine
+
+    def prepare_hybrid_search(self) -> None:
+        """Create the GIN index hybrid search's full-text ranking uses, so it does not scan the collection.
+
+        The index covers langchain_pg_embedding, which every collection of the repository shares, so it is built
+        with CREATE INDEX CONCURRENTLY and does not block ingestion. That cannot run inside a transaction, so the
+        statements run in autocommit mode.
+
+        A new repository has no embedding table until its first PGVector client connects, so the default
+        collection's client is built first. Without a default embedding model the index is left for a later
+        deployment once the table exists.
+
+        Raises:
+            ValueError: If PGVECTOR_TEXT_SEARCH_CONFIG is not a text search configuration of the database
+        """
+        connection_info = self._get_connection_info()
+        if not RepositoryType.is_type(connection_info, RepositoryType.PGVECTOR):
+            raise ValueError(f"Repository {self.repository_id} is not a PGVector repository")
+
+        embedding_model = self.repository.get("embeddingModelId")
+        if embedding_model:
+            # PGVector creates the vector extension and its tables when the client is built
+            self._get_vector_store_client(
+                collection_id=embedding_model,
+                embeddings=RagEmbeddings(model_name=embedding_model),  # type: ignore[arg-type]
+            )
+
+        _, engine = self._create_engine(connection_info)
+        try:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                # The configuration name is part of the index expression, which cannot take a bound parameter
+                config_exists = connection.execute(
+                    sqlalchemy.text("SELECT 1 FROM pg_ts_config WHERE cfgname = :name"),
+                    {"name": PGVECTOR_TEXT_SEARCH_CONFIG},
+                ).first()
+                if config_exists is None:
+                    raise ValueError(f"Unknown text search configuration: {PGVECTOR_TEXT_SEARCH_CONFIG}")
+
+                table = connection.execute(sqlalchemy.text("SELECT to_regclass('langchain_pg_embedding')")).scalar()
+                if table is None:
+                    logger.warning(f"No embedding table for repository {self.repository_id} yet, skipping index")
+                    return
+
+                index_valid = connection.execute(
+                    sqlalchemy.text(
+                        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                        "WHERE c.relname = :name"
+                    ),
+                    {"name": _TEXT_SEARCH_INDEX},
+                ).scalar()
+                if index_valid:
+                    return
+                if index_valid is not None:
+                    # An interrupted concurrent build leaves an invalid index behind that IF NOT EXISTS would keep
+                    logger.info(f"Rebuilding invalid full-text index {_TEXT_SEARCH_INDEX}")
+                    connection.execute(sqlalchemy.text(f"DROP INDEX CONCURRENTLY IF EXISTS {_TEXT_SEARCH_INDEX}"))
+
+                logger.info(f"Creating full-text index {_TEXT_SEARCH_INDEX} for repository {self.repository_id}")
+                connection.execute(
+                    sqlalchemy.text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_TEXT_SEARCH_INDEX} ON langchain_pg_embedding "
+                        f"USING gin (to_tsvector('{PGVECTOR_TEXT_SEARCH_CONFIG}', document))"
+                    )
+                )
+        finally:
+            engine.dispose()
+
+    def _close_vector_store_client(self, vector_store: VectorStore) -> None:
+        """Close the pooled connections of an evicted PGVector client."""
+        bind = getattr(vector_store, "_bind", None)
+        if isinstance(bind, sqlalchemy.engine.Engine):
+            bind.dispose()
@@ -126,6 +126,7 @@ class RepositoryService(ABC):
         model_name: str,
         include_score: bool = False,
         bedrock_agent_client: Any | None = None,
+        search_mode: str | None = None,
     ) -> list[dict[str, Any]]:
         """Retrieve documents matching a query.
 
@@ -136,12 +137,44 @@ class RepositoryService(ABC):
             model_name: Embedding model name to use for query embedding
             include_score: Whether to include similarity scores in results
             bedrock_agent_client: Bedrock agent client (for Bedrock KB only)
+            search_mode: "vector" or "hybrid"; None uses the repository's default
 
         Returns:
             List of matching documents with page_content and metadata
         """
         pass
 
+    def retrieve_documents_batch(
+        self,
+        queries: list[str],
+        collection_id: str,
+        top_k: int,
+        model_name: str,
+        include_score: bool = False,
+        bedrock_agent_client: Any | None = None,
+        search_mode: str | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Retrieve documents for several queries against one collection.
+
+        Default implementation runs retrieve_documents once per query. Subclasses that can embed queries
+        together or share a client across searches override this.
+
+        Returns:
+            One list of matching documents per query, in query order
+        """
+        return [
+            self.retrieve_documents(
+                query=query,
+                collection_id=collection_id,
+                top_k=top_k,
+                model_name=model_name,
+                include_score=include_score,
+                bedrock_agent_client=bedrock_agent_client,
+                search_mode=search_mode,
+            )
+            for query in queries
+        ]
+
     @abstractmethod
     def validate_document_source(self, s3_path: str) -> str:
         """Validate and normalize document source path.
@@ -178,3 +211,11 @@ class RepositoryService(ABC):
             Default collection configuration, or None if not applicable
         """
         pass
+
+    def prepare_hybrid_search(self) -> None:  # noqa: B027 - optional hook, most stores need no preparation
+        """Create whatever hybrid search needs in the repository's store (repository-specific).
+
+        Called when the repository is deployed with hybridSearch configured. Default implementation does nothing, for
+        stores that index text for full-text search as it is written.
+        """
+        pass
@@ -21,21 +21,26 @@ vector stores with chunking and embedding pipelines.
 import logging
 import os
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import boto3
+from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
 from models.domain_objects import (
     CollectionMetadata,
     CollectionStatus,
+    HybridSearchConfig,
     IngestionJob,
     RagCollectionConfig,
     RagDocument,
     VectorStoreStatus,
 )
 from repository.embeddings import RagEmbeddings
+from repository.hybrid_search import document_key, reciprocal_rank_fusion, resolve_hybrid_search_config
 from repository.rag_document_repo import RagDocumentRepository
+from repository.vector_store_clients import vector_store_client_registry
 from utilities.common_functions import retry_config
 from utilities.time import utc_now
 
@@ -44,6 +49,9 @@ from .repository_service import RepositoryService
 logger = logging.getLogger(__name__)
 ssm_client = boto3.client("ssm", region_name=os.environ["AWS_REGION"], config=retry_config)
 
+# Max vector searches in flight at once for a single batch search, sharing one vector store client
+BATCH_SEARCH_CONCURRENCY = int(os.environ.get("BATCH_SEARCH_CONCURRENCY", "4"))
+
 
 class VectorStoreRepositoryService(RepositoryService):
     """Base implementation for vector store-based repository services.
@@ -142,6 +150,8 @@ class VectorStoreRepositoryService(RepositoryService):
         indexes/collections.
         """
         self._drop_collection_index(collection_id)
+        # A cached client may still reference the dropped collection row or index
+        vector_store_client_registry.evict(self.repository_id, collection_id)  # type: ignore[arg-type]
 
     def retrieve_documents(
         self,
@@ -151,9 +161,13 @@ class VectorStoreRepositoryService(RepositoryService):
         model_name: str,
         include_score: bool = False,
         bedrock_agent_client: Any | None = None,
+        search_mode: str | None = None,
     ) -> list[dict[str, Any]]:
         """Retrieve documents from vector store using similarity search.
 
+        In hybrid mode the vector ranking is fused with a full-text ranking of the collection using the repository's
+        hybridSearch weights.
+
         Args:
             query: Search query
             collection_id: Collection to search
@@ -161,18 +175,77 @@ class VectorStoreRepositoryService(RepositoryService):
             model_name: Embedding model name to use for query embedding
             include_score: Whether to include similarity scores in metadata
             bedrock_agent_client: Not used for vector stores
+            search_mode: "vector" or "hybrid"; defaults to the repository's hybridSearch setting
 
         Returns:
             List of documents with page_content and metadata
         """
+        hybrid_config = resolve_hybrid_search_config(self.repository, search_mode)
         embeddings = RagEmbeddings(model_name=model_name)
         vector_store = self._get_vector_store_client(
             collection_id=collection_id,
             embeddings=embeddings,
         )
 
+        if not self._collection_exists(vector_store, collection_id):
+            logger.info(f"Collection {collection_id} does not exist. Returning empty docs.")
+            return []
+
+        if hybrid_config is not None:
+            return self._hybrid_search(vector_store, query, top_k, include_score, hybrid_config)
+
         results = vector_store.similarity_search_with_score(query, k=top_k)
+        return self._to_documents(query, results, include_score)
+
+    def retrieve_documents_batch(
+        self,
+        queries: list[str],
+        collection_id: str,
+        top_k: int,
+        model_name: str,
+        include_score: bool = False,
+        bedrock_agent_client: Any | None = None,
+        search_mode: str | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Retrieve documents for several queries against one collection.
 
+        The queries are embedded together and searched concurrently over one vector store client, so the
+        per-search setup is paid once for the batch.
+
+        Returns:
+            One list of matching documents per query, in query order
+        """
+        hybrid_config = resolve_hybrid_search_config(self.repository, search_mode)
+        embeddings = RagEmbeddings(model_name=model_name)
+        vector_store = self._get_vector_store_client(
+            collection_id=collection_id,
+            embeddings=embeddings,
+        )
+
+        if not self._collection_exists(vector_store, collection_id):
+            logger.info(f"Collection {collection_id} does not exist. Returning empty docs.")
+            return [[] for _ in queries]
+
+        query_embeddings = embeddings.embed_queries(queries)
+
+        def search(query: str, embedding: list[float]) -> list[dict[str, Any]]:
+            if hybrid_config is not None:
+                return self._hybrid_search(vector_store, query, top_k, include_score, hybrid_config, embedding)
+            # OpenSearch and PGVector clients implement it, though the VectorStore base class does not
+            results = vector_store.similarity_search_with_score_by_vector(  # type: ignore[attr-defined]
+                embedding, k=top_k
+            )
+            return self._to_documents(query, results, include_score)
+
+        logger.info(f"Running {len(queries)} searches in collection {collection_id}")
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_SEARCH_CONCURRENCY, len(queries)))) as executor:
+            # Executor.map yields results in submission order, so results line up with their queries
+            return list(executor.map(search, queries, query_embeddings))
+
+    def _to_documents(
+        self, query: str, results: list[tuple[Document, float]], include_score: bool
+    ) -> list[dict[str, Any]]:
+        """Convert (document, score) search results into response documents."""
         documents = []
         for i, (doc, score) in enumerate(results):
             doc_dict = {
@@ -203,6 +276,59 @@ class VectorStoreRepositoryService(RepositoryService):
 
         return documents
 
+    def _hybrid_search(
+        self,
+        vector_store: VectorStore,
+        query: str,
+        top_k: int,
+        include_score: bool,
+        config: HybridSearchConfig,
+        embedding: list[float] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Fuse vector and full-text rankings with reciprocal-rank fusion.
+
+        With include_score, every result carries its fused score as hybrid_score; results the vector search also
+        returned keep their similarity_score. A precomputed query embedding skips embedding the query again.
+        """
+        candidates = top_k * config.candidateMultiplier
+        # The full-text query runs while the query is embedded and the vector search runs
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lexical_future = executor.submit(self._lexical_search, vector_store, query, candidates)
+            if embedding is None:
+                vector_results = vector_store.similarity_search_with_score(query, k=candidates)
+            else:
+                vector_results = vector_store.similarity_search_with_score_by_vector(  # type: ignore[attr-defined]
+                    embedding, k=candidates
+                )
+            try:
+                lexical_results = lexical_future.result()
+            except Exception as e:
+                # A failed full-text query should not fail the search; fall back to the vector ranking
+                logger.warning(f"Full-text search failed, using vector results only: {e}", exc_info=True)
+                lexical_results = []
+
+        fused = reciprocal_rank_fusion(
+            [[doc for doc, _ in vector_results], [doc for doc, _ in lexical_results]],
+            weights=[config.vectorWeight, config.lexicalWeight],
+            k=config.rrfK,
+        )[:top_k]
+        logger.info(
+            f"Hybrid search fused {len(vector_results)} vector and {len(lexical_results)} full-text candidates "
+            f"into {len(fused)} results"
+        )
+
+        vector_scores = {document_key(doc): score for doc, score in vector_results}
+        documents = []
+        for doc, fused_score in fused:
+            metadata = doc.metadata.copy() if doc.metadata else {}
+            if include_score:
+                metadata["hybrid_score"] = fused_score
+                vector_score = vector_scores.get(document_key(doc))
+                if vector_score is not None:
+                    metadata["similarity_score"] = self._normalize_similarity_score(vector_score)
+            documents.append({"page_content": doc.page_content, "metadata": metadata})
+        return documents
+
     def validate_document_source(self, s3_path: str) -> str:
         """Vector stores accept any valid S3 path."""
         if not s3_path.startswith("s3://"):
@@ -227,6 +353,27 @@ class VectorStoreRepositoryService(RepositoryService):
         """
         pass
 
+    def _collection_exists(self, vector_store: VectorStore, collection_id: str) -> bool:
+        """Check whether the collection can be searched (repository-specific).
+
+        Default implementation assumes it exists; stores that fail on a missing index override this.
+        """
+        return True
+
+    @abstractmethod
+    def _lexical_search(self, vector_store: VectorStore, query: str, k: int) -> list[tuple[Document, float]]:
+        """Rank the collection's chunks by full-text relevance to the query (repository-specific).
+
+        Args:
+            vector_store: Vector store client for the collection
+            query: Search query
+            k: Number of results to return
+
+        Returns:
+            (document, relevance score) pairs, best first
+        """
+        pass
+
     def _normalize_similarity_score(self, score: float) -> float:
         """Normalize similarity score to 0-1 range.
 
@@ -16,11 +16,11 @@
 
 import logging
 import os
-from datetime import timedelta
 from typing import Any
 
 import boto3
-from utilities.time import utc_now
+from models.domain_objects import Watermark
+from repository.pipeline_discovery import discover_modified_objects
 from utilities.validation import safe_error_response, ValidationError
 
 logger = logging.getLogger(__name__)
@@ -78,10 +78,14 @@ def validate_bucket_prefix(bucket: str, prefix: str) -> bool:
 
 def handle_list_modified_objects(event: dict[str, Any], context: Any) -> dict[str, Any] | Any:
     """
-    Lists all objects in the specified S3 bucket and prefix that were modified in the last 24 hours.
+    Lists objects in the specified S3 bucket and prefix modified after a watermark.
+
+    Without a watermark in the event, objects modified in the last 24 hours are listed. The returned metadata carries
+    the watermark to pass to the next run.
 
     Args:
-        event: Event data containing bucket and prefix information
+        event: Event data containing bucket and prefix information, and optionally the previous run's watermark and
+            an S3 Inventory manifest to read instead of listing the bucket
         context: Lambda context
 
     Returns:
@@ -116,46 +120,28 @@ def handle_list_modified_objects(event: dict[str, Any], context: Any) -> dict[st
         # Initialize S3 client
         s3_client = boto3.client("s3", region_name=os.environ["AWS_REGION"])
 
-        # Calculate timestamp for 24 hours ago
-        twenty_four_hours_ago = utc_now() - timedelta(hours=24)
-
-        # List to store matching objects
-        modified_files = []
-
-        # Use paginator to handle case where there are more than 1000 objects
-        paginator = s3_client.get_paginator("list_objects_v2")
+        # Resume after the watermark returned by the previous run, if the caller threads it through
+        watermark = Watermark.from_dict(detail["watermark"]) if detail.get("watermark") else None
 
         # Add debug logging for S3 list operation
-        logger.info(f"Listing objects in {bucket}/{prefix} modified after {twenty_four_hours_ago}")
+        logger.info(f"Listing objects in {bucket}/{prefix} after {watermark}")
 
-        # Iterate through all objects in the bucket/prefix
         try:
-            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                if "Contents" not in page:
-                    logger.info(f"No contents found in page for {bucket}/{prefix}")
-                    continue
-
-                # Check each object's last modified time
-                for obj in page["Contents"]:
-                    last_modified = obj["LastModified"]
-                    if last_modified >= twenty_four_hours_ago:
-                        logger.info(f"Found modified file: {obj['Key']} (Last Modified: {last_modified})")
-                        modified_files.append({"bucket": bucket, "key": obj["Key"]})
-                    else:
-                        logger.debug(
-                            f"Skipping file {obj['Key']} - Last modified {last_modified} before cutoff "
-                            f"{twenty_four_hours_ago}"
-                        )
+            discovery = discover_modified_objects(
+                s3_client, bucket, prefix, watermark, inventory_manifest=detail.get("inventoryManifest")
+            )
         except Exception as e:
             logger.error(f"Error during S3 list operation: {str(e)}", exc_info=True)
             raise
 
+        modified_files = [{"bucket": bucket, "key": key} for key in discovery.keys]
         result = {
             "files": modified_files,
             "metadata": {
                 "bucket": bucket,
                 "prefix": prefix,
-                "cutoff_time": twenty_four_hours_ago.isoformat(),
+                "cutoff_time": discovery.since.last_modified.isoformat(),
+                "watermark": discovery.watermark.to_dict(),
                 "files_found": len(modified_files),
             },
         }
@@ -0,0 +1,164 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Process-level registry of vector store clients.
+
+Building a vector store client reads the repository's connection info from SSM, resolves credentials and opens a
+connection pool (PGVector also creates its extension, tables and collection row). The registry keeps one client per
+repository, collection and embedding model so warm Lambda invocations reuse the pool. Callers receive a shallow copy
+bound to their own embeddings adapter, because the adapter carries the caller's token.
+
+A repository's connection info is re-read at most every VECTOR_STORE_CONFIG_TTL seconds. When it has changed, the
+repository's clients are closed and rebuilt from the new config.
+
+Configuration (environment variables):
+    VECTOR_STORE_CONFIG_TTL – seconds between re-reads of a repository's connection info (default 60)
+    VECTOR_STORE_CLIENT_MAX_AGE – seconds a client is reused before it is rebuilt (default 3600)
+    VECTOR_STORE_CLIENT_MAX_SIZE – max clients held per process (default 32)
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from cachetools import TTLCache
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_CONFIG_TTL = int(os.environ.get("VECTOR_STORE_CONFIG_TTL", "60"))
+VECTOR_STORE_CLIENT_MAX_AGE = int(os.environ.get("VECTOR_STORE_CLIENT_MAX_AGE", "3600"))
+VECTOR_STORE_CLIENT_MAX_SIZE = int(os.environ.get("VECTOR_STORE_CLIENT_MAX_SIZE", "32"))
+
+ClientKey = tuple[str, str, str]
+
+
+@dataclass
+class _CachedClient:
+    client: VectorStore
+    connection_info: dict[str, Any]
+    created_at: float
+    close: Callable[[VectorStore], None] | None
+
+
+class VectorStoreClientRegistry:
+    """Reuse vector store clients across requests in the same process."""
+
+    def __init__(
+        self,
+        config_ttl: float = VECTOR_STORE_CONFIG_TTL,
+        max_age: float = VECTOR_STORE_CLIENT_MAX_AGE,
+        max_size: int = VECTOR_STORE_CLIENT_MAX_SIZE,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_age = max_age
+        self.max_size = max(max_size, 1)
+        self._timer = timer
+        self._configs: TTLCache = TTLCache(maxsize=self.max_size, ttl=config_ttl, timer=timer)
+        # Insertion-ordered; the oldest client is closed when the registry is full
+        self._clients: dict[ClientKey, _CachedClient] = {}
+        self._lock = threading.RLock()
+
+    def get_connection_info(self, repository_id: str, load_config: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        """Return the repository's connection info, calling ``load_config`` when it is not cached or has expired."""
+        with self._lock:
+            connection_info = self._configs.get(repository_id)
+            if connection_info is None:
+                connection_info = load_config()
+                self._configs[repository_id] = connection_info
+            return dict(connection_info)
+
+    def get_client(
+        self,
+        repository_id: str,
+        collection_id: str,
+        embeddings: Embeddings,
+        load_config: Callable[[], dict[str, Any]],
+        build_client: Callable[[dict[str, Any], str, Embeddings], VectorStore],
+        close_client: Callable[[VectorStore], None] | None = None,
+    ) -> VectorStore:
+        """Return a vector store client for the collection, bound to ``embeddings``.
+
+        Args:
+            repository_id: Repository the collection belongs to
+            collection_id: Collection (index or table) the client targets
+            embeddings: Embeddings adapter for this request
+            load_config: Reads the repository's connection info
+            build_client: Builds a client from connection info, collection id and embeddings
+            close_client: Releases a client's connections when it is evicted
+
+        Returns:
+            Vector store client sharing the cached client's connections
+        """
+        model_name = getattr(embeddings, "model_name", None) or type(embeddings).__name__
+        key = (repository_id, collection_id, model_name)
+
+        with self._lock:
+            connection_info = self.get_connection_info(repository_id, load_config)
+            entry = self._clients.get(key)
+            if entry is not None and entry.connection_info != connection_info:
+                logger.info(f"Connection info for repository {repository_id} changed, closing its vector store clients")
+                self.evict(repository_id)
+                self._configs[repository_id] = connection_info
+                entry = None
+            elif entry is not None and self._timer() - entry.created_at > self.max_age:
+                self._close(self._clients.pop(key))
+                entry = None
+
+            if entry is None:
+                client = build_client(connection_info, collection_id, embeddings)
+                entry = _CachedClient(client, connection_info, self._timer(), close_client)
+                self._clients[key] = entry
+                while len(self._clients) > self.max_size:
+                    self._close(self._clients.pop(next(iter(self._clients))))
+
+        client = copy.copy(entry.client)
+        client.embedding_function = embeddings  # type: ignore[attr-defined]
+        return client
+
+    def evict(self, repository_id: str, collection_id: str | None = None) -> None:
+        """Close cached clients for a repository, or for one of its collections, and forget its connection info."""
+        with self._lock:
+            if collection_id is None:
+                self._configs.pop(repository_id, None)
+            for key in [k for k in self._clients if k[0] == repository_id and collection_id in (None, k[1])]:
+                self._close(self._clients.pop(key))
+
+    def clear(self) -> None:
+        """Close every cached client."""
+        with self._lock:
+            self._configs.clear()
+            while self._clients:
+                self._close(self._clients.pop(next(iter(self._clients))))
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @staticmethod
+    def _close(entry: _CachedClient) -> None:
+        if entry.close is None:
+            return
+        try:
+            entry.close(entry.client)
+        except Exception as e:
+            logger.warning(f"Failed to close vector store client: {e}")
+
+
+vector_store_client_registry = VectorStoreClientRegistry()
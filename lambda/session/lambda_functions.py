@@ -27,7 +27,7 @@ from typing import Any
 import boto3
 import create_env_variables  # noqa: F401
 from botocore.exceptions import ClientError
-from cachetools import cached, TTLCache  # type: ignore[import-untyped,unused-ignore]
+from cachetools import cached, TTLCache
 from metrics.models import MetricsEvent
 from models.domain_objects import DeleteResponse, SuccessResponse
 from pydantic import ValidationError
@@ -14,13 +14,23 @@
 
 """Factory pattern for creating chunking strategies."""
 
+import copy
 import logging
 import os
+import re
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
 
+import tiktoken
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from models.domain_objects import ChunkingStrategy, ChunkingStrategyType, FixedChunkingStrategy
+from models.domain_objects import (
+    ChunkingStrategy,
+    ChunkingStrategyType,
+    FixedChunkingStrategy,
+    StructuredChunkingStrategy,
+    TokenChunkingStrategy,
+)
 from utilities.exceptions import RagUploadException
 
 logger = logging.getLogger(__name__)
@@ -30,6 +40,46 @@ DEFAULT_STRATEGY = FixedChunkingStrategy(
     overlap=int(os.getenv("CHUNK_OVERLAP", "51")),
 )
 
+# Text buffered by a streaming fixed-size chunker before it is split, in multiples of the chunk size
+STREAM_BUFFER_CHUNKS = 16
+
+_PARAGRAPH_BREAK = re.compile(r"\n[^\S\n]*\n\s*")
+
+
+def get_token_counter(encoding_name: str) -> Callable[[str], int]:
+    """
+    Return a function counting the tokens of a text in a tiktoken encoding.
+
+    Encodings are loaded from TIKTOKEN_CACHE_DIR, which the ingestion image pre-populates so that nothing is fetched
+    from the internet at runtime.
+
+    Parameters
+    ----------
+    encoding_name : str
+        Name of the tiktoken encoding, such as cl100k_base
+
+    Returns
+    -------
+    Callable[[str], int]
+        Function returning the number of tokens in a text
+
+    Raises
+    ------
+    RagUploadException
+        If the encoding is unknown or cannot be loaded
+    """
+    try:
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.error(f"Unable to load tiktoken encoding {encoding_name}: {e}")
+        raise RagUploadException(f"Unable to load tokenizer encoding: {encoding_name}")
+
+    def count_tokens(text: str) -> int:
+        # Documents are counted as plain text, so special-token markers in them are not an error
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return count_tokens
+
 
 class ChunkingStrategyHandler(ABC):
     """Abstract base class for chunking strategy handlers."""
@@ -53,6 +103,28 @@ class ChunkingStrategyHandler(ABC):
         """
         pass
 
+    def chunk_stream(self, blocks: Iterable[str], metadata: dict, strategy: ChunkingStrategy) -> Iterator[Document]:
+        """
+        Chunk a document whose text arrives as consecutive blocks, such as pages or paragraphs.
+
+        Handlers that can chunk incrementally override this; the default joins the blocks and chunks the whole text.
+
+        Parameters
+        ----------
+        blocks : Iterable[str]
+            Consecutive pieces of the document text, including any separators between them
+        metadata : dict
+            Metadata given to every chunk
+        strategy : ChunkingStrategy
+            The chunking strategy configuration
+
+        Returns
+        -------
+        Iterator[Document]
+            Chunks in document order
+        """
+        yield from self.chunk_documents([Document(page_content="".join(blocks), metadata=metadata)], strategy)
+
 
 class FixedSizeChunkingHandler(ChunkingStrategyHandler):
     """Handler for fixed-size chunking strategy."""
@@ -73,6 +145,74 @@ class FixedSizeChunkingHandler(ChunkingStrategyHandler):
         list[Document]
             List of chunked documents
         """
+        chunk_size, chunk_overlap = self._chunk_parameters(strategy)
+        logger.info(f"Chunking documents with {strategy.type} strategy: size={chunk_size}, overlap={chunk_overlap}")
+
+        text_splitter = self._text_splitter(strategy, chunk_size, chunk_overlap)
+        result: list[Document] = text_splitter.split_documents(docs)
+        return result
+
+    def chunk_stream(self, blocks: Iterable[str], metadata: dict, strategy: ChunkingStrategy) -> Iterator[Document]:
+        """
+        Chunk streamed text with RecursiveCharacterTextSplitter, holding at most a few chunks' worth of text.
+
+        Text is buffered until it reaches STREAM_BUFFER_CHUNKS chunk sizes and then split. The last chunk may continue
+        in the next block, so it stays in the buffer and is split again together with the text that follows.
+
+        Chunks keep the size and overlap limits and cover the whole text. For text of "\n\n"-separated paragraphs they
+        are the chunks of the joined text. Otherwise boundaries near a split of the buffer can differ, as the splitter
+        picks its separator from the buffered text rather than the whole document.
+
+        Parameters
+        ----------
+        blocks : Iterable[str]
+            Consecutive pieces of the document text, including any separators between them
+        metadata : dict
+            Metadata given to every chunk
+        strategy : ChunkingStrategy
+            The chunking strategy configuration (FixedChunkingStrategy)
+
+        Returns
+        -------
+        Iterator[Document]
+            Chunks in document order
+        """
+        chunk_size, chunk_overlap = self._chunk_parameters(strategy)
+        logger.info(
+            f"Chunking streamed document with {strategy.type} strategy: size={chunk_size}, overlap={chunk_overlap}"
+        )
+
+        text_splitter = self._text_splitter(strategy, chunk_size, chunk_overlap)
+        # Sizes in tokens are never more than sizes in characters, so this buffers at least as many chunks
+        flush_size = STREAM_BUFFER_CHUNKS * chunk_size
+        buffer = ""
+        for block in blocks:
+            buffer += block
+            if len(buffer) < flush_size:
+                continue
+            chunks = text_splitter.split_text(buffer)
+            if not chunks:
+                buffer = ""
+                continue
+            for chunk in chunks[:-1]:
+                yield Document(page_content=chunk, metadata=copy.deepcopy(metadata))
+            # Chunks are stripped, so the last one is found by its text rather than its length
+            buffer = buffer[buffer.rfind(chunks[-1]) :]
+        for chunk in text_splitter.split_text(buffer):
+            yield Document(page_content=chunk, metadata=copy.deepcopy(metadata))
+
+    def _text_splitter(
+        self, strategy: ChunkingStrategy, chunk_size: int, chunk_overlap: int
+    ) -> RecursiveCharacterTextSplitter:
+        """Return the splitter for a strategy, measuring chunk sizes in characters."""
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+        )
+
+    def _chunk_parameters(self, strategy: ChunkingStrategy) -> tuple[int, int]:
+        """Return the validated chunk size and overlap of a fixed-size strategy."""
         # Ensure we have a FixedChunkingStrategy
         if not isinstance(strategy, FixedChunkingStrategy):
             raise ValueError(f"Expected FixedChunkingStrategy, got {type(strategy).__name__}")
@@ -94,16 +234,96 @@ class FixedSizeChunkingHandler(ChunkingStrategyHandler):
         if chunk_overlap < 0 or chunk_overlap >= chunk_size:
             raise RagUploadException("Invalid chunk overlap: must be non-negative and less than chunk size")
 
-        logger.info(f"Chunking documents with fixed size strategy: size={chunk_size}, overlap={chunk_overlap}")
+        return chunk_size, chunk_overlap
 
-        text_splitter = RecursiveCharacterTextSplitter(
+
+class TokenChunkingHandler(FixedSizeChunkingHandler):
+    """Handler for token-budgeted chunking strategy.
+
+    Splits text like the fixed-size handler, but measures chunk size and overlap in tokens of the strategy's tiktoken
+    encoding, so chunks fit the embedding model's input limit.
+    """
+
+    def _text_splitter(
+        self, strategy: ChunkingStrategy, chunk_size: int, chunk_overlap: int
+    ) -> RecursiveCharacterTextSplitter:
+        """Return the splitter for a strategy, measuring chunk sizes in tokens."""
+        if not isinstance(strategy, TokenChunkingStrategy):
+            raise ValueError(f"Expected TokenChunkingStrategy, got {type(strategy).__name__}")
+        return RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
+            length_function=get_token_counter(strategy.encoding),
         )
-        result: list[Document] = text_splitter.split_documents(docs)
+
+    def _chunk_parameters(self, strategy: ChunkingStrategy) -> tuple[int, int]:
+        """Return the chunk size and overlap of a token strategy, in tokens."""
+        if not isinstance(strategy, TokenChunkingStrategy):
+            raise ValueError(f"Expected TokenChunkingStrategy, got {type(strategy).__name__}")
+        return strategy.size, strategy.overlap
+
+
+class StructuredChunkingHandler(ChunkingStrategyHandler):
+    """Handler for structure-aware chunking strategy.
+
+    Each input document is treated as one structural section, such as a PDF page or the text under a heading, and
+    chunks never span two of them. Within a section, whole paragraphs are packed into chunks of up to the strategy's
+    size in tokens; only a paragraph longer than that is split further, with RecursiveCharacterTextSplitter.
+    """
+
+    def chunk_documents(self, docs: list[Document], strategy: ChunkingStrategy) -> list[Document]:
+        """
+        Chunk documents along their paragraphs without merging text from different documents.
+
+        Parameters
+        ----------
+        docs : list[Document]
+            Sections to chunk, each with the metadata its chunks should carry
+        strategy : ChunkingStrategy
+            The chunking strategy configuration (StructuredChunkingStrategy)
+
+        Returns
+        -------
+        list[Document]
+            List of chunked documents
+        """
+        if not isinstance(strategy, StructuredChunkingStrategy):
+            raise ValueError(f"Expected StructuredChunkingStrategy, got {type(strategy).__name__}")
+        logger.info(f"Chunking documents with structured strategy: size={strategy.size}, overlap={strategy.overlap}")
+
+        count_tokens = get_token_counter(strategy.encoding)
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=strategy.size,
+            chunk_overlap=strategy.overlap,
+            length_function=count_tokens,
+        )
+        separator_tokens = count_tokens("\n\n")
+        result: list[Document] = []
+        for doc in docs:
+            for text in self._pack_paragraphs(doc.page_content, strategy.size, count_tokens, separator_tokens):
+                pieces = text_splitter.split_text(text) if count_tokens(text) > strategy.size else [text]
+                result.extend(Document(page_content=piece, metadata=copy.deepcopy(doc.metadata)) for piece in pieces)
         return result
 
+    def _pack_paragraphs(
+        self, text: str, size: int, count_tokens: Callable[[str], int], separator_tokens: int
+    ) -> Iterator[str]:
+        """Yield runs of consecutive paragraphs of up to size tokens, and each longer paragraph on its own."""
+        packed: list[str] = []
+        packed_tokens = 0
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = count_tokens(paragraph)
+            if packed and packed_tokens + separator_tokens + tokens > size:
+                yield "\n\n".join(packed)
+                packed, packed_tokens = [], 0
+            packed_tokens += tokens + (separator_tokens if packed else 0)
+            packed.append(paragraph)
+        if packed:
+            yield "\n\n".join(packed)
+
 
 class NoneChunkingHandler(ChunkingStrategyHandler):
     """Handler for no-chunking strategy - returns documents as-is."""
@@ -133,6 +353,8 @@ class ChunkingStrategyFactory:
 
     _handlers = {
         ChunkingStrategyType.FIXED: FixedSizeChunkingHandler(),
+        ChunkingStrategyType.TOKEN: TokenChunkingHandler(),
+        ChunkingStrategyType.STRUCTURED: StructuredChunkingHandler(),
         ChunkingStrategyType.NONE: NoneChunkingHandler(),
     }
 
@@ -160,6 +382,40 @@ class ChunkingStrategyFactory:
         """
         if strategy is None:
             strategy = DEFAULT_STRATEGY
+        return cls._get_handler(strategy).chunk_documents(docs, strategy)
+
+    @classmethod
+    def chunk_stream(
+        cls, blocks: Iterable[str], metadata: dict, strategy: ChunkingStrategy = DEFAULT_STRATEGY
+    ) -> Iterator[Document]:
+        """
+        Chunk a document whose text arrives as consecutive blocks using the appropriate strategy handler.
+
+        Parameters
+        ----------
+        blocks : Iterable[str]
+            Consecutive pieces of the document text, including any separators between them
+        metadata : dict
+            Metadata given to every chunk
+        strategy : ChunkingStrategy
+            The chunking strategy configuration
+
+        Returns
+        -------
+        Iterator[Document]
+            Chunks in document order
+
+        Raises
+        ------
+        ValueError
+            If the chunking strategy type is not supported
+        """
+        if strategy is None:
+            strategy = DEFAULT_STRATEGY
+        return cls._get_handler(strategy).chunk_stream(blocks, metadata, strategy)
+
+    @classmethod
+    def _get_handler(cls, strategy: ChunkingStrategy) -> ChunkingStrategyHandler:
         handler = cls._handlers.get(strategy.type)
         if not handler:
             supported_strategies = ", ".join([s.value for s in cls._handlers.keys()])
@@ -167,8 +423,7 @@ class ChunkingStrategyFactory:
                 f"Unsupported chunking strategy: {strategy.type}. Supported strategies: {supported_strategies}"
             )
             raise ValueError(f"Unsupported chunking strategy: {strategy.type}")
-
-        return handler.chunk_documents(docs, strategy)
+        return handler
 
     @classmethod
     def register_handler(cls, strategy_type: ChunkingStrategyType, handler: ChunkingStrategyHandler) -> None:
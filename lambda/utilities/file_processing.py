@@ -12,30 +12,65 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-"""Helper functions to parse documents for ingestion into RAG vector store."""
+"""Helper functions to parse documents for ingestion into RAG vector store.
+
+Objects of at least STREAMING_EXTRACTION_MIN_BYTES are extracted in streaming mode: the object is downloaded to a
+spooled temporary file and its text is read one PDF page, DOCX paragraph or block of plain text at a time and fed to the
+chunker, so chunks are produced while the document is still being read and memory use does not grow with its size.
+
+The structured chunking strategy always reads the object this way, as a sequence of sections that keep their line and
+paragraph breaks: one per PDF page, and one per heading in docx and markdown documents.
+
+Configuration (environment variables):
+    STREAMING_EXTRACTION_MIN_BYTES – object size at which streaming extraction is used (default 32 MiB)
+    STREAMING_SPOOL_MAX_BYTES      – bytes of a streamed object kept in memory before it spills to disk (default 8 MiB)
+"""
 
 import logging
 import os
 import re
+import shutil
+import tempfile
 import unicodedata
-from io import BytesIO
+import zipfile
+from collections.abc import Callable, Iterator
+from functools import partial
+from io import BytesIO, TextIOWrapper
+from typing import Any, IO
 from urllib.parse import urlparse
 
 import boto3
 import docx
 from botocore.exceptions import ClientError
+from docx.oxml import parse_xml
 from langchain_core.documents import Document
-from models.domain_objects import IngestionJob
-from pypdf import PdfReader
+from lxml import etree
+from models.domain_objects import ChunkingStrategy, ChunkingStrategyType, IngestionJob
+from pypdf import PageObject, PdfReader
 from pypdf.errors import PdfReadError
+from pypdf.generic import NameObject
 from utilities.chunking_strategy_factory import ChunkingStrategyFactory
-from utilities.constants import DOCX_FILE, PDF_FILE, RAG_FILES
+from utilities.constants import DOCX_FILE, MD_FILE, PDF_FILE, RAG_FILES
 from utilities.exceptions import RagUploadException
 
 logger = logging.getLogger(__name__)
 session = boto3.Session()
 s3 = session.client("s3", region_name=os.environ["AWS_REGION"])
 
+STREAMING_EXTRACTION_MIN_BYTES = int(os.environ.get("STREAMING_EXTRACTION_MIN_BYTES", str(32 * 1024 * 1024)))
+STREAMING_SPOOL_MAX_BYTES = int(os.environ.get("STREAMING_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+_DOWNLOAD_BUFFER_BYTES = 1024 * 1024
+_TEXT_BLOCK_CHARS = 64 * 1024
+# Sections without headings are cut at the first paragraph break after this many characters
+_SECTION_MAX_CHARS = 1024 * 1024
+
+# Page attributes a PDF page inherits from its ancestors in the page tree when it does not set them itself
+_PDF_INHERITABLE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+_WORDPROCESSING_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_HEADING_STYLE = re.compile(r"(?:Heading\s*[1-9]|Title)", re.IGNORECASE)
+_MARKDOWN_HEADING = re.compile(r"#{1,6}[ \t]+(.+?)[ \t#]*$")
+_MARKDOWN_FENCE = ("```", "~~~")
+
 
 def _get_metadata(s3_uri: str, name: str, metadata: dict | None = None) -> dict:
     """
@@ -95,10 +130,17 @@ def _extract_pdf_content(s3_object: dict) -> str:
     except PdfReadError as e:
         logger.error(f"Error reading PDF file: {e}")
         raise
-    raw = " ".join(page.extract_text() or "" for page in pdf_reader.pages)
+    return _normalize_pdf_text(" ".join(page.extract_text() or "" for page in pdf_reader.pages))
+
+
+def _normalize_pdf_text(raw: str, keep_lines: bool = False) -> str:
     raw = unicodedata.normalize("NFKC", raw)
     raw = re.sub(r"[\xad\u200b\u200c\u200d\ufeff]", "", raw)
-    return re.sub(r"\s+", " ", raw).strip()
+    if not keep_lines:
+        return re.sub(r"\s+", " ", raw).strip()
+    raw = re.sub(r"[^\S\n]+", " ", raw)
+    raw = re.sub(r" ?\n ?", "\n", raw)
+    return re.sub(r"\n{3,}", "\n\n", raw).strip()
 
 
 def _extract_docx_content(s3_object: dict) -> str:
@@ -136,8 +178,245 @@ def _extract_text_content(s3_object: dict) -> str:
     return s3_object["Body"].read().decode("utf-8", errors="replace")  # type: ignore[no-any-return]
 
 
-def generate_chunks(ingestion_job: IngestionJob) -> list[Document]:
-    """Generate chunks from an ingestion job using the configured chunking strategy.
+def _download_to_spooled_file(s3_object: dict) -> IO[bytes]:
+    """Copy an S3 object body to a temporary file that stays in memory up to STREAMING_SPOOL_MAX_BYTES."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=STREAMING_SPOOL_MAX_BYTES)
+    try:
+        shutil.copyfileobj(s3_object["Body"], spooled, _DOWNLOAD_BUFFER_BYTES)
+        spooled.seek(0)
+    except Exception:
+        spooled.close()
+        raise
+    return spooled
+
+
+def _get_text_block_reader(content_type: str) -> Callable[[IO[bytes]], Iterator[str]]:
+    if content_type == PDF_FILE:
+        return _iter_pdf_pages
+    elif content_type == DOCX_FILE:
+        return _iter_docx_paragraphs
+    elif content_type in RAG_FILES:
+        return _iter_text_blocks
+    else:
+        logger.error(f"File has unsupported content type: {content_type}")
+        raise RagUploadException("Unsupported file type")
+
+
+def _walk_pdf_pages(file: IO[bytes]) -> Iterator[PageObject]:
+    """Yield the pages of a PDF one at a time.
+
+    The page tree is walked lazily rather than through PdfReader.pages, which loads every page up front, and the
+    objects the reader resolved for a page are dropped once the caller moves on to the next one.
+
+    Parameters
+    ----------
+    file (IO[bytes]): a seekable file containing a PDF
+
+    Returns
+    -------
+    Iterator[PageObject]: Each page in document order, with the attributes it inherits from the page tree.
+    """
+    try:
+        pdf_reader = PdfReader(file)
+    except PdfReadError as e:
+        logger.error(f"Error reading PDF file: {e}")
+        raise
+
+    def walk(node_reference: Any, inherited: dict) -> Iterator[PageObject]:
+        node = node_reference.get_object()
+        if "/Kids" not in node:
+            page = PageObject(pdf_reader, node_reference)
+            page.update(node)
+            for key, value in inherited.items():
+                if key not in page:
+                    page[NameObject(key)] = value
+            yield page
+            return
+        inherited = {**inherited, **{key: node.raw_get(key) for key in _PDF_INHERITABLE_KEYS if key in node}}
+        for kid in list(node["/Kids"]):
+            yield from walk(kid, inherited)
+
+    for page in walk(pdf_reader.root_object.raw_get("/Pages"), {}):
+        yield page
+        pdf_reader.resolved_objects.clear()
+
+
+def _iter_pdf_pages(file: IO[bytes]) -> Iterator[str]:
+    """Yield the text of a PDF one page at a time.
+
+    Yields the same text as _extract_pdf_content, split at page boundaries.
+
+    Parameters
+    ----------
+    file (IO[bytes]): a seekable file containing a PDF
+
+    Returns
+    -------
+    Iterator[str]: The normalized text of each page that has any, prefixed with a space after the first.
+    """
+    separator = ""
+    for page in _walk_pdf_pages(file):
+        text = _normalize_pdf_text(page.extract_text() or "")
+        if text:
+            yield separator + text
+            separator = " "
+
+
+def _iter_pdf_sections(file: IO[bytes]) -> Iterator[Document]:
+    """Yield each PDF page that has text as a section, with its line breaks kept and its number in the metadata."""
+    for number, page in enumerate(_walk_pdf_pages(file), start=1):
+        text = _normalize_pdf_text(page.extract_text() or "", keep_lines=True)
+        if text:
+            yield Document(page_content=text, metadata={"page": number})
+
+
+def _iter_docx_body_paragraphs(file: IO[bytes]) -> Iterator[Any]:
+    """Yield the body paragraphs of a docx document one at a time.
+
+    The document XML is parsed incrementally and each body element is discarded once the caller moves on. Paragraphs
+    are re-parsed with python-docx so runs, tabs, breaks and hyperlinks read as they do there.
+
+    Parameters
+    ----------
+    file (IO[bytes]): a seekable file containing a docx document
+
+    Returns
+    -------
+    Iterator[CT_P]: Each paragraph directly under the document body, in document order.
+    """
+    body_tag = f"{_WORDPROCESSING_NAMESPACE}body"
+    paragraph_tag = f"{_WORDPROCESSING_NAMESPACE}p"
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as document_xml:
+        for _, element in etree.iterparse(document_xml, events=("end",)):
+            parent = element.getparent()
+            if parent is None or parent.tag != body_tag:
+                continue
+            if element.tag == paragraph_tag:
+                yield parse_xml(etree.tostring(element))
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def _iter_docx_paragraphs(file: IO[bytes]) -> Iterator[str]:
+    """Yield the text of a docx document one paragraph at a time.
+
+    Yields the same text as _extract_docx_content, split at paragraph boundaries.
+
+    Parameters
+    ----------
+    file (IO[bytes]): a seekable file containing a docx document
+
+    Returns
+    -------
+    Iterator[str]: The text of each paragraph, prefixed with a newline after the first.
+    """
+    separator = ""
+    for paragraph in _iter_docx_body_paragraphs(file):
+        yield separator + paragraph.text
+        separator = "\n"
+
+
+def _section_document(paragraphs: list[str], heading: str | None) -> Document:
+    return Document(page_content="\n\n".join(paragraphs), metadata={"heading": heading} if heading else {})
+
+
+def _iter_docx_sections(file: IO[bytes]) -> Iterator[Document]:
+    """Yield a docx document as sections, starting a new one at each paragraph with a heading or title style.
+
+    Each section holds its paragraphs separated by blank lines, the heading first, and the heading in its metadata.
+    """
+    heading = None
+    paragraphs: list[str] = []
+    size = 0
+    for paragraph in _iter_docx_body_paragraphs(file):
+        text = paragraph.text.strip()
+        if not text:
+            continue
+        is_heading = bool(paragraph.style and _DOCX_HEADING_STYLE.fullmatch(paragraph.style))
+        if paragraphs and (is_heading or size >= _SECTION_MAX_CHARS):
+            yield _section_document(paragraphs, heading)
+            paragraphs, size = [], 0
+        if is_heading:
+            heading = text
+        paragraphs.append(text)
+        size += len(text)
+    if paragraphs:
+        yield _section_document(paragraphs, heading)
+
+
+def _iter_text_blocks(file: IO[bytes]) -> Iterator[str]:
+    """Yield the text of a utf-8 file in blocks of _TEXT_BLOCK_CHARS characters."""
+    with TextIOWrapper(file, encoding="utf-8", errors="replace") as text:
+        while block := text.read(_TEXT_BLOCK_CHARS):
+            yield block
+
+
+def _iter_text_sections(file: IO[bytes], markdown: bool = False) -> Iterator[Document]:
+    """Yield a utf-8 file as sections of whole lines.
+
+    Markdown files start a new section at each ATX heading outside fenced code blocks. Any section is also cut at the
+    first blank line after _SECTION_MAX_CHARS characters.
+    """
+    heading = None
+    lines: list[str] = []
+    size = 0
+    in_fence = False
+    with TextIOWrapper(file, encoding="utf-8", errors="replace") as text:
+        for line in text:
+            match = None
+            if markdown and line.lstrip().startswith(_MARKDOWN_FENCE):
+                in_fence = not in_fence
+            elif markdown and not in_fence:
+                match = _MARKDOWN_HEADING.match(line)
+            if lines and (match or (size >= _SECTION_MAX_CHARS and not line.strip())):
+                yield _section_document(["".join(lines)], heading)
+                lines, size = [], 0
+            if match:
+                heading = match.group(1)
+            lines.append(line)
+            size += len(line)
+    if lines:
+        yield _section_document(["".join(lines)], heading)
+
+
+def _get_section_reader(content_type: str) -> Callable[[IO[bytes]], Iterator[Document]]:
+    if content_type == PDF_FILE:
+        return _iter_pdf_sections
+    elif content_type == DOCX_FILE:
+        return _iter_docx_sections
+    elif content_type == MD_FILE:
+        return partial(_iter_text_sections, markdown=True)
+    elif content_type in RAG_FILES:
+        return _iter_text_sections
+    else:
+        logger.error(f"File has unsupported content type: {content_type}")
+        raise RagUploadException("Unsupported file type")
+
+
+def _structured_chunks(
+    content_type: str, s3_object: dict, metadata: dict, chunk_strategy: ChunkingStrategy
+) -> Iterator[Document]:
+    read_sections = _get_section_reader(content_type)
+    with _download_to_spooled_file(s3_object) as file:
+        for section in read_sections(file):
+            section.metadata = {**metadata, **section.metadata}
+            yield from ChunkingStrategyFactory.chunk_documents([section], chunk_strategy)
+
+
+def _stream_chunks(
+    content_type: str, s3_object: dict, metadata: dict, chunk_strategy: ChunkingStrategy
+) -> Iterator[Document]:
+    read_blocks = _get_text_block_reader(content_type)
+    with _download_to_spooled_file(s3_object) as file:
+        yield from ChunkingStrategyFactory.chunk_stream(read_blocks(file), metadata, chunk_strategy)
+
+
+def iter_chunks(ingestion_job: IngestionJob) -> Iterator[Document]:
+    """Generate chunks from an ingestion job using the configured chunking strategy, one chunk at a time.
+
+    Objects of at least STREAMING_EXTRACTION_MIN_BYTES are extracted in streaming mode, so chunks are yielded while
+    the rest of the document is still being read.
 
     Parameters
     ----------
@@ -146,8 +425,8 @@ def generate_chunks(ingestion_job: IngestionJob) -> list[Document]:
 
     Returns
     -------
-    list[Document]
-        List of document chunks for the processed file
+    Iterator[Document]
+        Document chunks for the processed file, in document order
 
     Raises
     ------
@@ -172,28 +451,56 @@ def generate_chunks(ingestion_job: IngestionJob) -> list[Document]:
         logger.error(f"Error getting object from S3: {key}")
         raise e
 
-    # Extract text and create initial document
-    extracted_text = _extract_text_by_content_type(content_type=content_type, s3_object=s3_object)
     basename = os.path.basename(ingestion_job.s3_path)
-
     # Pass metadata from IngestionJob to be merged into document metadata
-    docs = [
-        Document(
-            page_content=extracted_text,
-            metadata=_get_metadata(s3_uri=ingestion_job.s3_path, name=basename, metadata=ingestion_job.metadata),
-        )
-    ]
+    metadata = _get_metadata(s3_uri=ingestion_job.s3_path, name=basename, metadata=ingestion_job.metadata)
 
     # Use factory to chunk documents based on strategy
     chunk_strategy = ingestion_job.chunk_strategy
     if chunk_strategy is None:
         raise ValueError("Chunking strategy is required")
     logger.info(f"Processing document with chunking strategy: {chunk_strategy.type}")
-    doc_chunks = ChunkingStrategyFactory.chunk_documents(docs, chunk_strategy)
+
+    content_length = s3_object.get("ContentLength", 0)
+    if chunk_strategy.type == ChunkingStrategyType.STRUCTURED:
+        # Page, heading and paragraph boundaries are lost once the text is extracted as one string
+        doc_chunks = _structured_chunks(content_type, s3_object, metadata, chunk_strategy)
+    elif content_length >= STREAMING_EXTRACTION_MIN_BYTES:
+        logger.info(f"Streaming extraction of {content_length} byte document: {basename}")
+        doc_chunks = _stream_chunks(content_type, s3_object, metadata, chunk_strategy)
+    else:
+        # Extract text and create initial document
+        extracted_text = _extract_text_by_content_type(content_type=content_type, s3_object=s3_object)
+        docs = [Document(page_content=extracted_text, metadata=metadata)]
+        doc_chunks = iter(ChunkingStrategyFactory.chunk_documents(docs, chunk_strategy))
 
     # Update part number of doc metadata
-    for i, doc in enumerate(doc_chunks):
-        doc.metadata["part"] = i + 1
+    part = 0
+    for part, doc in enumerate(doc_chunks, start=1):
+        doc.metadata["part"] = part
+        yield doc
+
+    logger.info(f"Generated {part} chunks for document: {basename}")
+
+
+def generate_chunks(ingestion_job: IngestionJob) -> list[Document]:
+    """Generate chunks from an ingestion job using the configured chunking strategy.
+
+    Parameters
+    ----------
+    ingestion_job : IngestionJob
+        Ingestion job containing file information and chunking strategy
+
+    Returns
+    -------
+    list[Document]
+        List of document chunks for the processed file
 
-    logger.info(f"Generated {len(doc_chunks)} chunks for document: {basename}")
-    return doc_chunks
+    Raises
+    ------
+    RagUploadException
+        If S3 path is invalid or file processing fails
+    ValueError
+        If chunking strategy is not supported
+    """
+    return list(iter_chunks(ingestion_job))
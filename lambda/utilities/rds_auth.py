@@ -12,12 +12,53 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 import os
+import threading
+import time
+from collections.abc import Callable
 from urllib.parse import quote_plus
 
 import boto3
 
+# RDS IAM auth tokens are valid for 15 minutes; pooled connections opened later get a newer token
+IAM_AUTH_TOKEN_REFRESH_SECONDS = 600
 
-def generate_auth_token(host: str, port: str, user: str) -> str:
+
+def _generate_db_auth_token(host: str, port: str, user: str) -> str:
     rds = boto3.client("rds", region_name=os.environ["AWS_REGION"])
-    token = rds.generate_db_auth_token(DBHostname=host, Port=port, DBUsername=user)
-    return quote_plus(token)
+    token: str = rds.generate_db_auth_token(DBHostname=host, Port=port, DBUsername=user)
+    return token
+
+
+def generate_auth_token(host: str, port: str, user: str) -> str:
+    return quote_plus(_generate_db_auth_token(host, port, user))
+
+
+class IamAuthTokenProvider:
+    """Supply RDS IAM auth tokens to new pool connections, generating a new token before the current one expires.
+
+    Tokens are returned unencoded, for use as a driver ``password`` rather than inside a connection URL.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: str,
+        user: str,
+        refresh_seconds: float = IAM_AUTH_TOKEN_REFRESH_SECONDS,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.user = user
+        self.refresh_seconds = refresh_seconds
+        self._timer = timer
+        self._token: str | None = None
+        self._generated_at = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            if self._token is None or self._timer() - self._generated_at >= self.refresh_seconds:
+                self._token = _generate_db_auth_token(self.host, self.port, self.user)
+                self._generated_at = self._timer()
+            return self._token
@@ -14,6 +14,9 @@
 
 from datetime import datetime, timezone, tzinfo
 
+# Fixed-width UTC timestamps so persisted values also compare correctly as strings
+_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
 
 def now(tz: tzinfo = timezone.utc) -> int:
     """Return UTC epoch milliseconds."""
@@ -33,3 +36,14 @@ def iso_string(tz: tzinfo = timezone.utc) -> str:
 def utc_now() -> datetime:
     """Return current UTC datetime object."""
     return datetime.now(timezone.utc)
+
+
+def format_timestamp(value: datetime) -> str:
+    """Return a fixed-width UTC timestamp string with microseconds."""
+    return value.astimezone(timezone.utc).strftime(_TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp, treating values without an offset as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -157,6 +157,16 @@ export class RepositoryApi extends Construct {
                     ...baseEnvironment,
                 },
             },
+            {
+                name: 'batch_similarity_search',
+                resource: 'repository',
+                description: 'Run several similarity searches against the specified repository in one request',
+                path: 'repository/{repositoryId}/similaritySearch/batch',
+                method: 'POST',
+                environment: {
+                    ...baseEnvironment,
+                },
+            },
             {
                 name: 'ingest_documents',
                 resource: 'repository',
@@ -37,7 +37,7 @@ import path from 'path';
 import { ILayerVersion } from 'aws-cdk-lib/aws-lambda';
 import { StringParameter } from 'aws-cdk-lib/aws-ssm';
 import * as fs from 'fs';
-import { BATCH_INGESTION_PATH, CodeFactory, LAMBDA_PATH } from '../../util';
+import { BATCH_INGESTION_PATH, CodeFactory, LAMBDA_PATH, ROOT_PATH } from '../../util';
 
 // Props interface for the IngestionJobConstruct
 export type IngestionJobConstructProps = StackProps & BaseProps & {
@@ -139,6 +139,11 @@ export class IngestionJobConstruct extends Construct {
         // Skip actual copying during tests to avoid file not found errors
         if (process.env.NODE_ENV !== 'test') {
             fs.cpSync(path.join(__dirname, '../../../lambda'), buildDir, copyOptions);
+            // The image runs this to pre-generate the tiktoken cache used by token-based chunking strategies
+            fs.copyFileSync(
+                path.join(ROOT_PATH, 'scripts', 'cache-tiktoken-for-offline.py'),
+                path.join(buildDir, 'cache-tiktoken-for-offline.py'),
+            );
         } else {
             // For tests, we just ensure the directories exist but don't copy files
             const directories = ['repository', 'prompt_templates'];
@@ -131,6 +131,19 @@ export class LegacyIngestPipelineStateMachine extends Construct {
 
             // Ensure rule is created after Lambda function parameter is available
             dailyRule.node.addDependency(ingestionLambdaArn);
+
+            // Grant the execution role permissions to find and read the S3 Inventory reports for the bucket
+            if (pipelineConfig.s3InventoryManifest) {
+                const inventoryBucket = pipelineConfig.s3InventoryManifest.replace(/^s3:\/\//, '').split('/')[0];
+                lambdaExecutionRole.addToPrincipalPolicy(new PolicyStatement({
+                    effect: Effect.ALLOW,
+                    actions: ['s3:ListBucket', 's3:GetObject'],
+                    resources: [
+                        `arn:${config.partition}:s3:::${inventoryBucket}`,
+                        `arn:${config.partition}:s3:::${inventoryBucket}/*`,
+                    ]
+                }));
+            }
         } else if (pipelineConfig.trigger === 'event') {
             const ingestionLambdaArn = StringParameter.fromStringParameterName(this, createCdkId(['IngestionChangeEventLambdaStringParameter', hash]), `${config.deploymentPrefix}/ingestion/ingest/event`);
 
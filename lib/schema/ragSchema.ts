@@ -21,6 +21,8 @@ import { EbsDeviceVolumeType } from './cdk';
  */
 export enum ChunkingStrategyType {
     FIXED = 'fixed',
+    TOKEN = 'token',
+    STRUCTURED = 'structured',
     NONE = 'none',
 }
 
@@ -38,6 +40,36 @@ export const FixedSizeChunkingStrategySchema = z.object({
     }
 );
 
+/**
+ * Token chunking strategy schema - chunk size and overlap are counted in embedding-model tokens
+ */
+export const TokenChunkingStrategySchema = z.object({
+    type: z.literal(ChunkingStrategyType.TOKEN).default(ChunkingStrategyType.TOKEN).describe('Token budgeted chunking strategy type'),
+    size: z.number().min(50).max(8192).default(512).describe('Size of each chunk in tokens'),
+    overlap: z.number().min(0).default(51).describe('Overlap between chunks in tokens'),
+    encoding: z.string().min(1).default('cl100k_base').describe('tiktoken encoding used to count tokens'),
+}).refine(
+    (data) => data.overlap <= data.size / 2,
+    {
+        error: 'overlap must be less than or equal to half of size'
+    }
+);
+
+/**
+ * Structured chunking strategy schema - chunks follow PDF pages, headings and paragraphs, up to size tokens each
+ */
+export const StructuredChunkingStrategySchema = z.object({
+    type: z.literal(ChunkingStrategyType.STRUCTURED).default(ChunkingStrategyType.STRUCTURED).describe('Structure-aware chunking strategy type'),
+    size: z.number().min(50).max(8192).default(512).describe('Maximum size of each chunk in tokens'),
+    overlap: z.number().min(0).default(0).describe('Overlap in tokens between pieces of a paragraph that is split'),
+    encoding: z.string().min(1).default('cl100k_base').describe('tiktoken encoding used to count tokens'),
+}).refine(
+    (data) => data.overlap <= data.size / 2,
+    {
+        error: 'overlap must be less than or equal to half of size'
+    }
+);
+
 /**
  * None chunking strategy schema - documents ingested as-is without chunking
  */
@@ -50,11 +82,15 @@ export const NoneChunkingStrategySchema = z.object({
  */
 export const ChunkingStrategySchema = z.union([
     FixedSizeChunkingStrategySchema,
+    TokenChunkingStrategySchema,
+    StructuredChunkingStrategySchema,
     NoneChunkingStrategySchema,
 ]);
 
 export type ChunkingStrategy = z.infer<typeof ChunkingStrategySchema>;
 export type FixedSizeChunkingStrategy = z.infer<typeof FixedSizeChunkingStrategySchema>;
+export type TokenChunkingStrategy = z.infer<typeof TokenChunkingStrategySchema>;
+export type StructuredChunkingStrategy = z.infer<typeof StructuredChunkingStrategySchema>;
 export type NoneChunkingStrategy = z.infer<typeof NoneChunkingStrategySchema>;
 
 /**
@@ -135,6 +171,8 @@ export const RagRepositoryPipeline = z.object({
         .regex(/^([a-zA-Z0-9!_.*'()/=-]+\/)*[a-zA-Z0-9!_.*'()/=-]*$/, 'Prefix must be a valid S3 prefix.')
         .regex(/^(?!\/).*/, 'Prefix must not start with /')
         .default('').describe('The prefix within the S3 bucket monitored for document processing.'),
+    s3InventoryManifest: z.string().regex(/^s3:\/\/.+/, 'Inventory manifest must be an S3 URI').optional()
+        .describe('S3 URI of an S3 Inventory manifest.json for the monitored bucket, or of the inventory destination prefix holding its dated reports. Daily pipelines read new objects from the latest report instead of listing the bucket.'),
     trigger: z.union([triggerSchema.shape.daily, triggerSchema.shape.event])
         .default('event').describe('The event type that triggers document ingestion.'),
     autoRemove: z.boolean().default(true).describe('Enable removal of document from vector store when deleted from S3. This will also remove the file from S3 if file is deleted from vector store through API/UI.'),
@@ -160,6 +198,28 @@ export type RdsConfig = z.infer<typeof RdsInstanceConfig>;
 
 export type BedrockKnowledgeBaseConfig = z.infer<typeof BedrockKnowledgeBaseInstanceConfig>;
 
+export const HybridSearchConfigSchema = z.object({
+    enabled: z.boolean().default(false).describe('Use hybrid search when a similarity search request does not choose a searchMode.'),
+    vectorWeight: z.number().min(0).default(1).describe('Weight of the vector ranking in the reciprocal-rank fusion score.'),
+    lexicalWeight: z.number().min(0).default(1).describe('Weight of the full-text ranking in the reciprocal-rank fusion score.'),
+    rrfK: z.number().int().positive().default(60).describe('Rank constant k in the reciprocal-rank fusion score 1 / (k + rank).'),
+    candidateMultiplier: z.number().int().min(1).max(20).default(4).describe('Each ranking contributes topK * candidateMultiplier candidates to the fusion.'),
+}).describe('Hybrid search fuses full-text (BM25 or Postgres tsvector) and vector search results with reciprocal-rank fusion.');
+
+export type HybridSearchConfig = z.infer<typeof HybridSearchConfigSchema>;
+
+export const RerankConfigSchema = z.object({
+    enabled: z.boolean().default(true).describe('Rerank similarity searches that do not set rerank=false.'),
+    type: z.enum(['cross_encoder', 'term_overlap', 'stub']).default('term_overlap').describe('Reranker: a cross-encoder model served by LISA, a local BM25 scorer, or a deterministic stub for tests.'),
+    modelName: z.string().optional().describe('Reranking model served by LISA, required for the cross_encoder reranker.'),
+    candidates: z.number().int().min(1).max(100).default(20).describe('Number of candidates retrieved and reranked down to topK.'),
+    latencyBudgetMs: z.number().int().positive().default(500).describe('Rerank time after which results are returned in vector order.'),
+}).refine((input) => input.type !== 'cross_encoder' || !!input.modelName, {
+    message: 'modelName is required for the cross_encoder reranker.',
+}).describe('Reranking reorders over-fetched similarity search candidates before the top results are returned.');
+
+export type RerankConfig = z.infer<typeof RerankConfigSchema>;
+
 export const RagRepositoryMetadata = MetadataSchema.extend({
     customFields: z.record(z.string(), z.any()).optional().describe('Custom metadata fields for the repository.'),
 });
@@ -177,6 +237,8 @@ export const BaseRagRepositoryConfigSchema = z.object({
     opensearchConfig: z.union([OpenSearchExistingClusterConfig, OpenSearchNewClusterConfig]).optional(),
     rdsConfig: RdsInstanceConfig.optional(),
     bedrockKnowledgeBaseConfig: BedrockKnowledgeBaseInstanceConfig.optional(),
+    hybridSearch: HybridSearchConfigSchema.optional().describe('Hybrid search settings for OpenSearch and PGVector repositories.'),
+    rerank: RerankConfigSchema.optional().describe('Reranking settings for similarity search.'),
     pipelines: z.array(RagRepositoryPipeline).optional().default([]).describe('Rag ingestion pipeline for automated inclusion into a vector store from S3'),
     allowedGroups: z.array(z.string()).optional().describe('The groups provided by the Identity Provider that have access to this repository. If no groups are specified, access is granted to everyone.'),
     createdBy: z.string().describe('User ID of creator'),
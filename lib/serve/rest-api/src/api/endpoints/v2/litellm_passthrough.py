@@ -14,19 +14,21 @@
 
 """Model invocation routes."""
 
+import asyncio
 import json
 import logging
 import os
+import re
 import time
 import uuid
-from collections.abc import Iterator
-from typing import Any, cast
+from collections.abc import AsyncIterator
+from typing import Any
 
 import boto3
 from auth import extract_user_groups_from_jwt
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse, Response, StreamingResponse
-from requests import request as requests_request
+from starlette.background import BackgroundTask
 from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN
 from utils.guardrails import (
     create_guardrail_json_response,
@@ -34,16 +36,16 @@ from utils.guardrails import (
     extract_guardrail_response,
     get_applicable_guardrails,
     get_model_guardrails,
+    invalidate_guardrails_cache,
     is_guardrail_violation,
 )
+from utils.litellm_client import get_litellm_client, UpstreamResponse, UpstreamStreamingResponse
 from utils.metrics import extract_token_usage, publish_metrics_event
+from utils.rate_limit import record_token_usage
+from utils.request_body import get_json_body, get_request_body
 from utils.request_utils import get_lisa_end_user_id
 from utils.route_utils import is_anthropic_route, is_chat_route, is_lisa_public_route, is_openai_route
 
-# Local LiteLLM installation URL. By default, LiteLLM runs on port 4000. Change the port here if the
-# port was changed as part of the LiteLLM startup in entrypoint.sh
-LITELLM_URL = "http://localhost:4000"
-
 # With the introduction of the LiteLLM database for model configurations, it forces a requirement to have a
 # LiteLLM-vended API key. Since we are not requiring LiteLLM keys for customers, we are using the LiteLLM key
 # required for the db and injecting that into all requests instead to overcome that requirement.
@@ -57,13 +59,25 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Model info cache with TTL (Time To Live)
-# Cache structure: {model_id: {"data": model_info, "timestamp": cache_time}}
-_model_info_cache: dict[str, dict[str, Any]] = {}
+# Streaming relay. Upstream SSE lines are forwarded as-is; only data lines that mention an error or a non-null
+# usage block are parsed, since those are the only chunks that affect guardrail handling or token metrics.
+_SSE_DATA_PREFIX = b"data: "
+_SSE_EVENT_SEPARATOR = b"\n\n"
+_SSE_PARSE_CANDIDATE = re.compile(rb'"error"|"usage"\s*:(?!\s*null\b)')
+
+# Model info cache. LiteLLM returns every model from /model/info, so the whole list is cached and indexed by
+# model_name. Once the TTL expires, the first lookup starts a single background refresh and every lookup keeps
+# being served from the stale index until it completes, so an expiry under load costs one upstream call.
+_model_info_index: dict[str, dict[str, Any]] = {}
+# time.monotonic() of the last successful refresh, or None if the index has never been loaded
+_model_info_refreshed_at: float | None = None
+_model_info_refresh_task: asyncio.Task | None = None
 # Cache TTL in seconds (default: 5 minutes)
-# Stale entries are automatically refreshed when accessed after TTL expires
 # This ensures deleted/recreated models get fresh data within 5 minutes
 MODEL_INFO_CACHE_TTL = int(os.environ.get("MODEL_INFO_CACHE_TTL", "300"))
+# Lookups for a model missing from the index trigger a refresh at most this often, so newly created models are
+# picked up quickly without letting requests for unknown models hammer LiteLLM
+MODEL_INFO_MISS_REFRESH_INTERVAL = int(os.environ.get("MODEL_INFO_MISS_REFRESH_INTERVAL", "10"))
 
 
 def _generate_presigned_video_url(key: str, content_type: str = "video/mp4") -> str:
@@ -121,7 +135,7 @@ async def apply_guardrails_to_request(params: dict, model_id: str, jwt_data: dic
 
 
 def handle_guardrail_violation_response(
-    response: Response, model_id: str, params: dict, is_streaming: bool
+    response: UpstreamResponse, model_id: str, params: dict, is_streaming: bool
 ) -> Response | None:
     """
     Handle guardrail violation errors in LiteLLM responses.
@@ -176,24 +190,65 @@ def invalidate_model_cache(model_id: str | None = None) -> None:
 
     Note: This function is available for manual/programmatic cache clearing but is not
     automatically triggered. The cache relies on TTL expiration for normal operation.
+    Cached guardrail assignments for the model are invalidated as well.
 
     Args:
         model_id: Specific model to invalidate. If None, clears entire cache.
     """
+    global _model_info_refreshed_at, _model_info_refresh_task
+    invalidate_guardrails_cache(model_id)
     if model_id is None:
-        _model_info_cache.clear()
+        _model_info_index.clear()
+        _model_info_refreshed_at = None
+        _model_info_refresh_task = None
         logger.info("Cleared entire model info cache")
-    elif model_id in _model_info_cache:
-        del _model_info_cache[model_id]
+    else:
+        # The index is refreshed as a whole, so mark it stale to pick up the model's current info
+        _model_info_index.pop(model_id, None)
+        if _model_info_refreshed_at is not None:
+            _model_info_refreshed_at = -float("inf")
         logger.info(f"Invalidated cache for model {model_id}")
 
 
-def get_model_info(model_id: str, use_cache: bool = True) -> dict | None:
+async def _refresh_model_info() -> bool:
+    """Fetch every model from LiteLLM and replace the model info index. Returns True on success."""
+    global _model_info_refreshed_at
+    try:
+        headers = {"Authorization": f"Bearer {LITELLM_KEY}"}
+        response = await get_litellm_client().request("GET", "model/info", headers=headers, timeout=2)
+        if response.status_code != HTTP_200_OK:
+            logger.error(f"Failed to refresh model info: LiteLLM returned {response.status_code}")
+            return False
+        all_models = response.json().get("data", [])
+    except Exception as e:
+        logger.error(f"Failed to refresh model info: {e}")
+        return False
+
+    index = {model["model_name"]: model for model in all_models if model.get("model_name")}
+    _model_info_index.clear()
+    _model_info_index.update(index)
+    _model_info_refreshed_at = time.monotonic()
+    logger.debug(f"Cached model info for {len(index)} models")
+    return True
+
+
+def _start_model_info_refresh() -> asyncio.Task:
+    """Return the in-flight model info refresh, starting one if none is running on this event loop."""
+    global _model_info_refresh_task
+    task = _model_info_refresh_task
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(_refresh_model_info())
+        _model_info_refresh_task = task
+    return task
+
+
+async def get_model_info(model_id: str, use_cache: bool = True) -> dict | None:
     """
     Get model information from LiteLLM for a given model ID.
 
-    Uses a TTL-based cache to reduce API calls while ensuring deleted/recreated
-    models are eventually refreshed.
+    Uses a TTL-based cache of the full model list to reduce API calls while ensuring
+    deleted/recreated models are eventually refreshed. Concurrent lookups share a
+    single upstream refresh, and expired entries are served while it runs.
 
     Args:
         model_id: User-defined model ID (model_name in LiteLLM)
@@ -202,68 +257,43 @@ def get_model_info(model_id: str, use_cache: bool = True) -> dict | None:
     Returns:
         Model info dict with litellm_params, or None if not found
     """
-    current_time = time.time()
-
-    # Check cache first if enabled
-    if use_cache and model_id in _model_info_cache:
-        cache_entry = _model_info_cache[model_id]
-        cache_age = current_time - cache_entry["timestamp"]
-
-        # Return cached data if still fresh
-        if cache_age < MODEL_INFO_CACHE_TTL:
-            logger.debug(f"Cache hit for model {model_id} (age: {cache_age:.1f}s)")
-            model_info = cast(dict[Any, Any], cache_entry["data"])
-            return model_info
-        else:
-            logger.debug(f"Cache expired for model {model_id} (age: {cache_age:.1f}s)")
-
-    # Cache miss or expired - fetch from LiteLLM
-    try:
-        headers = {"Authorization": f"Bearer {LITELLM_KEY}"}
-        response = requests_request(
-            method="GET",
-            url=f"{LITELLM_URL}/model/info",
-            headers=headers,
-            timeout=2,
-        )
-
-        if response.status_code == HTTP_200_OK:
-            all_models = response.json().get("data", [])
-            # Filter to find the specific model by model_name
-            for model in all_models:
-                if model.get("model_name") == model_id:
-                    model_info = cast(dict[Any, Any], model)
-                    # Update cache
-                    _model_info_cache[model_id] = {"data": model_info, "timestamp": current_time}
-                    logger.debug(f"Cached model info for {model_id}")
-                    return model_info
-
-            # Model not found - remove from cache if present
-            if model_id in _model_info_cache:
-                logger.info(f"Model {model_id} no longer exists, removing from cache")
-                del _model_info_cache[model_id]
-
-    except Exception as e:
-        logger.error(f"Failed to get model info for {model_id}: {e}")
-
-    return None
-
-
-def generate_response(iterator: Iterator[str | bytes]) -> Iterator[str]:
-    """For streaming responses, generate strings instead of bytes objects so that clients recognize the LLM output."""
-    for line in iterator:
-        if isinstance(line, bytes):
-            line = line.decode()
+    if not use_cache or _model_info_refreshed_at is None:
+        # Nothing usable cached - wait for the shared refresh. Shielded so a cancelled request does not cancel
+        # the refresh for everyone else waiting on it.
+        await asyncio.shield(_start_model_info_refresh())
+        return _model_info_index.get(model_id)
+
+    cache_age = time.monotonic() - _model_info_refreshed_at
+    model_info = _model_info_index.get(model_id)
+    if cache_age >= MODEL_INFO_CACHE_TTL:
+        logger.debug(f"Model info cache expired (age: {cache_age:.1f}s), refreshing in the background")
+        refresh = _start_model_info_refresh()
+        if model_info is None:
+            await asyncio.shield(refresh)
+            return _model_info_index.get(model_id)
+    elif model_info is None and cache_age >= MODEL_INFO_MISS_REFRESH_INTERVAL:
+        logger.debug(f"Model {model_id} not in model info cache, refreshing")
+        await asyncio.shield(_start_model_info_refresh())
+        return _model_info_index.get(model_id)
+
+    return model_info
+
+
+async def generate_response(iterator: AsyncIterator[str | bytes]) -> AsyncIterator[bytes]:
+    """For streaming responses, relay each upstream line to the client as an SSE event, byte-for-byte."""
+    async for line in iterator:
+        if isinstance(line, str):
+            line = line.encode()
         if line:
-            yield f"{line}\n\n"
+            yield line + _SSE_EVENT_SEPARATOR
 
 
-def generate_response_with_guardrail_handling(
-    iterator: Iterator[str | bytes],
+async def generate_response_with_guardrail_handling(
+    iterator: AsyncIterator[str | bytes],
     model: str,
     request: Request,
     params: dict,
-) -> Iterator[str]:
+) -> AsyncIterator[str | bytes]:
     """
     Generate streaming responses with guardrail violation error handling and token usage capture.
 
@@ -273,6 +303,8 @@ def generate_response_with_guardrail_handling(
     metrics event to SQS after the stream completes.
 
     All chunks are forwarded to the client unchanged — token capture is a side-effect only.
+    Only chunks that can carry a usage block or an error are decoded and parsed; all other
+    chunks are relayed as raw bytes.
 
     Args:
         iterator: The line iterator from the streaming LiteLLM response
@@ -285,55 +317,50 @@ def generate_response_with_guardrail_handling(
     guardrail_triggered = False
 
     try:
-        for line in iterator:
-            if isinstance(line, bytes):
-                line = line.decode()
+        async for line in iterator:
+            if isinstance(line, str):
+                line = line.encode()
 
             if not line:
                 continue
 
-            if line.startswith("data: "):
-                try:
-                    data_content = line[6:].strip()  # Remove "data: " prefix
-
-                    if data_content == "[DONE]":
-                        yield f"{line}\n\n"
-                        continue
-
-                    chunk_data = json.loads(data_content)
-
-                    # Capture token usage from the usage chunk (present near end of stream)
-                    if "usage" in chunk_data and chunk_data["usage"]:
-                        pt, ct = extract_token_usage(chunk_data)
-                        if pt is not None:
-                            captured_prompt_tokens = pt
-                        if ct is not None:
-                            captured_completion_tokens = ct
-
-                    # Check if this is an error chunk
-                    if "error" in chunk_data:
-                        error_msg = chunk_data.get("error", {}).get("message", "")
-
-                        if is_guardrail_violation(error_msg):
-                            logger.info("Guardrail policy violated in streaming response")
-
-                            guardrail_response = extract_guardrail_response(error_msg)
-                            if guardrail_response:
-                                guardrail_triggered = True
-                                created = int(chunk_data.get("created", 0))
-                                yield from create_guardrail_streaming_response(guardrail_response, model, created)
-                                return  # Stop streaming — finally block publishes metrics
-                            else:
-                                yield f"{line}\n\n"
-                        else:
-                            yield f"{line}\n\n"
-                    else:
-                        yield f"{line}\n\n"
-
-                except json.JSONDecodeError:
-                    yield f"{line}\n\n"
-            else:
-                yield f"{line}\n\n"
+            event = line + _SSE_EVENT_SEPARATOR
+
+            # Fast path: relay token chunks, [DONE] and non-data lines without parsing them
+            if not line.startswith(_SSE_DATA_PREFIX) or not _SSE_PARSE_CANDIDATE.search(line, len(_SSE_DATA_PREFIX)):
+                yield event
+                continue
+
+            try:
+                chunk_data = json.loads(line[len(_SSE_DATA_PREFIX) :])
+            except ValueError:
+                yield event
+                continue
+
+            # Capture token usage from the usage chunk (present near end of stream)
+            if "usage" in chunk_data and chunk_data["usage"]:
+                pt, ct = extract_token_usage(chunk_data)
+                if pt is not None:
+                    captured_prompt_tokens = pt
+                if ct is not None:
+                    captured_completion_tokens = ct
+
+            # Check if this is an error chunk
+            if "error" in chunk_data:
+                error_msg = chunk_data.get("error", {}).get("message", "")
+
+                if is_guardrail_violation(error_msg):
+                    logger.info("Guardrail policy violated in streaming response")
+
+                    guardrail_response = extract_guardrail_response(error_msg)
+                    if guardrail_response:
+                        guardrail_triggered = True
+                        created = int(chunk_data.get("created", 0))
+                        for guardrail_chunk in create_guardrail_streaming_response(guardrail_response, model, created):
+                            yield guardrail_chunk
+                        return  # Stop streaming — finally block publishes metrics
+
+            yield event
     finally:
         # Always publish metrics after the stream ends, regardless of how the generator exits
         # (normal exhaustion, guardrail early-return, or unexpected exception).
@@ -348,6 +375,8 @@ def generate_response_with_guardrail_handling(
             prompt_tokens=None if guardrail_triggered else captured_prompt_tokens,
             completion_tokens=None if guardrail_triggered else captured_completion_tokens,
         )
+        if not guardrail_triggered:
+            await record_token_usage(request, model, captured_prompt_tokens, captured_completion_tokens)
 
 
 @router.api_route("/{api_path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
@@ -361,7 +390,7 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
     Results are only streamed if the OpenAI-compatible request specifies streaming as part of the
     input payload.
     """
-    litellm_path = f"{LITELLM_URL}/{api_path}"
+    litellm_client = get_litellm_client()
     headers = dict(request.headers.items())
 
     # Auth is handled by middleware - check authorization for admin routes
@@ -386,7 +415,7 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
 
     # Handle GET and DELETE requests (no body expected)
     if http_method in ("GET", "DELETE", "OPTIONS"):
-        response = requests_request(method=http_method, url=litellm_path, headers=headers)
+        response = await litellm_client.request(http_method, api_path, headers=headers)
 
         # Check content type to handle binary responses (e.g., video content)
         content_type = response.headers.get("content-type", "").lower()
@@ -468,7 +497,7 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
             # Parse the form data
             form = await request.form()
 
-            # Build files dict for requests library
+            # Build files dict for the multipart upstream request
             files = {}
             data = {}
 
@@ -484,15 +513,15 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
                     # It's a regular form field
                     data[field_name] = field_value
 
-            # Create new headers without Content-Type (requests library will set it with correct boundary)
+            # Create new headers without Content-Type (the HTTP client will set it with correct boundary)
             forward_headers = {"Authorization": f"Bearer {LITELLM_KEY}"}
             # Preserve end-user attribution header for multipart requests if it was set above.
             if "x-litellm-end-user-id" in headers:
                 forward_headers["x-litellm-end-user-id"] = headers["x-litellm-end-user-id"]
 
             # Forward multipart request to LiteLLM
-            response = requests_request(
-                method=http_method, url=litellm_path, data=data, files=files, headers=forward_headers
+            response = await litellm_client.request(
+                http_method, api_path, data=data, files=files, headers=forward_headers
             )
 
             if response.status_code != HTTP_200_OK:
@@ -505,12 +534,11 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Error processing multipart request")
 
     # Handle JSON POST requests
-    # Parse request body first
+    # Parse request body first (reuses the body already read and parsed by the security middleware)
     try:
-        body = await request.body()
-        if not body:
+        if not await get_request_body(request):
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Request body is required")
-        params = json.loads(body)
+        params = await get_json_body(request)
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in request body: {e}")
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid JSON in request body")
@@ -524,7 +552,7 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
     model_id = params.get("model")
     model_name = None  # The actual provider/model path (e.g., "bedrock/us.anthropic.claude...")
     if model_id:
-        model_info = get_model_info(model_id)
+        model_info = await get_model_info(model_id)
         if model_info:
             model_name = model_info.get("litellm_params", {}).get("model")
             logger.debug(f"model_id: {model_id}, model_name: {model_name}")
@@ -568,31 +596,38 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
 
     is_streaming = params.get("stream", False)
     if is_streaming:
-        response = requests_request(method=http_method, url=litellm_path, json=params, headers=headers, stream=True)
+        upstream = await litellm_client.stream(http_method, api_path, json=params, headers=headers)
 
-        # Check for guardrail violations in the initial response (before streaming starts)
+        # Guardrail violations are reported as a 400 before streaming starts, so buffer the (small) error body
+        # and check it. Successful streams are relayed as they arrive.
         model_id = params.get("model", "")
-        guardrail_response = handle_guardrail_violation_response(response, model_id, params, is_streaming=True)
-        if guardrail_response:
-            return guardrail_response
+        stream_source: UpstreamResponse | UpstreamStreamingResponse = upstream
+        if upstream.status_code == HTTP_400_BAD_REQUEST:
+            stream_source = await upstream.read()
+            guardrail_response = handle_guardrail_violation_response(stream_source, model_id, params, is_streaming=True)
+            if guardrail_response:
+                return guardrail_response
 
         # Use token-capturing, guardrail-aware generator for chat/completions.
         # The generator publishes the unified metrics event (including token counts)
         # after the stream ends, so no separate publish_metrics_event call is needed here.
-        if is_chat_completion and response.status_code == HTTP_200_OK:
+        # The background task returns the upstream connection to the pool even if the client disconnects early.
+        if is_chat_completion and upstream.status_code == HTTP_200_OK:
             model_id = params.get("model", "")
             return StreamingResponse(
-                generate_response_with_guardrail_handling(response.iter_lines(), model_id, request, params),
-                status_code=response.status_code,
+                generate_response_with_guardrail_handling(stream_source.iter_lines(), model_id, request, params),
+                status_code=upstream.status_code,
+                background=BackgroundTask(upstream.aclose),
             )
         else:
             return StreamingResponse(
-                generate_response(response.iter_lines()),
-                status_code=response.status_code,
+                generate_response(stream_source.iter_lines()),
+                status_code=upstream.status_code,
+                background=BackgroundTask(upstream.aclose),
             )
 
     # Non-streaming request
-    response = requests_request(method=http_method, url=litellm_path, json=params, headers=headers)
+    response = await litellm_client.request(http_method, api_path, json=params, headers=headers)
 
     # Check for guardrail violations in the response
     model_id = params.get("model", "")
@@ -609,5 +644,7 @@ async def litellm_passthrough(request: Request, api_path: str) -> Response:
     # Publish metrics for non-streaming chat completions (API users).
     if is_chat_completion:
         publish_metrics_event(request, params, response.status_code, response_body=response_body)
+        if response_body is not None:
+            await record_token_usage(request, model_id, *extract_token_usage(response_body))
 
     return JSONResponse(response_body, status_code=response.status_code)
@@ -20,6 +20,7 @@ import os
 import ssl
 import sys
 import threading
+import time
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
@@ -29,7 +30,7 @@ import boto3
 import jwt
 import requests
 from auth_provider import get_authorization_provider
-from cachetools import TTLCache
+from cachetools import TLRUCache, TTLCache
 from cachetools.keys import hashkey
 from fastapi import HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -41,6 +42,13 @@ TOKEN_EXPIRATION_NAME = "tokenExpiration"  # nosec B105
 TOKEN_TABLE_NAME = "TOKEN_TABLE_NAME"  # nosec B105
 USE_AUTH = "USE_AUTH"
 
+# API token lookups are cached by token hash. Valid tokens are cached until the cache TTL or the token's own
+# expiration, whichever comes first; unknown hashes are cached for a shorter window. The TTL bounds how long a
+# deleted token keeps working on a warm worker.
+API_TOKEN_CACHE_TTL = int(os.environ.get("API_TOKEN_CACHE_TTL", "60"))
+API_TOKEN_NEGATIVE_CACHE_TTL = int(os.environ.get("API_TOKEN_NEGATIVE_CACHE_TTL", "30"))
+API_TOKEN_CACHE_MAX_SIZE = int(os.environ.get("API_TOKEN_CACHE_MAX_SIZE", "10000"))
+
 
 logger_level = os.environ.get("LOG_LEVEL", "INFO")
 logger.configure(
@@ -180,6 +188,15 @@ def extract_user_groups_from_jwt(jwt_data: dict[str, Any] | None) -> list[str]:
         return []
 
 
+def looks_like_jwt(token: str) -> bool:
+    """Return whether a bearer token has the shape of a JWT.
+
+    JWTs are three base64url segments separated by dots, and their JSON header always encodes to a string
+    starting with "eyJ". LISA API tokens are hex strings, so they never match.
+    """
+    return token.startswith("eyJ") and token.count(".") == 2
+
+
 def get_authorization_token(headers: dict[str, str], header_name: str = AuthHeaders.AUTHORIZATION) -> str:
     """Get Bearer token from Authorization headers if it exists."""
     if header_name in headers:
@@ -231,27 +248,63 @@ class ApiTokenAuthorizer:
     API key becomes invalid after a specified time.
     """
 
+    _NOT_FOUND: dict[str, Any] = {}
+
     def __init__(self) -> None:
         ddb_resource = boto3.resource("dynamodb", region_name=os.environ["AWS_REGION"])
         self._token_table = ddb_resource.Table(os.environ[TOKEN_TABLE_NAME])
+        # Cache structure: {token_hash: token_info}, with _NOT_FOUND marking hashes that are not in the table
+        self._cache: TLRUCache = TLRUCache(maxsize=API_TOKEN_CACHE_MAX_SIZE, ttu=self._time_to_use, timer=time.time)
+        self._cache_lock = threading.RLock()
+
+    def _time_to_use(self, token_hash: str, token_info: dict[str, Any], now: float) -> float:
+        """Return the wall-clock time at which a cached lookup expires."""
+        if token_info is self._NOT_FOUND:
+            return now + API_TOKEN_NEGATIVE_CACHE_TTL
+        expires = now + API_TOKEN_CACHE_TTL
+        try:
+            return min(expires, float(token_info.get(TOKEN_EXPIRATION_NAME) or expires))
+        except (TypeError, ValueError):
+            return expires
 
     def _get_token_info(self, token_hash: str) -> Any:
         """Return DDB entry for hashed token if it exists."""
         ddb_response = self._token_table.get_item(Key={"token": token_hash}, ReturnConsumedCapacity="NONE")
         return ddb_response.get("Item", None)
 
+    async def _get_cached_token_info(self, token_hash: str) -> dict[str, Any] | None:
+        """Return the token entry for a hash, reading DynamoDB only on a cache miss."""
+        with self._cache_lock:
+            cached = self._cache.get(token_hash)
+        if cached is not None:
+            return None if cached is self._NOT_FOUND else cached
+
+        token_info = await asyncio.to_thread(self._get_token_info, token_hash)
+        with self._cache_lock:
+            self._cache[token_hash] = token_info if token_info else self._NOT_FOUND
+        return token_info or None
+
+    def invalidate(self, token_hash: str | None = None) -> None:
+        """Drop a cached token lookup, or every cached lookup if no hash is given."""
+        with self._cache_lock:
+            if token_hash is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(token_hash, None)
+
     async def is_valid_api_token(self, headers: dict[str, str]) -> dict[str, Any] | None:
         """Return token info if API Token from request headers is valid, else None."""
 
         for header_name in AuthHeaders.values():
             token = get_authorization_token(headers, header_name)
 
-            if token:
+            # OIDC bearer tokens share the Authorization header; skip the token table for them
+            if token and not looks_like_jwt(token):
                 # Hash the provided token
                 token_hash = hashlib.sha256(token.encode()).hexdigest()
 
-                # Look up hashed token in DynamoDB
-                token_info = await asyncio.to_thread(self._get_token_info, token_hash)
+                # Look up hashed token in the cache, falling back to DynamoDB
+                token_info = await self._get_cached_token_info(token_hash)
 
                 if token_info:
                     # Reject legacy tokens without tokenUUID
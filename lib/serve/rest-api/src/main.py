@@ -14,6 +14,7 @@
 
 """REST API."""
 
+import asyncio
 import os
 import sys
 from contextlib import asynccontextmanager
@@ -24,13 +25,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from middleware import (
     auth_middleware,
-    process_request_middleware,
+    FunctionMiddleware,
+    ProcessRequestMiddleware,
     rate_limit_middleware,
     register_exception_handlers,
     security_middleware,
     validate_input_middleware,
 )
 from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.litellm_client import close_litellm_client
+from utils.metrics import shutdown_metrics_publisher
 
 logger.remove()
 logger_level = os.environ.get("LOG_LEVEL", "INFO")
@@ -59,6 +63,10 @@ logger.configure(
 async def lifespan(app: FastAPI):  # type: ignore
     """REST API lifespan."""
     yield
+    # Close pooled keep-alive connections to LiteLLM on worker shutdown
+    await close_litellm_client()
+    # Send any usage metrics still queued in this worker
+    await asyncio.to_thread(shutdown_metrics_publisher)
 
 
 app = FastAPI(lifespan=lifespan)
@@ -87,50 +95,30 @@ app.add_middleware(
 ##############
 
 
-@app.middleware("http")
-async def rate_limit(request, call_next):  # type: ignore
-    """Per-user rate limiting middleware.
+# All middleware is pure ASGI. Starlette runs the most recently added middleware first, so the registration order
+# below is the reverse of the order requests pass through: security -> process request -> input validation ->
+# authentication -> rate limiting -> CORS -> routes. The request body is read and parsed at most once across all of
+# them (see utils.request_body).
 
-    Runs after authentication (user identity is available) to enforce
-    per-API-key / per-user request rate limits.
-    """
-    return await rate_limit_middleware(request, call_next)
-
-
-@app.middleware("http")
-async def authenticate(request, call_next):  # type: ignore
-    """Authentication middleware.
-
-    Validates tokens and sets user context on request.state.
-    NOTE: Function middleware executes in reverse registration order in FastAPI,
-    so this must be declared *after* rate_limit() to run first on requests.
-    """
-    return await auth_middleware(request, call_next)
+# Per-user rate limiting. Runs after authentication (user identity is available) to enforce
+# per-API-key / per-user request rate limits.
+app.add_middleware(FunctionMiddleware, dispatch=rate_limit_middleware)
 
+# Authentication. Validates tokens and sets user context on request.state.
+app.add_middleware(FunctionMiddleware, dispatch=auth_middleware)
 
-@app.middleware("http")
-async def validate_input(request, call_next):  # type: ignore
-    """Middleware for validating all HTTP request inputs."""
-    return await validate_input_middleware(request, call_next)
+# Validation of all HTTP request inputs.
+app.add_middleware(FunctionMiddleware, dispatch=validate_input_middleware)
 
+# Request processing (request ID and logging).
+app.add_middleware(ProcessRequestMiddleware)
 
-@app.middleware("http")
-async def process_request(request, call_next):  # type: ignore
-    """Middleware for processing all HTTP requests (logging)."""
-    return await process_request_middleware(request, call_next)
-
-
-@app.middleware("http")
-async def security_check(request, call_next):  # type: ignore
-    """Security middleware for input validation.
-
-    This middleware runs FIRST (before request logging) to validate:
-    - HTTP method is allowed
-    - No null bytes in path, query, or body
-    - Request body is valid JSON for POST/PUT/PATCH
-    - Request size is within limits (model proxy endpoints are exempt)
-    """
-    return await security_middleware(request, call_next)
+# Security checks run FIRST (before request logging) to validate:
+# - HTTP method is allowed
+# - No null bytes in path, query, or body
+# - Request body is valid JSON for POST/PUT/PATCH
+# - Request size is within limits (model proxy endpoints are exempt)
+app.add_middleware(FunctionMiddleware, dispatch=security_middleware)
 
 
 def _parse_asgi_spec_version(spec_version: str) -> tuple[int, ...]:
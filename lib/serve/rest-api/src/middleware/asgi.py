@@ -0,0 +1,64 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pure ASGI adapter for request-checking middleware functions."""
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import Request, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.request_body import receive_with_cached_body
+
+CallNext = Callable[[Request], Awaitable[Response]]
+# call_next is typed loosely because the existing middleware functions annotate it in different ways
+Dispatch = Callable[[Request, Any], Awaitable[Response]]
+
+
+class _ForwardedResponse(Response):
+    """Placeholder returned by ``call_next`` once the wrapped app has already sent its response."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        raise RuntimeError("The wrapped app's response has already been sent")
+
+
+class FunctionMiddleware:
+    """Run a ``(request, call_next)`` middleware function as pure ASGI middleware.
+
+    Unlike ``@app.middleware("http")`` (``BaseHTTPMiddleware``), ``call_next`` runs the wrapped app directly with the
+    server's ``send``, so responses stream straight through without an extra task and memory stream per layer.
+    The function may return its own response instead of calling ``call_next``. The response returned by
+    ``call_next`` has already been sent, so it must be returned unchanged rather than modified.
+
+    A request body read by the function through ``utils.request_body`` is replayed to the wrapped app.
+    """
+
+    def __init__(self, app: ASGIApp, dispatch: Dispatch) -> None:
+        self.app = app
+        self.dispatch = dispatch
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forwarded = _ForwardedResponse()
+
+        async def call_next(request: Request) -> Response:
+            await self.app(scope, receive_with_cached_body(scope, receive), send)
+            return forwarded
+
+        response = await self.dispatch(Request(scope, receive), call_next)
+        if response is not forwarded:
+            await response(scope, receive, send)
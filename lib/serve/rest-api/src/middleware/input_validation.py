@@ -25,6 +25,7 @@ from starlette.status import (
     HTTP_405_METHOD_NOT_ALLOWED,
     HTTP_413_CONTENT_TOO_LARGE,
 )
+from utils.request_body import get_request_body
 
 # Maximum request size: 10MB
 # This allows for large prompts, image uploads, and other content
@@ -132,8 +133,8 @@ async def validate_input_middleware(
     # 5. Check request size and validate body for null bytes
     # Only check body for methods that typically have a body
     if request.method in {"POST", "PUT", "PATCH"}:
-        # Read the body
-        body = await request.body()
+        # Read the body (cached, so this does not re-read it if an earlier middleware already has)
+        body = await get_request_body(request)
 
         # Check size
         body_size = len(body)
@@ -150,33 +151,27 @@ async def validate_input_middleware(
                 },
             )
 
-        # Check for null bytes in body
-        if body:
+        # Check for null bytes in body. A NUL character in UTF-8 text is always the single byte 0x00, so scan the raw
+        # bytes and only decode when one is present.
+        if b"\x00" in body:
             try:
-                body_str = body.decode("utf-8")
-                if contains_null_bytes(body_str):
-                    task_logger.warning(
-                        "Null byte detected in request body",
-                        status="ERROR",
-                    )
-                    return JSONResponse(
-                        status_code=HTTP_400_BAD_REQUEST,
-                        content={
-                            "error": "Bad Request",
-                            "message": "Invalid characters detected in request body",
-                        },
-                    )
+                body.decode("utf-8")
             except UnicodeDecodeError:
                 # If body is not valid UTF-8, it might be binary data (e.g., file upload)
                 # In this case, we skip null byte validation
                 pass
-
-        # Important: We need to make the body available again for the route handler
-        # FastAPI's Request.body() can only be called once, so we need to store it
-        async def receive() -> dict[str, Any]:
-            return {"type": "http.request", "body": body}
-
-        request._receive = receive
+            else:
+                task_logger.warning(
+                    "Null byte detected in request body",
+                    status="ERROR",
+                )
+                return JSONResponse(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    content={
+                        "error": "Bad Request",
+                        "message": "Invalid characters detected in request body",
+                    },
+                )
 
     # All validations passed, call the next handler
     response = await call_next(request)
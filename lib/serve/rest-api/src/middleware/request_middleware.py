@@ -15,69 +15,83 @@
 """Request processing middleware."""
 
 import time
-from collections.abc import Callable
-from typing import Any
 from uuid import uuid4
 
-from fastapi import Request, Response
+from fastapi import Request
 from fastapi.responses import JSONResponse
 from loguru import logger
+from starlette.datastructures import MutableHeaders
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from utils.header_sanitizer import get_real_client_ip, get_sanitized_headers_from_request
 
 
-async def process_request_middleware(request: Request, call_next: Callable[[Request], Any]) -> Any:
-    """Middleware for processing all HTTP requests.
+class ProcessRequestMiddleware:
+    """Pure ASGI middleware for processing all HTTP requests.
+
+    Logs the start and finish of each request under a unique request ID, adds the ID to the
+    response as ``X-Request-ID``, and converts unhandled errors raised before the response
+    starts into a generic 500 response.
 
     Parameters
     ----------
-    request : Request
-        The incoming request
-    call_next : Callable
-        The next middleware or route handler
-
-    Returns
-    -------
-    Response
-        The response with added request ID header
+    app : ASGIApp
+        The wrapped application
     """
-    event = "process_request"
-    request_id = str(uuid4())  # Unique ID for this request
-    tic = time.time()
 
-    # Get real client IP for logging (sanitized)
-    client_ip = get_real_client_ip(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        event = "process_request"
+        request_id = str(uuid4())  # Unique ID for this request
+        tic = time.time()
+        request = Request(scope)
+        response_started = False
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                # Add the unique request ID to the response headers
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        # Get real client IP for logging (sanitized)
+        client_ip = get_real_client_ip(request)
 
-    with logger.contextualize(request_id=request_id, endpoint=request.url.path, client_ip=client_ip):
-        try:
+        with logger.contextualize(request_id=request_id, endpoint=request.url.path, client_ip=client_ip):
             task_logger = logger.bind(event=event)
-            task_logger.debug("Start task", status="START")
-
-            # Sanitize headers before any logging that might include them
-            # This prevents log injection attacks via user-controlled headers
-            _ = get_sanitized_headers_from_request(request)
-
-            # Attempt to call the next request handler
-            response = await call_next(request)
-
-            # If response is successful, log the finish status
-            duration = time.time() - tic
-            task_logger.debug(f"Finish task (took {duration:.2f} seconds)", status="FINISH")
-
-        except Exception as e:
-            # In case of an exception, log the error and prepare a generic response
-            duration = time.time() - tic
-            task_logger.exception(
-                f"Error occurred during processing: {e} (took {duration:.2f} seconds)",
-                status="ERROR",
-            )
-            response = JSONResponse(
-                status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-                content={"detail": "Internal server error"},
-            )
-
-        # Add the unique request ID to the response headers
-        if response is not None and isinstance(response, Response):
-            response.headers["X-Request-ID"] = request_id
-
-    return response
+            try:
+                task_logger.debug("Start task", status="START")
+
+                # Sanitize headers before any logging that might include them
+                # This prevents log injection attacks via user-controlled headers
+                _ = get_sanitized_headers_from_request(request)
+
+                # Attempt to call the next request handler
+                await self.app(scope, receive, send_with_request_id)
+
+                # If response is successful, log the finish status
+                duration = time.time() - tic
+                task_logger.debug(f"Finish task (took {duration:.2f} seconds)", status="FINISH")
+
+            except Exception as e:
+                # In case of an exception, log the error and prepare a generic response
+                duration = time.time() - tic
+                task_logger.exception(
+                    f"Error occurred during processing: {e} (took {duration:.2f} seconds)",
+                    status="ERROR",
+                )
+                if response_started:
+                    # Part of the response is already on the wire, so it cannot be replaced
+                    raise
+                response = JSONResponse(
+                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                    content={"detail": "Internal server error"},
+                )
+                await response(scope, receive, send_with_request_id)
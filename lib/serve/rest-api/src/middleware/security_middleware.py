@@ -33,6 +33,7 @@ from starlette.status import (
     HTTP_405_METHOD_NOT_ALLOWED,
     HTTP_413_CONTENT_TOO_LARGE,
 )
+from utils.request_body import get_json_body, get_request_body
 
 # HTTP methods that require a request body
 METHODS_REQUIRING_BODY = {"POST", "PUT", "PATCH"}
@@ -151,8 +152,8 @@ async def security_middleware(
 
     # 4. Request body validation for methods that require a body
     if method in METHODS_REQUIRING_BODY:
-        # Read the body
-        body = await request.body()
+        # Read the body (cached for the rest of the middleware chain and the route handler)
+        body = await get_request_body(request)
 
         # Check content type to determine if we should validate body
         content_type = request.headers.get("content-type", "").lower()
@@ -190,7 +191,8 @@ async def security_middleware(
             # Validate JSON body (only for JSON content types or when no content type specified)
             if "application/json" in content_type or not content_type:
                 try:
-                    json.loads(body)
+                    # Parsed once here; later middleware and route handlers reuse the result
+                    await get_json_body(request)
                 except json.JSONDecodeError:
                     logger.warning(f"Invalid JSON in request body for path: {path}")
                     return create_error_response(
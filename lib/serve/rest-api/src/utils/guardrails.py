@@ -14,6 +14,7 @@
 
 """Utilities for managing and applying LiteLLM guardrails."""
 
+import asyncio
 import json
 import os
 import re
@@ -21,14 +22,75 @@ from collections.abc import Iterator
 from typing import Any
 
 import boto3
+from cachetools import TTLCache
 from fastapi.responses import JSONResponse
 from loguru import logger
 from starlette.status import HTTP_200_OK
 
+# Guardrail assignments change rarely, so lookups are cached per model id. The TTL bounds how long a worker keeps
+# serving a stale assignment after a guardrail is created, updated or deleted elsewhere.
+GUARDRAILS_CACHE_TTL = int(os.environ.get("GUARDRAILS_CACHE_TTL", "60"))
+GUARDRAILS_CACHE_MAX_SIZE = int(os.environ.get("GUARDRAILS_CACHE_MAX_SIZE", "1024"))
+
+# Cache structure: {model_id: [guardrail, ...]}. Models without guardrails are cached as an empty list.
+_guardrails_cache: TTLCache = TTLCache(maxsize=GUARDRAILS_CACHE_MAX_SIZE, ttl=GUARDRAILS_CACHE_TTL)
+# In-flight lookups, so that concurrent misses for the same model share a single DynamoDB query
+_guardrails_inflight: dict[str, asyncio.Future] = {}
+_guardrails_table: Any = None
+
+
+def _get_guardrails_table() -> Any:
+    """Return the guardrails DynamoDB table, creating the resource on first use."""
+    global _guardrails_table
+    if _guardrails_table is None:
+        dynamodb = boto3.resource("dynamodb", region_name=os.environ["AWS_REGION"])
+        _guardrails_table = dynamodb.Table(os.environ["GUARDRAILS_TABLE_NAME"])
+    return _guardrails_table
+
+
+def _query_model_guardrails(model_id: str) -> list[dict[str, Any]]:
+    """Query the ModelIdIndex GSI for all guardrails assigned to a model."""
+    guardrails_table = _get_guardrails_table()
+    items: list[dict[str, Any]] = []
+    query_kwargs: dict[str, Any] = {
+        "IndexName": "ModelIdIndex",
+        "KeyConditionExpression": "modelId = :modelId",
+        "ExpressionAttributeValues": {":modelId": model_id},
+    }
+    while True:
+        response = guardrails_table.query(**query_kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def invalidate_guardrails_cache(model_id: str | None = None) -> None:
+    """
+    Drop cached guardrail assignments so the next lookup reads DynamoDB.
+
+    Call this after guardrails for a model are created, updated or deleted. Without an explicit call,
+    cached entries expire after ``GUARDRAILS_CACHE_TTL`` seconds.
+
+    Parameters
+    ----------
+    model_id : Optional[str]
+        The model whose guardrails changed. If None, the entire cache is cleared.
+    """
+    if model_id is None:
+        _guardrails_cache.clear()
+        logger.info("Cleared entire guardrails cache")
+    else:
+        _guardrails_cache.pop(model_id, None)
+        logger.info(f"Invalidated guardrails cache for model {model_id}")
+
 
 async def get_model_guardrails(model_id: str) -> list[dict[str, Any]]:
     """
-    Query the guardrails DynamoDB table for guardrails associated with a model.
+    Get the guardrails associated with a model, using a per-model TTL cache.
+
+    Cache misses query the guardrails DynamoDB table. Concurrent misses for the same model share one query,
+    and models without guardrails are cached too. Lookup errors are not cached.
 
     Parameters
     ----------
@@ -40,24 +102,29 @@ async def get_model_guardrails(model_id: str) -> list[dict[str, Any]]:
     List[Dict[str, Any]]
         List of guardrail configurations for the model. Returns empty list if no guardrails found.
     """
-    try:
-        dynamodb = boto3.resource("dynamodb", region_name=os.environ["AWS_REGION"])
-        guardrails_table = dynamodb.Table(os.environ["GUARDRAILS_TABLE_NAME"])
+    cached = _guardrails_cache.get(model_id)
+    if cached is not None:
+        return list(cached)
 
-        # Query using the ModelIdIndex GSI
-        response = guardrails_table.query(
-            IndexName="ModelIdIndex",
-            KeyConditionExpression="modelId = :modelId",
-            ExpressionAttributeValues={":modelId": model_id},
-        )
+    inflight = _guardrails_inflight.get(model_id)
+    if inflight is not None:
+        return list(await asyncio.shield(inflight))
 
-        guardrails = response.get("Items", [])
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    _guardrails_inflight[model_id] = future
+    guardrails: list[dict[str, Any]] = []
+    try:
+        guardrails = await asyncio.to_thread(_query_model_guardrails, model_id)
+        _guardrails_cache[model_id] = guardrails
         logger.debug(f"Found {len(guardrails)} guardrails for model {model_id}")
-        return guardrails  # type: ignore[no-any-return]
-
     except Exception as e:
         logger.error(f"Error fetching guardrails for model {model_id}: {e}")
-        return []
+    finally:
+        # Always resolve waiters, even if this lookup was cancelled
+        _guardrails_inflight.pop(model_id, None)
+        future.set_result(guardrails)
+
+    return list(guardrails)
 
 
 def get_applicable_guardrails(user_groups: list[str], guardrails: list[dict[str, Any]], model_id: str) -> list[str]:
@@ -0,0 +1,279 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pooled async HTTP client for the local LiteLLM proxy."""
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import AsyncIterator, Mapping
+from typing import Any
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Local LiteLLM installation URL. By default, LiteLLM runs on port 4000. Change the port here if the
+# port was changed as part of the LiteLLM startup in entrypoint.sh
+LITELLM_URL = "http://localhost:4000"
+
+# Connection pool sizing. Every proxied request goes LISA -> LiteLLM over localhost, so the pool only ever
+# targets a single host and the per-host limit is the one that matters in practice.
+LITELLM_POOL_MAX_CONNECTIONS = int(os.environ.get("LITELLM_POOL_MAX_CONNECTIONS", "200"))
+LITELLM_POOL_MAX_CONNECTIONS_PER_HOST = int(os.environ.get("LITELLM_POOL_MAX_CONNECTIONS_PER_HOST", "200"))
+# Seconds an idle keep-alive connection is held open for reuse
+LITELLM_POOL_KEEPALIVE_TIMEOUT = float(os.environ.get("LITELLM_POOL_KEEPALIVE_TIMEOUT", "30"))
+
+# Timeouts in seconds. The read timeout applies between chunks, so long-running streams are not cut off as long
+# as LiteLLM keeps sending data. It matches the Gunicorn worker timeout configured in entrypoint.sh.
+LITELLM_CONNECT_TIMEOUT = float(os.environ.get("LITELLM_CONNECT_TIMEOUT", "10"))
+LITELLM_READ_TIMEOUT = float(os.environ.get("LITELLM_READ_TIMEOUT", "600"))
+
+# Hop-by-hop and framing headers must not be copied from the inbound request. The body forwarded upstream is
+# re-serialized, so the original Content-Length no longer applies.
+_EXCLUDED_REQUEST_HEADERS = frozenset(
+    {
+        "connection",
+        "content-length",
+        "host",
+        "keep-alive",
+        "proxy-connection",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+
+
+def _forwardable_headers(headers: Mapping[str, str] | None) -> dict[str, str]:
+    """Drop hop-by-hop headers that must not be forwarded to LiteLLM."""
+    if not headers:
+        return {}
+    return {key: value for key, value in headers.items() if key.lower() not in _EXCLUDED_REQUEST_HEADERS}
+
+
+def _build_form_data(data: Mapping[str, Any] | None, files: Mapping[str, tuple[str, bytes, str]] | None) -> Any:
+    """Build a multipart body from plain form fields and ``(filename, content, content_type)`` file tuples."""
+    form = aiohttp.FormData()
+    for field_name, field_value in (data or {}).items():
+        form.add_field(field_name, str(field_value))
+    for field_name, (filename, content, content_type) in (files or {}).items():
+        form.add_field(field_name, content, filename=filename, content_type=content_type)
+    return form
+
+
+async def _split_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without the trailing newline, like ``requests.Response.iter_lines``.
+
+    Lines are reassembled across chunk boundaries and are not subject to a maximum length.
+    """
+    pending = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+class UpstreamResponse:
+    """A fully buffered response from LiteLLM."""
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        """Response body decoded as UTF-8."""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """Response body parsed as JSON."""
+        return json.loads(self.content)
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        """Yield the buffered body line by line."""
+        for line in self.content.splitlines():
+            yield line
+
+    async def aclose(self) -> None:
+        """No-op; buffered responses hold no connection."""
+
+
+class UpstreamStreamingResponse:
+    """A streaming response from LiteLLM that holds its pooled connection until it is consumed or closed."""
+
+    def __init__(self, response: aiohttp.ClientResponse) -> None:
+        self._response = response
+        self.status_code = response.status
+        self.headers = response.headers
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        """Yield the body line by line as it arrives, releasing the connection when the stream ends."""
+        try:
+            async for line in _split_lines(self._response.content.iter_any()):
+                yield line
+        finally:
+            await self.aclose()
+
+    async def read(self) -> UpstreamResponse:
+        """Buffer the remaining body and release the connection."""
+        try:
+            content = await self._response.read()
+        finally:
+            await self.aclose()
+        return UpstreamResponse(self.status_code, self.headers, content)
+
+    async def aclose(self) -> None:
+        """Return the connection to the pool, or close it if the body was not fully consumed."""
+        self._response.release()
+
+
+class LiteLLMClient:
+    """Long-lived async client for LiteLLM that reuses keep-alive connections across requests.
+
+    The underlying ``aiohttp.ClientSession`` is created lazily on first use because it must be bound to the
+    running event loop. If the loop changes (e.g. between test cases) a new session is created for it.
+    """
+
+    def __init__(
+        self,
+        base_url: str = LITELLM_URL,
+        max_connections: int = LITELLM_POOL_MAX_CONNECTIONS,
+        max_connections_per_host: int = LITELLM_POOL_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout: float = LITELLM_POOL_KEEPALIVE_TIMEOUT,
+        connect_timeout: float = LITELLM_CONNECT_TIMEOUT,
+        read_timeout: float = LITELLM_READ_TIMEOUT,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._loop = loop
+            logger.debug(
+                f"Created LiteLLM connection pool (limit={self.max_connections}, "
+                f"limit_per_host={self.max_connections_per_host})"
+            )
+        return self._session
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        json: Any = None,
+        data: Mapping[str, Any] | None = None,
+        files: Mapping[str, tuple[str, bytes, str]] | None = None,
+        timeout: float | None = None,
+    ) -> UpstreamResponse:
+        """Send a request to LiteLLM and buffer the full response body.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the LiteLLM base URL
+            headers: Request headers; hop-by-hop headers are dropped
+            json: JSON-serializable request body
+            data: Multipart form fields, sent together with ``files``
+            files: Multipart files as ``{field: (filename, content, content_type)}``
+            timeout: Optional total timeout in seconds for this request, on top of the client's connect and read
+                timeouts
+
+        Returns:
+            The buffered upstream response
+        """
+        session = self._get_session()
+        body = _build_form_data(data, files) if (data or files) else None
+        # aiohttp replaces the session timeout with any per-request value, so the connect and read limits are kept
+        request_timeout = self.timeout
+        if timeout is not None:
+            request_timeout = aiohttp.ClientTimeout(
+                total=timeout, connect=self.timeout.connect, sock_read=self.timeout.sock_read
+            )
+        async with session.request(
+            method,
+            self._url(path),
+            headers=_forwardable_headers(headers),
+            json=json,
+            data=body,
+            timeout=request_timeout,
+        ) as response:
+            content = await response.read()
+            return UpstreamResponse(response.status, response.headers, content)
+
+    async def stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        json: Any = None,
+    ) -> UpstreamStreamingResponse:
+        """Send a request to LiteLLM and return as soon as the response headers arrive.
+
+        The caller must consume ``iter_lines()`` or call ``aclose()`` to return the connection to the pool.
+        """
+        session = self._get_session()
+        response = await session.request(method, self._url(path), headers=_forwardable_headers(headers), json=json)
+        return UpstreamStreamingResponse(response)
+
+    async def close(self) -> None:
+        """Close the pooled session and all of its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+_litellm_client: LiteLLMClient | None = None
+
+
+def get_litellm_client() -> LiteLLMClient:
+    """Return the process-wide LiteLLM client."""
+    global _litellm_client
+    if _litellm_client is None:
+        _litellm_client = LiteLLMClient()
+    return _litellm_client
+
+
+async def close_litellm_client() -> None:
+    """Close the process-wide LiteLLM client. Called on application shutdown."""
+    global _litellm_client
+    if _litellm_client is not None:
+        await _litellm_client.close()
+        _litellm_client = None
@@ -16,6 +16,9 @@
 
 import logging
 import os
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime
 
@@ -28,6 +31,14 @@ logger = logging.getLogger(__name__)
 
 sqs_client = boto3.client("sqs", region_name=os.environ["AWS_REGION"])
 
+# SQS accepts at most 10 messages and 256 KiB of payload per send_message_batch call
+SQS_MAX_BATCH_SIZE = 10
+SQS_MAX_BATCH_BYTES = 256 * 1024
+# Events waiting beyond this many are dropped so that a slow or unavailable queue never backs up requests
+USAGE_METRICS_MAX_QUEUE_SIZE = int(os.environ.get("USAGE_METRICS_MAX_QUEUE_SIZE", "10000"))
+# How long the publisher waits for a batch to fill before sending a partial one
+USAGE_METRICS_LINGER_SECONDS = float(os.environ.get("USAGE_METRICS_LINGER_SECONDS", "0.5"))
+
 
 def extract_messages_for_metrics(params: dict) -> list[dict]:
     """
@@ -115,6 +126,248 @@ def extract_token_usage(response_body: dict | None) -> tuple[int | None, int | N
     return usage.get("prompt_tokens"), usage.get("completion_tokens")
 
 
+class _PendingMetricsEvent:
+    """The request-scoped data needed to build a metrics event later, on the publisher thread."""
+
+    __slots__ = (
+        "queue_url",
+        "username",
+        "groups",
+        "params",
+        "is_jwt_user",
+        "timestamp",
+        "prompt_tokens",
+        "completion_tokens",
+    )
+
+    def __init__(
+        self,
+        queue_url: str,
+        username: str,
+        groups: list[str],
+        params: dict,
+        is_jwt_user: bool,
+        prompt_tokens: int | None,
+        completion_tokens: int | None,
+    ) -> None:
+        self.queue_url = queue_url
+        self.username = username
+        self.groups = groups
+        self.params = params
+        self.is_jwt_user = is_jwt_user
+        self.timestamp = datetime.now().isoformat()
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+    def to_message_body(self) -> str:
+        """Build and validate the SQS message body."""
+        if self.is_jwt_user:
+            # JWT/UI user: the session lambda already publishes prompt/RAG/MCP metrics with the
+            # real sessionId. The passthrough only supplies the token counts that the session
+            # lambda cannot see (they come from the LLM response, not the session history).
+            messages: list[dict] = []  # Prevent double-counting prompts — session lambda owns this
+            session_id = f"ui-tokens-{uuid.uuid4().hex}"
+            event_type = "token_only"
+        else:
+            # API token user: publish full messages + tokens.
+            # The session lambda does not run for API users, so the passthrough owns all metrics.
+            messages = extract_messages_for_metrics(self.params)
+            session_id = f"api-{uuid.uuid4().hex}"
+            event_type = "full"
+
+        # Build and validate the event through the Pydantic model before publishing
+        metrics_event = MetricsEvent(
+            userId=self.username,
+            sessionId=session_id,
+            messages=messages,
+            userGroups=self.groups,
+            timestamp=self.timestamp,
+            eventType=event_type,
+            modelId=self.params.get("model"),
+            promptTokens=self.prompt_tokens,
+            completionTokens=self.completion_tokens,
+        )
+        # Exclude None fields to keep the message lean
+        return metrics_event.model_dump_json(exclude_none=True)
+
+
+class MetricsPublisher:
+    """Background publisher that batches usage metrics events to SQS off the request path.
+
+    Events are buffered in a bounded in-process queue and sent by a daemon thread with
+    ``send_message_batch`` in groups of up to ``SQS_MAX_BATCH_SIZE``, or after ``linger_seconds``
+    if fewer events are waiting. When the queue is full, new events are dropped and counted
+    rather than slowing down requests.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = USAGE_METRICS_MAX_QUEUE_SIZE,
+        linger_seconds: float = USAGE_METRICS_LINGER_SECONDS,
+    ) -> None:
+        self.linger_seconds = linger_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._enqueued = 0
+        self._published = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def _ensure_started(self) -> None:
+        """Start the sender thread on first use, so that each forked worker process gets its own."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="metrics-publisher", daemon=True)
+                self._thread.start()
+
+    def submit(self, event: _PendingMetricsEvent) -> bool:
+        """Queue an event for publishing without blocking. Returns False if the event was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped == 1 or dropped % 100 == 0:
+                logger.warning(f"Metrics queue full, dropped {dropped} events so far")
+            return False
+        with self._lock:
+            self._enqueued += 1
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Return queue depth and lifetime counters."""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self._enqueued,
+                "published": self._published,
+                "dropped": self._dropped,
+                "failed": self._failed,
+            }
+
+    def flush(self) -> None:
+        """Block until every queued event has been sent (or has failed)."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Send all queued events and stop the sender thread."""
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Metrics queue did not drain before shutdown")
+            return
+        thread.join(timeout)
+        logger.info(f"Metrics publisher stopped: {self.stats()}")
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.linger_seconds
+            while len(batch) < SQS_MAX_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._send_and_ack(batch)
+
+        # Drain anything that was queued before shutdown
+        remaining_items = []
+        while True:
+            try:
+                remaining_items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(remaining_items), SQS_MAX_BATCH_SIZE):
+            self._send_and_ack(remaining_items[start : start + SQS_MAX_BATCH_SIZE])
+
+    def _send_and_ack(self, batch: list[_PendingMetricsEvent]) -> None:
+        try:
+            self._send(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _send(self, batch: list[_PendingMetricsEvent]) -> None:
+        """Serialize a batch and send it, splitting by queue URL and the SQS batch payload limit."""
+        pending: dict[str, list[str]] = {}
+        for event in batch:
+            try:
+                pending.setdefault(event.queue_url, []).append(event.to_message_body())
+            except Exception as e:
+                logger.error(f"Failed to build metrics event: {e}")
+                self._count_failed(1)
+
+        for queue_url, bodies in pending.items():
+            entries: list[dict[str, str]] = []
+            entries_size = 0
+            for body in bodies:
+                body_size = len(body.encode())
+                if entries and entries_size + body_size > SQS_MAX_BATCH_BYTES:
+                    self._send_entries(queue_url, entries)
+                    entries, entries_size = [], 0
+                entries.append({"Id": str(len(entries)), "MessageBody": body})
+                entries_size += body_size
+            if entries:
+                self._send_entries(queue_url, entries)
+
+    def _send_entries(self, queue_url: str, entries: list[dict[str, str]]) -> None:
+        try:
+            response = sqs_client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+        except Exception as e:
+            logger.error(f"Failed to publish {len(entries)} metrics events: {e}")
+            self._count_failed(len(entries))
+            return
+
+        failed = response.get("Failed", [])
+        for failure in failed:
+            logger.error(f"Failed to publish metrics event: {failure.get('Code')} {failure.get('Message')}")
+        self._count_failed(len(failed))
+        with self._lock:
+            self._published += len(response.get("Successful", []))
+        logger.debug(f"Published {len(entries) - len(failed)} metrics events")
+
+    def _count_failed(self, count: int) -> None:
+        with self._lock:
+            self._failed += count
+
+
+_STOP = object()
+_metrics_publisher: MetricsPublisher | None = None
+
+
+def get_metrics_publisher() -> MetricsPublisher:
+    """Return the process-wide metrics publisher."""
+    global _metrics_publisher
+    if _metrics_publisher is None:
+        _metrics_publisher = MetricsPublisher()
+    return _metrics_publisher
+
+
+def shutdown_metrics_publisher() -> None:
+    """Drain queued metrics events and stop the publisher. Called on application shutdown."""
+    if _metrics_publisher is not None:
+        _metrics_publisher.shutdown()
+
+
 def publish_metrics_event(
     request: Request,
     params: dict,
@@ -124,10 +377,12 @@ def publish_metrics_event(
     completion_tokens: int | None = None,
 ) -> None:
     """
-    Publish metrics event to SQS queue for API users.
+    Queue a metrics event for API users, to be published to SQS in the background.
 
     Includes both message-level metrics (for prompt/RAG/MCP counting) and
     token-level metrics (prompt_tokens, completion_tokens) if available.
+    Only the user context is read on the request path; the event is built and
+    sent by the metrics publisher.
 
     Args:
         request: The FastAPI request object
@@ -149,7 +404,6 @@ def publish_metrics_event(
 
     try:
         username, groups = get_user_context(request)
-        model_id = params.get("model")
 
         # If token counts were not passed directly, try to extract from response_body
         if prompt_tokens is None and response_body is not None:
@@ -157,48 +411,18 @@ def publish_metrics_event(
 
         is_jwt_user = not is_api_user(request)
 
-        if is_jwt_user:
-            # JWT/UI user: the session lambda already publishes prompt/RAG/MCP metrics with the
-            # real sessionId. The passthrough only supplies the token counts that the session
-            # lambda cannot see (they come from the LLM response, not the session history).
-            # Skip entirely if there are no token counts to add.
-            if prompt_tokens is None and completion_tokens is None:
-                logger.debug("No token data for JWT user, skipping passthrough metrics publish")
-                return
-            messages = []  # Prevent double-counting prompts — session lambda owns this
-            session_id = f"ui-tokens-{uuid.uuid4().hex}"
-            event_type = "token_only"
-        else:
-            # API token user: publish full messages + tokens.
-            # The session lambda does not run for API users, so the passthrough owns all metrics.
-            messages = extract_messages_for_metrics(params)
-            session_id = f"api-{uuid.uuid4().hex}"
-            event_type = "full"
-
-        # Build and validate the event through the Pydantic model before publishing
-        metrics_event = MetricsEvent(
-            userId=username,
-            sessionId=session_id,
-            messages=messages,
-            userGroups=groups,
-            timestamp=datetime.now().isoformat(),
-            eventType=event_type,
-            modelId=model_id,
-            promptTokens=prompt_tokens,
-            completionTokens=completion_tokens,
-        )
+        # Skip JWT users entirely if there are no token counts to add — the session lambda owns their prompts
+        if is_jwt_user and prompt_tokens is None and completion_tokens is None:
+            logger.debug("No token data for JWT user, skipping passthrough metrics publish")
+            return
 
-        # Publish to SQS — exclude None fields to keep the message lean
-        sqs_client.send_message(
-            QueueUrl=queue_url,
-            MessageBody=metrics_event.model_dump_json(exclude_none=True),
-        )
-
-        logger.info(
-            f"Published metrics event for user: {username} "
-            f"tokens: prompt={prompt_tokens} completion={completion_tokens}"
-        )
+        event = _PendingMetricsEvent(queue_url, username, groups, params, is_jwt_user, prompt_tokens, completion_tokens)
+        if get_metrics_publisher().submit(event):
+            logger.info(
+                f"Queued metrics event for user: {username} "
+                f"tokens: prompt={prompt_tokens} completion={completion_tokens}"
+            )
 
     except Exception as e:
         # Don't fail the request if metrics publishing fails
-        logger.error(f"Failed to publish metrics event: {e}")
+        logger.error(f"Failed to queue metrics event: {e}")
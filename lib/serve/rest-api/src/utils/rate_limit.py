@@ -0,0 +1,281 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Per-user and per-model rate limit state shared by the rate limit middleware and the serving endpoints.
+
+Buckets live in a pluggable backend (``utils.rate_limit_backends``). With the default
+in-memory backend each worker process tracks limits independently — the effective
+per-user limit across the fleet is ``N_workers × RATE_LIMIT_RPM``. The SQLite backend
+shares buckets between all workers on a host that use the same database file.
+
+Besides requests per minute, callers can be limited by LLM tokens (prompt plus
+completion) per minute, per user and per model. Token usage is only known once a
+response completes, so the middleware admits requests while the token bucket is not
+in debt and endpoints charge the reported usage afterwards (see ``record_token_usage``).
+
+Configuration (environment variables):
+    RATE_LIMIT_RPM   – sustained requests per minute per user (default 60)
+    RATE_LIMIT_BURST – extra burst allowance above the sustained rate (default 10)
+    RATE_LIMIT_TPM   – LLM tokens per minute per user, 0 for no limit (default 0)
+    RATE_LIMIT_MODEL_TPM – JSON map of model ID to LLM tokens per minute shared by
+        all callers of that model (default "{}"). Example: {"claude-3-7": 200000}
+    RATE_LIMIT_ENABLED – set to "false" to disable (default "true")
+    RATE_LIMIT_OVERRIDES – JSON map of per-user/per-token overrides (default "{}")
+        Keys match the user_key format: "token:<tokenUUID>" or "oidc:<sub>" or "user:<username>"
+        Values are objects with optional "rpm", "burst" and "tpm" fields.
+        Example: {"token:abc-123": {"rpm": 120, "burst": 20}, "oidc:user-456": {"rpm": 10, "tpm": 50000}}
+    RATE_LIMIT_BACKEND – "memory" (default) or "sqlite"
+    RATE_LIMIT_SQLITE_PATH – database file for the SQLite backend
+    RATE_LIMIT_LOCK_SHARDS – number of independently locked shards in the in-memory backend (default 64)
+"""
+
+import json
+import os
+from typing import Any
+
+from fastapi import Request
+from loguru import logger
+from utils.rate_limit_backends import InMemoryRateLimitBackend, RateLimitBackend, SQLiteRateLimitBackend
+from utils.request_body import get_json_body
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+RATE_LIMIT_RPM = int(os.environ.get("RATE_LIMIT_RPM", "60"))
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_TPM = int(os.environ.get("RATE_LIMIT_TPM", "0"))
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "/tmp/lisa-rate-limit.sqlite3")
+RATE_LIMIT_LOCK_SHARDS = int(os.environ.get("RATE_LIMIT_LOCK_SHARDS", "64"))
+
+
+# Per-user overrides: { "token:<uuid>": {"rpm": N, "burst": N, "tpm": N}, ... }
+def _parse_overrides(raw: str) -> dict[str, dict[str, int]]:
+    """Parse the RATE_LIMIT_OVERRIDES JSON env var into a validated dict."""
+    if not raw:
+        return {}
+    try:
+        parsed = json.loads(raw)
+        if not isinstance(parsed, dict):
+            logger.warning("RATE_LIMIT_OVERRIDES is not a JSON object, ignoring")
+            return {}
+        result: dict[str, dict[str, int]] = {}
+        for key, val in parsed.items():
+            if not isinstance(val, dict):
+                logger.warning(f"RATE_LIMIT_OVERRIDES[{key}] is not an object, skipping")
+                continue
+            entry: dict[str, int] = {}
+            if "rpm" in val:
+                entry["rpm"] = int(val["rpm"])
+            if "burst" in val:
+                entry["burst"] = int(val["burst"])
+            if "tpm" in val:
+                entry["tpm"] = int(val["tpm"])
+            result[str(key)] = entry
+        return result
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.warning(f"Failed to parse RATE_LIMIT_OVERRIDES: {e}")
+        return {}
+
+
+RATE_LIMIT_OVERRIDES: dict[str, dict[str, int]] = _parse_overrides(os.environ.get("RATE_LIMIT_OVERRIDES", ""))
+
+
+def _parse_model_tpm(raw: str) -> dict[str, int]:
+    """Parse the RATE_LIMIT_MODEL_TPM JSON env var into a validated dict."""
+    if not raw:
+        return {}
+    try:
+        parsed = json.loads(raw)
+        if not isinstance(parsed, dict):
+            logger.warning("RATE_LIMIT_MODEL_TPM is not a JSON object, ignoring")
+            return {}
+        return {str(model_id): int(tpm) for model_id, tpm in parsed.items()}
+    except (json.JSONDecodeError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to parse RATE_LIMIT_MODEL_TPM: {e}")
+        return {}
+
+
+RATE_LIMIT_MODEL_TPM: dict[str, int] = _parse_model_tpm(os.environ.get("RATE_LIMIT_MODEL_TPM", ""))
+
+# Derived: tokens added per second (system default)
+_REFILL_RATE = RATE_LIMIT_RPM / 60.0
+
+# Maximum number of tracked buckets per process before the in-memory backend evicts entries
+_MAX_BUCKETS = 10_000
+# Entries older than this (seconds) are eligible for pruning
+_STALE_SECONDS = 300.0
+
+
+# ---------------------------------------------------------------------------
+# Bucket storage
+# ---------------------------------------------------------------------------
+
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Return the process-wide rate limit backend, creating it from configuration on first use."""
+    global _backend
+    if _backend is None:
+        if RATE_LIMIT_BACKEND == "sqlite":
+            _backend = SQLiteRateLimitBackend(RATE_LIMIT_SQLITE_PATH, stale_seconds=_STALE_SECONDS)
+        else:
+            if RATE_LIMIT_BACKEND != "memory":
+                logger.warning(f"Unknown RATE_LIMIT_BACKEND {RATE_LIMIT_BACKEND!r}, using in-memory buckets")
+            _backend = InMemoryRateLimitBackend(
+                shards=RATE_LIMIT_LOCK_SHARDS, max_buckets=_MAX_BUCKETS, stale_seconds=_STALE_SECONDS
+            )
+    return _backend
+
+
+def _get_max_tokens() -> float:
+    """Max tokens = sustained rate (per minute converted to bucket size) + burst.
+
+    Returns the system default. For per-user values use ``_get_user_limits``.
+    """
+    return float(RATE_LIMIT_RPM) + float(RATE_LIMIT_BURST)
+
+
+def _get_user_limits(user_key: str) -> tuple[float, float, float]:
+    """Return (max_tokens, refill_rate, rpm) for a specific user.
+
+    Checks ``RATE_LIMIT_OVERRIDES`` first, falls back to system defaults.
+    """
+    override = RATE_LIMIT_OVERRIDES.get(user_key)
+    if override:
+        rpm = max(int(override.get("rpm", RATE_LIMIT_RPM)), 0)
+        burst = max(int(override.get("burst", RATE_LIMIT_BURST)), 0)
+    else:
+        rpm = max(RATE_LIMIT_RPM, 0)
+        burst = max(RATE_LIMIT_BURST, 0)
+    max_tokens = float(rpm) + float(burst)
+    refill_rate = rpm / 60.0
+    return max_tokens, refill_rate, float(rpm)
+
+
+def _get_user_token_limit(user_key: str) -> int:
+    """Return the LLM tokens-per-minute limit for a user, or 0 for no limit."""
+    override = RATE_LIMIT_OVERRIDES.get(user_key) or {}
+    return max(int(override.get("tpm", RATE_LIMIT_TPM)), 0)
+
+
+async def check_rate_limit(user_key: str) -> tuple[bool, float]:
+    """Check whether *user_key* is within its rate limit.
+
+    Returns ``(allowed, retry_after_seconds)``.
+    Uses per-user overrides from ``RATE_LIMIT_OVERRIDES`` when available.
+    """
+    max_tokens, refill_rate, _ = _get_user_limits(user_key)
+    return await get_rate_limit_backend().acquire(user_key, 1.0, max_tokens, refill_rate)
+
+
+async def check_token_limits(user_key: str, model_id: str | None) -> tuple[bool, float]:
+    """Check that neither the user's nor the model's LLM token bucket is in debt.
+
+    Returns ``(allowed, retry_after_seconds)``.
+    """
+    backend = get_rate_limit_backend()
+    user_tpm = _get_user_token_limit(user_key)
+    if user_tpm:
+        allowed, retry_after = await backend.acquire(f"tpm:{user_key}", 0.0, float(user_tpm), user_tpm / 60.0)
+        if not allowed:
+            return allowed, retry_after
+    model_tpm = RATE_LIMIT_MODEL_TPM.get(model_id) if model_id else None
+    if model_tpm:
+        return await backend.acquire(f"model-tpm:{model_id}", 0.0, float(model_tpm), model_tpm / 60.0)
+    return True, 0.0
+
+
+async def get_request_model_id(request: Request) -> str | None:
+    """Return the model named in a JSON request body, if model token limits could apply."""
+    if not RATE_LIMIT_MODEL_TPM or request.method != "POST":
+        return None
+    try:
+        body: Any = await get_json_body(request)
+    except ValueError:
+        return None
+    model_id = body.get("model") if isinstance(body, dict) else None
+    return model_id if isinstance(model_id, str) else None
+
+
+async def record_token_usage(
+    request: Request, model_id: str | None, prompt_tokens: int | None, completion_tokens: int | None
+) -> None:
+    """Charge the LLM tokens used by a completed request against the user's and model's token limits.
+
+    Never raises — a failure to record usage must not fail the request.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+    used = (prompt_tokens or 0) + (completion_tokens or 0)
+    if used <= 0:
+        return
+    try:
+        backend = get_rate_limit_backend()
+        user_key = get_user_key(request)
+        user_tpm = _get_user_token_limit(user_key) if user_key else 0
+        if user_key and user_tpm:
+            await backend.charge(f"tpm:{user_key}", float(used), float(user_tpm), user_tpm / 60.0)
+        model_tpm = RATE_LIMIT_MODEL_TPM.get(model_id) if model_id else None
+        if model_tpm:
+            await backend.charge(f"model-tpm:{model_id}", float(used), float(model_tpm), model_tpm / 60.0)
+    except Exception as e:
+        logger.error(f"Failed to record token usage for rate limiting: {e}")
+
+
+# ---------------------------------------------------------------------------
+# User identity extraction
+# ---------------------------------------------------------------------------
+
+
+def get_user_key(request: Request) -> str | None:
+    """Derive a rate-limit key from the authenticated request.
+
+    Returns ``None`` for requests that should bypass rate limiting
+    (management tokens, unauthenticated/public paths).
+    """
+    if not getattr(request.state, "authenticated", False):
+        return None
+
+    api_token_info = getattr(request.state, "api_token_info", None)
+    jwt_data = getattr(request.state, "jwt_data", None)
+    username = getattr(request.state, "username", None)
+
+    # Management tokens bypass rate limiting — they're internal automation.
+    if getattr(request.state, "is_management_token", False):
+        return None
+    if api_token_info is None and not jwt_data and username == "management-token":
+        return None
+
+    # API token users — key on tokenUUID (unique per key)
+    if api_token_info and isinstance(api_token_info, dict):
+        token_uuid = api_token_info.get("tokenUUID")
+        if token_uuid:
+            return f"token:{token_uuid}"
+        # Fallback to username if no UUID (shouldn't happen for valid tokens)
+        return f"token:{api_token_info.get('username', 'unknown')}"
+
+    # OIDC users — key on subject claim
+    if jwt_data and isinstance(jwt_data, dict):
+        sub = jwt_data.get("sub") or jwt_data.get("username")
+        if sub:
+            return f"oidc:{sub}"
+
+    # Fallback to username set by auth middleware
+    if username:
+        return f"user:{username}"
+
+    return None
@@ -0,0 +1,256 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Token bucket storage backends for the REST API rate limiter.
+
+A backend stores one token bucket per key. ``acquire`` refills a bucket and takes ``cost`` units if they are
+available; ``charge`` debits units after the fact and may leave the bucket in debt, which is how LLM token usage is
+counted once a response reports it. Buckets are described by the caller on every call (capacity and refill rate), so
+limits can change without touching stored state.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from loguru import logger
+
+
+class TokenBucket:
+    """Simple token bucket for a single key.
+
+    Not thread-safe on its own — callers must hold the lock that guards the bucket.
+    """
+
+    __slots__ = ("tokens", "last_refill")
+
+    def __init__(self, max_tokens: float, now: float | None = None) -> None:
+        self.tokens: float = max_tokens
+        self.last_refill: float = time.monotonic() if now is None else now
+
+    def _refill(self, max_tokens: float, refill_rate: float, now: float | None) -> None:
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self.last_refill, 0.0)
+        self.tokens = min(max_tokens, self.tokens + elapsed * refill_rate)
+        self.last_refill = now
+
+    def try_consume(
+        self, max_tokens: float, refill_rate: float, cost: float = 1.0, now: float | None = None
+    ) -> tuple[bool, float]:
+        """Refill and attempt to consume ``cost`` tokens.
+
+        A ``cost`` of 0 only checks that the bucket is not in debt.
+
+        Returns ``(allowed, retry_after_seconds)``.
+        """
+        self._refill(max_tokens, refill_rate, now)
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+
+        # Disabled refill (rpm=0): allow burst-only capacity and then throttle.
+        if refill_rate <= 0:
+            return False, 60.0
+
+        # How long until enough tokens are available
+        wait = (cost - self.tokens) / refill_rate
+        return False, wait
+
+    def debit(self, amount: float, max_tokens: float, refill_rate: float, now: float | None = None) -> None:
+        """Refill and then remove ``amount`` tokens, allowing the balance to go negative."""
+        self._refill(max_tokens, refill_rate, now)
+        self.tokens -= amount
+
+
+class RateLimitBackend(ABC):
+    """Storage for rate limit token buckets."""
+
+    @abstractmethod
+    async def acquire(self, key: str, cost: float, max_tokens: float, refill_rate: float) -> tuple[bool, float]:
+        """Take ``cost`` tokens from the bucket for ``key`` if available.
+
+        Returns ``(allowed, retry_after_seconds)``.
+        """
+
+    @abstractmethod
+    async def charge(self, key: str, amount: float, max_tokens: float, refill_rate: float) -> None:
+        """Remove ``amount`` tokens from the bucket for ``key``, even if that leaves it in debt."""
+
+    def close(self) -> None:  # noqa: B027
+        """Release any resources held by the backend."""
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # Ordered by last use, so stale and least recently used buckets are at the front
+        self.buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets, spread over independently locked shards.
+
+    Keys hash to one of ``shards`` shards, so unrelated keys never wait on the same lock. Each shard keeps its
+    buckets in least-recently-used order; once a shard holds more than its share of ``max_buckets``, stale buckets
+    are dropped from the front, and if none are stale the least recently used bucket is evicted. Both are O(1) per
+    removed bucket.
+    """
+
+    def __init__(self, shards: int = 64, max_buckets: int = 10_000, stale_seconds: float = 300.0) -> None:
+        self._shards = [_Shard() for _ in range(max(shards, 1))]
+        self._max_per_shard = max(max_buckets // len(self._shards), 1)
+        self.stale_seconds = stale_seconds
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _bucket(self, shard: _Shard, key: str, max_tokens: float) -> TokenBucket:
+        """Return the bucket for ``key``, creating it if needed. Must hold ``shard.lock``."""
+        bucket = shard.buckets.get(key)
+        if bucket is not None:
+            shard.buckets.move_to_end(key)
+            return bucket
+        if len(shard.buckets) >= self._max_per_shard:
+            self._evict(shard)
+        bucket = TokenBucket(max_tokens)
+        shard.buckets[key] = bucket
+        return bucket
+
+    def _evict(self, shard: _Shard) -> None:
+        """Make room in a full shard. Must hold ``shard.lock``."""
+        cutoff = time.monotonic() - self.stale_seconds
+        buckets = shard.buckets
+        while buckets and next(iter(buckets.values())).last_refill < cutoff:
+            buckets.popitem(last=False)
+        if len(buckets) >= self._max_per_shard:
+            buckets.popitem(last=False)
+
+    def prune(self) -> None:
+        """Remove every bucket that has not been used within ``stale_seconds``."""
+        for shard in self._shards:
+            with shard.lock:
+                cutoff = time.monotonic() - self.stale_seconds
+                while shard.buckets and next(iter(shard.buckets.values())).last_refill < cutoff:
+                    shard.buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shard(key).buckets
+
+    async def acquire(self, key: str, cost: float, max_tokens: float, refill_rate: float) -> tuple[bool, float]:
+        shard = self._shard(key)
+        with shard.lock:
+            return self._bucket(shard, key, max_tokens).try_consume(max_tokens, refill_rate, cost)
+
+    async def charge(self, key: str, amount: float, max_tokens: float, refill_rate: float) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            self._bucket(shard, key, max_tokens).debit(amount, max_tokens, refill_rate)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Token buckets stored in a SQLite database shared by every process that opens the same file.
+
+    Each update runs in an immediate transaction, so concurrent workers on the same host see a single consistent
+    bucket per key. Bucket times use the wall clock because monotonic clocks are not comparable across processes.
+    Database calls run in worker threads, each with its own connection.
+    """
+
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, stale_seconds: float = 300.0, busy_timeout: float = 5.0) -> None:
+        self.path = path
+        self.stale_seconds = stale_seconds
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._operations = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, last_refill REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _update(
+        self, key: str, cost: float, max_tokens: float, refill_rate: float, require: bool
+    ) -> tuple[bool, float]:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, last_refill FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+            bucket = TokenBucket(max_tokens, now)
+            if row is not None:
+                bucket.tokens, bucket.last_refill = row
+            if require:
+                result = bucket.try_consume(max_tokens, refill_rate, cost, now)
+            else:
+                bucket.debit(cost, max_tokens, refill_rate, now)
+                result = (True, 0.0)
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, last_refill) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, last_refill = excluded.last_refill",
+                (key, bucket.tokens, bucket.last_refill),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._operations += 1
+        if self._operations % self._PRUNE_EVERY == 0:
+            self.prune()
+        return result
+
+    def prune(self) -> None:
+        """Remove every bucket that has not been used within ``stale_seconds``."""
+        try:
+            self._connect().execute(
+                "DELETE FROM rate_limit_buckets WHERE last_refill < ?", (time.time() - self.stale_seconds,)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to prune rate limit buckets: {e}")
+
+    async def acquire(self, key: str, cost: float, max_tokens: float, refill_rate: float) -> tuple[bool, float]:
+        return await asyncio.to_thread(self._update, key, cost, max_tokens, refill_rate, True)
+
+    async def charge(self, key: str, amount: float, max_tokens: float, refill_rate: float) -> None:
+        await asyncio.to_thread(self._update, key, amount, max_tokens, refill_rate, False)
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,95 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Read and parse the request body once per request.
+
+Every middleware layer and the route handler build their own ``Request`` for the same ASGI scope. The body and its
+parsed JSON are cached on the scope, so all of them share a single read and a single ``json.loads``.
+"""
+
+import json
+from typing import Any
+
+from fastapi import Request
+from starlette.types import Message, Receive, Scope
+
+_BODY_KEY = "lisa.request_body"
+_JSON_BODY_KEY = "lisa.request_json"
+
+
+async def get_request_body(request: Request) -> bytes:
+    """Return the request body, reading it from the client only on first use.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        The raw request body
+    """
+    body = request.scope.get(_BODY_KEY)
+    if body is None:
+        body = await request.body()
+        request.scope[_BODY_KEY] = body
+    return body
+
+
+async def get_json_body(request: Request) -> Any:
+    """Return the request body parsed as JSON, parsing it only on first use.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        The parsed JSON body
+
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON. Failures are not cached.
+    """
+    if _JSON_BODY_KEY not in request.scope:
+        request.scope[_JSON_BODY_KEY] = json.loads(await get_request_body(request))
+    return request.scope[_JSON_BODY_KEY]
+
+
+class _CachedBodyReceive:
+    """ASGI receive callable that replays a body already read from the client."""
+
+    def __init__(self, body: bytes, receive: Receive) -> None:
+        self.body = body
+        self.receive = receive
+        self._sent = False
+
+    async def __call__(self) -> Message:
+        if not self._sent:
+            self._sent = True
+            return {"type": "http.request", "body": self.body, "more_body": False}
+        # After the body, pass through to the server so disconnects are still delivered
+        return await self.receive()
+
+
+def receive_with_cached_body(scope: Scope, receive: Receive) -> Receive:
+    """Return a receive callable for downstream apps that replays the cached body, if it has been read.
+
+    Args:
+        scope: The ASGI connection scope
+        receive: The receive callable the body was read from
+
+    Returns:
+        A receive callable that yields the cached body first, or ``receive`` unchanged if the body was not read
+    """
+    body = scope.get(_BODY_KEY)
+    if body is None:
+        return receive
+    if isinstance(receive, _CachedBodyReceive):
+        receive = receive.receive
+    return _CachedBodyReceive(body, receive)
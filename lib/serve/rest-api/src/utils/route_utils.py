@@ -12,9 +12,14 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-"""Shared route utilities for API path matching and validation."""
+"""Shared route utilities for API path matching and validation.
 
-import fnmatch
+The route tables below are compiled once at import into a set of exact routes and a single regular expression for
+the wildcard routes, so classifying a path is a set lookup and at most one regex match.
+"""
+
+import re
+from collections.abc import Iterable
 
 # The following is an allowlist of OpenAI routes that users would not need elevated permissions to invoke. This is so
 # that we may assume anything *not* in this allowlist is an admin operation that requires greater LiteLLM permissions.
@@ -91,6 +96,41 @@ CHAT_ROUTES = (
 )
 
 
+def compile_wildcard_routes(routes: Iterable[str], trailing_wildcard_single_segment: bool = False) -> re.Pattern[str]:
+    """Compile the ``fnmatch``-style wildcard routes in ``routes`` into one regular expression.
+
+    Each ``*`` matches any run of characters, including ``/``, as it does in ``fnmatch``. Routes without a wildcard
+    are skipped; check them with a set lookup instead.
+
+    Args:
+        routes: Route patterns, without leading slash
+        trailing_wildcard_single_segment: If True, a trailing ``/*`` matches exactly one path segment
+
+    Returns:
+        A pattern to match paths against with ``fullmatch``. It never matches if there are no wildcard routes.
+    """
+    alternatives = []
+    for route in routes:
+        if "*" not in route:
+            continue
+        regex = ".*".join(re.escape(part) for part in route.split("*"))
+        if trailing_wildcard_single_segment and route.endswith("/*"):
+            regex = regex[: -len(".*")] + "[^/]*"
+        alternatives.append(regex)
+    return re.compile("|".join(alternatives) if alternatives else "(?!)", re.DOTALL)
+
+
+# Video routes like "videos/*" must not match paths with additional segments ("videos/123/content")
+_OPENAI_EXACT = frozenset(OPENAI_ROUTES)
+_OPENAI_WILDCARDS = compile_wildcard_routes(OPENAI_ROUTES, trailing_wildcard_single_segment=True)
+_LISA_PUBLIC_EXACT = frozenset(LISA_PUBLIC_ROUTES)
+_LISA_PUBLIC_WILDCARDS = compile_wildcard_routes(LISA_PUBLIC_ROUTES)
+_ANTHROPIC_EXACT = frozenset(ANTHROPIC_ROUTES)
+_CHAT_EXACT = frozenset(CHAT_ROUTES)
+_AUTHENTICATED_EXACT = _OPENAI_EXACT | _ANTHROPIC_EXACT | _LISA_PUBLIC_EXACT
+_AUTHENTICATED_WILDCARDS = re.compile(f"{_OPENAI_WILDCARDS.pattern}|{_LISA_PUBLIC_WILDCARDS.pattern}", re.DOTALL)
+
+
 def is_openai_route(api_path: str) -> bool:
     """Check if the given API path is an OpenAI-compatible route.
 
@@ -102,30 +142,7 @@ def is_openai_route(api_path: str) -> bool:
     Returns:
         True if the path matches an OpenAI route, False otherwise
     """
-    # First check for exact matches (most common case)
-    if api_path in OPENAI_ROUTES:
-        return True
-
-    # Only check wildcard patterns if the path contains "video" (since only video routes have wildcards)
-    # This avoids expensive pattern matching for non-video routes
-    if "video" not in api_path:
-        return False
-
-    wildcard_patterns = [pattern for pattern in OPENAI_ROUTES if "*" in pattern]
-    wildcard_patterns.sort(key=len, reverse=True)
-
-    for route_pattern in wildcard_patterns:
-        if fnmatch.fnmatch(api_path, route_pattern):
-            # For patterns like "videos/*" (not "videos/*/something"), ensure we don't match
-            # paths with additional segments (e.g., "videos/123/content" should not match "videos/*")
-            if route_pattern.endswith("/*") and not route_pattern.endswith("/*/"):
-                pattern_segments = route_pattern.count("/")
-                path_segments = api_path.count("/")
-                if path_segments != pattern_segments:
-                    continue
-            return True
-
-    return False
+    return api_path in _OPENAI_EXACT or _OPENAI_WILDCARDS.fullmatch(api_path) is not None
 
 
 def is_lisa_public_route(api_path: str) -> bool:
@@ -139,17 +156,7 @@ def is_lisa_public_route(api_path: str) -> bool:
     Returns:
         True if the path matches a LISA public route, False otherwise
     """
-    # Check exact matches first
-    if api_path in LISA_PUBLIC_ROUTES:
-        return True
-
-    # Check wildcard patterns
-    wildcard_patterns = [pattern for pattern in LISA_PUBLIC_ROUTES if "*" in pattern]
-    for route_pattern in wildcard_patterns:
-        if fnmatch.fnmatch(api_path, route_pattern):
-            return True
-
-    return False
+    return api_path in _LISA_PUBLIC_EXACT or _LISA_PUBLIC_WILDCARDS.fullmatch(api_path) is not None
 
 
 def is_anthropic_route(api_path: str) -> bool:
@@ -161,7 +168,7 @@ def is_anthropic_route(api_path: str) -> bool:
     Returns:
         True if the path matches an Anthropic route, False otherwise
     """
-    return api_path in ANTHROPIC_ROUTES
+    return api_path in _ANTHROPIC_EXACT
 
 
 def is_openai_or_anthropic_route(api_path: str) -> bool:
@@ -179,7 +186,7 @@ def is_openai_or_anthropic_route(api_path: str) -> bool:
     # Remove leading slash for comparison
     api_path = api_path.lstrip("/")
 
-    return is_openai_route(api_path) or is_anthropic_route(api_path) or is_lisa_public_route(api_path)
+    return api_path in _AUTHENTICATED_EXACT or _AUTHENTICATED_WILDCARDS.fullmatch(api_path) is not None
 
 
 def is_chat_route(api_path: str) -> bool:
@@ -191,4 +198,4 @@ def is_chat_route(api_path: str) -> bool:
     Returns:
         True if the path is a chat completion route, False otherwise
     """
-    return api_path in CHAT_ROUTES
+    return api_path in _CHAT_EXACT
@@ -484,12 +484,12 @@ export const RagUploadModal = ({
                         setFields={(values) => {
                             if (values.chunkingStrategy !== undefined) {
                                 setChunkingStrategy(values.chunkingStrategy);
-                            } else if (values['chunkingStrategy.size'] !== undefined && chunkingStrategy?.type === ChunkingStrategyType.FIXED) {
+                            } else if (values['chunkingStrategy.size'] !== undefined && chunkingStrategy && 'size' in chunkingStrategy) {
                                 setChunkingStrategy({
                                     ...chunkingStrategy,
                                     size: values['chunkingStrategy.size'],
                                 });
-                            } else if (values['chunkingStrategy.overlap'] !== undefined && chunkingStrategy?.type === ChunkingStrategyType.FIXED) {
+                            } else if (values['chunkingStrategy.overlap'] !== undefined && chunkingStrategy && 'size' in chunkingStrategy) {
                                 setChunkingStrategy({
                                     ...chunkingStrategy,
                                     overlap: values['chunkingStrategy.overlap'],
@@ -149,6 +149,63 @@ describe('ChunkingConfigForm', () => {
         });
     });
 
+    describe('TOKEN and STRUCTURED Strategy Selection', () => {
+        it('shows sizes in tokens when TOKEN is selected', () => {
+            render(
+                <ChunkingConfigForm
+                    item={{ type: ChunkingStrategyType.TOKEN, size: 256, overlap: 32, encoding: 'cl100k_base' }}
+                    setFields={mockSetFields}
+                    touchFields={mockTouchFields}
+                    formErrors={{}}
+                />
+            );
+
+            expect(screen.getByText('Token budget')).toBeInTheDocument();
+            expect((screen.getByLabelText(/chunk size/i) as HTMLInputElement).value).toBe('256');
+            expect((screen.getByLabelText(/chunk overlap/i) as HTMLInputElement).value).toBe('32');
+            expect(screen.getByText(/size of each chunk in embedding model tokens/i)).toBeInTheDocument();
+        });
+
+        it('keeps a zero overlap for STRUCTURED strategy', () => {
+            render(
+                <ChunkingConfigForm
+                    item={{ type: ChunkingStrategyType.STRUCTURED, size: 512, overlap: 0, encoding: 'cl100k_base' }}
+                    setFields={mockSetFields}
+                    touchFields={mockTouchFields}
+                    formErrors={{}}
+                />
+            );
+
+            expect(screen.getByText('Structure-aware')).toBeInTheDocument();
+            expect((screen.getByLabelText(/chunk overlap/i) as HTMLInputElement).value).toBe('0');
+        });
+
+        it('calls setFields with default STRUCTURED values when switching to STRUCTURED', async () => {
+            const user = userEvent.setup();
+
+            render(
+                <ChunkingConfigForm
+                    item={{ type: ChunkingStrategyType.FIXED, size: 512, overlap: 51 }}
+                    setFields={mockSetFields}
+                    touchFields={mockTouchFields}
+                    formErrors={{}}
+                />
+            );
+
+            await user.click(screen.getByRole('button', { name: /chunking type/i }));
+            await user.click(screen.getByText('Structure-aware'));
+
+            expect(mockSetFields).toHaveBeenCalledWith({
+                chunkingStrategy: {
+                    type: ChunkingStrategyType.STRUCTURED,
+                    size: 512,
+                    overlap: 0,
+                    encoding: 'cl100k_base',
+                }
+            });
+        });
+    });
+
     describe('NONE Strategy Selection', () => {
         it('hides size and overlap fields when NONE is selected', () => {
             render(
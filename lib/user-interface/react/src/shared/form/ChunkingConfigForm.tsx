@@ -19,7 +19,13 @@ import FormField from '@cloudscape-design/components/form-field';
 import Input from '@cloudscape-design/components/input';
 import Select from '@cloudscape-design/components/select';
 import { SpaceBetween } from '@cloudscape-design/components';
-import { ChunkingStrategy, ChunkingStrategyType, FixedSizeChunkingStrategySchema } from '#root/lib/schema';
+import {
+    ChunkingStrategy,
+    ChunkingStrategyType,
+    FixedSizeChunkingStrategySchema,
+    StructuredChunkingStrategySchema,
+    TokenChunkingStrategySchema,
+} from '#root/lib/schema';
 import { ModifyMethod } from './form-props';
 
 
@@ -31,16 +37,36 @@ export type ChunkingConfigFormProps = {
     disabled?: boolean;
 };
 
+// Size and overlap descriptions for the strategies that split documents
+const SIZED_STRATEGY_DESCRIPTIONS: Partial<Record<ChunkingStrategyType, { size: string, overlap: string }>> = {
+    [ChunkingStrategyType.FIXED]: {
+        size: 'Size of each chunk in characters (100-10000)',
+        overlap: 'Overlap between chunks in characters (must be ≤ size/2)',
+    },
+    [ChunkingStrategyType.TOKEN]: {
+        size: 'Size of each chunk in embedding model tokens (50-8192)',
+        overlap: 'Overlap between chunks in tokens (must be ≤ size/2)',
+    },
+    [ChunkingStrategyType.STRUCTURED]: {
+        size: 'Maximum size of each chunk in tokens (50-8192); chunks keep to pages, headings and paragraphs',
+        overlap: 'Overlap in tokens between pieces of a paragraph too long for one chunk (must be ≤ size/2)',
+    },
+};
+
 export function ChunkingConfigForm (props: ChunkingConfigFormProps): ReactElement {
     const { item, touchFields, setFields, formErrors, disabled = false } = props;
 
     // Chunking type options
     const chunkingTypeOptions = [
         { label: 'Fixed size', value: ChunkingStrategyType.FIXED },
+        { label: 'Token budget', value: ChunkingStrategyType.TOKEN },
+        { label: 'Structure-aware', value: ChunkingStrategyType.STRUCTURED },
         { label: 'None (no chunking)', value: ChunkingStrategyType.NONE },
         // Future: { label: 'Semantic', value: ChunkingStrategyType.SEMANTIC },
-        // Future: { label: 'Recursive', value: ChunkingStrategyType.RECURSIVE },
     ];
+    const selectedType = item?.type ?? ChunkingStrategyType.FIXED;
+    const descriptions = SIZED_STRATEGY_DESCRIPTIONS[selectedType];
+    const sizedItem = item && 'size' in item ? item : undefined;
 
     return (
         <SpaceBetween size='s'>
@@ -54,17 +80,21 @@ export function ChunkingConfigForm (props: ChunkingConfigFormProps): ReactElemen
             >
                 <Select
                     selectedOption={
-                        item?.type === ChunkingStrategyType.NONE
-                            ? { label: 'None (no chunking)', value: ChunkingStrategyType.NONE }
-                            : item?.type
-                                ? { label: 'Fixed size', value: item.type }
-                                : { label: 'Fixed size', value: ChunkingStrategyType.FIXED }
+                        chunkingTypeOptions.find((option) => option.value === selectedType) ?? chunkingTypeOptions[0]
                     }
                     onChange={({ detail }) => {
                         if (detail.selectedOption.value === ChunkingStrategyType.FIXED) {
                             setFields({
                                 chunkingStrategy: FixedSizeChunkingStrategySchema.parse({})
                             });
+                        } else if (detail.selectedOption.value === ChunkingStrategyType.TOKEN) {
+                            setFields({
+                                chunkingStrategy: TokenChunkingStrategySchema.parse({})
+                            });
+                        } else if (detail.selectedOption.value === ChunkingStrategyType.STRUCTURED) {
+                            setFields({
+                                chunkingStrategy: StructuredChunkingStrategySchema.parse({})
+                            });
                         } else if (detail.selectedOption.value === ChunkingStrategyType.NONE) {
                             setFields({
                                 chunkingStrategy: { type: ChunkingStrategyType.NONE }
@@ -77,22 +107,20 @@ export function ChunkingConfigForm (props: ChunkingConfigFormProps): ReactElemen
                 />
             </FormField>
 
-            {/* Fixed Size Configuration */}
-            {(item?.type === ChunkingStrategyType.FIXED || !item?.type) && (
+            {/* Size Configuration */}
+            {descriptions && (
                 <>
                     <FormField
                         label='Chunk Size'
                         errorText={formErrors?.['chunkingStrategy.size'] || formErrors?.chunkingStrategy?.size}
-                        description='Size of each chunk in characters (100-10000)'
+                        description={descriptions.size}
                     >
                         <Input
                             type='number'
-                            value={String(
-                                (item?.type === ChunkingStrategyType.FIXED ? item.size : undefined) || 512
-                            )}
+                            value={String(sizedItem?.size || 512)}
                             onChange={({ detail }) => {
-                                if (!item || item.type !== ChunkingStrategyType.FIXED) {
-                                    // Create full chunking strategy when item is undefined or not FIXED
+                                if (!sizedItem) {
+                                    // Create full chunking strategy when item is undefined or has no size
                                     setFields({
                                         chunkingStrategy: {
                                             type: ChunkingStrategyType.FIXED,
@@ -101,7 +129,7 @@ export function ChunkingConfigForm (props: ChunkingConfigFormProps): ReactElemen
                                         }
                                     });
                                 } else {
-                                    // Update existing FIXED strategy
+                                    // Update existing strategy
                                     setFields({
                                         'chunkingStrategy.size': Number(detail.value)
                                     });
@@ -115,16 +143,14 @@ export function ChunkingConfigForm (props: ChunkingConfigFormProps): ReactElemen
                     <FormField
                         label='Chunk Overlap'
                         errorText={formErrors?.['chunkingStrategy.overlap'] || formErrors?.chunkingStrategy?.overlap}
-                        description='Overlap between chunks in characters (must be ≤ size/2)'
+                        description={descriptions.overlap}
                     >
                         <Input
                             type='number'
-                            value={String(
-                                (item?.type === ChunkingStrategyType.FIXED ? item.overlap : undefined) || 51
-                            )}
+                            value={String(sizedItem?.overlap ?? 51)}
                             onChange={({ detail }) => {
-                                if (!item || item.type !== ChunkingStrategyType.FIXED) {
-                                    // Create full chunking strategy when item is undefined or not FIXED
+                                if (!sizedItem) {
+                                    // Create full chunking strategy when item is undefined or has no size
                                     setFields({
                                         chunkingStrategy: {
                                             type: ChunkingStrategyType.FIXED,
@@ -133,7 +159,7 @@ export function ChunkingConfigForm (props: ChunkingConfigFormProps): ReactElemen
                                         }
                                     });
                                 } else {
-                                    // Update existing FIXED strategy
+                                    // Update existing strategy
                                     setFields({
                                         'chunkingStrategy.overlap': Number(detail.value)
                                     });
@@ -23,7 +23,7 @@ Each backend has an s3_bucket prefix. The source_map is built at runtime
 by combining the document registry with the backend's bucket.
 """
 
-from typing import Any
+from typing import Any, Literal
 from urllib.parse import urlparse
 
 import yaml
@@ -51,6 +51,13 @@ class LisaApiBackend(BaseModel):
     repo_id: str = Field(..., description="Repository ID.")
     collection_id: str = Field("default", description="Collection ID within the repository.")
     s3_bucket: str = Field(..., description="S3 bucket prefix for source matching.")
+    search_mode: Literal["vector", "hybrid"] | None = Field(
+        None, description="Similarity search mode; None uses the repository's default."
+    )
+    rerank: bool | None = Field(None, description="Rerank search candidates; None uses the repository's default.")
+    count_chunks: bool = Field(
+        False, description="List the collection's documents to report its chunk count and chunking strategy."
+    )
 
     @field_validator("api_url")
     @classmethod
@@ -21,6 +21,17 @@ accessible via the LISA API's similarity_search endpoint.
 from lisapy.api import LisaApi
 
 from .base import BaseEvaluator
+from .types import EvalResult, GoldenDatasetEntry
+
+
+def _describe_strategy(strategy: dict | None) -> str:
+    """Summarize a document's chunking strategy, e.g. "token 512/51" for size 512 and overlap 51."""
+    if not strategy:
+        return "unknown"
+    label = str(strategy.get("type", "unknown"))
+    if "size" in strategy:
+        label += f" {strategy['size']}/{strategy.get('overlap', 0)}"
+    return label
 
 
 class LisaApiEvaluator(BaseEvaluator):
@@ -35,6 +46,10 @@ class LisaApiEvaluator(BaseEvaluator):
         collection_id: Collection identifier within the repository.
         source_map: Mapping of short document names to full S3 URIs.
         k: Number of top results to evaluate.
+        search_mode: Similarity search mode ("vector" or "hybrid"); None uses the repository's default.
+        rerank: Whether to rerank search candidates; None uses the repository's default.
+        count_chunks: Whether to list the collection's documents and report its chunk count and chunking strategy,
+            so collections ingested with different strategies can be compared.
     """
 
     def __init__(
@@ -44,11 +59,30 @@ class LisaApiEvaluator(BaseEvaluator):
         collection_id: str,
         source_map: dict[str, str],
         k: int = 5,
+        search_mode: str | None = None,
+        rerank: bool | None = None,
+        count_chunks: bool = False,
     ) -> None:
         super().__init__(source_map=source_map, k=k)
         self.client = client
         self.repo_id = repo_id
         self.collection_id = collection_id
+        self.search_mode = search_mode
+        self.rerank = rerank
+        self.count_chunks = count_chunks
+
+    def evaluate(self, golden: list[GoldenDatasetEntry]) -> EvalResult:
+        """Run evaluation across all golden dataset entries, adding the collection's chunk count if requested."""
+        result = super().evaluate(golden)
+        if self.count_chunks:
+            documents = self.client.list_all_documents(repo_id=self.repo_id, collection_id=self.collection_id)
+            strategies = {_describe_strategy(doc.get("chunk_strategy")) for doc in documents}
+            result.chunk_count = sum(doc.get("chunks") or 0 for doc in documents)
+            if len(strategies) == 1:
+                result.chunking_strategy = strategies.pop()
+            elif strategies:
+                result.chunking_strategy = "mixed"
+        return result
 
     def _retrieve(self, query: str) -> list[str]:
         """Call LISA API similarity_search and return source URIs."""
@@ -57,5 +91,7 @@ class LisaApiEvaluator(BaseEvaluator):
             query=query,
             k=self.k,
             collection_id=self.collection_id,
+            search_mode=self.search_mode,
+            rerank=self.rerank,
         )
         return [r["Document"]["metadata"]["source"] for r in results]
@@ -56,6 +56,8 @@ def format_report(name: str, result: EvalResult, golden: list[GoldenDatasetEntry
     lines.append(f"  Precision@{k}:  {result.precision:.3f}")
     lines.append(f"  Recall@{k}:     {result.recall:.3f}")
     lines.append(f"  NDCG@{k}:       {result.ndcg:.3f}")
+    if result.chunk_count is not None:
+        lines.append(f"  Chunks:        {result.chunk_count} ({result.chunking_strategy or 'unknown'} chunking)")
 
     # Breakdown by query type
     types: dict[str, dict[str, list[float]]] = {}
@@ -114,6 +116,18 @@ def format_comparison(results: dict[str, EvalResult], k: int) -> str:
             row += f" {getattr(results[name], metric):12.3f}"
         lines.append(row)
 
+    # Chunk counts are only known for collections evaluated with count_chunks
+    if any(result.chunk_count is not None for result in results.values()):
+        row = f"  {'chunks':<15}"
+        for name in names:
+            count = results[name].chunk_count
+            row += f" {'-' if count is None else count:>12}"
+        lines.append(row)
+        row = f"  {'strategy':<15}"
+        for name in names:
+            row += f" {(results[name].chunking_strategy or '-')[:12]:>12}"
+        lines.append(row)
+
     if len(names) > 1:
         lines.append("\n  Pairwise Deltas:")
         lines.append(f"  {'Comparison':<28} {'P@' + str(k):>8} {'R@' + str(k):>8} {'NDCG@' + str(k):>8}")
@@ -174,6 +188,9 @@ def run_evaluation(config: EvalConfig, dataset_path: str) -> dict[str, EvalResul
             collection_id=lisa_backend.collection_id,
             source_map=source_map,
             k=config.k,
+            search_mode=lisa_backend.search_mode,
+            rerank=lisa_backend.rerank,
+            count_chunks=lisa_backend.count_chunks,
         )
         all_results[lisa_backend.name] = lisa_evaluator.evaluate(golden)
 
@@ -51,3 +51,5 @@ class EvalResult(BaseModel):
     recall: float = Field(..., description="Mean Recall@k across all queries.")
     ndcg: float = Field(..., description="Mean NDCG@k across all queries.")
     per_query: list[QueryResult] = Field(default_factory=list, description="Per-query breakdown.")
+    chunk_count: int | None = Field(default=None, description="Chunks in the evaluated collection, when counted.")
+    chunking_strategy: str | None = Field(default=None, description="Chunking strategy of the collection's documents.")
@@ -45,6 +45,40 @@ class RagMixin(BaseMixin):
         else:
             raise parse_error(response.status_code, response)
 
+    def list_all_documents(self, repo_id: str, collection_id: str, page_size: int = 100) -> list[dict]:
+        """List every document in a collection, following pagination.
+
+        Args:
+            repo_id: Repository ID
+            collection_id: Collection ID
+            page_size: Documents requested per page
+
+        Returns:
+            List of document dictionaries
+        """
+        url = f"{self.url}/repository/{repo_id}/document"
+        params: dict[str, str | int] = {
+            "collectionId": collection_id,
+            "pageSize": page_size,
+        }
+        documents: list[dict] = []
+        while True:
+            response = self._session.get(url, params=params)
+            if response.status_code != 200:
+                raise parse_error(response.status_code, response)
+            result = response.json()
+            documents.extend(result.get("documents", []))
+            last_evaluated = result.get("lastEvaluated")
+            if not result.get("hasNextPage") or not last_evaluated:
+                return documents
+            for key, param in [
+                ("pk", "lastEvaluatedKeyPk"),
+                ("document_id", "lastEvaluatedKeyDocumentId"),
+                ("repository_id", "lastEvaluatedKeyRepositoryId"),
+            ]:
+                if last_evaluated.get(key):
+                    params[param] = last_evaluated[key]
+
     def get_document(self, repo_id: str, document_id: str) -> dict:
         """Get a single document by ID.
 
@@ -186,7 +220,15 @@ class RagMixin(BaseMixin):
             raise parse_error(response.status_code, response)
 
     def similarity_search(
-        self, repo_id: str, query: str, k: int = 3, collection_id: str | None = None, model_name: str | None = None
+        self,
+        repo_id: str,
+        query: str,
+        k: int = 3,
+        collection_id: str | None = None,
+        model_name: str | None = None,
+        search_mode: str | None = None,
+        rerank: bool | None = None,
+        rerank_budget_ms: int | None = None,
     ) -> list[dict]:
         """Perform similarity search.
 
@@ -196,6 +238,9 @@ class RagMixin(BaseMixin):
             k: Number of results
             collection_id: Optional collection id (will use collection's embedding model)
             model_name: Optional model name (required if collection_id not provided)
+            search_mode: Optional "vector" or "hybrid" (defaults to the repository's setting)
+            rerank: Optionally turn reranking on or off (defaults to the repository's setting)
+            rerank_budget_ms: Optional rerank latency budget, after which results keep their vector order
         """
         url = f"{self.url}/repository/{repo_id}/similaritySearch"
         params: dict[str, str | int] = {"query": query, "repositoryType": repo_id, "topK": k}
@@ -206,10 +251,21 @@ class RagMixin(BaseMixin):
         if model_name:
             params["modelName"] = model_name
 
+        if search_mode:
+            params["searchMode"] = search_mode
+
+        if rerank is not None:
+            params["rerank"] = str(rerank).lower()
+
+        if rerank_budget_ms:
+            params["rerankBudgetMs"] = rerank_budget_ms
+
         response = self._session.get(url, params=params)
         if response.status_code == 200:
             results = response.json()
             docs: list[dict] = results.get("docs", [])
+            if "latency" in results:
+                logging.debug(f"Search latency: {results['latency']}")
             for doc in docs:
                 logging.debug(f"Document content: {doc['Document']['page_content']}")
                 logging.debug(f"Metadata: {doc['Document']['metadata']}")
@@ -220,3 +276,59 @@ class RagMixin(BaseMixin):
             logging.info(f"Error: {response.status_code}")
             logging.info(response.text)
             raise parse_error(response.status_code, response)
+
+    def batch_similarity_search(
+        self,
+        repo_id: str,
+        queries: list[str],
+        k: int = 3,
+        collection_id: str | None = None,
+        model_name: str | None = None,
+        search_mode: str | None = None,
+        rerank: bool | None = None,
+        rerank_budget_ms: int | None = None,
+    ) -> list[list[dict]]:
+        """Perform several similarity searches against one collection in a single request.
+
+        Args:
+            repo_id: Repository ID
+            queries: Search queries (at most 50)
+            k: Number of results per query
+            collection_id: Optional collection id (will use collection's embedding model)
+            model_name: Optional model name (required if collection_id not provided)
+            search_mode: Optional "vector" or "hybrid" (defaults to the repository's setting)
+            rerank: Optionally turn reranking on or off (defaults to the repository's setting)
+            rerank_budget_ms: Optional latency budget for reranking the whole batch, after which queries not yet
+                reranked keep their vector order
+
+        Returns:
+            One list of documents per query, in query order, shaped like similarity_search results
+        """
+        url = f"{self.url}/repository/{repo_id}/similaritySearch/batch"
+        payload: dict[str, str | int | bool | list[str]] = {"queries": queries, "topK": k}
+
+        if collection_id:
+            payload["collectionId"] = collection_id
+
+        if model_name:
+            payload["modelName"] = model_name
+
+        if search_mode:
+            payload["searchMode"] = search_mode
+
+        if rerank is not None:
+            payload["rerank"] = rerank
+
+        if rerank_budget_ms:
+            payload["rerankBudgetMs"] = rerank_budget_ms
+
+        response = self._session.post(url, json=payload)
+        if response.status_code == 200:
+            result = response.json()
+            if "latency" in result:
+                logging.debug(f"Batch search latency: {result['latency']}")
+            return [query_result.get("docs", []) for query_result in result.get("results", [])]
+        else:
+            logging.info(f"Error: {response.status_code}")
+            logging.info(response.text)
+            raise parse_error(response.status_code, response)
@@ -0,0 +1,113 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Embedding cache hit rate and time saved when re-ingesting an unchanged corpus against a local fake embeddings
+server.
+
+Each corpus is embedded twice through RagEmbeddings: the first pass fills the cache, the second is the re-ingest.
+
+    python test/benchmarks/bench_embedding_cache.py --chunks 2000 --latency-ms 50
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from bench_utils import add_source_paths, LAMBDA_SRC, print_table, set_default_env
+
+add_source_paths(LAMBDA_SRC)
+set_default_env(AWS_REGION="us-east-1", AWS_ACCESS_KEY_ID="testing", AWS_SECRET_ACCESS_KEY="testing")
+
+from repository import embeddings  # noqa: E402
+from repository.embedding_cache import (  # noqa: E402
+    DiskEmbeddingCacheBackend,
+    EmbeddingCache,
+    InMemoryEmbeddingCacheBackend,
+    set_embedding_cache,
+)
+
+DIMENSIONS = 1024
+
+
+def _handler(latency_s: float) -> type[BaseHTTPRequestHandler]:
+    class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency_s)
+            data = [{"embedding": [float(len(text))] * DIMENSIONS} for text in body["input"]]
+            payload = json.dumps({"data": data}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return FakeEmbeddingsHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake server latency per embedding batch")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with patch.object(embeddings, "get_rest_api_container_endpoint", return_value=base_url), patch.object(
+        embeddings, "get_cert_path", return_value=True
+    ):
+        embeddings.invalidate_client_config()
+        client = embeddings.RagEmbeddings("bench-model", id_token="bench-token")
+
+    corpus = [f"Chunk {i} of an unchanged document. " * 20 for i in range(args.chunks)]
+    rows = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, backend in (
+            ("memory", InMemoryEmbeddingCacheBackend(max_entries=args.chunks)),
+            ("disk", DiskEmbeddingCacheBackend(cache_dir)),
+        ):
+            cache = EmbeddingCache(backend)
+            set_embedding_cache(cache)
+            for ingest in ("first", "re-ingest"):
+                hits, misses = cache.stats.hits, cache.stats.misses
+                start = time.perf_counter()
+                client.embed_documents(corpus)
+                elapsed = time.perf_counter() - start
+                lookups = cache.stats.hits - hits + cache.stats.misses - misses
+                rows.append(
+                    {
+                        "backend": name,
+                        "pass": ingest,
+                        "hit_rate": (cache.stats.hits - hits) / lookups,
+                        "seconds": elapsed,
+                        "est_saved_s": cache.stats.seconds_saved,
+                    }
+                )
+    set_embedding_cache(None)
+    server.shutdown()
+
+    print_table(f"Embedding {args.chunks} chunks twice ({args.latency_ms} ms per embedding batch)", rows)
+
+
+if __name__ == "__main__":
+    main()
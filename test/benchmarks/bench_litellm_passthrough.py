@@ -0,0 +1,201 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Throughput and tail latency of the LiteLLM passthrough against a local fake LiteLLM server.
+
+Compares the pooled async upstream client with the previous behaviour of issuing a blocking ``requests`` call
+(one new TCP connection each) from inside the async route.
+
+    python test/benchmarks/bench_litellm_passthrough.py --requests 2000 --concurrency 64 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import patch
+
+from bench_utils import add_source_paths, percentile, print_table, REST_API_SRC, set_default_env
+
+add_source_paths(REST_API_SRC)
+set_default_env(AWS_REGION="us-east-1", LITELLM_KEY="bench-key")
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+from aiohttp import web  # noqa: E402
+from api.endpoints.v2 import litellm_passthrough  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from utils.litellm_client import LiteLLMClient, UpstreamResponse  # noqa: E402
+
+CHUNKS = 50
+
+
+class FakeLiteLLMThread:
+    """Runs the fake LiteLLM server on its own thread and loop so blocking clients cannot stall it."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(latency_s,), daemon=True)
+        self.url = ""
+
+    def _serve(self, latency_s: float) -> None:
+        asyncio.set_event_loop(self.loop)
+        self._runner, self.url = self.loop.run_until_complete(_serve_fake_litellm(latency_s))
+        self._ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self._runner.cleanup())
+        self.loop.close()
+
+    def start(self) -> str:
+        self._thread.start()
+        self._ready.wait()
+        return self.url
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+async def _serve_fake_litellm(latency_s: float) -> tuple[web.AppRunner, str]:
+    async def model_info(request: web.Request) -> web.Response:
+        return web.json_response({"data": [{"model_name": "bench-model", "litellm_params": {"model": "bench/m"}}]})
+
+    async def chat(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        await asyncio.sleep(latency_s)
+        if not body.get("stream"):
+            return web.json_response({"choices": [{"message": {"content": "ok"}}], "usage": {"prompt_tokens": 1}})
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i in range(CHUNKS):
+            chunk = {"id": "1", "choices": [{"index": 0, "delta": {"content": f"tok{i}"}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/model/info", model_info)
+    app.router.add_post("/v1/chat/completions", chat)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class BlockingRequestsClient:
+    """Emulates the previous implementation: blocking ``requests`` calls made directly on the event loop."""
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> UpstreamResponse:
+        kwargs.pop("files", None)
+        timeout = kwargs.pop("timeout", None)
+        response = requests.request(method, f"{self.base_url}/{path}", timeout=timeout, **kwargs)
+        return UpstreamResponse(response.status_code, response.headers, response.content)
+
+    async def stream(self, method: str, path: str, **kwargs: Any) -> Any:
+        response = requests.request(method, f"{self.base_url}/{path}", stream=True, **kwargs)
+
+        class _Stream:
+            status_code = response.status_code
+
+            async def iter_lines(self) -> AsyncIterator[bytes]:
+                for line in response.iter_lines():
+                    yield line
+
+            async def read(self) -> UpstreamResponse:
+                return UpstreamResponse(response.status_code, response.headers, response.content)
+
+            async def aclose(self) -> None:
+                response.close()
+
+        return _Stream()
+
+    async def close(self) -> None:
+        pass
+
+
+async def _run_mode(client: Any, total: int, concurrency: int, stream: bool) -> dict[str, object]:
+    app = FastAPI()
+    app.include_router(litellm_passthrough.router, prefix="/v2/serve")
+    payload = {"model": "bench-model", "stream": stream, "messages": [{"role": "user", "content": "hi"}]}
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(http: httpx.AsyncClient) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await http.post("/v2/serve/v1/chat/completions", json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    litellm_passthrough.invalidate_model_cache()
+    with (
+        patch.object(litellm_passthrough, "get_litellm_client", return_value=client),
+        patch.object(litellm_passthrough, "publish_metrics_event"),
+    ):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://lisa", timeout=120) as http:
+            await one(http)  # warm the model info cache and connection pool
+            latencies.clear()
+            start = time.perf_counter()
+            await asyncio.gather(*(one(http) for _ in range(total)))
+            elapsed = time.perf_counter() - start
+    await client.close()
+
+    return {
+        "rps": total / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Artificial upstream latency per request")
+    args = parser.parse_args()
+
+    server = FakeLiteLLMThread(args.latency_ms / 1000)
+    url = server.start()
+    rows = []
+    try:
+        for stream in (False, True):
+            for name, client in (
+                ("blocking requests", BlockingRequestsClient(url)),
+                ("pooled aiohttp", LiteLLMClient(base_url=url)),
+            ):
+                result = await _run_mode(client, args.requests, args.concurrency, stream)
+                rows.append({"mode": name, "stream": stream, **result})
+    finally:
+        server.stop()
+
+    print_table(
+        f"LiteLLM passthrough: {args.requests} requests, concurrency {args.concurrency}, "
+        f"upstream latency {args.latency_ms} ms",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Per-request middleware overhead for a large JSON chat body, before and after parsing the body once.
+
+"Before" reproduces the previous stack: five ``@app.middleware("http")`` (``BaseHTTPMiddleware``) layers, with the
+security check, the input validation and the route each reading and scanning the body and parsing it separately.
+"After" is the current pure ASGI stack built from the REST API's middleware, sharing one read and one parse. The
+authentication and rate-limit layers are pass-throughs in both, so only the middleware plumbing is compared.
+
+    python test/benchmarks/bench_middleware_body.py --body-mb 1 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from bench_utils import add_source_paths, percentile, print_table, REST_API_SRC, set_default_env
+
+add_source_paths(REST_API_SRC)
+set_default_env(AWS_REGION="us-east-1", LOG_LEVEL="WARNING")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from middleware import (  # noqa: E402
+    FunctionMiddleware,
+    ProcessRequestMiddleware,
+    security_middleware,
+    validate_input_middleware,
+)
+from utils.request_body import get_json_body  # noqa: E402
+
+
+async def _pass_through(request: Request, call_next: Callable) -> Response:
+    """Stand-in for the authentication and rate-limit layers."""
+    return await call_next(request)
+
+
+async def _legacy_security(request: Request, call_next: Callable) -> Response:
+    body = await request.body()
+    if b"\x00" in body:
+        return JSONResponse({"error": "Bad Request"}, status_code=400)
+    try:
+        json.loads(body)
+    except json.JSONDecodeError:
+        return JSONResponse({"error": "Bad Request"}, status_code=400)
+    return await call_next(request)
+
+
+async def _legacy_validate_input(request: Request, call_next: Callable) -> Response:
+    body = await request.body()
+    if "\x00" in body.decode("utf-8"):
+        return JSONResponse({"error": "Bad Request"}, status_code=400)
+    return await call_next(request)
+
+
+async def _legacy_process_request(request: Request, call_next: Callable) -> Response:
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = "id"
+    return response
+
+
+def _legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request) -> dict[str, Any]:
+        params = json.loads(await request.body())
+        return {"model": params["model"]}
+
+    for dispatch in (_pass_through, _pass_through, _legacy_validate_input, _legacy_process_request, _legacy_security):
+        app.middleware("http")(dispatch)
+    return app
+
+
+def _current_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request) -> dict[str, Any]:
+        params = await get_json_body(request)
+        return {"model": params["model"]}
+
+    app.add_middleware(FunctionMiddleware, dispatch=_pass_through)
+    app.add_middleware(FunctionMiddleware, dispatch=_pass_through)
+    app.add_middleware(FunctionMiddleware, dispatch=validate_input_middleware)
+    app.add_middleware(ProcessRequestMiddleware)
+    app.add_middleware(FunctionMiddleware, dispatch=security_middleware)
+    return app
+
+
+def _chat_body(size: int) -> bytes:
+    """Build a chat completion request of roughly ``size`` bytes split across many messages."""
+    messages = []
+    while len(json.dumps(messages)) < size:
+        messages.append({"role": "user", "content": [{"type": "text", "text": "lorem ipsum dolor " * 200}]})
+    return json.dumps({"model": "bench-model", "messages": messages}).encode()
+
+
+async def _measure(app: FastAPI, body: bytes, requests: int) -> dict[str, float]:
+    latencies = []
+    headers = {"content-type": "application/json"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://lisa") as client:
+        for _ in range(5):
+            await client.post("/v1/chat/completions", content=body, headers=headers)
+        cpu_start = time.process_time()
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.post("/v1/chat/completions", content=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+        cpu = time.process_time() - cpu_start
+    return {
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "cpu_ms_per_request": cpu / requests * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--body-mb", type=float, default=1.0)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    body = _chat_body(int(args.body_mb * 1024 * 1024))
+    rows = []
+    for name, build in (("BaseHTTPMiddleware, parse per layer", _legacy_app), ("pure ASGI, parse once", _current_app)):
+        rows.append({"stack": name, **await _measure(build(), body, args.requests)})
+
+    print_table(f"Middleware overhead: {len(body) / 1024 / 1024:.2f} MB JSON body, {args.requests} requests", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
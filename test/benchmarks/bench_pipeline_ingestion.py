@@ -0,0 +1,192 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Batch ingestion wall time for synthetic documents, one document at a time vs. several at once, against a local
+fake embeddings server and an in-memory vector store.
+
+Each document is "fetched" with a fixed delay standing in for the S3 read and parse, split into 20-300 chunks, embedded
+through RagEmbeddings and written to a langchain InMemoryVectorStore. The document and job tables are mocked.
+
+    python test/benchmarks/bench_pipeline_ingestion.py --documents 100 --concurrency 1 4 8 --latency-ms 50
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from bench_utils import add_source_paths, LAMBDA_SRC, print_table, set_default_env
+
+add_source_paths(LAMBDA_SRC)
+set_default_env(
+    AWS_REGION="us-east-1",
+    AWS_DEFAULT_REGION="us-east-1",
+    AWS_ACCESS_KEY_ID="testing",
+    AWS_SECRET_ACCESS_KEY="testing",
+    RAG_DOCUMENT_TABLE="bench-doc-table",
+    RAG_SUB_DOCUMENT_TABLE="bench-subdoc-table",
+    LISA_INGESTION_JOB_TABLE_NAME="bench-job-table",
+    LISA_RAG_VECTOR_STORE_TABLE="bench-vector-store-table",
+)
+
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.vectorstores import InMemoryVectorStore  # noqa: E402
+from models.domain_objects import FixedChunkingStrategy, IngestionJob, IngestionStatus, JobActionType  # noqa: E402
+from repository import embeddings  # noqa: E402
+from repository import pipeline_ingest_documents as pipeline  # noqa: E402
+
+DIMENSIONS = 256
+
+
+class InFlightCounter:
+    """Tracks how many embedding requests the fake server is handling at once."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.now = 0
+        self.peak = 0
+        self.requests = 0
+
+    def __enter__(self) -> None:
+        with self.lock:
+            self.now += 1
+            self.requests += 1
+            self.peak = max(self.peak, self.now)
+
+    def __exit__(self, *exc: object) -> None:
+        with self.lock:
+            self.now -= 1
+
+
+def _handler(latency_s: float, counter: InFlightCounter) -> type[BaseHTTPRequestHandler]:
+    class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            with counter:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(latency_s)
+                data = [{"embedding": [float(len(text))] * DIMENSIONS} for text in body["input"]]
+            payload = json.dumps({"data": data}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return FakeEmbeddingsHandler
+
+
+def _synthetic_chunks(fetch_s: float) -> Callable[[IngestionJob], list[Document]]:
+    def generate_chunks(job: IngestionJob) -> list[Document]:
+        time.sleep(fetch_s)
+        number = int(job.s3_path.rsplit("-", 1)[-1])
+        chunk_count = 20 + (number * 37) % 281
+        return [
+            Document(page_content=f"Document {number} chunk {i}. " * 30, metadata={"source": job.s3_path, "part": i})
+            for i in range(chunk_count)
+        ]
+
+    return generate_chunks
+
+
+def _run(documents: int, concurrency: int, fetch_s: float, store: InMemoryVectorStore) -> tuple[float, IngestionJob]:
+    job = IngestionJob(
+        repository_id="bench-repo",
+        collection_id="bench-collection",
+        s3_path="",
+        embedding_model="bench-model",
+        username="bench-user",
+        job_type=JobActionType.DOCUMENT_BATCH_INGESTION,
+        chunk_strategy=FixedChunkingStrategy(size=512, overlap=51),
+        s3_paths=[f"s3://bench-bucket/doc-{i}" for i in range(documents)],
+    )
+    vs_repo = MagicMock()
+    vs_repo.find_repository_by_id.return_value = {"repositoryId": "bench-repo", "type": "pgvector"}
+    doc_repo = MagicMock()
+    doc_repo.find_by_source.return_value = []
+    factory = MagicMock()
+    factory.create_service.return_value.get_vector_store_client.return_value = store
+
+    with patch.multiple(
+        pipeline,
+        generate_chunks=_synthetic_chunks(fetch_s),
+        vs_repo=vs_repo,
+        VectorStoreRepository=MagicMock(return_value=vs_repo),
+        RepositoryServiceFactory=factory,
+        rag_document_repository=doc_repo,
+        ingestion_job_repository=MagicMock(),
+        INGESTION_DOCUMENT_CONCURRENCY=concurrency,
+    ):
+        start = time.perf_counter()
+        pipeline.pipeline_ingest_documents(job)
+        elapsed = time.perf_counter() - start
+    return elapsed, job
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake server latency per embedding request")
+    parser.add_argument("--fetch-ms", type=float, default=30.0, help="Simulated S3 read and parse time per document")
+    args = parser.parse_args()
+
+    counter = InFlightCounter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(args.latency_ms / 1000, counter))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Resolve the endpoint, management key and certificate once; every RagEmbeddings built during ingestion reuses them
+    with patch.object(embeddings, "get_rest_api_container_endpoint", return_value=base_url), patch.object(
+        embeddings, "get_cert_path", return_value=True
+    ), patch.object(embeddings, "get_management_key", return_value="bench-key"):
+        embeddings.invalidate_client_config()
+        embedding = embeddings.RagEmbeddings("bench-model")
+
+    rows = []
+    baseline = None
+    for concurrency in args.concurrency:
+        counter.peak = counter.requests = 0
+        store = InMemoryVectorStore(embedding=embedding)
+        elapsed, job = _run(args.documents, concurrency, args.fetch_ms / 1000, store)
+        baseline = baseline or elapsed
+        results = job.document_results or []
+        rows.append(
+            {
+                "concurrency": concurrency,
+                "documents_ok": sum(1 for result in results if result.status == IngestionStatus.INGESTION_COMPLETED),
+                "chunks": len(store.store),
+                "embed_requests": counter.requests,
+                "peak_in_flight": counter.peak,
+                "seconds": elapsed,
+                "docs_per_s": args.documents / elapsed,
+                "speedup": baseline / elapsed,
+            }
+        )
+    server.shutdown()
+
+    print_table(
+        f"Ingesting {args.documents} documents ({args.latency_ms} ms per embedding request, {args.fetch_ms} ms per "
+        f"fetch, EMBEDDING_MAX_IN_FLIGHT={embeddings.EMBEDDING_MAX_IN_FLIGHT})",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
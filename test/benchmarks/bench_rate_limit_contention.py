@@ -0,0 +1,128 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Rate limit check throughput with many distinct callers, before and after the pluggable backends.
+
+"Before" reproduces the previous store: one dict behind a global ``asyncio.Lock``, scanned in full for stale buckets
+on every check once it holds 10,000 keys. Because no bucket is stale yet, the scan frees nothing and repeats on the
+next check. "After" uses the sharded in-memory backend (O(1) LRU eviction) and the SQLite backend shared by workers
+on a host.
+
+    python test/benchmarks/bench_rate_limit_contention.py --keys 50000 --checks 100000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import add_source_paths, percentile, print_table, REST_API_SRC, set_default_env
+
+add_source_paths(REST_API_SRC)
+set_default_env(AWS_REGION="us-east-1", LOG_LEVEL="WARNING")
+
+from utils.rate_limit_backends import (  # noqa: E402
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+    SQLiteRateLimitBackend,
+    TokenBucket,
+)
+
+_MAX_BUCKETS = 10_000
+_STALE_SECONDS = 300.0
+_MAX_TOKENS = 70.0
+_REFILL_RATE = 1.0
+
+
+class LegacyBackend(RateLimitBackend):
+    """The previous global-lock dict store with its O(n) prune."""
+
+    def __init__(self) -> None:
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = asyncio.Lock()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, b in self.buckets.items() if (now - b.last_refill) > _STALE_SECONDS]:
+            del self.buckets[key]
+
+    async def acquire(self, key: str, cost: float, max_tokens: float, refill_rate: float) -> tuple[bool, float]:
+        async with self.lock:
+            if len(self.buckets) >= _MAX_BUCKETS:
+                self._prune()
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(max_tokens)
+                self.buckets[key] = bucket
+            return bucket.try_consume(max_tokens, refill_rate, cost)
+
+    async def charge(self, key: str, amount: float, max_tokens: float, refill_rate: float) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+
+async def _measure(backend: RateLimitBackend, keys: list[str], concurrency: int) -> dict[str, object]:
+    latencies: list[float] = []
+    queue = iter(keys)
+
+    async def worker() -> None:
+        for key in queue:
+            start = time.perf_counter()
+            await backend.acquire(key, 1.0, _MAX_TOKENS, _REFILL_RATE)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "checks_per_s": len(keys) / elapsed,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "buckets_held": len(backend) if hasattr(backend, "__len__") else "-",
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=50_000, help="Distinct callers")
+    parser.add_argument("--checks", type=int, default=100_000, help="Rate limit checks per backend")
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    population = [f"token:{i}" for i in range(args.keys)]
+    keys = [rng.choice(population) for _ in range(args.checks)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends: list[tuple[str, RateLimitBackend]] = [
+            ("global lock, O(n) prune", LegacyBackend()),
+            ("sharded in-memory", InMemoryRateLimitBackend(max_buckets=_MAX_BUCKETS, stale_seconds=_STALE_SECONDS)),
+            ("SQLite (shared per host)", SQLiteRateLimitBackend(str(Path(tmp) / "rate-limit.sqlite3"))),
+        ]
+        rows = []
+        for name, backend in backends:
+            rows.append({"backend": name, **await _measure(backend, keys, args.concurrency)})
+            backend.close()
+
+    print_table(
+        f"Rate limit checks: {args.checks:,} checks over {args.keys:,} callers, concurrency {args.concurrency}", rows
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
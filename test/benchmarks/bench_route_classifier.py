@@ -0,0 +1,112 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Route classifications per second, before and after compiling the route tables.
+
+"Before" reproduces the previous helpers, which scanned the route tuples and rebuilt, sorted and ``fnmatch``-ed the
+wildcard patterns on every call. "After" is ``utils.route_utils``. Both classify the same mix of chat, video,
+metadata, admin and unknown paths with ``is_openai_or_anthropic_route``, the check the auth middleware runs on every
+request.
+
+    python test/benchmarks/bench_route_classifier.py --iterations 200000
+"""
+
+import argparse
+import fnmatch
+import time
+from collections.abc import Callable
+
+from bench_utils import add_source_paths, print_table, REST_API_SRC, set_default_env
+
+add_source_paths(REST_API_SRC)
+set_default_env(AWS_REGION="us-east-1", LOG_LEVEL="WARNING")
+
+from utils.route_utils import (  # noqa: E402
+    ANTHROPIC_ROUTES,
+    is_openai_or_anthropic_route,
+    LISA_PUBLIC_ROUTES,
+    OPENAI_ROUTES,
+)
+
+_PATHS = [
+    "/v1/chat/completions",
+    "/v1/messages",
+    "/v1/videos/vid_123/content",
+    "/videos/vid_123",
+    "/models/metadata/instances",
+    "/models/metadata/my-model",
+    "/v1/embeddings",
+    "/key/generate",
+    "/model/new",
+    "/unknown/path/with/segments",
+]
+
+
+def _legacy_is_openai_route(api_path: str) -> bool:
+    if api_path in OPENAI_ROUTES:
+        return True
+    if "video" not in api_path:
+        return False
+    wildcard_patterns = [pattern for pattern in OPENAI_ROUTES if "*" in pattern]
+    wildcard_patterns.sort(key=len, reverse=True)
+    for route_pattern in wildcard_patterns:
+        if fnmatch.fnmatch(api_path, route_pattern):
+            if route_pattern.endswith("/*") and not route_pattern.endswith("/*/"):
+                if api_path.count("/") != route_pattern.count("/"):
+                    continue
+            return True
+    return False
+
+
+def _legacy_is_lisa_public_route(api_path: str) -> bool:
+    if api_path in LISA_PUBLIC_ROUTES:
+        return True
+    wildcard_patterns = [pattern for pattern in LISA_PUBLIC_ROUTES if "*" in pattern]
+    for route_pattern in wildcard_patterns:
+        if fnmatch.fnmatch(api_path, route_pattern):
+            return True
+    return False
+
+
+def _legacy_is_openai_or_anthropic_route(api_path: str) -> bool:
+    api_path = api_path.lstrip("/")
+    return _legacy_is_openai_route(api_path) or api_path in ANTHROPIC_ROUTES or _legacy_is_lisa_public_route(api_path)
+
+
+def _measure(classify: Callable[[str], bool], iterations: int) -> dict[str, float]:
+    paths = _PATHS * (iterations // len(_PATHS))
+    start = time.perf_counter()
+    for path in paths:
+        classify(path)
+    elapsed = time.perf_counter() - start
+    return {"classifications_per_s": len(paths) / elapsed, "ns_per_call": elapsed / len(paths) * 1e9}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    for path in _PATHS:
+        assert is_openai_or_anthropic_route(path) == _legacy_is_openai_or_anthropic_route(path), path
+
+    rows = [
+        {"classifier": "fnmatch per call", **_measure(_legacy_is_openai_or_anthropic_route, args.iterations)},
+        {"classifier": "precompiled", **_measure(is_openai_or_anthropic_route, args.iterations)},
+    ]
+    print_table(f"Route classification: {args.iterations:,} paths", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Latency of adding document ids to similarity search hits, one partition query per hit vs. one batched source index
+lookup, on a moto document table.
+
+Loading the table takes a while with the default 50k documents; per-hit lookups scan the whole collection partition
+in moto, so use --rounds to keep the k=100 case short.
+
+    python test/benchmarks/bench_source_enrichment.py --documents 50000 --rounds 3
+"""
+
+import argparse
+import random
+import time
+from unittest.mock import MagicMock
+
+from bench_utils import add_source_paths, LAMBDA_SRC, print_table, set_default_env
+
+add_source_paths(LAMBDA_SRC)
+set_default_env(
+    AWS_REGION="us-east-1",
+    AWS_DEFAULT_REGION="us-east-1",
+    AWS_ACCESS_KEY_ID="testing",
+    AWS_SECRET_ACCESS_KEY="testing",
+)
+
+import boto3  # noqa: E402
+from models.domain_objects import ChunkingStrategyType, FixedChunkingStrategy, RagDocument  # noqa: E402
+from moto import mock_aws  # noqa: E402
+from repository.rag_document_repo import RagDocumentRepository  # noqa: E402
+
+REPOSITORY_ID = "bench-repo"
+COLLECTION_ID = "bench-collection"
+
+
+def _load_documents(repo: RagDocumentRepository, count: int) -> list[str]:
+    strategy = FixedChunkingStrategy(type=ChunkingStrategyType.FIXED, size=1000, overlap=200)
+    sources = []
+    with repo.doc_table.batch_writer() as batch:
+        for i in range(count):
+            source = f"s3://bench-bucket/docs/document-{i}.pdf"
+            document = RagDocument(
+                repository_id=REPOSITORY_ID,
+                collection_id=COLLECTION_ID,
+                document_name=f"document-{i}.pdf",
+                source=source,
+                username="bench",
+                chunk_strategy=strategy,
+            )
+            batch.put_item(Item=document.model_dump())
+            # The entry RagDocumentRepository.save writes alongside each document
+            batch.put_item(
+                Item={
+                    **RagDocumentRepository._source_index_key(REPOSITORY_ID, COLLECTION_ID, source),
+                    "source": source,
+                    "target_document_id": document.document_id,
+                }
+            )
+            sources.append(source)
+    return sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=3, help="Searches timed per k")
+    args = parser.parse_args()
+
+    rows = []
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        dynamodb.create_table(
+            TableName="bench-doc-table",
+            KeySchema=[
+                {"AttributeName": "pk", "KeyType": "HASH"},
+                {"AttributeName": "document_id", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "pk", "AttributeType": "S"},
+                {"AttributeName": "document_id", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        repo = RagDocumentRepository("bench-doc-table", "bench-subdoc-table")
+        repo.subdoc_table = MagicMock()
+
+        start = time.perf_counter()
+        sources = _load_documents(repo, args.documents)
+        print(f"Loaded {args.documents:,} documents in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(0)
+        for k in (5, 20, 100):
+            # Hits often repeat a source when several chunks of one document match
+            hits = [rng.sample(sources, k) for _ in range(args.rounds)]
+            for hit in hits:
+                hit[-1] = hit[0]
+
+            start = time.perf_counter()
+            for hit in hits:
+                [repo.find_one_by_source(REPOSITORY_ID, COLLECTION_ID, source) for source in hit]
+            per_hit = (time.perf_counter() - start) / args.rounds
+
+            start = time.perf_counter()
+            for hit in hits:
+                repo.find_document_ids_by_source(REPOSITORY_ID, COLLECTION_ID, hit)
+            batched = (time.perf_counter() - start) / args.rounds
+
+            rows.append(
+                {"k": k, "per_hit_ms": per_hit * 1000, "batched_ms": batched * 1000, "speedup": per_hit / batched}
+            )
+
+    print_table(f"Document id enrichment per search ({args.documents:,} documents in one collection)", rows)
+
+
+if __name__ == "__main__":
+    main()
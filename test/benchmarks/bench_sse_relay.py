@@ -0,0 +1,138 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Throughput of the streaming chat relay when replaying a recorded 10k-chunk SSE stream.
+
+Compares the relay in ``generate_response_with_guardrail_handling`` with the previous approach of decoding and
+``json.loads``-ing every chunk. Pass ``--stream-file`` to replay a captured LiteLLM stream (raw SSE text) instead of
+the synthetic one.
+
+    python test/benchmarks/bench_sse_relay.py --chunks 10000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bench_utils import add_source_paths, print_table, REST_API_SRC, set_default_env
+
+add_source_paths(REST_API_SRC)
+set_default_env(AWS_REGION="us-east-1", LITELLM_KEY="bench-key")
+
+from api.endpoints.v2 import litellm_passthrough  # noqa: E402
+from utils.metrics import extract_token_usage  # noqa: E402
+
+
+def synthetic_stream(chunks: int) -> list[bytes]:
+    """Build a LiteLLM-style chat completion stream with a trailing usage chunk."""
+    lines = []
+    for i in range(chunks):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "created": 1700000000,
+            "model": "bench-model",
+            "object": "chat.completion.chunk",
+            "system_fingerprint": None,
+            "choices": [{"index": 0, "delta": {"content": f" token{i}", "role": "assistant"}, "finish_reason": None}],
+            "usage": None,
+        }
+        lines += [f"data: {json.dumps(chunk)}".encode(), b""]
+    usage = {"id": "chatcmpl-bench", "choices": [], "usage": {"prompt_tokens": 100, "completion_tokens": chunks}}
+    lines += [f"data: {json.dumps(usage)}".encode(), b"", b"data: [DONE]", b""]
+    return lines
+
+
+async def _replay(lines: list[bytes]) -> AsyncIterator[bytes]:
+    for line in lines:
+        yield line
+
+
+async def legacy_relay(iterator: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """The previous relay: decode and parse every data chunk."""
+    async for line in iterator:
+        text = line.decode()
+        if not text:
+            continue
+        if text.startswith("data: "):
+            data_content = text[6:].strip()
+            if data_content == "[DONE]":
+                yield f"{text}\n\n"
+                continue
+            try:
+                chunk_data = json.loads(data_content)
+            except json.JSONDecodeError:
+                yield f"{text}\n\n"
+                continue
+            if "usage" in chunk_data and chunk_data["usage"]:
+                extract_token_usage(chunk_data)
+            yield f"{text}\n\n"
+        else:
+            yield f"{text}\n\n"
+
+
+async def current_relay(iterator: AsyncIterator[bytes]) -> AsyncIterator[str | bytes]:
+    request = SimpleNamespace(state=SimpleNamespace())
+    async for chunk in litellm_passthrough.generate_response_with_guardrail_handling(
+        iterator, "bench-model", request, {"model": "bench-model"}  # type: ignore[arg-type]
+    ):
+        yield chunk
+
+
+async def _consume(relay, lines: list[bytes]) -> tuple[float, float, int]:  # type: ignore[no-untyped-def]
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    relayed = 0
+    async for chunk in relay(_replay(lines)):
+        relayed += len(chunk)
+    return time.perf_counter() - wall_start, time.process_time() - cpu_start, relayed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--stream-file", help="Replay a recorded SSE stream instead of a synthetic one")
+    args = parser.parse_args()
+
+    if args.stream_file:
+        with open(args.stream_file, "rb") as f:
+            lines = f.read().split(b"\n")
+    else:
+        lines = synthetic_stream(args.chunks)
+    data_chunks = sum(1 for line in lines if line.startswith(b"data: "))
+
+    rows = []
+    with patch.object(litellm_passthrough, "publish_metrics_event"):
+        for name, relay in (("parse every chunk", legacy_relay), ("selective parse", current_relay)):
+            wall = cpu = 0.0
+            for _ in range(args.rounds):
+                round_wall, round_cpu, _ = await _consume(relay, lines)
+                wall += round_wall
+                cpu += round_cpu
+            rows.append(
+                {
+                    "relay": name,
+                    "chunks_per_s": data_chunks * args.rounds / wall,
+                    "cpu_ms_per_stream": cpu / args.rounds * 1000,
+                }
+            )
+
+    print_table(f"SSE relay: {data_chunks:,} data chunks per stream, {args.rounds} rounds", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Shared helpers for the standalone benchmark scripts."""
+
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+REST_API_SRC = REPO_ROOT / "lib" / "serve" / "rest-api" / "src"
+LAMBDA_SRC = REPO_ROOT / "lambda"
+SDK_SRC = REPO_ROOT / "lisa-sdk"
+
+
+def add_source_paths(*paths: Path) -> None:
+    """Make service sources importable the same way pytest.ini's ``pythonpath`` does."""
+    for path in paths:
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+
+def set_default_env(**env: str) -> None:
+    """Set environment variables required at import time, without overriding the caller's values."""
+    for key, value in env.items():
+        os.environ.setdefault(key, value)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def print_table(title: str, rows: list[dict[str, object]]) -> None:
+    """Print benchmark results as an aligned table."""
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {col: max(len(col), *(len(_fmt(row[col])) for row in rows)) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    print("  ".join("-" * widths[col] for col in columns))
+    for row in rows:
+        print("  ".join(_fmt(row[col]).ljust(widths[col]) for col in columns))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
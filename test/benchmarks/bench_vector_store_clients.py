@@ -0,0 +1,154 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""OpenSearch similarity search latency with a cold and a warm vector store client, against a local fake OpenSearch
+server and moto SSM.
+
+"cold" clears the client registry before every search, which is what every request paid before clients were pooled:
+an SSM read, new credentials and client, and a new connection. "warm" reuses the registry's client and connection.
+The fake server sleeps once per new TCP connection to stand in for the TLS handshake to a remote domain; TLS itself is
+disabled for the local server.
+
+    python test/benchmarks/bench_vector_store_clients.py --searches 200 --connect-latency-ms 30
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import patch
+
+from bench_utils import add_source_paths, LAMBDA_SRC, percentile, print_table, set_default_env
+
+add_source_paths(LAMBDA_SRC)
+set_default_env(
+    AWS_REGION="us-east-1",
+    AWS_DEFAULT_REGION="us-east-1",
+    AWS_ACCESS_KEY_ID="testing",
+    AWS_SECRET_ACCESS_KEY="testing",
+    RAG_DOCUMENT_TABLE="bench-doc-table",
+    RAG_SUB_DOCUMENT_TABLE="bench-subdoc-table",
+    REGISTERED_REPOSITORIES_PS_PREFIX="/lisa/repositories/",
+)
+
+import boto3  # noqa: E402
+from moto import mock_aws  # noqa: E402
+from repository.services import opensearch_repository_service  # noqa: E402
+from repository.services.opensearch_repository_service import OpenSearchRepositoryService  # noqa: E402
+from repository.vector_store_clients import vector_store_client_registry  # noqa: E402
+
+TOP_K = 5
+
+
+class FakeEmbeddings:
+    model_name = "bench-model"
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(len(text))] * 8
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+def _handler(connect_latency_s: float) -> type[BaseHTTPRequestHandler]:
+    hits = [
+        {"_id": str(i), "_score": 1.0 - i / 10, "_source": {"text": f"chunk {i}", "metadata": {"source": "s3://b/k"}}}
+        for i in range(TOP_K)
+    ]
+    payload = json.dumps({"hits": {"hits": hits}}).encode()
+
+    class FakeOpenSearchHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            # Runs once per TCP connection
+            time.sleep(connect_latency_s)
+            super().setup()
+
+        def do_HEAD(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return FakeOpenSearchHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--connect-latency-ms", type=float, default=30.0, help="Fake server delay per new connection")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(args.connect_latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    local_url = f"http://127.0.0.1:{server.server_address[1]}"
+    opensearch_vector_search = opensearch_repository_service.OpenSearchVectorSearch
+
+    def local_vector_search(**kwargs: Any) -> Any:
+        kwargs.update(opensearch_url=local_url, use_ssl=False, verify_certs=False)
+        return opensearch_vector_search(**kwargs)
+
+    rows = []
+    with mock_aws():
+        ssm = boto3.client("ssm", region_name="us-east-1")
+        ssm.put_parameter(
+            Name="/lisa/repositories/bench-repo",
+            Value=json.dumps({"type": "opensearch", "endpoint": "search.example.com"}),
+            Type="String",
+        )
+        service = OpenSearchRepositoryService({"repositoryId": "bench-repo", "type": "opensearch"})
+        with patch.object(opensearch_repository_service, "ssm_client", ssm), patch.object(
+            opensearch_repository_service, "OpenSearchVectorSearch", side_effect=local_vector_search
+        ), patch.object(opensearch_repository_service, "RagEmbeddings", return_value=FakeEmbeddings()):
+            for mode in ("cold", "warm"):
+                vector_store_client_registry.clear()
+                samples = []
+                for i in range(args.searches):
+                    if mode == "cold":
+                        vector_store_client_registry.clear()
+                    start = time.perf_counter()
+                    service.retrieve_documents(f"query {i}", "bench-collection", TOP_K, "bench-model")
+                    samples.append((time.perf_counter() - start) * 1000)
+                rows.append(
+                    {
+                        "client": mode,
+                        "searches": args.searches,
+                        "p50_ms": percentile(samples, 50),
+                        "p99_ms": percentile(samples, 99),
+                        "mean_ms": sum(samples) / len(samples),
+                    }
+                )
+    vector_store_client_registry.clear()
+    server.shutdown()
+
+    print_table(f"similarity_search latency ({args.connect_latency_ms} ms per new connection)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -99,3 +99,95 @@ class TestPGVectorRepositoryService:
 
         # Negative distance (shouldn't happen but handle gracefully) -> clamped to 0.0
         assert pgvector_service._normalize_similarity_score(-0.5) >= 0.0
+
+
+class TestPrepareHybridSearch:
+    """Test suite for creating the full-text index hybrid search uses."""
+
+    @pytest.fixture
+    def connection(self, pgvector_service):
+        """Patch the service's engine and clients and return the connection its statements run on."""
+        mock_connection = MagicMock()
+        mock_engine = MagicMock()
+        mock_engine.connect.return_value.execution_options.return_value.__enter__.return_value = mock_connection
+        with patch.object(pgvector_service, "_get_connection_info", return_value={"type": "pgvector"}), patch.object(
+            pgvector_service, "_create_engine", return_value=("postgresql://", mock_engine)
+        ), patch.object(pgvector_service, "_get_vector_store_client") as mock_get_client, patch(
+            "repository.services.pgvector_repository_service.RagEmbeddings"
+        ):
+            mock_connection.engine = mock_engine
+            mock_connection.get_client = mock_get_client
+            self._results(mock_connection)
+            yield mock_connection
+
+    @staticmethod
+    def _results(connection, config=True, table=True, index_valid=None):
+        """Answer the catalog queries by statement: text search config, embedding table, index validity."""
+
+        def execute(statement, params=None):
+            result = MagicMock()
+            sql = str(statement)
+            result.first.return_value = (1,) if config else None
+            if "to_regclass" in sql:
+                result.scalar.return_value = "langchain_pg_embedding" if table else None
+            elif "indisvalid" in sql:
+                result.scalar.return_value = index_valid
+            return result
+
+        connection.execute.side_effect = execute
+
+    @staticmethod
+    def _statements(connection):
+        return [str(call.args[0]) for call in connection.execute.call_args_list]
+
+    def test_creates_index_concurrently_in_autocommit(self, pgvector_service, connection):
+        pgvector_service.prepare_hybrid_search()
+
+        # The default collection's client creates the embedding table before it is indexed
+        connection.get_client.assert_called_once()
+        assert connection.get_client.call_args.kwargs["collection_id"] == "amazon.titan-embed-text-v1"
+        connection.engine.connect.return_value.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+        statements = self._statements(connection)
+        assert "pg_ts_config" in statements[0]
+        assert statements[-1].startswith(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_langchain_pg_embedding_document_fts ON langchain_pg_embedding"
+        )
+        assert "to_tsvector('english', document)" in statements[-1]
+        connection.engine.dispose.assert_called_once()
+
+    def test_existing_valid_index_is_kept(self, pgvector_service, connection):
+        self._results(connection, index_valid=True)
+
+        pgvector_service.prepare_hybrid_search()
+
+        assert not any("CREATE INDEX" in statement for statement in self._statements(connection))
+
+    def test_invalid_index_is_rebuilt(self, pgvector_service, connection):
+        self._results(connection, index_valid=False)
+
+        pgvector_service.prepare_hybrid_search()
+
+        statements = self._statements(connection)
+        assert statements[-2] == "DROP INDEX CONCURRENTLY IF EXISTS ix_langchain_pg_embedding_document_fts"
+        assert statements[-1].startswith("CREATE INDEX CONCURRENTLY")
+
+    def test_missing_embedding_table_is_skipped(self, pgvector_service, connection):
+        pgvector_service.repository.pop("embeddingModelId")
+        self._results(connection, table=False)
+
+        pgvector_service.prepare_hybrid_search()
+
+        connection.get_client.assert_not_called()
+        assert not any("INDEX" in statement for statement in self._statements(connection))
+        connection.engine.dispose.assert_called_once()
+
+    def test_unknown_text_search_config_rejected(self, pgvector_service, connection):
+        self._results(connection, config=False)
+
+        with patch("repository.services.pgvector_repository_service.PGVECTOR_TEXT_SEARCH_CONFIG", "english'); --"):
+            with pytest.raises(ValueError, match="Unknown text search configuration"):
+                pgvector_service.prepare_hybrid_search()
+
+        assert len(connection.execute.call_args_list) == 1
+        assert connection.execute.call_args.args[1] == {"name": "english'); --"}
+        connection.engine.dispose.assert_called_once()
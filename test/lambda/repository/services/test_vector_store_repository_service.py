@@ -155,7 +155,7 @@ class TestVectorStoreRepositoryService:
         mock_vector_store.client.indices.exists.return_value = True
         mock_vector_store.similarity_search_with_score.return_value = [(mock_doc1, 0.95), (mock_doc2, 0.85)]
 
-        with patch("repository.services.opensearch_repository_service.RagEmbeddings"):
+        with patch("repository.services.vector_store_repository_service.RagEmbeddings"):
             with patch.object(vector_store_service, "_get_vector_store_client", return_value=mock_vector_store):
                 results = vector_store_service.retrieve_documents("test query", "test-collection", 5, "test-model")
 
@@ -164,6 +164,43 @@ class TestVectorStoreRepositoryService:
                 assert results[0]["metadata"]["source"] == "doc1.pdf"
                 assert results[1]["page_content"] == "Content 2"
 
+    def test_retrieve_documents_batch(self, vector_store_service):
+        """Test that a batch embeds its queries together and keeps results in query order."""
+        mock_vector_store = MagicMock()
+        mock_vector_store.client.indices.exists.return_value = True
+
+        def search_by_vector(embedding, k):
+            doc = MagicMock()
+            doc.page_content = f"Content {embedding[0]}"
+            doc.metadata = {"source": f"doc{embedding[0]}.pdf"}
+            return [(doc, 0.9)]
+
+        mock_vector_store.similarity_search_with_score_by_vector.side_effect = search_by_vector
+
+        with patch("repository.services.vector_store_repository_service.RagEmbeddings") as mock_embeddings:
+            mock_embeddings.return_value.embed_queries.return_value = [[1.0], [2.0], [3.0]]
+            with patch.object(vector_store_service, "_get_vector_store_client", return_value=mock_vector_store):
+                results = vector_store_service.retrieve_documents_batch(
+                    ["q1", "q2", "q3"], "test-collection", 5, "test-model"
+                )
+
+        mock_embeddings.assert_called_once_with(model_name="test-model")
+        mock_embeddings.return_value.embed_queries.assert_called_once_with(["q1", "q2", "q3"])
+        mock_vector_store.similarity_search_with_score.assert_not_called()
+        assert [docs[0]["metadata"]["source"] for docs in results] == ["doc1.0.pdf", "doc2.0.pdf", "doc3.0.pdf"]
+
+    def test_retrieve_documents_batch_missing_collection(self, vector_store_service):
+        """Test that a batch against a missing collection returns empty results without embedding."""
+        mock_vector_store = MagicMock()
+        mock_vector_store.client.indices.exists.return_value = False
+
+        with patch("repository.services.vector_store_repository_service.RagEmbeddings") as mock_embeddings:
+            with patch.object(vector_store_service, "_get_vector_store_client", return_value=mock_vector_store):
+                results = vector_store_service.retrieve_documents_batch(["q1", "q2"], "missing", 5, "test-model")
+
+        assert results == [[], []]
+        mock_embeddings.return_value.embed_queries.assert_not_called()
+
     def test_validate_document_source_valid(self, vector_store_service):
         """Test validating valid S3 path."""
         s3_path = "s3://test-bucket/document.pdf"
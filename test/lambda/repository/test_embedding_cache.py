@@ -0,0 +1,194 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the content-addressed embedding cache."""
+
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+from repository import embedding_cache
+from repository.embedding_cache import (
+    DiskEmbeddingCacheBackend,
+    DynamoDBEmbeddingCacheBackend,
+    embedding_cache_key,
+    EmbeddingCache,
+    InMemoryEmbeddingCacheBackend,
+    set_embedding_cache,
+)
+
+
+def fake_embed(texts):
+    """Embed each text as [length, first code point] so vectors are easy to check."""
+    return [[float(len(text)), float(ord(text[0]))] for text in texts]
+
+
+@pytest.fixture
+def dynamodb_backend():
+    """Create an embedding cache table in moto."""
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        dynamodb.create_table(
+            TableName="embedding-cache",
+            KeySchema=[{"AttributeName": "cacheKey", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "cacheKey", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield DynamoDBEmbeddingCacheBackend("embedding-cache", dynamodb_resource=dynamodb)
+
+
+@pytest.fixture(params=["memory", "disk", "dynamodb"])
+def backend(request, tmp_path):
+    """Each embedding cache backend."""
+    if request.param == "memory":
+        return InMemoryEmbeddingCacheBackend()
+    if request.param == "disk":
+        return DiskEmbeddingCacheBackend(str(tmp_path))
+    return request.getfixturevalue("dynamodb_backend")
+
+
+class TestEmbeddingCacheKey:
+    """Test suite for content-addressed cache keys."""
+
+    def test_key_depends_on_model_and_input_type(self):
+        """Test that the same text embedded by different models or input types gets different keys."""
+        keys = {
+            embedding_cache_key("model-a", "hello"),
+            embedding_cache_key("model-b", "hello"),
+            embedding_cache_key("model-a", "hello", input_type="query"),
+        }
+
+        assert len(keys) == 3
+
+    def test_key_uses_normalized_text(self):
+        """Test that Unicode normal forms and surrounding whitespace share a key."""
+        assert embedding_cache_key("model", "café") == embedding_cache_key("model", "  café\n")
+        assert embedding_cache_key("model", "a b") != embedding_cache_key("model", "a  b")
+
+
+class TestEmbeddingCacheBackends:
+    """Test suite for storing and reading vectors in each backend."""
+
+    def test_round_trip(self, backend):
+        """Test that stored vectors are returned exactly and missing keys are omitted."""
+        backend.put_many({"k1": [0.1, -2.5, 3.0000001], "k2": [1.0]})
+
+        assert backend.get_many(["k1", "k2", "missing"]) == {"k1": [0.1, -2.5, 3.0000001], "k2": [1.0]}
+
+    def test_dynamodb_reads_in_batches(self, dynamodb_backend):
+        """Test that lookups of more than 100 keys are split into BatchGetItem calls."""
+        dynamodb_backend.put_many({f"k{i}": [float(i)] for i in range(250)})
+
+        with patch.object(
+            dynamodb_backend._dynamodb, "batch_get_item", wraps=dynamodb_backend._dynamodb.batch_get_item
+        ) as mock_batch_get:
+            vectors = dynamodb_backend.get_many([f"k{i}" for i in range(250)])
+
+        assert len(vectors) == 250
+        assert mock_batch_get.call_count == 3
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        """Test that the in-memory backend is bounded."""
+        backend = InMemoryEmbeddingCacheBackend(max_entries=2)
+        backend.put_many({"a": [1.0], "b": [2.0]})
+        backend.get_many(["a"])
+        backend.put_many({"c": [3.0]})
+
+        assert backend.get_many(["a", "b", "c"]) == {"a": [1.0], "c": [3.0]}
+
+
+class TestEmbeddingCache:
+    """Test suite for serving embeddings from the cache."""
+
+    def test_only_misses_are_computed(self, backend):
+        """Test that a second call computes only the texts not seen before."""
+        cache = EmbeddingCache(backend)
+        compute = MagicMock(side_effect=fake_embed)
+
+        first = cache.embed("model", ["alpha", "beta"], compute)
+        second = cache.embed("model", ["beta", "gamma", "alpha"], compute)
+
+        assert compute.call_args_list[0].args == (["alpha", "beta"],)
+        assert compute.call_args_list[1].args == (["gamma"],)
+        assert second == [first[1], fake_embed(["gamma"])[0], first[0]]
+        assert (cache.stats.hits, cache.stats.misses) == (2, 3)
+
+    def test_duplicate_texts_computed_once(self):
+        """Test that repeated texts within one call are embedded once."""
+        cache = EmbeddingCache(InMemoryEmbeddingCacheBackend())
+        compute = MagicMock(side_effect=fake_embed)
+
+        result = cache.embed("model", ["same", "other", "same"], compute)
+
+        compute.assert_called_once_with(["same", "other"])
+        assert result[0] == result[2]
+
+    def test_fully_cached_call_skips_compute(self):
+        """Test that the embedding endpoint is not called when every text is cached."""
+        cache = EmbeddingCache(InMemoryEmbeddingCacheBackend())
+        cache.embed("model", ["alpha"], fake_embed)
+        compute = MagicMock()
+
+        assert cache.embed("model", ["alpha"], compute) == fake_embed(["alpha"])
+        compute.assert_not_called()
+        assert cache.stats.hit_rate == 0.5
+
+    def test_backend_failure_falls_back_to_compute(self):
+        """Test that an unavailable backend does not fail embedding."""
+        backend = MagicMock()
+        backend.get_many.side_effect = Exception("table unavailable")
+        backend.put_many.side_effect = Exception("table unavailable")
+        cache = EmbeddingCache(backend)
+
+        assert cache.embed("model", ["alpha"], fake_embed) == fake_embed(["alpha"])
+
+    def test_seconds_saved_estimate(self):
+        """Test that time saved is estimated from the average cost of a miss."""
+        stats = embedding_cache.EmbeddingCacheStats(hits=30, misses=10, compute_seconds=2.0)
+
+        assert stats.seconds_saved == pytest.approx(6.0)
+        assert stats.hit_rate == 0.75
+
+
+class TestRagEmbeddingsWithCache:
+    """Test suite for RagEmbeddings using the configured cache."""
+
+    @pytest.fixture
+    def client(self):
+        from repository.embeddings import invalidate_client_config, RagEmbeddings
+
+        with patch("repository.embeddings.get_rest_api_container_endpoint", return_value="https://api"), patch(
+            "repository.embeddings.get_cert_path", return_value=True
+        ):
+            invalidate_client_config()
+            client = RagEmbeddings("test-model", id_token="user-token")
+        cache = EmbeddingCache(InMemoryEmbeddingCacheBackend())
+        set_embedding_cache(cache)
+        yield client, cache
+        set_embedding_cache(None)
+
+    def test_reingest_unchanged_corpus_hits_cache(self, client):
+        """Test that re-embedding the same documents and a repeated query make no API calls."""
+        rag_embeddings, cache = client
+        texts = [f"chunk {i}" for i in range(10)]
+
+        with patch("repository.embeddings.RagEmbeddings._embed_batch_with_retry", side_effect=fake_embed) as mock_api:
+            first = rag_embeddings.embed_documents(texts)
+            second = rag_embeddings.embed_documents(texts)
+            rag_embeddings.embed_query("chunk 3")
+
+        assert mock_api.call_count == 1
+        assert first == second
+        assert (cache.stats.hits, cache.stats.misses) == (11, 10)
@@ -0,0 +1,249 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for reusing resolved embedding client settings."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+from repository import embeddings
+from repository.embeddings import invalidate_client_config, RagEmbeddings
+
+CERT_BODY = "-----BEGIN CERTIFICATE-----\ntest\n-----END CERTIFICATE-----"
+
+
+@pytest.fixture
+def aws_settings(monkeypatch):
+    """Store the management key, API URL and server certificate in moto and count AWS calls made to read them."""
+    monkeypatch.setenv("MANAGEMENT_KEY_SECRET_NAME_PS", "/lisa/management-key-name")
+    monkeypatch.setenv("LISA_API_URL_PS_NAME", "/lisa/api-url")
+    monkeypatch.setenv("REST_API_VERSION", "v2")
+    monkeypatch.setenv("RESTAPI_SSL_CERT_ARN", "arn:aws:iam::123456789012:server-certificate/lisa-cert")
+
+    with mock_aws():
+        # Clients come from a session because some test modules leave boto3.client patched
+        session = boto3.Session(region_name="us-east-1")
+        ssm = session.client("ssm")
+        secrets = session.client("secretsmanager")
+        iam = session.client("iam")
+        ssm.put_parameter(Name="/lisa/management-key-name", Value="lisa-management-key", Type="String")
+        ssm.put_parameter(Name="/lisa/api-url", Value="https://lisa.example.com", Type="String")
+        secrets.create_secret(Name="lisa-management-key", SecretString="management-key-1")
+        iam.upload_server_certificate(
+            ServerCertificateName="lisa-cert", CertificateBody=CERT_BODY, PrivateKey="test-private-key"
+        )
+
+        calls: Counter = Counter()
+
+        def count_call(model, **kwargs):
+            calls[model.name] += 1
+
+        for client in (ssm, secrets, iam):
+            client.meta.events.register("before-call", count_call)
+
+        with patch("utilities.auth.ssm_client", ssm), patch("utilities.auth.secrets_client", secrets), patch(
+            "utilities.aws_helpers.ssm_client", ssm
+        ), patch.object(embeddings, "iam_client", iam):
+            invalidate_client_config()
+            yield SimpleNamespace(secrets=secrets, calls=calls)
+            invalidate_client_config()
+
+
+def _response(status_code, embeddings_data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {"data": [{"embedding": e} for e in embeddings_data or []]}
+    return response
+
+
+class TestEmbeddingClientConfigCache:
+    """Test suite for the process-level embedding client settings cache."""
+
+    def test_warm_constructions_make_no_aws_calls(self, aws_settings):
+        """Test that 100 constructions resolve the key, endpoint and certificate once."""
+        clients = [RagEmbeddings("test-model") for _ in range(100)]
+
+        assert aws_settings.calls == Counter({"GetParameter": 2, "GetSecretValue": 1, "GetServerCertificate": 1})
+        assert clients[-1].token == "management-key-1"
+        assert clients[-1].base_url == "https://lisa.example.com/v2/serve"
+        assert isinstance(clients[-1].cert_path, str)
+
+    def test_user_token_skips_management_key(self, aws_settings):
+        """Test that clients built with a caller's token never read the management key."""
+        for _ in range(100):
+            RagEmbeddings("test-model", id_token="user-token")
+
+        assert aws_settings.calls["GetSecretValue"] == 0
+        assert aws_settings.calls["GetParameter"] == 1
+
+    def test_settings_resolved_again_after_ttl(self, aws_settings):
+        """Test that expired settings are re-read from AWS."""
+        with patch.object(embeddings, "_client_config", embeddings.TTLCache(maxsize=3, ttl=0)):
+            RagEmbeddings("test-model")
+            RagEmbeddings("test-model")
+
+        assert aws_settings.calls["GetSecretValue"] == 2
+
+    def test_auth_failure_refreshes_management_key(self, aws_settings):
+        """Test that a rejected management key is re-read and the request retried with the new key."""
+        client = RagEmbeddings("test-model")
+        aws_settings.secrets.put_secret_value(SecretId="lisa-management-key", SecretString="management-key-2")
+        session = MagicMock()
+        session.post.side_effect = [_response(401), _response(200, [[0.1, 0.2]])]
+
+        with patch.object(embeddings, "_get_http_session", return_value=session):
+            assert client.embed_query("hello") == [0.1, 0.2]
+
+        assert session.post.call_count == 2
+        assert session.post.call_args.kwargs["headers"]["Authorization"] == "Bearer management-key-2"
+        assert RagEmbeddings("test-model").token == "management-key-2"
+
+    def test_auth_failure_with_user_token_not_retried(self, aws_settings):
+        """Test that a rejected caller token does not trigger a management key refresh."""
+        client = RagEmbeddings("test-model", id_token="user-token")
+        session = MagicMock()
+        session.post.return_value = _response(401)
+
+        with patch.object(embeddings, "_get_http_session", return_value=session), patch.object(
+            embeddings, "MAX_RETRIES", 1
+        ):
+            with pytest.raises(Exception, match="status 401"):
+                client.embed_query("hello")
+
+        assert session.post.call_count == 1
+        assert aws_settings.calls["GetSecretValue"] == 0
+
+
+class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+    """Embeds each text as [len(text)] after a fixed delay, like a slow embedding server."""
+
+    latency = 0.2
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        payload = json.dumps({"data": [{"embedding": [float(len(text))]} for text in body["input"]]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def embeddings_server():
+    """Serve a local fake embeddings endpoint."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEmbeddingsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestConcurrentEmbeddingBatches:
+    """Test suite for sending embedding batches concurrently."""
+
+    def _client(self, base_url):
+        with patch.object(embeddings, "get_rest_api_container_endpoint", return_value=base_url), patch.object(
+            embeddings, "get_cert_path", return_value=True
+        ):
+            invalidate_client_config()
+            return RagEmbeddings("test-model", id_token="user-token")
+
+    def _timed_embed(self, client, texts, concurrency):
+        with patch.object(embeddings, "MAX_EMBEDDING_BATCH_SIZE", 2), patch.object(
+            embeddings, "EMBEDDING_BATCH_CONCURRENCY", concurrency
+        ):
+            start = time.perf_counter()
+            result = client.embed_documents(texts)
+            return result, time.perf_counter() - start
+
+    def test_batches_sent_concurrently_in_order(self, embeddings_server):
+        """Test that concurrent batches finish close to linearly faster and keep input order."""
+        client = self._client(embeddings_server)
+        texts = ["x" * n for n in range(1, 17)]
+
+        sequential, sequential_time = self._timed_embed(client, texts, concurrency=1)
+        concurrent, concurrent_time = self._timed_embed(client, texts, concurrency=4)
+
+        assert concurrent == sequential == [[float(n)] for n in range(1, 17)]
+        # 8 batches: sequential takes 8 round trips, four at a time takes 2
+        assert sequential_time / concurrent_time > 3
+
+    def test_failing_batch_retried_independently(self, embeddings_server):
+        """Test that a transient failure in one batch is retried without resending the others."""
+        client = self._client(embeddings_server)
+        original = RagEmbeddings._call_embedding_api
+        failures = {"count": 0}
+
+        def flaky(self, texts, input_type=None):
+            if texts == ["ccc", "dddd"] and not failures["count"]:
+                failures["count"] += 1
+                raise Exception("transient")
+            return original(self, texts, input_type=input_type)
+
+        with patch.object(RagEmbeddings, "_call_embedding_api", flaky), patch.object(
+            embeddings, "INITIAL_BACKOFF_SECONDS", 0
+        ):
+            result, _ = self._timed_embed(client, ["a", "bb", "ccc", "dddd", "eeeee"], concurrency=3)
+
+        assert failures["count"] == 1
+        assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+
+    def test_in_flight_requests_limited_across_clients(self, embeddings_server):
+        """Test that concurrent embed calls from several clients share the process-wide request limit."""
+        session = embeddings._get_http_session()
+        lock = threading.Lock()
+        in_flight = {"now": 0, "peak": 0}
+
+        def counting_post(*args, **kwargs):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            try:
+                return session.post(*args, **kwargs)
+            finally:
+                with lock:
+                    in_flight["now"] -= 1
+
+        clients = [self._client(embeddings_server) for _ in range(3)]
+        counting_session = SimpleNamespace(post=counting_post)
+        with patch.object(embeddings, "_get_http_session", return_value=counting_session), patch.object(
+            embeddings, "_in_flight_requests", threading.BoundedSemaphore(2)
+        ), patch.object(embeddings, "MAX_EMBEDDING_BATCH_SIZE", 2), patch.object(
+            embeddings, "EMBEDDING_BATCH_CONCURRENCY", 2
+        ):
+            threads = [
+                threading.Thread(target=client.embed_documents, args=(["a", "bb", "ccc", "dddd"],))
+                for client in clients
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Three clients sending two batches at once would have six requests in flight without the limit
+        assert in_flight["peak"] == 2
@@ -0,0 +1,242 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for hybrid (full-text plus vector) search and reciprocal-rank fusion."""
+
+import json
+import math
+import os
+import re
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("RAG_DOCUMENT_TABLE", "test-doc-table")
+os.environ.setdefault("RAG_SUB_DOCUMENT_TABLE", "test-subdoc-table")
+
+from langchain_core.documents import Document
+from lisapy.evaluation import BaseEvaluator, load_golden_dataset
+from repository.hybrid_search import reciprocal_rank_fusion, resolve_hybrid_search_config
+from repository.services.opensearch_repository_service import OpenSearchRepositoryService
+from repository.services.vector_store_repository_service import VectorStoreRepositoryService
+
+FIXTURES = Path(__file__).parent / "fixtures" / "hybrid_search"
+STOPWORDS = {"a", "and", "does", "i", "is", "its", "or", "the", "then", "to", "what", "when", "why"}
+
+
+def _doc(source, text=None):
+    return Document(page_content=text or f"text of {source}", metadata={"source": source})
+
+
+def _tokens(text):
+    return [token for token in re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", text.lower()) if token not in STOPWORDS]
+
+
+class FixtureVectorStore:
+    """In-memory store over the fixture corpus.
+
+    The stand-in dense model only sees words, not identifiers: like real embedding models, it cannot tell E1042
+    from E2210. The full-text ranking counts matching query terms, identifiers included.
+    """
+
+    def __init__(self, corpus):
+        self.docs = [Document(page_content=row["text"], metadata={"source": row["source"]}) for row in corpus]
+
+    def similarity_search_with_score(self, query, k):
+        words = {token for token in _tokens(query) if not any(c.isdigit() for c in token)}
+
+        def similarity(doc):
+            doc_words = {token for token in _tokens(doc.page_content) if not any(c.isdigit() for c in token)}
+            return len(words & doc_words) / math.sqrt(len(words) * len(doc_words)) if words else 0.0
+
+        return sorted(((doc, similarity(doc)) for doc in self.docs), key=lambda pair: pair[1], reverse=True)[:k]
+
+    def lexical_search(self, query, k):
+        terms = set(_tokens(query))
+        scored = [(doc, float(len(terms & set(_tokens(doc.page_content))))) for doc in self.docs]
+        return sorted([pair for pair in scored if pair[1] > 0], key=lambda pair: pair[1], reverse=True)[:k]
+
+
+class FixtureRepositoryService(VectorStoreRepositoryService):
+    def __init__(self, repository, vector_store):
+        super().__init__(repository)
+        self.vector_store = vector_store
+
+    def _drop_collection_index(self, collection_id):
+        pass
+
+    def _get_vector_store_client(self, collection_id, embeddings):
+        return self.vector_store
+
+    def _lexical_search(self, vector_store, query, k):
+        return vector_store.lexical_search(query, k)
+
+
+class ServiceEvaluator(BaseEvaluator):
+    """Run the lisapy evaluation harness against a repository service in-process."""
+
+    def __init__(self, service, search_mode, source_map, k):
+        super().__init__(source_map=source_map, k=k)
+        self.service = service
+        self.search_mode = search_mode
+
+    def _retrieve(self, query):
+        docs = self.service.retrieve_documents(query, "fixture", self.k, "fixture-model", search_mode=self.search_mode)
+        return [doc["metadata"]["source"] for doc in docs]
+
+
+@pytest.fixture
+def fixture_store():
+    with open(FIXTURES / "corpus.jsonl") as f:
+        return FixtureVectorStore([json.loads(line) for line in f if line.strip()])
+
+
+@pytest.fixture(autouse=True)
+def mock_embeddings():
+    with patch("repository.services.vector_store_repository_service.RagEmbeddings"):
+        yield
+
+
+class TestReciprocalRankFusion:
+    """Test suite for fusing rankings."""
+
+    def test_documents_in_both_rankings_win(self):
+        """Test that a document ranked by both retrievers beats one ranked first by only one."""
+        fused = reciprocal_rank_fusion(
+            [[_doc("a"), _doc("b"), _doc("c")], [_doc("c"), _doc("d")]], weights=[1.0, 1.0], k=60
+        )
+
+        assert [doc.metadata["source"] for doc, _ in fused] == ["c", "a", "b", "d"]
+        assert fused[0][1] == pytest.approx(1 / 63 + 1 / 61)
+
+    def test_weights_favor_a_ranking(self):
+        """Test that the lexical weight can outrank the vector order."""
+        rankings = [[_doc("a"), _doc("b")], [_doc("b"), _doc("a")]]
+
+        assert reciprocal_rank_fusion(rankings, weights=[1.0, 1.0])[0][1] == pytest.approx(1 / 61 + 1 / 62)
+        assert reciprocal_rank_fusion(rankings, weights=[1.0, 2.0])[0][0].metadata["source"] == "b"
+        assert reciprocal_rank_fusion(rankings, weights=[2.0, 1.0])[0][0].metadata["source"] == "a"
+
+    def test_same_chunk_matched_across_rankings(self):
+        """Test that chunks are matched by source and content, not object identity or store ids."""
+        fused = reciprocal_rank_fusion(
+            [[Document(page_content="x", metadata={"source": "s"}, id="vector-id")], [_doc("s", "x")]],
+            weights=[1.0, 1.0],
+        )
+
+        assert len(fused) == 1
+
+    def test_weights_must_match_rankings(self):
+        """Test that a missing weight is rejected."""
+        with pytest.raises(ValueError):
+            reciprocal_rank_fusion([[_doc("a")], [_doc("b")]], weights=[1.0])
+
+
+class TestResolveHybridSearchConfig:
+    """Test suite for choosing the search mode."""
+
+    def test_repository_default(self):
+        """Test that the repository's enabled flag picks the mode when the request does not."""
+        assert resolve_hybrid_search_config({}, None) is None
+        config = resolve_hybrid_search_config({"hybridSearch": {"enabled": True, "lexicalWeight": 2}}, None)
+        assert config.lexicalWeight == 2
+
+    def test_request_overrides_repository(self):
+        """Test that a request can choose either mode."""
+        assert resolve_hybrid_search_config({"hybridSearch": {"enabled": True}}, "vector") is None
+        assert resolve_hybrid_search_config({}, "hybrid").rrfK == 60
+
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            resolve_hybrid_search_config({}, "keyword")
+
+
+class TestHybridRetrieval:
+    """Test suite for hybrid retrieve_documents."""
+
+    def test_candidates_fused_and_scored(self, fixture_store):
+        """Test that both retrievers over-fetch and fused results carry their scores."""
+        fixture_store.lexical_search = MagicMock(wraps=fixture_store.lexical_search)
+        repository = {"repositoryId": "repo", "hybridSearch": {"candidateMultiplier": 3}}
+        service = FixtureRepositoryService(repository, fixture_store)
+
+        docs = service.retrieve_documents(
+            "Order PN-55120", "fixture", 2, "model", include_score=True, search_mode="hybrid"
+        )
+
+        fixture_store.lexical_search.assert_called_once_with("Order PN-55120", 6)
+        assert docs[0]["metadata"]["source"] == "part-pn55120.txt"
+        assert docs[0]["metadata"]["hybrid_score"] > docs[1]["metadata"]["hybrid_score"]
+        assert "similarity_score" in docs[0]["metadata"]
+
+    def test_lexical_failure_falls_back_to_vector(self, fixture_store):
+        """Test that a failed full-text query returns the vector ranking."""
+        fixture_store.lexical_search = MagicMock(side_effect=RuntimeError("syntax error in tsquery"))
+        service = FixtureRepositoryService({"repositoryId": "repo"}, fixture_store)
+
+        hybrid = service.retrieve_documents("Clear error E1042", "fixture", 3, "model", search_mode="hybrid")
+        vector = service.retrieve_documents("Clear error E1042", "fixture", 3, "model", search_mode="vector")
+
+        assert hybrid == vector
+
+    def test_vector_mode_skips_full_text(self, fixture_store):
+        """Test that vector-only search does not run the full-text query."""
+        fixture_store.lexical_search = MagicMock()
+        service = FixtureRepositoryService({"repositoryId": "repo"}, fixture_store)
+
+        service.retrieve_documents("Order PN-55120", "fixture", 2, "model")
+
+        fixture_store.lexical_search.assert_not_called()
+
+    def test_hybrid_improves_fixture_evaluation(self, fixture_store):
+        """Test the lisapy evaluation harness comparing both modes on the fixture corpus."""
+        golden = load_golden_dataset(str(FIXTURES / "golden.jsonl"))
+        source_map = {entry: f"{entry}.txt" for item in golden for entry in item.expected}
+        service = FixtureRepositoryService({"repositoryId": "repo"}, fixture_store)
+
+        vector = ServiceEvaluator(service, "vector", source_map, k=2).evaluate(golden)
+        hybrid = ServiceEvaluator(service, "hybrid", source_map, k=2).evaluate(golden)
+
+        assert hybrid.recall > vector.recall
+        assert hybrid.ndcg > vector.ndcg
+        for vector_query, hybrid_query in zip(vector.per_query, hybrid.per_query):
+            if vector_query.query_type == "lexical":
+                assert hybrid_query.recall == 1.0
+            else:
+                # Fusion must not lose what the vector search already found
+                assert hybrid_query.recall >= vector_query.recall
+
+
+class TestOpenSearchFullText:
+    """Test suite for the OpenSearch full-text ranking."""
+
+    def test_match_query(self):
+        """Test that OpenSearch runs a BM25 match query on the chunk text."""
+        vector_store = MagicMock()
+        vector_store.index_name = "collection"
+        vector_store.client.search.return_value = {
+            "hits": {"hits": [{"_score": 7.5, "_source": {"text": "E2210", "metadata": {"source": "s3://b/k"}}}]}
+        }
+        service = OpenSearchRepositoryService({"repositoryId": "repo", "type": "opensearch"})
+
+        results = service._lexical_search(vector_store, "error E2210", 10)
+
+        body = vector_store.client.search.call_args.kwargs["body"]
+        assert body["query"] == {"match": {"text": "error E2210"}}
+        assert body["size"] == 10
+        assert results[0][0].page_content == "E2210"
+        assert results[0][1] == 7.5
@@ -0,0 +1,194 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the similarity search rerank stage."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+from models.domain_objects import RerankConfig
+from repository.rerankers import (
+    CrossEncoderReranker,
+    get_reranker,
+    rerank_documents,
+    rerank_documents_batch,
+    resolve_rerank_config,
+    StubReranker,
+    TermOverlapReranker,
+)
+
+DOCS = [
+    {"page_content": "How to reset a password", "metadata": {"source": "password.txt"}},
+    {"page_content": "General troubleshooting for the controller", "metadata": {"source": "general.txt"}},
+    {"page_content": "Error E2210 means the controller lost power", "metadata": {"source": "e2210.txt"}},
+]
+
+
+def _sources(docs):
+    return [doc["metadata"]["source"] for doc in docs]
+
+
+class TestRerankers:
+    """Test suite for the rerankers."""
+
+    def test_term_overlap_ranks_matching_terms_first(self):
+        """Test that the BM25 scorer favors rare query terms."""
+        scores = TermOverlapReranker().score("controller error E2210", [doc["page_content"] for doc in DOCS], 1.0)
+
+        assert scores[2] > scores[1] > scores[0] == 0.0
+
+    def test_stub_is_deterministic(self):
+        """Test that the stub gives the same scores for the same query and texts."""
+        texts = [doc["page_content"] for doc in DOCS]
+
+        assert StubReranker().score("q", texts, 1.0) == StubReranker().score("q", texts, 1.0)
+        assert StubReranker().score("q", texts, 1.0) != StubReranker().score("other", texts, 1.0)
+
+    def test_cross_encoder_request(self):
+        """Test that the cross-encoder reranker posts to the rerank route and maps scores by index."""
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        session.post.return_value.json.return_value = {
+            "results": [{"index": 1, "relevance_score": 0.9}, {"index": 0, "relevance_score": 0.2}]
+        }
+        with patch("repository.rerankers.RagEmbeddings") as mock_embeddings, patch(
+            "repository.rerankers._get_http_session", return_value=session
+        ):
+            mock_embeddings.return_value.base_url = "https://lisa/v2/serve"
+            scores = CrossEncoderReranker("bge-reranker").score("q", ["a", "b"], 0.25)
+
+        assert scores == [0.2, 0.9]
+        assert session.post.call_args.args[0] == "https://lisa/v2/serve/rerank"
+        assert session.post.call_args.kwargs["json"]["model"] == "bge-reranker"
+        assert session.post.call_args.kwargs["timeout"] == 0.25
+
+    def test_get_reranker(self):
+        """Test that the config picks the reranker."""
+        assert isinstance(get_reranker(RerankConfig()), TermOverlapReranker)
+        assert isinstance(get_reranker(RerankConfig(type="stub")), StubReranker)
+        assert get_reranker(RerankConfig(type="cross_encoder", modelName="m")).model_name == "m"
+
+    def test_cross_encoder_requires_model(self):
+        """Test that a cross-encoder config without a model is rejected."""
+        with pytest.raises(ValueError):
+            RerankConfig(type="cross_encoder")
+
+
+class TestResolveRerankConfig:
+    """Test suite for deciding whether to rerank."""
+
+    def test_repository_default(self):
+        """Test that repositories without a rerank config do not rerank unless asked."""
+        assert resolve_rerank_config({}, None) is None
+        assert resolve_rerank_config({"rerank": {"enabled": False}}, None) is None
+        assert resolve_rerank_config({"rerank": {"candidates": 30}}, None).candidates == 30
+
+    def test_request_overrides_repository(self):
+        """Test that a request can turn reranking on or off."""
+        assert resolve_rerank_config({"rerank": {"candidates": 30}}, False) is None
+        assert resolve_rerank_config({}, True).candidates == 20
+
+
+class TestRerankDocuments:
+    """Test suite for the rerank stage."""
+
+    def test_reranks_to_top_k(self):
+        """Test that candidates are reordered and cut to top_k."""
+        docs, outcome = rerank_documents(TermOverlapReranker(), "error E2210", DOCS, 2, 1.0, include_score=True)
+
+        assert _sources(docs) == ["e2210.txt", "password.txt"]
+        assert docs[0]["metadata"]["rerank_score"] > docs[1]["metadata"]["rerank_score"]
+        assert outcome.status == "reranked"
+        assert "rerank_score" not in DOCS[2]["metadata"]
+
+    def test_budget_exceeded_keeps_vector_order(self):
+        """Test that a reranker slower than the budget falls back to the original order."""
+        docs, outcome = rerank_documents(StubReranker(delay_seconds=0.5), "q", DOCS, 2, 0.05)
+
+        assert _sources(docs) == ["password.txt", "general.txt"]
+        assert outcome.status == "budget_exceeded"
+        assert outcome.latency_ms < 500
+
+    def test_failure_keeps_vector_order(self):
+        """Test that a failing reranker falls back to the original order."""
+        reranker = MagicMock()
+        reranker.score.side_effect = RuntimeError("rerank endpoint unavailable")
+
+        docs, outcome = rerank_documents(reranker, "q", DOCS, 1, 1.0)
+
+        assert _sources(docs) == ["password.txt"]
+        assert outcome.status == "failed"
+
+    def test_no_candidates(self):
+        """Test that an empty result set is returned as is."""
+        assert rerank_documents(TermOverlapReranker(), "q", [], 3, 1.0)[0] == []
+
+
+class TestRerankDocumentsBatch:
+    """Test suite for reranking the results of several queries under one budget."""
+
+    @pytest.fixture(autouse=True)
+    def executor(self):
+        # A private pool, so reranks left running past their budget do not hold up other tests
+        executor = ThreadPoolExecutor(max_workers=4)
+        with patch("repository.rerankers._executor", executor):
+            yield executor
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def test_queries_reranked_concurrently(self):
+        """Test that the queries of a batch are scored at the same time rather than one after another."""
+        queries = ["error E2210", "password", "controller", "reset"]
+
+        start = time.perf_counter()
+        reranked = rerank_documents_batch(StubReranker(delay_seconds=0.2), queries, [DOCS] * 4, 2, 2.0)
+        elapsed = time.perf_counter() - start
+
+        assert [outcome.status for _, outcome in reranked] == ["reranked"] * 4
+        assert all(len(docs) == 2 for docs, _ in reranked)
+        assert elapsed < 0.6
+
+    def test_total_rerank_time_within_budget(self):
+        """Test that the whole batch, including queries still queued for a worker, stays within one budget."""
+        budget_seconds = 0.2
+
+        start = time.perf_counter()
+        reranked = rerank_documents_batch(StubReranker(delay_seconds=0.5), ["q"] * 10, [DOCS] * 10, 2, budget_seconds)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < budget_seconds + 0.1
+        assert [outcome.status for _, outcome in reranked] == ["budget_exceeded"] * 10
+        assert all(_sources(docs) == ["password.txt", "general.txt"] for docs, _ in reranked)
+        assert all(outcome.latency_ms < (budget_seconds + 0.1) * 1000 for _, outcome in reranked)
+
+    def test_empty_and_failed_queries(self):
+        """Test that a query without candidates or with a failing rerank does not affect the others."""
+
+        def score(query, texts, timeout):
+            if query == "bad":
+                raise RuntimeError("rerank endpoint unavailable")
+            return [0.0, 0.0, 1.0]
+
+        reranker = MagicMock()
+        reranker.score.side_effect = score
+
+        reranked = rerank_documents_batch(reranker, ["ok", "empty", "bad"], [DOCS, [], DOCS], 1, 1.0)
+
+        assert [_sources(docs) for docs, _ in reranked] == [["e2210.txt"], [], ["password.txt"]]
+        assert [outcome.status for _, outcome in reranked] == ["reranked", "reranked", "failed"]
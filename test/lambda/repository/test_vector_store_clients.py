@@ -0,0 +1,256 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the process-level vector store client registry."""
+
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("RAG_DOCUMENT_TABLE", "test-doc-table")
+os.environ.setdefault("RAG_SUB_DOCUMENT_TABLE", "test-subdoc-table")
+
+from repository.services.opensearch_repository_service import OpenSearchRepositoryService
+from repository.services.pgvector_repository_service import PGVectorRepositoryService
+from repository.vector_store_clients import vector_store_client_registry, VectorStoreClientRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeVectorStore:
+    def __init__(self, connection_info, collection_id, embeddings):
+        self.connection_info = connection_info
+        self.collection_id = collection_id
+        self.embedding_function = embeddings
+        self.pool = object()
+
+
+def _embeddings(model_name="model-a", token="token"):
+    return SimpleNamespace(model_name=model_name, token=token)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def registry(clock):
+    return VectorStoreClientRegistry(config_ttl=60, max_age=3600, max_size=4, timer=clock)
+
+
+@pytest.fixture
+def repo_config():
+    """Connection info returned by a counting SSM stand-in."""
+    config = {"type": "pgvector", "dbHost": "db-1"}
+    load_config = MagicMock(side_effect=lambda: dict(config))
+    return config, load_config
+
+
+class TestVectorStoreClientRegistry:
+    """Test suite for reusing and evicting cached clients."""
+
+    def test_warm_calls_reuse_client(self, registry, repo_config):
+        """Test that repeated requests build one client and read the config once."""
+        _, load_config = repo_config
+        build = MagicMock(side_effect=FakeVectorStore)
+
+        clients = [registry.get_client("repo", "col", _embeddings(), load_config, build) for _ in range(10)]
+
+        build.assert_called_once()
+        load_config.assert_called_once()
+        assert len({id(client.pool) for client in clients}) == 1
+
+    def test_each_request_bound_to_its_embeddings(self, registry, repo_config):
+        """Test that a caller's embeddings adapter, which carries their token, is never shared."""
+        _, load_config = repo_config
+        first = registry.get_client("repo", "col", _embeddings(token="alice"), load_config, FakeVectorStore)
+        second = registry.get_client("repo", "col", _embeddings(token="bob"), load_config, FakeVectorStore)
+
+        assert first.embedding_function.token == "alice"
+        assert second.embedding_function.token == "bob"
+        assert first.pool is second.pool
+
+    def test_clients_keyed_by_collection_and_model(self, registry, repo_config):
+        """Test that different collections and embedding models get their own clients."""
+        _, load_config = repo_config
+        build = MagicMock(side_effect=FakeVectorStore)
+
+        registry.get_client("repo", "col-1", _embeddings("model-a"), load_config, build)
+        registry.get_client("repo", "col-2", _embeddings("model-a"), load_config, build)
+        registry.get_client("repo", "col-1", _embeddings("model-b"), load_config, build)
+
+        assert build.call_count == 3
+
+    def test_config_change_rebuilds_clients(self, registry, repo_config, clock):
+        """Test that a changed connection config closes the old clients once the cached config expires."""
+        config, load_config = repo_config
+        close = MagicMock()
+        old = registry.get_client("repo", "col", _embeddings(), load_config, FakeVectorStore, close)
+
+        config["dbHost"] = "db-2"
+        clock.now = 30
+        assert registry.get_client("repo", "col", _embeddings(), load_config, FakeVectorStore, close).pool is old.pool
+
+        clock.now = 61
+        new = registry.get_client("repo", "col", _embeddings(), load_config, FakeVectorStore, close)
+
+        assert new.connection_info["dbHost"] == "db-2"
+        assert new.pool is not old.pool
+        close.assert_called_once()
+
+    def test_old_clients_rebuilt(self, repo_config, clock):
+        """Test that clients past their max age are replaced even if the config is unchanged."""
+        _, load_config = repo_config
+        registry = VectorStoreClientRegistry(config_ttl=10_000, max_age=100, timer=clock)
+        build = MagicMock(side_effect=FakeVectorStore)
+
+        registry.get_client("repo", "col", _embeddings(), load_config, build)
+        clock.now = 101
+        registry.get_client("repo", "col", _embeddings(), load_config, build)
+
+        assert build.call_count == 2
+
+    def test_oldest_client_closed_when_full(self, registry, repo_config):
+        """Test that the registry is bounded."""
+        _, load_config = repo_config
+        close = MagicMock()
+
+        for i in range(5):
+            registry.get_client("repo", f"col-{i}", _embeddings(), load_config, FakeVectorStore, close)
+
+        assert len(registry) == 4
+        assert close.call_args.args[0].collection_id == "col-0"
+
+    def test_evict_collection(self, registry, repo_config):
+        """Test that evicting a collection keeps the repository's other clients and cached config."""
+        _, load_config = repo_config
+        build = MagicMock(side_effect=FakeVectorStore)
+        registry.get_client("repo", "col-1", _embeddings(), load_config, build)
+        registry.get_client("repo", "col-2", _embeddings(), load_config, build)
+
+        registry.evict("repo", "col-1")
+        registry.get_client("repo", "col-1", _embeddings(), load_config, build)
+        registry.get_client("repo", "col-2", _embeddings(), load_config, build)
+
+        assert build.call_count == 3
+        load_config.assert_called_once()
+
+    def test_failed_config_read_not_cached(self, registry):
+        """Test that an unregistered repository is looked up again on the next request."""
+        load_config = MagicMock(side_effect=ValueError("Repository 'repo' is not registered."))
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                registry.get_client("repo", "col", _embeddings(), load_config, FakeVectorStore)
+
+        assert load_config.call_count == 2
+
+
+@pytest.fixture
+def clear_registry():
+    vector_store_client_registry.clear()
+    yield
+    vector_store_client_registry.clear()
+
+
+def _fake_client(**kwargs):
+    return SimpleNamespace(client=MagicMock(), embedding_function=kwargs["embedding_function"])
+
+
+def _ssm_with(connection_info):
+    ssm = MagicMock()
+    ssm.get_parameter.return_value = {"Parameter": {"Value": json.dumps(connection_info)}}
+    return ssm
+
+
+class TestRepositoryServicesUseRegistry:
+    """Test suite for the PGVector and OpenSearch services reusing cached clients."""
+
+    def test_pgvector_client_built_once(self, clear_registry):
+        """Test that warm PGVector requests skip SSM, Secrets Manager and engine creation."""
+        connection_info = {"type": "pgvector", "dbHost": "db", "dbPort": 5432, "dbName": "rag", "username": "u"}
+        connection_info["passwordSecretId"] = "secret"
+        secrets = MagicMock()
+        secrets.get_secret_value.return_value = {"SecretString": json.dumps({"password": "p"})}
+        ssm = _ssm_with(connection_info)
+        service = PGVectorRepositoryService({"repositoryId": "pg-repo", "type": "pgvector"})
+        module = "repository.services.pgvector_repository_service"
+
+        with patch(f"{module}.ssm_client", ssm), patch(f"{module}.secretsmanager_client", secrets), patch(
+            f"{module}.PGVector", side_effect=_fake_client
+        ) as mock_pgvector, patch(f"{module}.sqlalchemy.create_engine") as mock_create_engine:
+            for _ in range(5):
+                service._get_vector_store_client("col", _embeddings())
+
+        ssm.get_parameter.assert_called_once()
+        secrets.get_secret_value.assert_called_once()
+        mock_create_engine.assert_called_once()
+        assert mock_create_engine.call_args.kwargs["pool_pre_ping"] is True
+        mock_pgvector.assert_called_once()
+        assert mock_pgvector.call_args.kwargs["connection"] is mock_create_engine.return_value
+
+    def test_pgvector_iam_connections_use_current_token(self, clear_registry):
+        """Test that each new pooled connection asks the token provider for a token."""
+        connection_info = {"type": "pgvector", "dbHost": "db", "dbPort": 5432, "dbName": "rag"}
+        service = PGVectorRepositoryService({"repositoryId": "pg-iam-repo", "type": "pgvector"})
+        module = "repository.services.pgvector_repository_service"
+        provider = MagicMock(side_effect=["token-1", "token-2"])
+
+        with patch(f"{module}.ssm_client", _ssm_with(connection_info)), patch(
+            f"{module}.get_lambda_role_name", return_value="role"
+        ), patch(f"{module}.IamAuthTokenProvider", return_value=provider), patch(
+            f"{module}.PGVector", side_effect=_fake_client
+        ), patch(
+            f"{module}.sqlalchemy.create_engine"
+        ) as mock_create_engine, patch(
+            f"{module}.sqlalchemy.event.listen"
+        ) as mock_listen:
+            service._get_vector_store_client("col", _embeddings())
+
+        assert "sslmode=require" in mock_create_engine.call_args.args[0]
+        engine, event_name, set_token = mock_listen.call_args.args
+        assert (engine, event_name) == (mock_create_engine.return_value, "do_connect")
+        cparams: dict = {}
+        set_token(None, None, [], cparams)
+        assert cparams["password"] == "token-2"
+
+    def test_opensearch_client_built_once(self, clear_registry):
+        """Test that warm OpenSearch requests reuse one client and its connection pool."""
+        ssm = _ssm_with({"type": "opensearch", "endpoint": "search.example.com"})
+        service = OpenSearchRepositoryService({"repositoryId": "os-repo", "type": "opensearch"})
+        module = "repository.services.opensearch_repository_service"
+
+        with patch(f"{module}.ssm_client", ssm), patch(f"{module}.AWS4Auth") as mock_auth, patch(
+            f"{module}.OpenSearchVectorSearch", side_effect=_fake_client
+        ) as mock_opensearch:
+            first = service._get_vector_store_client("Col", _embeddings(token="alice"))
+            second = service._get_vector_store_client("Col", _embeddings(token="bob"))
+
+        ssm.get_parameter.assert_called_once()
+        mock_opensearch.assert_called_once()
+        assert mock_opensearch.call_args.kwargs["index_name"] == "col"
+        assert "refreshable_credentials" in mock_auth.call_args.kwargs
+        assert first.client is second.client
+        assert second.embedding_function.token == "bob"
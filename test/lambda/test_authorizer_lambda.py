@@ -13,17 +13,21 @@
 #   limitations under the License.
 
 import functools
+import hashlib
 import json
 import os
 import sys
+import time
 from types import SimpleNamespace
 from unittest.mock import call, MagicMock, patch
 
 import boto3
 import jwt
 import pytest
+import requests
 from botocore.config import Config
 from botocore.exceptions import ClientError
+from cryptography.hazmat.primitives.asymmetric import rsa
 from moto import mock_aws
 
 # Add the lambda directory to the Python path
@@ -91,13 +95,15 @@ patch("utilities.common_functions.retry_config", retry_config).start()
 patch("utilities.common_functions.authorization_wrapper", mock_authorization_wrapper).start()
 
 # Now import the lambda functions
-from authorizer.lambda_functions import (
+import authorizer.lambda_functions as authorizer_module  # noqa: E402
+from authorizer.lambda_functions import (  # noqa: E402
     find_jwt_username,
     generate_policy,
     get_management_tokens,
     id_token_is_valid,
     is_valid_api_token,
     lambda_handler,
+    OidcSigningKeyCache,
 )
 
 
@@ -121,7 +127,9 @@ def token_table(dynamodb):
         ],
         ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
     )
-    return table
+    authorizer_module.token_cache.clear()
+    yield table
+    authorizer_module.token_cache.clear()
 
 
 @pytest.fixture
@@ -163,6 +171,66 @@ def sample_jwt_data():
     return {"sub": "test-user-id", "username": "test-user", "groups": ["test-group"], "nested": {"property": "value"}}
 
 
+class OidcProviderStub:
+    """Local stand-in for an identity provider's discovery and JWKS endpoints that counts fetches."""
+
+    def __init__(self, authority="https://test-authority"):
+        self.authority = authority
+        self.jwks_uri = f"{authority}/.well-known/jwks.json"
+        self.keys = {}
+        self.fetches = {"metadata": 0, "jwks": 0}
+        self.verify = []
+        self.status_code = 200
+        self.add_key("key-1")
+
+    def add_key(self, kid):
+        """Generate an RSA key pair and publish its public key under ``kid``."""
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.keys[kid] = private_key
+        return private_key
+
+    def token(self, kid="key-1", private_key=None, **claims):
+        """Sign an ID token for the test client."""
+        now = int(time.time())
+        payload = {
+            "sub": "test-user-id",
+            "iss": self.authority,
+            "aud": "test-client-id",
+            "iat": now,
+            "exp": now + 300,
+            **claims,
+        }
+        return jwt.encode(payload, private_key or self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    def get(self, url, verify=True, timeout=None):
+        self.verify.append(verify)
+        response = MagicMock()
+        response.status_code = self.status_code
+        if url == f"{self.authority}/.well-known/openid-configuration":
+            self.fetches["metadata"] += 1
+            response.json.return_value = {"issuer": self.authority, "jwks_uri": self.jwks_uri}
+        elif url == self.jwks_uri:
+            self.fetches["jwks"] += 1
+            keys = []
+            for kid, private_key in self.keys.items():
+                jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+                keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+            response.json.return_value = {"keys": keys}
+        else:
+            response.status_code = 404
+        return response
+
+
+@pytest.fixture
+def oidc_provider():
+    """Serve OIDC discovery and JWKS from a local stub, with an empty signing key cache."""
+    provider = OidcProviderStub()
+    authorizer_module._signing_key_caches.clear()
+    with patch("authorizer.lambda_functions.requests.get", side_effect=provider.get):
+        yield provider
+    authorizer_module._signing_key_caches.clear()
+
+
 def test_generate_policy():
     """Test the generate_policy function."""
     # Test allow policy
@@ -298,70 +366,53 @@ def test_get_management_tokens():
         assert tokens == []
 
 
-@patch("authorizer.lambda_functions.requests.get")
-@patch("authorizer.lambda_functions.jwt.PyJWKClient")
-@patch("authorizer.lambda_functions.jwt.decode")
-@patch("authorizer.lambda_functions.jwt.algorithms.has_crypto", True)
-@patch("authorizer.lambda_functions.ssl.create_default_context")
-@patch("authorizer.lambda_functions.os.getenv")
-def test_id_token_is_valid(
-    mock_getenv, mock_create_default_context, mock_jwt_decode, mock_PyJWKClient, mock_requests_get
-):
+def test_id_token_is_valid(oidc_provider):
     """Test the id_token_is_valid function."""
-    # Mock the getenv return value for SSL_CERT_FILE
-    mock_getenv.return_value = None
-
-    # Mock the response from OIDC well-known endpoint
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "jwks_uri": "https://test-authority/.well-known/jwks.json",
-    }
-    mock_requests_get.return_value = mock_response
-
-    # Mock the SSL context
-    mock_ctx = MagicMock()
-    mock_create_default_context.return_value = mock_ctx
-
-    # Mock the JWT client
-    mock_jwks_client = MagicMock()
-    mock_signing_key = MagicMock()
-    mock_signing_key.key = "test-key"
-    mock_jwks_client.get_signing_key_from_jwt.return_value = mock_signing_key
-    mock_PyJWKClient.return_value = mock_jwks_client
-
-    # Mock the JWT decode return value
-    jwt_data = {
-        "sub": "test-user-id",
-        "username": "test-user",
-    }
-    mock_jwt_decode.return_value = jwt_data
-
     # Test successful token validation
-    result = id_token_is_valid(id_token="test-token", client_id="test-client-id", authority="https://test-authority")
-    assert result == jwt_data
-
-    # Test when OIDC metadata response is not 200
-    mock_response.status_code = 404
-    result = id_token_is_valid(id_token="test-token", client_id="test-client-id", authority="https://test-authority")
-    assert result is None
-
-    # Reset status code for the next test
-    mock_response.status_code = 200
+    result = id_token_is_valid(
+        id_token=oidc_provider.token(), client_id="test-client-id", authority="https://test-authority"
+    )
+    assert result["sub"] == "test-user-id"
 
     # Test when JWT verification fails
-    mock_jwt_decode.side_effect = jwt.exceptions.PyJWTError("Invalid token")
-    result = id_token_is_valid(id_token="test-token", client_id="test-client-id", authority="https://test-authority")
+    result = id_token_is_valid(
+        id_token=oidc_provider.token(aud="other-client"), client_id="test-client-id", authority="https://test-authority"
+    )
     assert result is None
 
     # Test when has_crypto is False (using a with statement to isolate the patch)
     with patch("authorizer.lambda_functions.jwt.algorithms.has_crypto", False):
         result = id_token_is_valid(
-            id_token="test-token", client_id="test-client-id", authority="https://test-authority"
+            id_token=oidc_provider.token(), client_id="test-client-id", authority="https://test-authority"
         )
         assert result is None
 
 
+def test_id_token_is_valid_metadata_unavailable(oidc_provider):
+    """Test that a token is rejected when OIDC metadata cannot be fetched and no keys are cached."""
+    oidc_provider.status_code = 404
+
+    result = id_token_is_valid(
+        id_token=oidc_provider.token(), client_id="test-client-id", authority="https://test-authority"
+    )
+
+    assert result is None
+
+
+@patch("authorizer.lambda_functions.os.getenv")
+def test_id_token_is_valid_with_cert_path(mock_getenv, oidc_provider):
+    """Test the id_token_is_valid function with a certificate path."""
+    mock_getenv.return_value = "/path/to/cert.pem"
+
+    result = id_token_is_valid(
+        id_token=oidc_provider.token(), client_id="test-client-id", authority="https://test-authority"
+    )
+
+    assert result["sub"] == "test-user-id"
+    # Verify cert_path was used to verify both OIDC requests
+    assert oidc_provider.verify == ["/path/to/cert.pem", "/path/to/cert.pem"]
+
+
 @patch("authorizer.lambda_functions.get_management_tokens")
 @patch("authorizer.lambda_functions.is_valid_api_token")
 @patch("authorizer.lambda_functions.id_token_is_valid")
@@ -616,47 +667,6 @@ def test_lambda_handler_without_token(
     mock_common.get_id_token.return_value = "test-token"
 
 
-@patch("authorizer.lambda_functions.requests.get")
-@patch("authorizer.lambda_functions.jwt.PyJWKClient")
-@patch("authorizer.lambda_functions.jwt.decode")
-@patch("authorizer.lambda_functions.jwt.algorithms.has_crypto", True)
-@patch("authorizer.lambda_functions.ssl.create_default_context")
-@patch("authorizer.lambda_functions.os.getenv")
-def test_id_token_is_valid_with_cert_path(
-    mock_getenv, mock_create_default_context, mock_jwt_decode, mock_PyJWKClient, mock_requests_get
-):
-    """Test the id_token_is_valid function with a certificate path."""
-    # Configure the mock
-    mock_context = MagicMock()
-    mock_create_default_context.return_value = mock_context
-
-    # Mock response from requests.get
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"jwks_uri": "https://test-authority/jwks"}
-    mock_requests_get.return_value = mock_response
-
-    # Set up environment variable to provide a cert path
-    mock_getenv.return_value = "/path/to/cert.pem"
-
-    # Set up JWT decode
-    mock_signing_key = MagicMock()
-    mock_signing_key.key = "test-key"
-    mock_jwks_client = MagicMock()
-    mock_jwks_client.get_signing_key_from_jwt.return_value = mock_signing_key
-    mock_PyJWKClient.return_value = mock_jwks_client
-
-    mock_jwt_decode.return_value = {"sub": "test-user-id"}
-
-    # Call the function
-    result = id_token_is_valid(id_token="test-token", client_id="test-client-id", authority="https://test-authority")
-
-    # Assertions
-    assert result == {"sub": "test-user-id"}
-    # Verify cert_path was used to load verify locations
-    mock_context.load_verify_locations.assert_called_once_with("/path/to/cert.pem")
-
-
 def test_get_management_tokens_client_error():
     """Test the get_management_tokens function when ClientError is raised."""
     # Set up the ClientError to be raised
@@ -812,3 +822,133 @@ def test_get_management_tokens_previous_exception():
             # Assertions
             assert result == ["current-token"]  # Only should have the current token
             assert mock_secrets_manager.get_secret_value.call_count == 2
+
+
+class TestOidcSigningKeyCache:
+    """Test suite for caching OIDC discovery and signing keys across invocations."""
+
+    def _validate(self, token):
+        return id_token_is_valid(id_token=token, client_id="test-client-id", authority="https://test-authority")
+
+    def test_keys_fetched_once_across_invocations(self, oidc_provider):
+        """Test that warm invocations reuse the discovery document and signing keys."""
+        for _ in range(20):
+            assert self._validate(oidc_provider.token()) is not None
+
+        assert oidc_provider.fetches == {"metadata": 1, "jwks": 1}
+
+    def test_unknown_kid_triggers_refresh(self, oidc_provider):
+        """Test that a token signed with a newly rotated key is accepted after one refresh."""
+        assert self._validate(oidc_provider.token()) is not None
+        oidc_provider.add_key("key-2")
+        authorizer_module._signing_key_caches["https://test-authority"]._attempted_at -= 3600
+
+        assert self._validate(oidc_provider.token(kid="key-2")) is not None
+        assert oidc_provider.fetches == {"metadata": 2, "jwks": 2}
+
+    def test_unknown_kid_refresh_is_throttled(self, oidc_provider):
+        """Test that repeated unknown key IDs do not each refetch the keys."""
+        assert self._validate(oidc_provider.token()) is not None
+        forged_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+        for i in range(10):
+            assert self._validate(oidc_provider.token(kid=f"unknown-{i}", private_key=forged_key)) is None
+
+        assert oidc_provider.fetches == {"metadata": 1, "jwks": 1}
+
+    def test_expired_keys_refreshed(self, oidc_provider):
+        """Test that keys are refetched once the cache TTL has passed."""
+        cache = OidcSigningKeyCache("https://test-authority", ttl=0, min_refresh_interval=0)
+
+        cache.get_signing_key("key-1")
+        cache.get_signing_key("key-1")
+
+        assert oidc_provider.fetches == {"metadata": 2, "jwks": 2}
+
+    def test_stale_keys_used_when_provider_unreachable(self, oidc_provider):
+        """Test that cached keys keep working while the identity provider is down."""
+        cache = OidcSigningKeyCache("https://test-authority", ttl=0, min_refresh_interval=0)
+        key = cache.get_signing_key("key-1")
+        oidc_provider.status_code = 503
+
+        assert cache.get_signing_key("key-1") is key
+        with patch("authorizer.lambda_functions.requests.get", side_effect=requests.ConnectionError("down")):
+            assert cache.get_signing_key("key-1") is key
+
+    def test_cold_cache_fails_when_provider_unreachable(self, oidc_provider):
+        """Test that a cold cache surfaces the fetch error."""
+        oidc_provider.status_code = 503
+        cache = OidcSigningKeyCache("https://test-authority")
+
+        with pytest.raises(jwt.exceptions.PyJWKClientConnectionError):
+            cache.get_signing_key("key-1")
+
+
+class TestApiTokenCache:
+    """Test suite for caching token table lookups across invocations."""
+
+    def _put_token(self, table, token, expiration):
+        table.put_item(
+            Item={
+                "token": hashlib.sha256(token.encode()).hexdigest(),
+                "tokenUUID": "test-uuid",
+                "tokenExpiration": expiration,
+                "username": "service-user",
+            }
+        )
+
+    def test_valid_token_read_once(self, token_table):
+        """Test that repeated requests with the same token read the table once."""
+        self._put_token(token_table, "service-token", int(time.time()) + 3600)
+        with patch("authorizer.lambda_functions.token_table", token_table), patch(
+            "authorizer.lambda_functions._get_token_info", wraps=authorizer_module._get_token_info
+        ) as mock_get_token_info:
+            hits = authorizer_module.token_cache_stats["hits"]
+            for _ in range(10):
+                assert is_valid_api_token("service-token")["username"] == "service-user"
+
+        assert mock_get_token_info.call_count == 1
+        assert authorizer_module.token_cache_stats["hits"] - hits == 9
+
+    def test_unknown_token_negatively_cached(self, token_table):
+        """Test that unknown tokens are cached so repeated misses skip the table."""
+        with patch("authorizer.lambda_functions.token_table", token_table), patch(
+            "authorizer.lambda_functions._get_token_info", wraps=authorizer_module._get_token_info
+        ) as mock_get_token_info:
+            misses = authorizer_module.token_cache_stats["misses"]
+            assert is_valid_api_token("unknown-token") is None
+            assert is_valid_api_token("unknown-token") is None
+
+        assert mock_get_token_info.call_count == 1
+        assert authorizer_module.token_cache_stats["misses"] - misses == 1
+
+    def test_negative_entry_expires(self, token_table):
+        """Test that a token created after a miss is found once the negative entry expires."""
+        with patch("authorizer.lambda_functions.token_table", token_table), patch(
+            "authorizer.lambda_functions.API_TOKEN_NEGATIVE_CACHE_TTL", 0
+        ):
+            assert is_valid_api_token("new-token") is None
+            self._put_token(token_table, "new-token", int(time.time()) + 3600)
+            assert is_valid_api_token("new-token") is not None
+
+    def test_cache_entry_bounded_by_token_expiration(self):
+        """Test that a cached token does not outlive its own expiration."""
+        now = time.time()
+        ttu = authorizer_module._token_cache_ttu
+
+        assert ttu("hash", {"tokenExpiration": now + 5}, now) == now + 5
+        assert ttu("hash", {"tokenExpiration": now + 86400}, now) == now + authorizer_module.API_TOKEN_CACHE_TTL
+        assert ttu("hash", authorizer_module._TOKEN_NOT_FOUND, now) == (
+            now + authorizer_module.API_TOKEN_NEGATIVE_CACHE_TTL
+        )
+
+    def test_cache_metrics_emitted(self, token_table, capsys):
+        """Test that hits and misses are written as CloudWatch embedded metrics."""
+        self._put_token(token_table, "service-token", int(time.time()) + 3600)
+        with patch("authorizer.lambda_functions.token_table", token_table):
+            is_valid_api_token("service-token")
+            is_valid_api_token("service-token")
+
+        metrics = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+        assert [(m["TokenCacheHit"], m["TokenCacheMiss"]) for m in metrics] == [(0, 1), (1, 0)]
+        assert metrics[0]["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "LISA/Authorizer"
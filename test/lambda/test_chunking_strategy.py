@@ -16,18 +16,41 @@
 """Unit tests for chunking strategy implementations."""
 
 import json
+import random
 import sys
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from langchain_core.documents import Document
-from models.domain_objects import ChunkingStrategyType, FixedChunkingStrategy, NoneChunkingStrategy
-from utilities.chunking_strategy_factory import ChunkingStrategyFactory, FixedSizeChunkingHandler, NoneChunkingHandler
+from models.domain_objects import (
+    ChunkingStrategyType,
+    FixedChunkingStrategy,
+    IngestionJob,
+    NoneChunkingStrategy,
+    StructuredChunkingStrategy,
+    TokenChunkingStrategy,
+)
+from utilities.chunking_strategy_factory import (
+    ChunkingStrategyFactory,
+    FixedSizeChunkingHandler,
+    get_token_counter,
+    NoneChunkingHandler,
+    StructuredChunkingHandler,
+    TokenChunkingHandler,
+)
+from utilities.exceptions import RagUploadException
 
 # Add parent directory to path for imports
 sys.path.insert(0, "..")
 
 
+def _word_encoding():
+    """Return a stand-in tiktoken encoding with one token per whitespace-separated word."""
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text, disallowed_special=(): text.split()
+    return encoding
+
+
 class TestChunkingStrategySchemas(unittest.TestCase):
     """Test chunking strategy schema validation and serialization."""
 
@@ -69,6 +92,34 @@ class TestChunkingStrategySchemas(unittest.TestCase):
 
         self.assertIn("overlap", str(context.exception).lower())
 
+    def test_token_strategy_defaults_to_cl100k(self):
+        """Test TOKEN strategy counts tokens with cl100k_base unless told otherwise."""
+        strategy = TokenChunkingStrategy(size=512, overlap=64)
+
+        self.assertEqual(strategy.type, ChunkingStrategyType.TOKEN)
+        self.assertEqual(strategy.encoding, "cl100k_base")
+        with self.assertRaises(ValueError):
+            TokenChunkingStrategy(size=512, overlap=300)
+
+    def test_strategy_selected_by_type(self):
+        """Test a chunking strategy parses to the model named by its type, and to FIXED without one."""
+
+        def parse(chunk_strategy):
+            return IngestionJob(
+                repository_id="repo",
+                collection_id="collection",
+                s3_path="s3://bucket/key",
+                embedding_model="model",
+                username="user",
+                chunk_strategy=chunk_strategy,
+            ).chunk_strategy
+
+        self.assertIsInstance(parse({"type": "token", "size": 256, "overlap": 32}), TokenChunkingStrategy)
+        self.assertIsInstance(parse({"type": "structured", "size": 256, "overlap": 0}), StructuredChunkingStrategy)
+        self.assertIsInstance(parse({"type": "fixed", "size": 256, "overlap": 32}), FixedChunkingStrategy)
+        self.assertIsInstance(parse({"size": 256, "overlap": 32}), FixedChunkingStrategy)
+        self.assertIsInstance(parse({"type": "none"}), NoneChunkingStrategy)
+
     def test_invalid_strategy_type_rejected(self):
         """Test that invalid strategy types are rejected."""
         # This test verifies enum validation
@@ -172,8 +223,10 @@ class TestChunkingStrategyFactory(unittest.TestCase):
         strategies = ChunkingStrategyFactory.get_supported_strategies()
 
         self.assertIn(ChunkingStrategyType.FIXED, strategies)
+        self.assertIn(ChunkingStrategyType.TOKEN, strategies)
+        self.assertIn(ChunkingStrategyType.STRUCTURED, strategies)
         self.assertIn(ChunkingStrategyType.NONE, strategies)
-        self.assertEqual(len(strategies), 2)
+        self.assertEqual(len(strategies), 4)
 
     def test_unsupported_strategy_raises_error(self):
         """Test factory raises error for unsupported strategy type."""
@@ -187,6 +240,141 @@ class TestChunkingStrategyFactory(unittest.TestCase):
         self.assertIn("Unsupported chunking strategy", str(context.exception))
 
 
+@patch("utilities.chunking_strategy_factory.tiktoken.get_encoding", new=lambda name: _word_encoding())
+class TestTokenChunkingHandler(unittest.TestCase):
+    """Test chunking with sizes in tokens."""
+
+    def test_handler_registered(self):
+        """Test TOKEN handler is registered in factory."""
+        self.assertIsInstance(ChunkingStrategyFactory._handlers[ChunkingStrategyType.TOKEN], TokenChunkingHandler)
+
+    def test_chunks_fit_token_budget(self):
+        """Test chunks hold up to size tokens however long the words are."""
+        strategy = TokenChunkingStrategy(size=50, overlap=5)
+        text = " ".join(f"word{i}" * (1 + i % 9) for i in range(1000))
+
+        result = ChunkingStrategyFactory.chunk_documents([Document(page_content=text, metadata={"a": 1})], strategy)
+
+        self.assertGreater(len(result), 20)
+        self.assertTrue(all(len(doc.page_content.split()) <= 50 for doc in result))
+        self.assertGreater(len(result[0].page_content), 200)
+        self.assertEqual(result[0].metadata, {"a": 1})
+
+    def test_stream_matches_whole_document(self):
+        """Test streamed token chunks of paragraph-separated text match chunking the joined text."""
+        strategy = TokenChunkingStrategy(size=60, overlap=6)
+        blocks = [f"Paragraph {i} " + "word " * (i % 37) + "\n\n" for i in range(500)]
+        whole = ChunkingStrategyFactory.chunk_documents([Document(page_content="".join(blocks))], strategy)
+
+        streamed = list(ChunkingStrategyFactory.chunk_stream(iter(blocks), {}, strategy))
+
+        self.assertEqual([doc.page_content for doc in streamed], [doc.page_content for doc in whole])
+
+    def test_special_tokens_counted_as_text(self):
+        """Test special-token markers in a document are counted rather than rejected."""
+        encoding = _word_encoding()
+        with patch("utilities.chunking_strategy_factory.tiktoken.get_encoding", return_value=encoding):
+            self.assertEqual(get_token_counter("cl100k_base")("a <|endoftext|> b"), 3)
+
+        encoding.encode.assert_called_once_with("a <|endoftext|> b", disallowed_special=())
+
+    def test_unavailable_encoding_raises_upload_error(self):
+        """Test an encoding that cannot be loaded is reported as an upload error."""
+        with patch("utilities.chunking_strategy_factory.tiktoken.get_encoding", side_effect=ValueError("unknown")):
+            with self.assertRaises(RagUploadException):
+                get_token_counter("not_an_encoding")
+
+
+@patch("utilities.chunking_strategy_factory.tiktoken.get_encoding", new=lambda name: _word_encoding())
+class TestStructuredChunkingHandler(unittest.TestCase):
+    """Test chunking along document structure."""
+
+    def test_handler_registered(self):
+        """Test STRUCTURED handler is registered in factory."""
+        handler = ChunkingStrategyFactory._handlers[ChunkingStrategyType.STRUCTURED]
+        self.assertIsInstance(handler, StructuredChunkingHandler)
+
+    def test_paragraphs_packed_within_budget(self):
+        """Test whole paragraphs are packed into chunks without splitting any of them."""
+        strategy = StructuredChunkingStrategy(size=60, overlap=0)
+        paragraphs = [f"p{i} " + "word " * 20 for i in range(10)]
+        doc = Document(page_content="\n\n".join(paragraphs), metadata={"heading": "Intro"})
+
+        result = ChunkingStrategyFactory.chunk_documents([doc], strategy)
+
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result[0].page_content, "\n\n".join(p.strip() for p in paragraphs[:2]))
+        self.assertTrue(all(len(chunk.page_content.split()) <= 60 for chunk in result))
+        self.assertTrue(all(chunk.metadata == {"heading": "Intro"} for chunk in result))
+
+    def test_chunks_never_span_documents(self):
+        """Test sections are chunked separately even when they would fit in one chunk together."""
+        strategy = StructuredChunkingStrategy(size=500, overlap=0)
+        docs = [Document(page_content=f"Page {n} text", metadata={"page": n}) for n in (1, 2, 3)]
+
+        result = ChunkingStrategyFactory.chunk_documents(docs, strategy)
+
+        self.assertEqual([chunk.page_content for chunk in result], ["Page 1 text", "Page 2 text", "Page 3 text"])
+        self.assertEqual([chunk.metadata["page"] for chunk in result], [1, 2, 3])
+
+    def test_long_paragraph_split_with_overlap(self):
+        """Test a paragraph longer than the budget is split into overlapping pieces on its own."""
+        strategy = StructuredChunkingStrategy(size=50, overlap=10)
+        long_paragraph = " ".join(f"w{i}" for i in range(200))
+        doc = Document(page_content=f"Short intro\n\n{long_paragraph}\n\nShort outro")
+
+        result = [chunk.page_content for chunk in ChunkingStrategyFactory.chunk_documents([doc], strategy)]
+
+        self.assertEqual(result[0], "Short intro")
+        self.assertEqual(result[-1], "Short outro")
+        self.assertTrue(all(len(chunk.split()) <= 50 for chunk in result))
+        self.assertEqual(result[1].split()[-10:], result[2].split()[:10])
+
+
+class TestChunkStream(unittest.TestCase):
+    """Test chunking text that arrives in blocks."""
+
+    def test_fixed_stream_matches_whole_document(self):
+        """Test streamed fixed-size chunks of paragraph-separated text match chunking the joined text."""
+        strategy = FixedChunkingStrategy(size=200, overlap=20)
+        blocks = [f"Paragraph {i} " + "word " * (i % 37) + "\n\n" for i in range(2000)]
+        whole = ChunkingStrategyFactory.chunk_documents([Document(page_content="".join(blocks))], strategy)
+
+        streamed = list(ChunkingStrategyFactory.chunk_stream(iter(blocks), {"source": "s3://b/k"}, strategy))
+
+        self.assertEqual([doc.page_content for doc in streamed], [doc.page_content for doc in whole])
+        self.assertEqual(streamed[0].metadata, {"source": "s3://b/k"})
+        self.assertIsNot(streamed[0].metadata, streamed[1].metadata)
+
+    def test_fixed_stream_mixed_separators_covers_text(self):
+        """Test streamed chunks of text with mixed separators, split mid-word into blocks, stay within the limits."""
+        strategy = FixedChunkingStrategy(size=200, overlap=20)
+        rng = random.Random(0)
+        text = "".join(f"w{i}" + rng.choice([" ", " ", "\n", "\n\n", ". "]) for i in range(20000))
+        cuts = [0]
+        while cuts[-1] < len(text):
+            cuts.append(cuts[-1] + rng.randint(50, 3000))
+        blocks = [text[start:end] for start, end in zip(cuts, cuts[1:])]
+
+        streamed = [doc.page_content for doc in ChunkingStrategyFactory.chunk_stream(iter(blocks), {}, strategy)]
+
+        self.assertTrue(all(len(chunk) <= 200 for chunk in streamed))
+        # Every chunk is a piece of the text, in order, and together they leave out nothing but whitespace
+        covered = [False] * len(text)
+        position = 0
+        for chunk in streamed:
+            position = text.find(chunk, position)
+            self.assertGreaterEqual(position, 0)
+            covered[position : position + len(chunk)] = [True] * len(chunk)
+        self.assertTrue(all(covered[i] or text[i].isspace() for i in range(len(text))))
+
+    def test_none_stream_joins_blocks(self):
+        """Test handlers without incremental chunking get the whole text."""
+        result = list(ChunkingStrategyFactory.chunk_stream(["a ", "b"], {}, NoneChunkingStrategy()))
+
+        self.assertEqual([doc.page_content for doc in result], ["a b"])
+
+
 class TestBackwardCompatibility(unittest.TestCase):
     """Test backward compatibility with existing FIXED strategy."""
 
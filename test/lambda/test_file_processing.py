@@ -16,6 +16,7 @@
 
 import os
 import sys
+import tracemalloc
 from io import BytesIO
 from unittest.mock import MagicMock, patch
 
@@ -41,9 +42,11 @@ from models.domain_objects import (
     IngestionJob,
     IngestionStatus,
     IngestionType,
+    StructuredChunkingStrategy,
 )
+from utilities import file_processing
 from utilities.exceptions import RagUploadException
-from utilities.file_processing import generate_chunks
+from utilities.file_processing import generate_chunks, iter_chunks
 
 
 @pytest.fixture
@@ -63,6 +66,43 @@ def sample_ingestion_job():
     )
 
 
+def _write_pdf(path, pages, image_bytes=0):
+    """Write a PDF with a line of text and an uncompressed image_bytes-byte image on every page, one page at a time."""
+    offsets = []
+    with open(path, "wb") as f:
+
+        def write_object(body):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (len(offsets), body))
+
+        f.write(b"%PDF-1.4\n")
+        write_object(b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = b" ".join(b"%d 0 R" % (4 + 3 * i) for i in range(pages))
+        # Resources are inherited from the page tree root
+        write_object(b"<< /Type /Pages /Kids [%s] /Count %d /Resources << /Font << /F1 3 0 R >> >> >>" % (kids, pages))
+        write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for i in range(pages):
+            page = 4 + 3 * i
+            write_object(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                b"/Resources << /Font << /F1 3 0 R >> /XObject << /Im1 %d 0 R >> >> >>" % (page + 1, page + 2)
+            )
+            content = b"BT /F1 10 Tf 72 720 Td (Page %d %s) Tj ET" % (i, b"lorem ipsum dolor sit amet " * 40)
+            if image_bytes:
+                content += b" q 100 0 0 100 72 72 cm /Im1 Do Q"
+            write_object(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+            image = os.urandom(max(image_bytes, 1))
+            write_object(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8 "
+                b"/Length %d >>\nstream\n%s\nendstream" % (len(image), len(image), image)
+            )
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref))
+
+
 def test_generate_chunks_invalid_s3_path(sample_ingestion_job):
     """Test generate_chunks with invalid S3 path."""
     job = sample_ingestion_job
@@ -251,3 +291,141 @@ def test_generate_chunks_unrecognized_strategy(sample_ingestion_job):
 
         with pytest.raises(ValueError, match="Unsupported chunking strategy"):
             generate_chunks(job)
+
+
+def test_generate_chunks_streams_large_objects(tmp_path, sample_ingestion_job):
+    """Test objects at the streaming threshold are chunked from a spooled file with parts numbered in order."""
+    path = tmp_path / "doc.pdf"
+    _write_pdf(path, pages=20)
+    sample_ingestion_job.s3_path = "s3://test-bucket/doc.pdf"
+
+    with open(path, "rb") as body, patch("utilities.file_processing.s3") as mock_s3, patch.object(
+        file_processing, "STREAMING_EXTRACTION_MIN_BYTES", 1
+    ), patch("utilities.file_processing._extract_pdf_content") as mock_extract:
+        mock_s3.get_object.return_value = {"Body": body, "ContentLength": os.path.getsize(path)}
+        result = generate_chunks(sample_ingestion_job)
+
+    mock_extract.assert_not_called()
+    assert [doc.metadata["part"] for doc in result] == list(range(1, len(result) + 1))
+    assert result[0].page_content.startswith("Page 0 lorem ipsum")
+    assert result[0].metadata["source"] == "s3://test-bucket/doc.pdf"
+
+
+def test_streaming_pdf_extraction_matches_in_memory(tmp_path):
+    """Test the streamed PDF pages join to the text extracted from the whole file."""
+    path = tmp_path / "doc.pdf"
+    _write_pdf(path, pages=5)
+    data = path.read_bytes()
+
+    pages = list(file_processing._iter_pdf_pages(BytesIO(data)))
+
+    assert len(pages) == 5
+    assert "".join(pages) == file_processing._extract_pdf_content({"Body": BytesIO(data)})
+
+
+def test_streaming_docx_extraction_matches_in_memory():
+    """Test the streamed DOCX paragraphs join to the text python-docx extracts, skipping table content."""
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph("First\tparagraph")
+    document.add_paragraph("Second ").add_run("run").add_break()
+    document.add_paragraph("")
+    document.add_table(rows=1, cols=1).cell(0, 0).text = "In a table"
+    document.add_paragraph("Last paragraph")
+    data = BytesIO()
+    document.save(data)
+
+    paragraphs = list(file_processing._iter_docx_paragraphs(BytesIO(data.getvalue())))
+
+    assert len(paragraphs) == 4
+    assert "".join(paragraphs) == file_processing._extract_docx_content({"Body": BytesIO(data.getvalue())})
+
+
+def test_structured_chunks_respect_pdf_pages(tmp_path, sample_ingestion_job):
+    """Test structured chunking of a PDF yields chunks from one page each, numbered in the metadata."""
+    path = tmp_path / "doc.pdf"
+    _write_pdf(path, pages=3)
+    sample_ingestion_job.s3_path = "s3://test-bucket/doc.pdf"
+    sample_ingestion_job.chunk_strategy = StructuredChunkingStrategy(size=500, overlap=0)
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text, disallowed_special=(): text.split()
+
+    with open(path, "rb") as body, patch("utilities.file_processing.s3") as mock_s3, patch(
+        "utilities.chunking_strategy_factory.tiktoken.get_encoding", return_value=encoding
+    ):
+        mock_s3.get_object.return_value = {"Body": body, "ContentLength": os.path.getsize(path)}
+        result = generate_chunks(sample_ingestion_job)
+
+    assert [doc.metadata["page"] for doc in result] == [1, 2, 3]
+    assert [doc.page_content.split()[:2] for doc in result] == [["Page", "0"], ["Page", "1"], ["Page", "2"]]
+    assert [doc.metadata["part"] for doc in result] == [1, 2, 3]
+    assert result[0].metadata["source"] == "s3://test-bucket/doc.pdf"
+
+
+def test_docx_sections_start_at_headings():
+    """Test DOCX sections start at heading and title paragraphs and carry the heading in their metadata."""
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph("Preamble")
+    document.add_heading("Guide", 0)
+    document.add_paragraph("Welcome")
+    document.add_heading("Install", 1)
+    document.add_paragraph("Run the installer")
+    document.add_paragraph("Then restart")
+    data = BytesIO()
+    document.save(data)
+
+    sections = list(file_processing._iter_docx_sections(BytesIO(data.getvalue())))
+
+    assert [section.page_content for section in sections] == [
+        "Preamble",
+        "Guide\n\nWelcome",
+        "Install\n\nRun the installer\n\nThen restart",
+    ]
+    assert [section.metadata for section in sections] == [{}, {"heading": "Guide"}, {"heading": "Install"}]
+
+
+def test_markdown_sections_start_at_headings_outside_code():
+    """Test markdown sections start at ATX headings but not at comment lines in fenced code."""
+    text = "Intro\n\n# Setup #\nSteps\n```sh\n# not a heading\n```\n## Usage\nRun it\n"
+
+    sections = list(file_processing._get_section_reader("md")(BytesIO(text.encode())))
+
+    assert [section.metadata.get("heading") for section in sections] == [None, "Setup", "Usage"]
+    assert sections[1].page_content == "# Setup #\nSteps\n```sh\n# not a heading\n```\n"
+    assert [section.metadata for section in file_processing._get_section_reader("yaml")(BytesIO(b"# a\nb: 1\n"))] == [
+        {}
+    ]
+
+
+def test_streaming_extraction_memory_is_flat(tmp_path, sample_ingestion_job):
+    """Test peak memory while streaming a PDF does not grow with the size of the file."""
+    sample_ingestion_job.s3_path = "s3://test-bucket/doc.pdf"
+
+    def peak_memory(path, streaming):
+        size = os.path.getsize(path)
+        threshold = 0 if streaming else size + 1
+        with open(path, "rb") as body, patch("utilities.file_processing.s3") as mock_s3, patch.object(
+            file_processing, "STREAMING_EXTRACTION_MIN_BYTES", threshold
+        ), patch.object(file_processing, "STREAMING_SPOOL_MAX_BYTES", 256 * 1024):
+            mock_s3.get_object.return_value = {"Body": body, "ContentLength": size}
+            tracemalloc.start()
+            try:
+                # Chunks are consumed without being kept, as they would be by an incremental writer
+                chunks = sum(1 for _ in iter_chunks(sample_ingestion_job))
+                return chunks, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    small, large = tmp_path / "small.pdf", tmp_path / "large.pdf"
+    _write_pdf(small, pages=20, image_bytes=64 * 1024)
+    _write_pdf(large, pages=80, image_bytes=64 * 1024)
+    small_chunks, small_peak = peak_memory(small, streaming=True)
+    large_chunks, large_peak = peak_memory(large, streaming=True)
+    _, in_memory_peak = peak_memory(large, streaming=False)
+
+    assert large_chunks > 3 * small_chunks
+    assert large_peak < 1.25 * small_peak
+    assert large_peak < os.path.getsize(large) / 2 < in_memory_peak
@@ -198,3 +198,37 @@ def test_ingestion_job_repo_list_jobs_non_admin(ingestion_repo):
         }
         jobs, _ = ingestion_repo.list_jobs_by_repository("repo1", "user1", False, 1, 10)
         assert len(jobs) == 1
+
+
+def test_ingestion_job_repo_watermark_only_moves_forward(ingestion_repo):
+    from datetime import datetime, timezone
+    from unittest.mock import patch
+
+    import boto3
+    from models.domain_objects import Watermark
+    from moto import mock_aws
+
+    with mock_aws():
+        table = (
+            boto3.session.Session(region_name="us-east-1")
+            .resource("dynamodb")
+            .create_table(
+                TableName="test-table",
+                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+        )
+        first = Watermark(datetime(2025, 1, 1, tzinfo=timezone.utc), "docs/b.txt")
+        earlier = Watermark(datetime(2025, 1, 1, tzinfo=timezone.utc), "docs/a.txt")
+        later = Watermark(datetime(2025, 1, 1, 0, 0, 1, tzinfo=timezone.utc), "docs/a.txt")
+
+        with patch("repository.ingestion_job_repo._get_ingestion_job_table", return_value=table):
+            assert ingestion_repo.find_watermark("pipeline-watermark#repo1#bucket/") is None
+
+            ingestion_repo.save_watermark("pipeline-watermark#repo1#bucket/", first)
+            ingestion_repo.save_watermark("pipeline-watermark#repo1#bucket/", earlier)
+            assert ingestion_repo.find_watermark("pipeline-watermark#repo1#bucket/") == first
+
+            ingestion_repo.save_watermark("pipeline-watermark#repo1#bucket/", later)
+            assert ingestion_repo.find_watermark("pipeline-watermark#repo1#bucket/") == later
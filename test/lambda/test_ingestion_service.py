@@ -57,6 +57,94 @@ def test_submit_create_job(setup_env):
         assert "document-ingest" in call_args[1]["jobName"]
 
 
+def _document_jobs(count):
+    from models.domain_objects import IngestionJob
+
+    return [
+        IngestionJob(
+            repository_id="repo1",
+            collection_id="col1",
+            s3_path=f"s3://bucket/key{i}",
+            embedding_model="model1",
+            username="user1",
+        )
+        for i in range(count)
+    ]
+
+
+def test_submit_create_jobs_single_document(setup_env):
+    """Test submit_create_jobs submits a single document as its own job."""
+    from repository.ingestion_service import DocumentIngestionService
+
+    (job,) = _document_jobs(1)
+    mock_job_repo = Mock()
+
+    with patch("boto3.client") as mock_client:
+        mock_batch = Mock()
+        mock_batch.submit_job.return_value = {"jobId": "job123"}
+        mock_client.return_value = mock_batch
+
+        DocumentIngestionService(mock_job_repo).submit_create_jobs([job])
+
+        mock_job_repo.save.assert_not_called()
+        call_args = mock_batch.submit_job.call_args[1]
+        assert call_args["parameters"]["DOCUMENT_ID"] == job.id
+        assert "arrayProperties" not in call_args
+
+
+def test_submit_create_jobs_packs_manifests_into_array_job(setup_env):
+    """Test submit_create_jobs saves manifest jobs and submits one array job over them."""
+    from models.domain_objects import JobActionType
+    from repository.ingestion_service import DocumentIngestionService
+
+    jobs = _document_jobs(5)
+    mock_job_repo = Mock()
+
+    with patch("boto3.client") as mock_client, patch("repository.ingestion_service.INGESTION_MANIFEST_SIZE", 2):
+        mock_batch = Mock()
+        mock_batch.submit_job.return_value = {"jobId": "job123"}
+        mock_client.return_value = mock_batch
+
+        DocumentIngestionService(mock_job_repo).submit_create_jobs(jobs)
+
+        call_args = mock_batch.submit_job.call_args[1]
+        array_id = call_args["parameters"]["DOCUMENT_ID"]
+        assert call_args["arrayProperties"] == {"size": 3}
+        assert call_args["jobName"] == f"document-ingest-{array_id}"
+
+        manifests = [call[0][0] for call in mock_job_repo.save.call_args_list]
+        assert [manifest.id for manifest in manifests] == [f"{array_id}-{i}" for i in range(3)]
+        assert all(manifest.job_type == JobActionType.DOCUMENT_BATCH_INGESTION for manifest in manifests)
+        assert [manifest.manifest_job_ids for manifest in manifests] == [
+            [jobs[0].id, jobs[1].id],
+            [jobs[2].id, jobs[3].id],
+            [jobs[4].id],
+        ]
+
+
+def test_submit_create_jobs_splits_array_jobs_at_batch_limit(setup_env):
+    """Test submit_create_jobs starts another array job when the array size limit is reached."""
+    from repository.ingestion_service import DocumentIngestionService
+
+    jobs = _document_jobs(5)
+    mock_job_repo = Mock()
+
+    with patch("boto3.client") as mock_client, patch("repository.ingestion_service.INGESTION_MANIFEST_SIZE", 1), patch(
+        "repository.ingestion_service.BATCH_ARRAY_MAX_SIZE", 2
+    ):
+        mock_batch = Mock()
+        mock_batch.submit_job.return_value = {"jobId": "job123"}
+        mock_client.return_value = mock_batch
+
+        DocumentIngestionService(mock_job_repo).submit_create_jobs(jobs)
+
+        submitted = [call[1] for call in mock_batch.submit_job.call_args_list]
+        assert [call.get("arrayProperties") for call in submitted] == [{"size": 2}, {"size": 2}, None]
+        # The last manifest is submitted as a plain job for the manifest job itself
+        assert submitted[2]["parameters"]["DOCUMENT_ID"] == mock_job_repo.save.call_args_list[4][0][0].id
+        assert mock_job_repo.save.call_count == 5
+
+
 def test_create_delete_job(setup_env):
     """Test create_delete_job submits delete batch job."""
     from models.domain_objects import IngestionJob
@@ -127,6 +215,37 @@ def test_create_ingestion_job_with_collection(setup_env):
         assert job.chunk_strategy.size == 1000
 
 
+def test_create_ingestion_job_overrides_with_any_strategy_type(setup_env):
+    """Test a collection allowing overrides accepts token and structured strategies in any case."""
+    from models.domain_objects import (
+        FixedChunkingStrategy,
+        IngestDocumentRequest,
+        StructuredChunkingStrategy,
+        TokenChunkingStrategy,
+    )
+    from repository.ingestion_service import DocumentIngestionService
+
+    repository = {"repositoryId": "repo1", "embeddingModelId": "repo-model"}
+    collection = {
+        "collectionId": "col1",
+        "embeddingModel": "col-model",
+        "allowChunkingOverride": True,
+        "chunkingStrategy": FixedChunkingStrategy(size=500, overlap=50),
+    }
+    service = DocumentIngestionService()
+
+    for override, expected in [
+        ({"type": "TOKEN", "size": 256, "overlap": 32}, TokenChunkingStrategy(size=256, overlap=32)),
+        ({"type": "structured", "size": 400, "overlap": 0}, StructuredChunkingStrategy(size=400, overlap=0)),
+        ({"type": "FIXED", "size": 1000, "overlap": 100}, FixedChunkingStrategy(size=1000, overlap=100)),
+    ]:
+        request = IngestDocumentRequest(keys=["key1"], collectionId="col1", chunkingStrategy=override)
+
+        job = service.create_ingestion_job(repository, collection, request, {}, "s3://bucket/key", "user1")
+
+        assert job.chunk_strategy == expected
+
+
 def test_create_ingestion_job_without_collection(setup_env):
     """Test create_ingestion_job without collection uses repository defaults."""
     from models.domain_objects import FixedChunkingStrategy, IngestDocumentRequest
@@ -18,7 +18,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 from botocore.exceptions import ClientError
-from utilities.rds_auth import generate_auth_token
+from utilities.rds_auth import generate_auth_token, IamAuthTokenProvider
 
 
 class TestRdsAuth:
@@ -70,3 +70,22 @@ class TestRdsAuth:
         with patch.dict("os.environ", {}, clear=True):
             with pytest.raises(KeyError):
                 generate_auth_token("test-host", "5432", "test-user")
+
+    def test_iam_auth_token_provider_refreshes_before_expiry(self):
+        """Test that the provider reuses a token and generates a new, unencoded one after the refresh interval."""
+        now = [0.0]
+        with patch.dict("os.environ", {"AWS_REGION": "us-east-1"}):
+            with patch("boto3.client") as mock_boto3:
+                mock_rds = Mock()
+                mock_rds.generate_db_auth_token.side_effect = ["token+1", "token+2"]
+                mock_boto3.return_value = mock_rds
+                provider = IamAuthTokenProvider(
+                    "test-host", "5432", "test-user", refresh_seconds=600, timer=lambda: now[0]
+                )
+
+                assert provider() == "token+1"
+                now[0] = 599
+                assert provider() == "token+1"
+                now[0] = 600
+                assert provider() == "token+2"
+                assert mock_rds.generate_db_auth_token.call_count == 2
@@ -0,0 +1,203 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for watermark-based discovery of objects for scheduled pipeline ingestion."""
+
+import gzip
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from moto import mock_aws
+from moto.core import DEFAULT_ACCOUNT_ID
+from moto.s3.models import s3_backends
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../lambda"))
+
+from models.domain_objects import Watermark
+from repository.pipeline_discovery import discover_modified_objects, pipeline_watermark_id, resolve_inventory_manifest
+from utilities.time import parse_timestamp
+
+KEY_COUNT = 100_000
+KEYS_PER_SECOND = 1_000
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _key(index: int) -> str:
+    return f"docs/{index:06d}.txt"
+
+
+def _modified(index: int) -> datetime:
+    # Many objects share each second, so ties on LastModified are broken by key
+    return BASE_TIME + timedelta(seconds=index // KEYS_PER_SECOND)
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        # A session client keeps this test independent of boto3.client patches made by other test modules
+        client = boto3.session.Session().client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="source-bucket")
+        client.create_bucket(Bucket="inventory-bucket")
+        yield client
+
+
+@pytest.fixture
+def large_bucket(s3):
+    """Fill the source bucket with 100k objects modified over 100 seconds."""
+    backend = s3_backends[DEFAULT_ACCOUNT_ID]["global"]
+    for index in range(KEY_COUNT):
+        fake_key = backend.put_object("source-bucket", _key(index), b"")
+        fake_key.last_modified = _modified(index).replace(tzinfo=None)
+    return s3
+
+
+def _write_inventory(s3, report: str, rows: list[list[str]], schema: str) -> None:
+    data_key = f"inventory/source-bucket/daily/data/{report}.csv.gz"
+    body = "".join(",".join(f'"{value}"' for value in row) + "\n" for row in rows)
+    s3.put_object(Bucket="inventory-bucket", Key=data_key, Body=gzip.compress(body.encode("utf-8")))
+    manifest = {
+        "sourceBucket": "source-bucket",
+        "destinationBucket": "arn:aws:s3:::inventory-bucket",
+        "fileFormat": "CSV",
+        "fileSchema": schema,
+        "files": [{"key": data_key}],
+    }
+    s3.put_object(
+        Bucket="inventory-bucket",
+        Key=f"inventory/source-bucket/daily/{report}/manifest.json",
+        Body=json.dumps(manifest).encode("utf-8"),
+    )
+
+
+def test_watermark_orders_by_time_then_key():
+    watermark = Watermark(BASE_TIME, "docs/b.txt")
+
+    assert Watermark(BASE_TIME, "docs/a.txt") < watermark < Watermark(BASE_TIME, "docs/c.txt")
+    assert watermark < Watermark(BASE_TIME + timedelta(microseconds=1), "docs/a.txt")
+    assert Watermark.from_dict(watermark.to_dict()) == watermark
+    assert watermark.to_dict() == {"lastModified": "2025-01-01T00:00:00.000000Z", "lastKey": "docs/b.txt"}
+
+
+def test_pipeline_watermark_id_is_per_pipeline():
+    assert pipeline_watermark_id("repo1", "bucket", "docs/") == "pipeline-watermark#repo1#bucket/docs/"
+    assert pipeline_watermark_id("repo1", "bucket", None) != pipeline_watermark_id("repo2", "bucket", None)
+
+
+def test_discover_large_bucket_after_watermark(large_bucket):
+    """Only objects after the watermark and up to the settle cutoff are returned from a 100k key bucket."""
+    watermark = Watermark(_modified(98_500), _key(98_500))
+    until = _modified(99_000) - timedelta(microseconds=1)
+
+    result = discover_modified_objects(large_bucket, "source-bucket", "docs/", watermark, until=until)
+
+    # The rest of second 98 is picked up, second 99 is left for the next run
+    assert result.keys == [_key(index) for index in range(98_501, 99_000)]
+    assert result.since == watermark
+    assert result.watermark == Watermark(_modified(98_999), _key(98_999))
+
+
+def test_discover_from_inventory_manifest(s3):
+    """A 100k row inventory report is read from the latest complete report instead of listing the bucket."""
+    schema = "Bucket, Key, Size, LastModifiedDate, IsLatest, IsDeleteMarker"
+    rows = [
+        ["source-bucket", _key(index), "1", _modified(index).strftime("%Y-%m-%dT%H:%M:%S.000Z"), "true", "false"]
+        for index in range(KEY_COUNT)
+    ]
+    latest_second = _modified(KEY_COUNT - 1).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    rows += [
+        ["source-bucket", "docs/space+and%2Bplus.txt", "1", latest_second, "true", "false"],
+        ["source-bucket", "docs/noncurrent.txt", "1", latest_second, "false", "false"],
+        ["source-bucket", "docs/deleted.txt", "1", latest_second, "true", "true"],
+        ["source-bucket", "other/outside-prefix.txt", "1", latest_second, "true", "false"],
+    ]
+    random.Random(0).shuffle(rows)
+    _write_inventory(s3, "2025-01-02T01-00Z", rows, schema)
+    _write_inventory(s3, "2025-01-01T01-00Z", [], schema)
+    # A report still being delivered has no manifest yet
+    s3.put_object(Bucket="inventory-bucket", Key="inventory/source-bucket/daily/2025-01-03T01-00Z/partial", Body=b"")
+
+    inventory = "s3://inventory-bucket/inventory/source-bucket/daily/"
+    assert resolve_inventory_manifest(s3, inventory) == (
+        "inventory-bucket",
+        "inventory/source-bucket/daily/2025-01-02T01-00Z/manifest.json",
+    )
+
+    watermark = Watermark(_modified(99_000), _key(99_499))
+    result = discover_modified_objects(s3, "source-bucket", "docs/", watermark, inventory_manifest=inventory)
+
+    assert sorted(result.keys) == [_key(index) for index in range(99_500, KEY_COUNT)] + ["docs/space and+plus.txt"]
+    assert result.watermark == Watermark(parse_timestamp(latest_second), "docs/space and+plus.txt")
+
+
+def test_discover_without_watermark_looks_back(s3, monkeypatch):
+    now = datetime.now(timezone.utc)
+    s3.put_object(Bucket="source-bucket", Key="docs/new.txt", Body=b"")
+    backend = s3_backends[DEFAULT_ACCOUNT_ID]["global"]
+    backend.get_object("source-bucket", "docs/new.txt").last_modified = (now - timedelta(hours=1)).replace(tzinfo=None)
+    s3.put_object(Bucket="source-bucket", Key="docs/old.txt", Body=b"")
+    backend.get_object("source-bucket", "docs/old.txt").last_modified = (now - timedelta(hours=30)).replace(tzinfo=None)
+
+    result = discover_modified_objects(s3, "source-bucket", "docs/", None)
+
+    assert result.keys == ["docs/new.txt"]
+    assert result.late_keys == []
+    assert result.since.last_key == ""
+    assert result.watermark.last_key == "docs/new.txt"
+
+    # Nothing new since the returned watermark
+    again = discover_modified_objects(s3, "source-bucket", "docs/", result.watermark)
+    assert again.keys == []
+    assert again.late_keys == ["docs/new.txt"]
+    assert again.watermark == result.watermark
+
+
+def test_discover_returns_late_objects_behind_watermark(s3):
+    """An object whose LastModified falls behind an advanced watermark is returned as late within the overlap."""
+    backend = s3_backends[DEFAULT_ACCOUNT_ID]["global"]
+    objects = {
+        "docs/ingested.txt": BASE_TIME - timedelta(minutes=5),
+        # A multipart upload started before the last run but completed after it
+        "docs/multipart.txt": BASE_TIME - timedelta(hours=1),
+        "docs/ancient.txt": BASE_TIME - timedelta(hours=30),
+        "docs/new.txt": BASE_TIME + timedelta(minutes=5),
+    }
+    for key, last_modified in objects.items():
+        s3.put_object(Bucket="source-bucket", Key=key, Body=b"")
+        backend.get_object("source-bucket", key).last_modified = last_modified.replace(tzinfo=None)
+
+    watermark = Watermark(BASE_TIME - timedelta(minutes=5), "docs/ingested.txt")
+    result = discover_modified_objects(s3, "source-bucket", "docs/", watermark)
+
+    assert result.keys == ["docs/new.txt"]
+    assert sorted(result.late_keys) == ["docs/ingested.txt", "docs/multipart.txt"]
+    # Late objects do not move the watermark
+    assert result.watermark == Watermark(objects["docs/new.txt"], "docs/new.txt")
+
+
+def test_discover_rejects_unsupported_inventory_format(s3):
+    s3.put_object(
+        Bucket="inventory-bucket",
+        Key="inventory/manifest.json",
+        Body=json.dumps({"fileFormat": "Parquet", "fileSchema": "", "files": []}).encode("utf-8"),
+    )
+
+    with pytest.raises(ValueError, match="Unsupported S3 Inventory format"):
+        discover_modified_objects(
+            s3, "source-bucket", "docs/", None, inventory_manifest="s3://inventory-bucket/inventory/manifest.json"
+        )
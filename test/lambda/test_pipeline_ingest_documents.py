@@ -16,6 +16,7 @@
 
 import os
 import sys
+import threading
 from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
@@ -48,6 +49,18 @@ def test_extract_chunk_strategy_new_format(setup_env):
     assert strategy.overlap == 100
 
 
+def test_extract_chunk_strategy_token_format(setup_env):
+    """Test extract_chunk_strategy parses token-budgeted strategies."""
+    from models.domain_objects import TokenChunkingStrategy
+    from repository.pipeline_ingest_handlers import extract_chunk_strategy
+
+    pipeline_config = {"chunkingStrategy": {"type": "token", "size": 256, "overlap": 32, "encoding": "o200k_base"}}
+
+    strategy = extract_chunk_strategy(pipeline_config)
+
+    assert strategy == TokenChunkingStrategy(size=256, overlap=32, encoding="o200k_base")
+
+
 def test_extract_chunk_strategy_legacy_format(setup_env):
     """Test extract_chunk_strategy with legacy flat fields."""
     from repository.pipeline_ingest_handlers import extract_chunk_strategy
@@ -297,7 +310,7 @@ def test_pipeline_ingest_with_previous_document(setup_env):
     )
 
     with patch("repository.pipeline_ingest_documents.vs_repo") as mock_vs_repo, patch(
-        "repository.pipeline_ingest_documents.generate_chunks"
+        "repository.pipeline_ingest_documents.iter_chunks"
     ) as mock_chunks, patch("repository.pipeline_ingest_documents.prepare_chunks") as mock_prepare, patch(
         "repository.pipeline_ingest_documents.store_chunks_in_vectorstore"
     ) as mock_store, patch(
@@ -309,7 +322,7 @@ def test_pipeline_ingest_with_previous_document(setup_env):
     ):
 
         mock_vs_repo.find_repository_by_id.return_value = {"type": RepositoryType.OPENSEARCH}
-        mock_chunks.return_value = [Mock(page_content="text", metadata={})]
+        mock_chunks.return_value = iter([Mock(page_content="text", metadata={})])
         mock_prepare.return_value = (["text"], [{"key": "value"}])
         mock_store.return_value = ["id1"]
         mock_doc_repo.find_by_source.return_value = [prev_doc]
@@ -389,14 +402,22 @@ def test_handle_pipline_ingest_schedule(setup_env):
         mock_s3.get_paginator.return_value = mock_paginator
         mock_vs_repo.find_repository_by_id.return_value = {"repositoryId": "repo1"}
         mock_coll_service.get_collection_metadata.return_value = {}
+        mock_job_repo.find_watermark.return_value = None
 
+        from models.domain_objects import Watermark
         from repository.pipeline_ingest_handlers import handle_pipline_ingest_schedule
 
         handle_pipline_ingest_schedule(event, None)
 
         # Only file1.txt should be ingested (modified in last 24 hours)
         assert mock_job_repo.save.call_count == 1
-        assert mock_service.submit_create_job.call_count == 1
+        mock_service.submit_create_jobs.assert_called_once()
+        submitted = mock_service.submit_create_jobs.call_args[0][0]
+        assert [job.s3_path for job in submitted] == ["s3://test-bucket/test-prefix/file1.txt"]
+        mock_job_repo.find_watermark.assert_called_once_with("pipeline-watermark#repo1#test-bucket/test-prefix/")
+        mock_job_repo.save_watermark.assert_called_once_with(
+            "pipeline-watermark#repo1#test-bucket/test-prefix/", Watermark(recent, "test-prefix/file1.txt")
+        )
 
 
 def test_handle_pipline_ingest_schedule_no_contents(setup_env):
@@ -413,18 +434,102 @@ def test_handle_pipline_ingest_schedule_no_contents(setup_env):
 
     with patch("repository.pipeline_ingest_handlers.s3") as mock_s3, patch(
         "repository.pipeline_ingest_handlers.vs_repo"
-    ) as mock_vs_repo, patch("repository.pipeline_ingest_handlers.collection_service") as mock_coll_service:
+    ) as mock_vs_repo, patch("repository.pipeline_ingest_handlers.collection_service") as mock_coll_service, patch(
+        "repository.pipeline_ingest_handlers.ingestion_job_repository"
+    ) as mock_job_repo, patch(
+        "repository.pipeline_ingest_handlers.ingestion_service"
+    ):
 
         mock_paginator = Mock()
         mock_paginator.paginate.return_value = [{}]  # No Contents key
         mock_s3.get_paginator.return_value = mock_paginator
         mock_vs_repo.find_repository_by_id.return_value = {"repositoryId": "repo1"}
         mock_coll_service.get_collection_metadata.return_value = {}
+        mock_job_repo.find_watermark.return_value = None
 
         from repository.pipeline_ingest_handlers import handle_pipline_ingest_schedule
 
         # Should not raise error
         handle_pipline_ingest_schedule(event, None)
+        mock_job_repo.save_watermark.assert_called_once()
+
+
+def test_handle_pipline_ingest_schedule_resumes_from_watermark(setup_env):
+    """Test consecutive scheduled runs only submit objects added since the persisted watermark."""
+    import boto3
+    from moto import mock_aws
+    from moto.core import DEFAULT_ACCOUNT_ID
+    from moto.s3.models import s3_backends
+
+    event = {
+        "detail": {
+            "bucket": "test-bucket",
+            "prefix": "test-prefix/",
+            "repositoryId": "repo1",
+            "pipelineConfig": {"embeddingModel": "model1", "chunkSize": 1000, "chunkOverlap": 100},
+        },
+        "requestContext": {"authorizer": {"username": "user1"}},
+    }
+
+    with mock_aws():
+        session = boto3.session.Session(region_name="us-east-1")
+        s3 = session.client("s3")
+        s3.create_bucket(Bucket="test-bucket")
+        table = session.resource("dynamodb").create_table(
+            TableName="test-job-table",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for name in ["file1.txt", "file2.txt"]:
+            s3.put_object(Bucket="test-bucket", Key=f"test-prefix/{name}", Body=b"text")
+
+        from repository.pipeline_ingest_handlers import handle_pipline_ingest_schedule
+
+        submitted = []
+        ingested: set[str] = set()
+
+        def submit(jobs):
+            submitted.append(sorted(job.s3_path for job in jobs))
+            ingested.update(job.s3_path for job in jobs)
+
+        with patch("repository.pipeline_ingest_handlers.s3", s3), patch(
+            "repository.ingestion_job_repo._get_ingestion_job_table", return_value=table
+        ), patch("repository.pipeline_ingest_handlers.vs_repo") as mock_vs_repo, patch(
+            "repository.pipeline_ingest_handlers.ingestion_service"
+        ) as mock_service, patch(
+            "repository.pipeline_ingest_handlers.rag_document_repository"
+        ) as mock_doc_repo, patch(
+            "repository.pipeline_ingest_handlers.INGESTION_WATERMARK_SETTLE_SECONDS", 0
+        ):
+            mock_vs_repo.find_repository_by_id.return_value = {"repositoryId": "repo1"}
+            mock_service.submit_create_jobs.side_effect = submit
+            mock_doc_repo.find_document_ids_by_source.side_effect = lambda repository_id, collection_id, sources: {
+                source: "doc" for source in sources if source in ingested
+            }
+
+            handle_pipline_ingest_schedule(event, None)
+            handle_pipline_ingest_schedule(event, None)
+            s3.put_object(Bucket="test-bucket", Key="test-prefix/file3.txt", Body=b"text")
+            handle_pipline_ingest_schedule(event, None)
+
+            # A multipart upload completing after the last run keeps the LastModified of when it started
+            s3.put_object(Bucket="test-bucket", Key="test-prefix/late.txt", Body=b"text")
+            s3_backends[DEFAULT_ACCOUNT_ID]["global"].get_object(
+                "test-bucket", "test-prefix/late.txt"
+            ).last_modified = (datetime.now(timezone.utc) - timedelta(hours=1)).replace(tzinfo=None)
+            handle_pipline_ingest_schedule(event, None)
+            handle_pipline_ingest_schedule(event, None)
+
+        assert submitted == [
+            ["s3://test-bucket/test-prefix/file1.txt", "s3://test-bucket/test-prefix/file2.txt"],
+            [],
+            ["s3://test-bucket/test-prefix/file3.txt"],
+            ["s3://test-bucket/test-prefix/late.txt"],
+            [],
+        ]
+        watermark = table.get_item(Key={"id": "pipeline-watermark#repo1#test-bucket/test-prefix/"})["Item"]
+        assert watermark["lastKey"] == "test-prefix/file3.txt"
 
 
 def test_remove_document_from_vectorstore(setup_env):
@@ -516,6 +621,129 @@ def test_pipeline_ingest_documents_batch_with_failures(setup_env):
         mock_job_repo.update_status.assert_called_with(job, IngestionStatus.INGESTION_FAILED)
 
 
+def test_pipeline_ingest_documents_batch_records_document_results(setup_env):
+    """Test pipeline_ingest_documents records each document's outcome on the batch job in path order."""
+    from models.domain_objects import FixedChunkingStrategy, IngestionJob, IngestionStatus, JobActionType
+
+    job = IngestionJob(
+        repository_id="repo1",
+        collection_id="col1",
+        s3_path="",
+        embedding_model="model1",
+        username="user1",
+        job_type=JobActionType.DOCUMENT_BATCH_INGESTION,
+        chunk_strategy=FixedChunkingStrategy(size=1000, overlap=100),
+        s3_paths=["s3://bucket/key1", "s3://bucket/bad", "s3://bucket/key3", "s3://bucket/key1"],
+    )
+
+    def ingest(doc_job):
+        if doc_job.s3_path.endswith("bad"):
+            raise Exception("Unsupported file type")
+        doc_job.document_id = f"doc-{doc_job.s3_path.split('/')[-1]}"
+
+    with patch("repository.pipeline_ingest_documents.ingestion_job_repository") as mock_job_repo, patch(
+        "repository.pipeline_ingest_documents.pipeline_ingest_document", side_effect=ingest
+    ) as mock_ingest_doc:
+        from repository.pipeline_ingest_documents import pipeline_ingest_documents
+
+        pipeline_ingest_documents(job)
+
+        # The duplicate path is ingested once
+        assert mock_ingest_doc.call_count == 3
+        assert [result.s3_path for result in job.document_results] == [
+            "s3://bucket/key1",
+            "s3://bucket/bad",
+            "s3://bucket/key3",
+        ]
+        assert [result.status for result in job.document_results] == [
+            IngestionStatus.INGESTION_COMPLETED,
+            IngestionStatus.INGESTION_FAILED,
+            IngestionStatus.INGESTION_COMPLETED,
+        ]
+        assert job.document_results[1].error_message == "Unsupported file type"
+        assert all(result.job_id for result in job.document_results)
+        assert job.document_ids == ["doc-key1", "doc-key3"]
+        assert job.error_message == "1 of 3 documents failed to ingest"
+        mock_job_repo.save.assert_called_once_with(job)
+        mock_job_repo.update_status.assert_called_with(job, IngestionStatus.INGESTION_FAILED)
+
+
+def test_pipeline_ingest_documents_batch_concurrent(setup_env):
+    """Test pipeline_ingest_documents ingests up to INGESTION_DOCUMENT_CONCURRENCY documents at once."""
+    from models.domain_objects import FixedChunkingStrategy, IngestionJob, IngestionStatus, JobActionType
+
+    job = IngestionJob(
+        repository_id="repo1",
+        collection_id="col1",
+        s3_path="",
+        embedding_model="model1",
+        username="user1",
+        job_type=JobActionType.DOCUMENT_BATCH_INGESTION,
+        chunk_strategy=FixedChunkingStrategy(size=1000, overlap=100),
+        s3_paths=[f"s3://bucket/key{i}" for i in range(8)],
+    )
+    # Every document waits until four are in progress at once, which sequential ingestion never reaches
+    barrier = threading.Barrier(4, timeout=5)
+
+    with patch("repository.pipeline_ingest_documents.ingestion_job_repository") as mock_job_repo, patch(
+        "repository.pipeline_ingest_documents.pipeline_ingest_document", side_effect=lambda doc_job: barrier.wait()
+    ), patch("repository.pipeline_ingest_documents.INGESTION_DOCUMENT_CONCURRENCY", 4):
+        from repository.pipeline_ingest_documents import pipeline_ingest_documents
+
+        pipeline_ingest_documents(job)
+
+        assert all(result.status == IngestionStatus.INGESTION_COMPLETED for result in job.document_results)
+        mock_job_repo.update_status.assert_called_with(job, IngestionStatus.INGESTION_COMPLETED)
+
+
+def test_pipeline_ingest_documents_manifest_skips_completed_documents(setup_env):
+    """Test a retried manifest job ingests only the document jobs the earlier attempt did not finish."""
+    from models.domain_objects import IngestionJob, IngestionStatus, JobActionType
+
+    def document_job(job_id, status):
+        return IngestionJob(
+            id=job_id,
+            repository_id="repo1",
+            collection_id="col1",
+            s3_path=f"s3://bucket/{job_id}",
+            username="user1",
+            status=status,
+            document_id="doc-done" if status == IngestionStatus.INGESTION_COMPLETED else None,
+        )
+
+    saved_jobs = {
+        "done": document_job("done", IngestionStatus.INGESTION_COMPLETED),
+        "pending": document_job("pending", IngestionStatus.INGESTION_IN_PROGRESS),
+    }
+    job = IngestionJob(
+        repository_id="repo1",
+        collection_id="col1",
+        s3_path="s3://bucket/done",
+        username="user1",
+        job_type=JobActionType.DOCUMENT_BATCH_INGESTION,
+        manifest_job_ids=["done", "pending", "missing"],
+    )
+
+    with patch("repository.pipeline_ingest_documents.ingestion_job_repository") as mock_job_repo, patch(
+        "repository.pipeline_ingest_documents.pipeline_ingest_document"
+    ) as mock_ingest_doc:
+        mock_job_repo.find_by_id.side_effect = lambda job_id: saved_jobs[job_id]
+        from repository.pipeline_ingest_documents import pipeline_ingest_documents
+
+        pipeline_ingest_documents(job)
+
+        mock_ingest_doc.assert_called_once_with(saved_jobs["pending"])
+        mock_job_repo.update_status.assert_any_call(saved_jobs["pending"], IngestionStatus.INGESTION_IN_PROGRESS)
+        assert [result.status for result in job.document_results] == [
+            IngestionStatus.INGESTION_COMPLETED,
+            IngestionStatus.INGESTION_COMPLETED,
+            IngestionStatus.INGESTION_FAILED,
+        ]
+        assert job.document_results[2].job_id == "missing"
+        assert job.document_ids == ["doc-done"]
+        mock_job_repo.update_status.assert_called_with(job, IngestionStatus.INGESTION_FAILED)
+
+
 def test_pipeline_ingest_documents_batch_exceeds_limit(setup_env):
     """Test pipeline_ingest_documents rejects batch over 100 documents."""
     from models.domain_objects import FixedChunkingStrategy, IngestionJob, JobActionType
@@ -656,3 +884,225 @@ def test_handle_pipeline_ingest_event_resolves_collection_by_name(setup_env):
         )
         mock_coll_service.collection_repo.find_by_id_or_name.assert_called_once_with("my-collection-name", "repo1")
         mock_service.submit_create_job.assert_called_once()
+
+
+class _InMemoryRagDocumentRepository:
+    """Keeps saved documents, including their subdoc ids and hashes, for re-ingest tests."""
+
+    def __init__(self):
+        self.documents = {}
+
+    def save(self, document):
+        self.documents[document.document_id] = document
+
+    def find_by_source(self, repository_id, collection_id, source, join_docs=False):
+        return [doc for doc in self.documents.values() if doc.source == source]
+
+    def delete_by_id(self, document_id):
+        self.documents.pop(document_id, None)
+
+
+def test_pipeline_reingest_embeds_only_changed_chunks(setup_env):
+    """Test that re-ingesting a large document after a one-chunk edit embeds and deletes only that chunk."""
+    import itertools
+
+    from models.domain_objects import FixedChunkingStrategy, IngestionJob
+    from utilities.repository_types import RepositoryType
+
+    def make_job():
+        return IngestionJob(
+            repository_id="repo1",
+            collection_id="col1",
+            s3_path="s3://bucket/large.pdf",
+            embedding_model="model1",
+            username="user1",
+            chunk_strategy=FixedChunkingStrategy(size=1000, overlap=100),
+        )
+
+    def make_chunks(edited_part=None):
+        return [
+            Mock(
+                page_content=f"Paragraph {i}" + (" (edited)" if i == edited_part else ""),
+                metadata={"source": "s3://bucket/large.pdf", "name": "large.pdf", "part": i + 1},
+            )
+            for i in range(2000)
+        ]
+
+    embedded_texts = []
+    ids = (f"vec-{n}" for n in itertools.count())
+    mock_embeddings = Mock()
+    mock_embeddings.embed_documents.side_effect = lambda texts: embedded_texts.extend(texts) or [[0.0]] * len(texts)
+
+    def add_texts(texts, metadatas):
+        mock_embeddings.embed_documents(texts)
+        return [next(ids) for _ in texts]
+
+    mock_vs = Mock()
+    mock_vs.add_texts.side_effect = add_texts
+    mock_service = Mock()
+    mock_service.get_vector_store_client.return_value = mock_vs
+    doc_repo = _InMemoryRagDocumentRepository()
+
+    with patch("repository.pipeline_ingest_documents.vs_repo") as mock_vs_repo, patch(
+        "repository.pipeline_ingest_documents.VectorStoreRepository"
+    ), patch("repository.pipeline_ingest_documents.RepositoryServiceFactory") as mock_factory, patch(
+        "repository.pipeline_ingest_documents.RagEmbeddings", return_value=mock_embeddings
+    ), patch(
+        "repository.pipeline_ingest_documents.iter_chunks"
+    ) as mock_chunks, patch(
+        "repository.pipeline_ingest_documents.rag_document_repository", doc_repo
+    ), patch(
+        "repository.pipeline_ingest_documents.ingestion_job_repository"
+    ) as mock_job_repo:
+        mock_vs_repo.find_repository_by_id.return_value = {"type": RepositoryType.OPENSEARCH}
+        mock_factory.create_service.return_value = mock_service
+        mock_job_repo.find_by_document.return_value = None
+
+        from repository.pipeline_ingest_documents import pipeline_ingest
+
+        mock_chunks.return_value = iter(make_chunks())
+        pipeline_ingest(make_job())
+        (first_version,) = doc_repo.documents.values()
+        assert len(embedded_texts) == 2000
+
+        embedded_texts.clear()
+        mock_chunks.return_value = iter(make_chunks(edited_part=1234))
+        pipeline_ingest(make_job())
+        (second_version,) = doc_repo.documents.values()
+
+    assert embedded_texts == ["Paragraph 1234 (edited)"]
+    mock_vs.delete.assert_called_once_with([first_version.subdocs[1234]])
+    assert len(second_version.subdocs) == 2000
+    assert second_version.subdocs[:1234] == first_version.subdocs[:1234]
+    assert second_version.subdocs[1235:] == first_version.subdocs[1235:]
+    assert second_version.subdocs[1234] not in first_version.subdocs
+
+
+def test_pipeline_ingest_streams_chunks_in_batches(setup_env):
+    """Test that chunks are embedded and written batch by batch while the document is still being read."""
+    from models.domain_objects import FixedChunkingStrategy, IngestionJob
+    from utilities.repository_types import RepositoryType
+
+    job = IngestionJob(
+        repository_id="repo1",
+        collection_id="col1",
+        s3_path="s3://bucket/large.pdf",
+        embedding_model="model1",
+        username="user1",
+        chunk_strategy=FixedChunkingStrategy(size=1000, overlap=100),
+    )
+    events = []
+
+    def read_chunks(job):
+        for i in range(25):
+            events.append(f"read {i}")
+            yield Mock(page_content=f"Paragraph {i}", metadata={"source": job.s3_path, "part": i + 1})
+
+    def store(texts, metadatas, **kwargs):
+        events.append(f"store {len(texts)}")
+        return [f"vec-{text}" for text in texts]
+
+    doc_repo = _InMemoryRagDocumentRepository()
+    with patch("repository.pipeline_ingest_documents.vs_repo") as mock_vs_repo, patch(
+        "repository.pipeline_ingest_documents.iter_chunks", side_effect=read_chunks
+    ), patch("repository.pipeline_ingest_documents.store_chunks_in_vectorstore", side_effect=store), patch(
+        "repository.pipeline_ingest_documents.INGESTION_CHUNK_BATCH_SIZE", 10
+    ), patch(
+        "repository.pipeline_ingest_documents.rag_document_repository", doc_repo
+    ), patch(
+        "repository.pipeline_ingest_documents.ingestion_job_repository"
+    ):
+        mock_vs_repo.find_repository_by_id.return_value = {"type": RepositoryType.OPENSEARCH}
+
+        from repository.pipeline_ingest_documents import pipeline_ingest
+
+        pipeline_ingest(job)
+
+    # Each batch is written before the next one is read
+    assert [event for event in events if event.startswith("store")] == ["store 10", "store 10", "store 5"]
+    assert events.index("store 10") == events.index("read 9") + 1
+    assert events.index("read 10") > events.index("store 10")
+    (document,) = doc_repo.documents.values()
+    assert document.subdocs == [f"vec-Paragraph {i}" for i in range(25)]
+    assert len(document.subdoc_hashes) == 25
+
+
+def test_pipeline_ingest_failure_deletes_stored_chunks(setup_env):
+    """Test that chunks written before the document fails to read are deleted again."""
+    from models.domain_objects import FixedChunkingStrategy, IngestionJob
+    from utilities.repository_types import RepositoryType
+
+    job = IngestionJob(
+        repository_id="repo1",
+        collection_id="col1",
+        s3_path="s3://bucket/large.pdf",
+        embedding_model="model1",
+        username="user1",
+        chunk_strategy=FixedChunkingStrategy(size=1000, overlap=100),
+    )
+
+    def read_chunks(job):
+        for i in range(15):
+            yield Mock(page_content=f"Paragraph {i}", metadata={"part": i + 1})
+        raise ValueError("corrupt page 16")
+
+    doc_repo = _InMemoryRagDocumentRepository()
+    with patch("repository.pipeline_ingest_documents.vs_repo") as mock_vs_repo, patch(
+        "repository.pipeline_ingest_documents.iter_chunks", side_effect=read_chunks
+    ), patch(
+        "repository.pipeline_ingest_documents.store_chunks_in_vectorstore",
+        side_effect=lambda texts, metadatas, **kwargs: [f"vec-{text}" for text in texts],
+    ), patch(
+        "repository.pipeline_ingest_documents.delete_chunks_from_vectorstore"
+    ) as mock_delete, patch(
+        "repository.pipeline_ingest_documents.INGESTION_CHUNK_BATCH_SIZE", 10
+    ), patch(
+        "repository.pipeline_ingest_documents.rag_document_repository", doc_repo
+    ), patch(
+        "repository.pipeline_ingest_documents.ingestion_job_repository"
+    ):
+        mock_vs_repo.find_repository_by_id.return_value = {"type": RepositoryType.OPENSEARCH}
+
+        from repository.pipeline_ingest_documents import pipeline_ingest
+
+        with pytest.raises(Exception, match="corrupt page 16"):
+            pipeline_ingest(job)
+
+    mock_delete.assert_called_once_with([f"vec-Paragraph {i}" for i in range(10)], "repo1", "col1", "model1")
+    assert doc_repo.documents == {}
+
+
+def test_match_unchanged_chunks(setup_env):
+    """Test matching new chunks against a previous version, including duplicates and legacy documents."""
+    from models.domain_objects import FixedChunkingStrategy, RagDocument
+    from repository.pipeline_ingest_documents import index_previous_chunks, match_unchanged_chunks
+
+    previous = RagDocument(
+        repository_id="repo1",
+        collection_id="col1",
+        document_name="test.txt",
+        source="s3://bucket/key",
+        subdocs=["id-a", "id-b", "id-a2", "id-c"],
+        subdoc_hashes=["a", "b", "a", "c"],
+        username="user1",
+        chunk_strategy=FixedChunkingStrategy(size=1000, overlap=100),
+    )
+    available = index_previous_chunks(previous)
+
+    # Chunks are matched batch by batch against what earlier batches left
+    assert match_unchanged_chunks(["a", "x", "a"], available) == ["id-a", None, "id-a2"]
+    assert match_unchanged_chunks(["a", "b"], available) == [None, "id-b"]
+    assert [subdoc_id for ids in available.values() for subdoc_id in ids] == ["id-c"]
+    assert match_unchanged_chunks(["a"], index_previous_chunks(None)) == [None]
+
+
+def test_chunk_content_hash_includes_part_number(setup_env):
+    """Test that a chunk that moved within the document does not keep its hash."""
+    from repository.pipeline_ingest_documents import chunk_content_hash
+
+    base = chunk_content_hash("text", {"source": "s3://b/k", "part": 1}, "model1")
+
+    assert chunk_content_hash("text", {"source": "s3://b/k", "part": 1}, "model1") == base
+    assert chunk_content_hash("text", {"source": "s3://b/k", "part": 7}, "model1") != base
+    assert chunk_content_hash("text", {"source": "s3://b/k", "part": 1}, "model2") != base
+    assert chunk_content_hash("text!", {"source": "s3://b/k", "part": 1}, "model1") != base
@@ -16,6 +16,7 @@
 
 import os
 import sys
+import threading
 from unittest.mock import patch
 
 import pytest
@@ -229,3 +230,154 @@ def test_main_missing_arguments(sample_ingestion_job):
 
         # Verify exit was called
         mock_exit.assert_called_once_with(1)
+
+
+@pytest.fixture
+def pipeline_env(monkeypatch):
+    """Set the environment the batch worker modules read at import."""
+    monkeypatch.setenv("RAG_DOCUMENT_TABLE", "test-doc-table")
+    monkeypatch.setenv("RAG_SUB_DOCUMENT_TABLE", "test-subdoc-table")
+    monkeypatch.setenv("LISA_RAG_VECTOR_STORE_TABLE", "test-vector-store-table")
+    monkeypatch.setenv("LISA_INGESTION_JOB_TABLE_NAME", "test-job-table")
+    monkeypatch.setenv("LISA_INGESTION_JOB_QUEUE_NAME", "test-queue")
+    monkeypatch.setenv("LISA_INGESTION_JOB_DEFINITION_NAME", "test-job-def")
+
+
+def test_resolve_job_id_for_array_child(pipeline_env, monkeypatch):
+    """Test that an array job's children each process the manifest job matching their array index."""
+    import repository.pipeline_ingestion
+
+    monkeypatch.delenv("AWS_BATCH_JOB_ARRAY_INDEX", raising=False)
+    assert repository.pipeline_ingestion.resolve_job_id("job-1") == "job-1"
+
+    monkeypatch.setenv("AWS_BATCH_JOB_ARRAY_INDEX", "3")
+    assert repository.pipeline_ingestion.resolve_job_id("array-1") == "array-1-3"
+
+
+class _InMemoryRagDocumentRepository:
+    """Keeps saved documents in memory in place of the document tables."""
+
+    def __init__(self):
+        self.documents = {}
+
+    def save(self, document):
+        self.documents[document.document_id] = document
+
+    def find_by_source(self, repository_id, collection_id, source, join_docs=False):
+        return [doc for doc in self.documents.values() if doc.source == source]
+
+    def delete_by_id(self, document_id):
+        self.documents.pop(document_id, None)
+
+
+class _InMemoryVectorStore:
+    """Stands in for a vector store client, keeping added texts by id."""
+
+    def __init__(self):
+        self.texts = {}
+        self._lock = threading.Lock()
+
+    def add_texts(self, texts, metadatas):
+        with self._lock:
+            ids = [f"vec-{len(self.texts) + i}" for i in range(len(texts))]
+            self.texts.update(zip(ids, texts))
+        return ids
+
+
+def test_main_ingests_manifest_array_job(pipeline_env, monkeypatch):
+    """Test a bulk submission end to end: one array job whose children run the worker entrypoint on a manifest."""
+    from unittest.mock import Mock
+
+    import boto3
+    from moto import mock_aws
+
+    keys = [f"doc{i}.txt" for i in range(4)] + ["image.bin"]
+
+    with mock_aws():
+        boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName="test-job-table",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        # A session of its own keeps the client real even if another test left boto3.client patched
+        s3 = boto3.session.Session().client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="docs")
+        for key in keys:
+            s3.put_object(Bucket="docs", Key=key, Body=f"Contents of {key}. ".encode() * 100)
+
+        import repository.pipeline_ingestion
+        from repository import pipeline_ingest_documents
+        from repository.ingestion_job_repo import IngestionJobRepository
+        from repository.ingestion_service import DocumentIngestionService
+
+        job_repo = IngestionJobRepository()
+        jobs = [
+            IngestionJob(
+                repository_id="test-repo",
+                collection_id="test-collection",
+                embedding_model="test-model",
+                s3_path=f"s3://docs/{key}",
+                chunk_strategy=FixedChunkingStrategy(size=500, overlap=50),
+                username="test-user",
+            )
+            for key in keys
+        ]
+        for job in jobs:
+            job_repo.save(job)
+
+        with patch("repository.ingestion_service.boto3") as mock_boto3, patch(
+            "repository.ingestion_service.INGESTION_MANIFEST_SIZE", 2
+        ):
+            mock_batch = mock_boto3.client.return_value
+            mock_batch.submit_job.return_value = {"jobId": "batch-job"}
+            DocumentIngestionService(job_repo).submit_create_jobs(jobs)
+
+        # Five documents in manifests of two run as one array job of three children
+        mock_batch.submit_job.assert_called_once()
+        submitted = mock_batch.submit_job.call_args.kwargs
+        assert submitted["arrayProperties"] == {"size": 3}
+        array_id = submitted["parameters"]["DOCUMENT_ID"]
+
+        store = _InMemoryVectorStore()
+        mock_service = Mock()
+        mock_service.get_vector_store_client.return_value = store
+        mock_vs_repo = Mock()
+        mock_vs_repo.find_repository_by_id.return_value = {"repositoryId": "test-repo", "type": "opensearch"}
+        doc_repo = _InMemoryRagDocumentRepository()
+
+        with patch.multiple(
+            "repository.pipeline_ingest_documents",
+            vs_repo=mock_vs_repo,
+            VectorStoreRepository=Mock(return_value=mock_vs_repo),
+            RepositoryServiceFactory=Mock(create_service=Mock(return_value=mock_service)),
+            RagEmbeddings=Mock(),
+            rag_document_repository=doc_repo,
+        ), patch.dict(pipeline_ingest_documents.iter_chunks.__globals__, {"s3": s3}):
+            # The S3 client is patched where iter_chunks looks it up, whichever module object defined it
+            for index in range(3):
+                monkeypatch.setenv("AWS_BATCH_JOB_ARRAY_INDEX", str(index))
+                repository.pipeline_ingestion.main(["pipeline_ingestion.py", "ingest", array_id])
+
+        # Each document job's outcome is written back to the job table
+        saved = {job.s3_path: job_repo.find_by_id(job.id) for job in jobs}
+        for key in keys[:4]:
+            assert saved[f"s3://docs/{key}"].status == IngestionStatus.INGESTION_COMPLETED
+            assert saved[f"s3://docs/{key}"].document_id in doc_repo.documents
+        assert saved["s3://docs/image.bin"].status == IngestionStatus.INGESTION_FAILED
+        assert "Unsupported file type" in saved["s3://docs/image.bin"].error_message
+
+        manifests = [job_repo.find_by_id(f"{array_id}-{index}") for index in range(3)]
+        assert [manifest.manifest_job_ids for manifest in manifests] == [
+            [jobs[0].id, jobs[1].id],
+            [jobs[2].id, jobs[3].id],
+            [jobs[4].id],
+        ]
+        assert [manifest.status for manifest in manifests] == [
+            IngestionStatus.INGESTION_COMPLETED,
+            IngestionStatus.INGESTION_COMPLETED,
+            IngestionStatus.INGESTION_FAILED,
+        ]
+        assert sorted(store.texts) == sorted(
+            chunk_id for doc in doc_repo.documents.values() for chunk_id in doc.subdocs
+        )
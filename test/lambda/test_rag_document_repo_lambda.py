@@ -150,8 +150,11 @@ def test_delete_by_id_success(sample_rag_document):
         # Call the function
         repo.delete_by_id("test-doc-id")
 
-        # Verify calls
-        mock_doc_table.delete_item.assert_called_once()
+        # Verify calls: the document and its source index entry
+        assert mock_doc_table.delete_item.call_count == 2
+        mock_doc_table.delete_item.assert_any_call(
+            Key={"pk": "test-repo#test-collection", "document_id": "test-doc-id"}
+        )
         mock_batch_writer.delete_item.assert_called_once()
 
 
@@ -258,8 +261,12 @@ def test_save_success(sample_rag_document):
         # Call the function
         repo.save(sample_rag_document)
 
-        # Verify put_item was called
-        mock_doc_table.put_item.assert_called_once_with(Item=sample_rag_document.model_dump())
+        # Verify put_item was called for the document and its source index entry
+        assert mock_doc_table.put_item.call_count == 2
+        assert mock_doc_table.put_item.call_args_list[0].kwargs == {"Item": sample_rag_document.model_dump()}
+        source_index_item = mock_doc_table.put_item.call_args_list[1].kwargs["Item"]
+        assert source_index_item["pk"] == "source#test-repo#test-collection"
+        assert source_index_item["target_document_id"] == "test-doc-id"
         # Verify batch writer was used
         mock_subdoc_table.batch_writer.assert_called_once()
 
@@ -449,6 +456,102 @@ def test_find_by_source_client_error():
             list(repo.find_by_source("test-repo", "test-collection", "s3://test-bucket/test-key"))
 
 
+@pytest.fixture
+def source_index_repo():
+    """RagDocumentRepository backed by a moto document table."""
+    import boto3
+    from moto import mock_aws
+
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        doc_table = dynamodb.create_table(
+            TableName="test-doc-table",
+            KeySchema=[
+                {"AttributeName": "pk", "KeyType": "HASH"},
+                {"AttributeName": "document_id", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "pk", "AttributeType": "S"},
+                {"AttributeName": "document_id", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "document_index",
+                    "KeySchema": [{"AttributeName": "document_id", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        repo = RagDocumentRepository("test-doc-table", "test-subdoc-table")
+        repo.dynamodb = dynamodb
+        repo.doc_table = doc_table
+        repo.subdoc_table = MagicMock()
+        repo.subdoc_table.query.return_value = {"Items": []}
+        yield repo
+
+
+def _document(document_id, source):
+    return RagDocument(
+        document_id=document_id,
+        repository_id="test-repo",
+        collection_id="test-collection",
+        document_name=source.rsplit("/", 1)[-1],
+        source=source,
+        username="test-user",
+        chunk_strategy=FixedChunkingStrategy(type=ChunkingStrategyType.FIXED, size=1000, overlap=200),
+    )
+
+
+def test_find_document_ids_by_source_batches_lookups(source_index_repo):
+    """Test that sources are deduplicated and resolved with one BatchGetItem per 100 sources."""
+    for i in range(250):
+        source_index_repo.save(_document(f"doc-{i}", f"s3://bucket/doc-{i}.pdf"))
+    sources = [f"s3://bucket/doc-{i}.pdf" for i in range(250)] + ["s3://bucket/doc-0.pdf", "s3://bucket/missing.pdf"]
+
+    with patch.object(
+        source_index_repo.dynamodb, "batch_get_item", wraps=source_index_repo.dynamodb.batch_get_item
+    ) as mock_batch_get, patch.object(
+        source_index_repo, "find_one_by_source", wraps=source_index_repo.find_one_by_source
+    ) as mock_find_one:
+        document_ids = source_index_repo.find_document_ids_by_source("test-repo", "test-collection", sources)
+
+    assert document_ids == {f"s3://bucket/doc-{i}.pdf": f"doc-{i}" for i in range(250)}
+    assert mock_batch_get.call_count == 3
+    # Only the source without a document falls back to a partition query
+    mock_find_one.assert_called_once_with("test-repo", "test-collection", "s3://bucket/missing.pdf")
+
+
+def test_find_document_ids_by_source_backfills_index(source_index_repo):
+    """Test that documents saved before the source index existed are found and added to the index."""
+    legacy = _document("legacy-doc", "s3://bucket/legacy.pdf")
+    source_index_repo.doc_table.put_item(Item=legacy.model_dump())
+
+    first = source_index_repo.find_document_ids_by_source("test-repo", "test-collection", ["s3://bucket/legacy.pdf"])
+    with patch.object(source_index_repo, "find_one_by_source") as mock_find_one:
+        second = source_index_repo.find_document_ids_by_source(
+            "test-repo", "test-collection", ["s3://bucket/legacy.pdf"]
+        )
+
+    assert first == second == {"s3://bucket/legacy.pdf": "legacy-doc"}
+    mock_find_one.assert_not_called()
+
+
+def test_delete_by_id_keeps_source_index_of_newer_document(source_index_repo):
+    """Test that deleting a replaced document leaves the source pointing at its replacement."""
+    source_index_repo.save(_document("old-doc", "s3://bucket/report.pdf"))
+    source_index_repo.save(_document("new-doc", "s3://bucket/report.pdf"))
+
+    def lookup():
+        return source_index_repo.find_document_ids_by_source("test-repo", "test-collection", ["s3://bucket/report.pdf"])
+
+    source_index_repo.delete_by_id("old-doc")
+    assert lookup() == {"s3://bucket/report.pdf": "new-doc"}
+
+    source_index_repo.delete_by_id("new-doc")
+    assert lookup() == {}
+
+
 def test_list_all_with_repository_id_only(sample_rag_document):
     """Test list_all with repository_id only."""
     with patch("repository.rag_document_repo.boto3.resource") as mock_resource, patch(
@@ -301,6 +301,16 @@ def mock_boto3_client_fixture():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_embedding_client_config():
+    """Resolve embedding client settings afresh in each test."""
+    from repository.embeddings import invalidate_client_config
+
+    invalidate_client_config()
+    yield
+    invalidate_client_config()
+
+
 @pytest.fixture
 def aws_credentials():
     """Mocked AWS Credentials for moto."""
@@ -1096,7 +1106,7 @@ def test_RagEmbeddings_function():
 
         assert result.model_name == "test-model"
         mock_cert.assert_called_once()
-        assert mock_endpoint.call_count == 2  # Called twice in RagEmbeddings.__init__
+        mock_endpoint.assert_called_once()
 
 
 def test_pipeline_embeddings_init():
@@ -1116,7 +1126,7 @@ def test_pipeline_embeddings_init():
         assert isinstance(embeddings.model_name, str)
         assert embeddings.model_name == "test-model"
         mock_management_key.assert_called_once()
-        assert mock_endpoint.call_count == 2  # Called twice in RagEmbeddings.__init__
+        mock_endpoint.assert_called_once()
         mock_cert.assert_called_once()
 
 
@@ -1439,6 +1449,117 @@ def test_real_similarity_search_function():
             assert "body" in result
 
 
+def test_similarity_search_search_mode():
+    """Test that similarity_search forwards searchMode and rejects unknown modes"""
+    from repository.lambda_functions import similarity_search
+
+    with patch("repository.lambda_functions.get_repository") as mock_get_repo, patch(
+        "repository.lambda_functions.RepositoryServiceFactory"
+    ) as mock_factory:
+        mock_get_repo.return_value = {"repositoryId": "test-repo", "type": "opensearch", "allowedGroups": []}
+        mock_service = mock_factory.create_service.return_value
+        mock_service.retrieve_documents.return_value = []
+
+        def search(search_mode):
+            event = {
+                "requestContext": {"authorizer": {"username": "test-user", "groups": ["users"]}},
+                "pathParameters": {"repositoryId": "test-repo"},
+                "queryStringParameters": {"modelName": "test-model", "query": "E2210", "searchMode": search_mode},
+            }
+            return similarity_search(event, {})
+
+        assert search("hybrid")["statusCode"] == 200
+        assert mock_service.retrieve_documents.call_args.kwargs["search_mode"] == "hybrid"
+
+        mock_service.retrieve_documents.reset_mock()
+        assert search("keyword")["statusCode"] == 400
+        mock_service.retrieve_documents.assert_not_called()
+
+
+def test_similarity_search_rerank():
+    """Test that similarity_search over-fetches for reranking and reports stage latency"""
+    from repository.lambda_functions import similarity_search
+
+    with patch("repository.lambda_functions.get_repository") as mock_get_repo, patch(
+        "repository.lambda_functions.RepositoryServiceFactory"
+    ) as mock_factory:
+        mock_get_repo.return_value = {
+            "repositoryId": "test-repo",
+            "type": "opensearch",
+            "allowedGroups": [],
+            "rerank": {"candidates": 10},
+        }
+        mock_service = mock_factory.create_service.return_value
+        mock_service.retrieve_documents.return_value = [
+            {"page_content": "unrelated text", "metadata": {"source": "a", "documentId": "doc-a"}},
+            {"page_content": "clear error E2210", "metadata": {"source": "b", "documentId": "doc-b"}},
+        ]
+
+        def search(**params):
+            event = {
+                "requestContext": {"authorizer": {"username": "test-user", "groups": ["users"]}},
+                "pathParameters": {"repositoryId": "test-repo"},
+                "queryStringParameters": {"modelName": "test-model", "query": "E2210", "topK": "1", **params},
+            }
+            return similarity_search(event, {})
+
+        result = search()
+        body = json.loads(result["body"])
+        assert result["statusCode"] == 200
+        assert mock_service.retrieve_documents.call_args.kwargs["top_k"] == 10
+        assert [doc["Document"]["metadata"]["source"] for doc in body["docs"]] == ["b"]
+        assert body["latency"]["rerankStatus"] == "reranked"
+        assert {"retrieveMs", "rerankMs"} <= body["latency"].keys()
+
+        body = json.loads(search(rerank="false")["body"])
+        assert mock_service.retrieve_documents.call_args.kwargs["top_k"] == 1
+        assert "latency" not in body
+
+        assert search(rerank="maybe")["statusCode"] == 400
+        assert search(rerankBudgetMs="0")["statusCode"] == 400
+
+
+def test_batch_similarity_search():
+    """Test that batch_similarity_search runs every query through one service call and keeps query order"""
+    from repository.lambda_functions import batch_similarity_search
+
+    with patch("repository.lambda_functions.get_repository") as mock_get_repo, patch(
+        "repository.lambda_functions.RepositoryServiceFactory"
+    ) as mock_factory:
+        mock_get_repo.return_value = {"repositoryId": "test-repo", "type": "opensearch", "allowedGroups": []}
+        mock_service = mock_factory.create_service.return_value
+        mock_service.retrieve_documents_batch.return_value = [
+            [{"page_content": "first", "metadata": {"source": "a", "documentId": "doc-a"}}],
+            [],
+        ]
+
+        def search(body):
+            event = {
+                "requestContext": {"authorizer": {"username": "test-user", "groups": ["users"]}},
+                "pathParameters": {"repositoryId": "test-repo"},
+                "body": body if isinstance(body, str) else json.dumps(body),
+            }
+            return batch_similarity_search(event, {})
+
+        result = search({"queries": ["q1", "q2"], "modelName": "test-model", "topK": 2, "searchMode": "hybrid"})
+        body = json.loads(result["body"])
+        assert result["statusCode"] == 200
+        assert mock_factory.create_service.call_count == 1
+        kwargs = mock_service.retrieve_documents_batch.call_args.kwargs
+        assert kwargs["queries"] == ["q1", "q2"]
+        assert kwargs["top_k"] == 2
+        assert kwargs["search_mode"] == "hybrid"
+        assert [r["query"] for r in body["results"]] == ["q1", "q2"]
+        assert body["results"][0]["docs"][0]["Document"]["page_content"] == "first"
+        assert body["results"][1]["docs"] == []
+        assert "latency" not in body
+
+        assert search({"queries": [], "modelName": "test-model"})["statusCode"] == 400
+        assert search({"queries": ["q"] * 51, "modelName": "test-model"})["statusCode"] == 400
+        assert search({"queries": ["q"]})["statusCode"] == 400
+        assert search("not json")["statusCode"] == 400
+
+
 def test_real_similarity_search_missing_params():
     """Test similarity_search with missing required parameters"""
     from repository.lambda_functions import similarity_search
@@ -1942,29 +2063,34 @@ def test_enrich_metadata_with_document_id():
     from repository.lambda_functions import enrich_metadata_with_document_id
 
     with patch("repository.lambda_functions.doc_repo") as mock_doc_repo:
-        # Mock RAG document lookup
-        mock_rag_doc = MagicMock()
-        mock_rag_doc.document_id = "enriched-doc-id-123"
-        mock_doc_repo.find_one_by_source.return_value = mock_rag_doc
+        # Mock batched RAG document lookup
+        mock_doc_repo.find_document_ids_by_source.return_value = {
+            "s3://bucket/doc1.pdf": "enriched-doc-id-1",
+            "s3://bucket/doc2.pdf": "enriched-doc-id-2",
+        }
 
         # Test documents without document_id in metadata
         docs = [
             {"page_content": "Test content", "metadata": {"source": "s3://bucket/doc1.pdf"}},
             {"page_content": "More content", "metadata": {"source": "s3://bucket/doc2.pdf"}},
+            {"page_content": "Same source", "metadata": {"source": "s3://bucket/doc1.pdf"}},
         ]
 
         # Enrich metadata
         enriched_docs = enrich_metadata_with_document_id(docs, "test-repo", "test-collection")
 
         # Verify document_id was added to metadata
-        assert enriched_docs[0]["metadata"]["document_id"] == "enriched-doc-id-123"
-        assert enriched_docs[1]["metadata"]["document_id"] == "enriched-doc-id-123"
+        assert enriched_docs[0]["metadata"]["document_id"] == "enriched-doc-id-1"
+        assert enriched_docs[1]["metadata"]["document_id"] == "enriched-doc-id-2"
+        assert enriched_docs[2]["metadata"]["document_id"] == "enriched-doc-id-1"
 
-        # Verify find_one_by_source was called correctly
-        assert mock_doc_repo.find_one_by_source.call_count == 2
-        mock_doc_repo.find_one_by_source.assert_any_call(
-            repository_id="test-repo", collection_id="test-collection", source="s3://bucket/doc1.pdf"
+        # Verify all sources were resolved in one lookup
+        mock_doc_repo.find_document_ids_by_source.assert_called_once_with(
+            repository_id="test-repo",
+            collection_id="test-collection",
+            sources=["s3://bucket/doc1.pdf", "s3://bucket/doc2.pdf", "s3://bucket/doc1.pdf"],
         )
+        mock_doc_repo.find_one_by_source.assert_not_called()
 
 
 def test_enrich_metadata_with_document_id_missing_source():
@@ -1981,7 +2107,7 @@ def test_enrich_metadata_with_document_id_missing_source():
         enriched_docs = enrich_metadata_with_document_id(docs, "test-repo", "test-collection")
 
         # Verify no lookup was attempted
-        mock_doc_repo.find_one_by_source.assert_not_called()
+        mock_doc_repo.find_document_ids_by_source.assert_not_called()
         # Document should be returned unchanged
         assert "document_id" not in enriched_docs[0]["metadata"]
 
@@ -1991,8 +2117,8 @@ def test_enrich_metadata_with_document_id_not_found():
     from repository.lambda_functions import enrich_metadata_with_document_id
 
     with patch("repository.lambda_functions.doc_repo") as mock_doc_repo:
-        # Mock RAG document lookup returning None
-        mock_doc_repo.find_one_by_source.return_value = None
+        # Mock RAG document lookup finding nothing
+        mock_doc_repo.find_document_ids_by_source.return_value = {}
 
         # Test document
         docs = [{"page_content": "Test content", "metadata": {"source": "s3://bucket/doc1.pdf"}}]
@@ -2010,7 +2136,7 @@ def test_enrich_metadata_with_document_id_exception():
 
     with patch("repository.lambda_functions.doc_repo") as mock_doc_repo:
         # Mock RAG document lookup raising exception
-        mock_doc_repo.find_one_by_source.side_effect = Exception("Database error")
+        mock_doc_repo.find_document_ids_by_source.side_effect = Exception("Database error")
 
         # Test document
         docs = [{"page_content": "Test content", "metadata": {"source": "s3://bucket/doc1.pdf"}}]
@@ -2711,7 +2837,7 @@ def test_similarity_search_with_score():
     mock_vs.similarity_search_with_score.return_value = [(mock_doc, 0.9)]
     mock_vs.client.indices.exists.return_value = True
 
-    with patch("repository.services.opensearch_repository_service.RagEmbeddings"):
+    with patch("repository.services.vector_store_repository_service.RagEmbeddings"):
         with patch.object(service, "_get_vector_store_client", return_value=mock_vs):
             result = service.retrieve_documents("query", "test-collection", 3, "test-model", include_score=True)
 
@@ -2733,7 +2859,7 @@ def test_similarity_search_without_score():
     mock_doc.metadata = {"source": "test"}
     mock_vs.similarity_search_with_score.return_value = [(mock_doc, 0.9)]
 
-    with patch("repository.services.opensearch_repository_service.RagEmbeddings"):
+    with patch("repository.services.vector_store_repository_service.RagEmbeddings"):
         with patch.object(service, "_get_vector_store_client", return_value=mock_vs):
             result = service.retrieve_documents("query", "test-collection", 3, "test-model", include_score=False)
 
@@ -3133,6 +3259,55 @@ def test_update_repository_without_pipeline_change():
         mock_sf.start_execution.assert_not_called()
 
 
+def test_update_repository_hybrid_search_change_deploys_pgvector():
+    """Test that changing a PGVector repository's hybridSearch settings runs the deployment that creates its index"""
+    from repository.lambda_functions import update_repository
+
+    with patch("repository.lambda_functions.vs_repo") as mock_vs, patch(
+        "repository.lambda_functions.ssm_client"
+    ) as mock_ssm, patch("repository.lambda_functions.step_functions_client") as mock_sf, patch(
+        "utilities.auth.is_admin"
+    ) as mock_is_admin:
+        mock_is_admin.return_value = True
+        mock_vs.find_repository_by_id.return_value = {
+            "repositoryId": "repo1",
+            "config": {"repositoryId": "repo1", "type": "pgvector", "pipelines": []},
+        }
+        mock_vs.update.return_value = {"repositoryId": "repo1", "type": "pgvector", "hybridSearch": {"enabled": True}}
+        mock_ssm.get_parameter.return_value = {"Parameter": {"Value": "arn:test-state-machine"}}
+        mock_sf.start_execution.return_value = {"executionArn": "arn:execution:123"}
+
+        event = {
+            "requestContext": {"authorizer": {"claims": {"username": "admin-user"}}},
+            "pathParameters": {"repositoryId": "repo1"},
+            "body": json.dumps({"hybridSearch": {"enabled": True}}),
+        }
+        result = update_repository(event, SimpleNamespace(function_name="test", aws_request_id="123"))
+
+        assert result["statusCode"] == 200
+        assert json.loads(result["body"])["executionArn"] == "arn:execution:123"
+        assert mock_vs.update.call_args.kwargs["status"] == "UPDATE_IN_PROGRESS"
+
+
+def test_create_default_collection_prepares_hybrid_search():
+    """Test that deploying a repository with hybridSearch configured prepares its store for hybrid search"""
+    from repository.lambda_functions import create_default_collection
+
+    with patch("repository.lambda_functions.vs_repo") as mock_vs, patch(
+        "repository.lambda_functions.RepositoryServiceFactory"
+    ) as mock_factory:
+        mock_vs.find_repository_by_id.return_value = {"repositoryId": "repo1", "hybridSearch": {"enabled": True}}
+        service = mock_factory.create_service.return_value
+        service.prepare_hybrid_search.side_effect = Exception("connection refused")
+        service.should_create_default_collection.return_value = False
+
+        result = create_default_collection({"ragConfig": {"repositoryId": "repo1"}}, {})
+
+    # Failing to prepare does not fail the deployment, searches only run slower
+    service.prepare_hybrid_search.assert_called_once()
+    assert result["skipped"] is True
+
+
 def test_create_success():
     """Test create repository"""
     from repository.lambda_functions import create
@@ -3212,7 +3387,7 @@ def test_similarity_search_helpers():
         mock_vs.similarity_search_with_score.return_value = [(mock_doc, 0.9)]
         mock_vs.client.indices.exists.return_value = True
 
-        with patch("repository.services.opensearch_repository_service.RagEmbeddings"):
+        with patch("repository.services.vector_store_repository_service.RagEmbeddings"):
             with patch.object(service, "_get_vector_store_client", return_value=mock_vs):
                 results = service.retrieve_documents("query", "test-collection", 3, "test-model", include_score=False)
 
@@ -726,3 +726,20 @@ class TestListModifiedObjects:
             result = handle_list_modified_objects(event, lambda_context)
             assert len(result["files"]) == 2
             assert result["metadata"]["files_found"] == 2
+
+    def test_handle_list_modified_objects_resumes_after_watermark(self, lambda_context):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        mock_page = {
+            "Contents": [
+                {"Key": "test/a.txt", "LastModified": now - timedelta(hours=2)},
+                {"Key": "test/b.txt", "LastModified": now - timedelta(hours=1)},
+                {"Key": "test/c.txt", "LastModified": now - timedelta(hours=1)},
+                {"Key": "test/d.txt", "LastModified": now},
+            ]
+        }
+        watermark = {"lastModified": (now - timedelta(hours=1)).isoformat(), "lastKey": "test/b.txt"}
+        with self._patch_s3(paginator_return_value=[mock_page]):
+            event = {"detail": {"bucket": "test-bucket", "prefix": "test/", "watermark": watermark}}
+            result = handle_list_modified_objects(event, lambda_context)
+            assert [f["key"] for f in result["files"]] == ["test/c.txt", "test/d.txt"]
+            assert result["metadata"]["watermark"]["lastKey"] == "test/d.txt"
@@ -14,9 +14,13 @@
 
 """Fixtures for REST API unit tests."""
 
+import asyncio
+import json
 from unittest.mock import MagicMock, Mock
 
 import pytest
+import pytest_asyncio
+from aiohttp import web
 from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
@@ -189,3 +193,93 @@ def mock_guardrails():
             "markedForDeletion": False,
         },
     ]
+
+
+class FakeLiteLLMServer:
+    """Minimal local stand-in for the LiteLLM proxy used to exercise the upstream HTTP client."""
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.requests: list[dict] = []
+        self.connections: set = set()
+        self.models = [
+            {"model_name": "test-model", "litellm_params": {"model": "bedrock/test-model"}},
+            {"model_name": "vllm-model", "litellm_params": {"model": "hosted_vllm/vllm-model"}},
+        ]
+        self.stream_chunks = [
+            {"id": "1", "choices": [{"index": 0, "delta": {"content": "Hello"}}]},
+            {"id": "1", "choices": [{"index": 0, "delta": {"content": " world"}}]},
+            {"id": "1", "choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}},
+        ]
+        self.error_response: tuple[int, dict] | None = None
+        self.model_info_delay = 0.0
+        self._runner = None
+
+    def _record(self, request, body=None) -> None:
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.requests.append(
+            {"method": request.method, "path": request.path, "headers": dict(request.headers), "body": body}
+        )
+
+    async def _model_info(self, request):
+        self._record(request)
+        if self.model_info_delay:
+            await asyncio.sleep(self.model_info_delay)
+        return web.json_response({"data": self.models})
+
+    async def _chat(self, request):
+        body = await request.json()
+        self._record(request, body)
+        if self.error_response is not None:
+            status, payload = self.error_response
+            return web.json_response(payload, status=status)
+        if not body.get("stream"):
+            return web.json_response(
+                {
+                    "id": "1",
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hello world"}}],
+                    "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+                }
+            )
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for chunk in self.stream_chunks:
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def _upload(self, request):
+        form = await request.post()
+        fields = {}
+        for name, value in form.items():
+            fields[name] = value.file.read().decode() if hasattr(value, "file") else value
+        self._record(request, fields)
+        return web.json_response({"fields": fields})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/model/info", self._model_info)
+        app.router.add_post("/v1/chat/completions", self._chat)
+        app.router.add_post("/chat/completions", self._chat)
+        app.router.add_post("/v1/images/edits", self._upload)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def fake_litellm_server():
+    """Start a fake LiteLLM server on a random local port."""
+    server = FakeLiteLLMServer()
+    await server.start()
+    yield server
+    await server.stop()
@@ -0,0 +1,196 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the pure ASGI middleware adapter and single-read request body."""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Add REST API src to path
+rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
+sys.path.insert(0, str(rest_api_src))
+
+import utils.request_body as request_body_module
+from middleware import FunctionMiddleware, ProcessRequestMiddleware, security_middleware, validate_input_middleware
+from utils.request_body import get_json_body, get_request_body, receive_with_cached_body
+
+
+class CountingReceive:
+    """ASGI wrapper that counts the body bytes the server delivers to the app."""
+
+    def __init__(self, app):
+        self.app = app
+        self.body_bytes = 0
+
+    async def __call__(self, scope, receive, send):
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                self.body_bytes += len(message.get("body", b""))
+            return message
+
+        await self.app(scope, counting_receive, send)
+
+
+def _validated_app() -> FastAPI:
+    """Build an app with the validation middleware in the same order as the REST API."""
+    app = FastAPI()
+
+    @app.post("/parsed")
+    async def parsed(request: Request):
+        params = await get_json_body(request)
+        return {"keys": sorted(params)}
+
+    @app.post("/model")
+    async def model(data: dict):
+        return {"keys": sorted(data)}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            for i in range(3):
+                yield f"chunk{i}\n"
+
+        return StreamingResponse(body())
+
+    app.add_middleware(FunctionMiddleware, dispatch=validate_input_middleware)
+    app.add_middleware(ProcessRequestMiddleware)
+    app.add_middleware(FunctionMiddleware, dispatch=security_middleware)
+    return app
+
+
+async def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestFunctionMiddleware:
+    """Test suite for running (request, call_next) middleware as pure ASGI."""
+
+    @pytest.mark.asyncio
+    async def test_short_circuit_response(self):
+        """Test that a response returned by the middleware function is sent instead of calling the app."""
+        app = FastAPI()
+        called = []
+
+        @app.get("/")
+        async def root():
+            called.append(True)
+            return {}
+
+        async def deny(request, call_next):
+            return JSONResponse({"error": "denied"}, status_code=403)
+
+        app.add_middleware(FunctionMiddleware, dispatch=deny)
+        async with await _client(app) as client:
+            response = await client.get("/")
+
+        assert response.status_code == 403
+        assert response.json() == {"error": "denied"}
+        assert called == []
+
+    @pytest.mark.asyncio
+    async def test_streaming_response_passes_through(self):
+        """Test that streaming responses are relayed through the whole chain."""
+        async with await _client(_validated_app()) as client:
+            response = await client.get("/stream")
+
+        assert response.status_code == 200
+        assert response.text == "chunk0\nchunk1\nchunk2\n"
+        assert "X-Request-ID" in response.headers
+
+    @pytest.mark.asyncio
+    async def test_validation_error_from_chain(self):
+        """Test that the security middleware still rejects invalid JSON."""
+        async with await _client(_validated_app()) as client:
+            response = await client.post("/parsed", content=b"{not json", headers={"content-type": "application/json"})
+
+        assert response.status_code == 400
+        assert response.json()["message"] == "Request body must be valid JSON"
+
+
+class TestRequestBodyReadOnce:
+    """Test suite for sharing one body read and one JSON parse across middleware and handlers."""
+
+    @pytest.mark.asyncio
+    async def test_body_read_and_parsed_once(self):
+        """Test that the body is received once and parsed once across the chain and the route handler."""
+        app = CountingReceive(_validated_app())
+        payload = {"model": "m", "messages": [{"role": "user", "content": "x" * 100_000}]}
+
+        content = json.dumps(payload).encode()
+
+        with patch.object(request_body_module.json, "loads", wraps=json.loads) as mock_loads:
+            async with await _client(app) as client:
+                response = await client.post("/parsed", content=content, headers={"content-type": "application/json"})
+
+        assert response.status_code == 200
+        assert response.json() == {"keys": ["messages", "model"]}
+        assert app.body_bytes == len(content)
+        assert mock_loads.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_body_replayed_to_framework_parsing(self):
+        """Test that routes using FastAPI body parameters receive the body already read by middleware."""
+        app = CountingReceive(_validated_app())
+
+        async with await _client(app) as client:
+            response = await client.post("/model", json={"a": 1, "b": 2})
+
+        assert response.status_code == 200
+        assert response.json() == {"keys": ["a", "b"]}
+        assert app.body_bytes == len(b'{"a":1,"b":2}')
+
+    @pytest.mark.asyncio
+    async def test_null_byte_in_body_rejected(self):
+        """Test that a raw null byte in a JSON body is rejected before reaching the route."""
+        async with await _client(_validated_app()) as client:
+            response = await client.post(
+                "/parsed",
+                content=b'{"a": "x\x00y"}',
+                headers={"content-type": "application/json"},
+            )
+
+        assert response.status_code == 400
+        assert response.json()["message"] == "Invalid characters detected in request"
+
+    @pytest.mark.asyncio
+    async def test_replay_then_disconnect(self):
+        """Test that replayed receives hand over the body once and then defer to the server."""
+        messages = [{"type": "http.request", "body": b"{}", "more_body": False}, {"type": "http.disconnect"}]
+
+        async def server_receive():
+            return messages.pop(0)
+
+        scope = {"type": "http", "method": "POST", "headers": [], "path": "/"}
+        assert await get_request_body(Request(scope, server_receive)) == b"{}"
+
+        # Nested adapters wrap an already replaying receive; the body must still only be replayed once
+        replay = receive_with_cached_body(scope, receive_with_cached_body(scope, server_receive))
+        assert await replay() == {"type": "http.request", "body": b"{}", "more_body": False}
+        assert await replay() == {"type": "http.disconnect"}
+
+    def test_receive_unchanged_when_body_not_read(self):
+        """Test that the receive callable is passed through untouched when no body was cached."""
+
+        async def server_receive():
+            return {"type": "http.disconnect"}
+
+        assert receive_with_cached_body({"type": "http"}, server_receive) is server_receive
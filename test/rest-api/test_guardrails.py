@@ -14,27 +14,53 @@
 
 """Unit tests for REST API guardrails utilities."""
 
+import asyncio
 import json
 import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import boto3
 import pytest
+from cachetools import TTLCache
+from moto import mock_aws
 
 # Add REST API src to path
 rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
 sys.path.insert(0, str(rest_api_src))
 
+import utils.guardrails as guardrails_module
 from utils.guardrails import (
     create_guardrail_json_response,
     create_guardrail_streaming_response,
     extract_guardrail_response,
     get_applicable_guardrails,
     get_model_guardrails,
+    invalidate_guardrails_cache,
     is_guardrail_violation,
 )
 
 
+class FakeClock:
+    """Controllable timer for TTL cache tests."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_guardrails_cache(monkeypatch):
+    """Give every test an empty guardrails cache and a fresh table handle."""
+    clock = FakeClock()
+    monkeypatch.setattr(guardrails_module, "_guardrails_cache", TTLCache(maxsize=16, ttl=60, timer=clock))
+    monkeypatch.setattr(guardrails_module, "_guardrails_inflight", {})
+    monkeypatch.setattr(guardrails_module, "_guardrails_table", None)
+    return clock
+
+
 class TestGetModelGuardrails:
     """Test suite for get_model_guardrails function."""
 
@@ -98,6 +124,134 @@ class TestGetModelGuardrails:
             assert result == []
 
 
+@pytest.fixture
+def guardrails_table(mock_env_vars):
+    """Create a moto guardrails table with the ModelIdIndex GSI and count its queries."""
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=mock_env_vars["GUARDRAILS_TABLE_NAME"],
+            KeySchema=[
+                {"AttributeName": "guardrailId", "KeyType": "HASH"},
+                {"AttributeName": "modelId", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "guardrailId", "AttributeType": "S"},
+                {"AttributeName": "modelId", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "ModelIdIndex",
+                    "KeySchema": [
+                        {"AttributeName": "modelId", "KeyType": "HASH"},
+                        {"AttributeName": "guardrailId", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        table.put_item(Item={"guardrailId": "g1", "modelId": "model-a", "guardrailName": "pii", "allowedGroups": []})
+        table.put_item(Item={"guardrailId": "g2", "modelId": "model-a", "guardrailName": "toxicity"})
+
+        queries: list[str] = []
+        guardrails_table = guardrails_module._get_guardrails_table()
+        guardrails_table.meta.client.meta.events.register(
+            "provide-client-params.dynamodb.Query",
+            lambda params, **kwargs: queries.append(params["ExpressionAttributeValues"][":modelId"]),
+        )
+        yield table, queries
+
+
+class TestModelGuardrailsCache:
+    """Test suite for the per-model guardrails cache, backed by a moto DynamoDB table."""
+
+    @pytest.mark.asyncio
+    async def test_one_query_per_model_per_ttl_window(self, guardrails_table, reset_guardrails_cache):
+        """Test that repeated lookups within the TTL hit DynamoDB once per model."""
+        _, queries = guardrails_table
+
+        for _ in range(5):
+            result = await get_model_guardrails("model-a")
+            await get_model_guardrails("model-b")
+
+        assert {g["guardrailName"] for g in result} == {"pii", "toxicity"}
+        assert sorted(queries) == ["model-a", "model-b"]
+
+        reset_guardrails_cache.now += 61
+        await get_model_guardrails("model-a")
+        await get_model_guardrails("model-a")
+
+        assert queries.count("model-a") == 2
+
+    @pytest.mark.asyncio
+    async def test_models_without_guardrails_are_cached(self, guardrails_table):
+        """Test negative caching of models with no guardrails."""
+        _, queries = guardrails_table
+
+        assert await get_model_guardrails("no-guardrails") == []
+        assert await get_model_guardrails("no-guardrails") == []
+
+        assert queries == ["no-guardrails"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_query(self, guardrails_table):
+        """Test single-flight refresh when many requests miss at once."""
+        _, queries = guardrails_table
+
+        results = await asyncio.gather(*(get_model_guardrails("model-a") for _ in range(50)))
+
+        assert queries == ["model-a"]
+        assert all(len(result) == 2 for result in results)
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_refresh(self, guardrails_table):
+        """Test that invalidating a model reloads its guardrails on the next lookup."""
+        table, queries = guardrails_table
+
+        assert len(await get_model_guardrails("model-a")) == 2
+        table.put_item(Item={"guardrailId": "g3", "modelId": "model-a", "guardrailName": "topics"})
+        assert len(await get_model_guardrails("model-a")) == 2
+
+        invalidate_guardrails_cache("model-a")
+
+        assert len(await get_model_guardrails("model-a")) == 3
+        assert queries == ["model-a", "model-a"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_all(self, guardrails_table):
+        """Test that invalidating without a model id clears every entry."""
+        _, queries = guardrails_table
+
+        await get_model_guardrails("model-a")
+        await get_model_guardrails("model-b")
+        invalidate_guardrails_cache()
+        await get_model_guardrails("model-a")
+        await get_model_guardrails("model-b")
+
+        assert len(queries) == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, mock_env_vars):
+        """Test that a failed lookup is retried on the next request."""
+        mock_table = MagicMock()
+        mock_table.query.side_effect = [Exception("DynamoDB error"), {"Items": [{"guardrailName": "pii"}]}]
+        mock_dynamodb = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+
+        with patch.dict("os.environ", mock_env_vars), patch("boto3.resource", return_value=mock_dynamodb):
+            assert await get_model_guardrails("test-model") == []
+            assert await get_model_guardrails("test-model") == [{"guardrailName": "pii"}]
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self, guardrails_table):
+        """Test that callers cannot mutate the cached list."""
+        result = await get_model_guardrails("model-a")
+        result.clear()
+
+        assert len(await get_model_guardrails("model-a")) == 2
+
+
 class TestGetApplicableGuardrails:
     """Test suite for get_applicable_guardrails function."""
 
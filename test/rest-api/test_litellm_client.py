@@ -0,0 +1,201 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the pooled LiteLLM upstream client."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+# Add REST API src to path
+rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
+sys.path.insert(0, str(rest_api_src))
+
+from utils.litellm_client import _forwardable_headers, _split_lines, LiteLLMClient
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+class TestSplitLines:
+    """Test suite for SSE line splitting."""
+
+    @pytest.mark.asyncio
+    async def test_lines_reassembled_across_chunks(self):
+        """Test that lines split across chunk boundaries are reassembled."""
+        lines = [line async for line in _split_lines(_chunks(b'data: {"a"', b": 1}\n\ndata: [DO", b"NE]\n\n"))]
+
+        assert lines == [b'data: {"a": 1}', b"", b"data: [DONE]", b""]
+
+    @pytest.mark.asyncio
+    async def test_crlf_and_trailing_data(self):
+        """Test that CRLF line endings are stripped and unterminated data is flushed."""
+        lines = [line async for line in _split_lines(_chunks(b"a\r\nb\r\n", b"", b"tail"))]
+
+        assert lines == [b"a", b"b", b"tail"]
+
+    @pytest.mark.asyncio
+    async def test_long_lines_are_not_truncated(self):
+        """Test that lines larger than a typical read buffer are yielded whole."""
+        payload = b"x" * 300_000
+        lines = [line async for line in _split_lines(_chunks(payload[:1000], payload[1000:] + b"\n"))]
+
+        assert lines == [payload]
+
+
+class TestForwardableHeaders:
+    """Test suite for hop-by-hop header filtering."""
+
+    def test_drops_hop_by_hop_headers(self):
+        """Test that framing headers from the inbound request are not forwarded."""
+        headers = {
+            "Host": "lisa.example.com",
+            "Content-Length": "12",
+            "Connection": "keep-alive",
+            "Transfer-Encoding": "chunked",
+            "Authorization": "Bearer key",
+            "anthropic-version": "2023-06-01",
+        }
+
+        assert _forwardable_headers(headers) == {"Authorization": "Bearer key", "anthropic-version": "2023-06-01"}
+
+    def test_empty_headers(self):
+        """Test that missing headers produce an empty dict."""
+        assert _forwardable_headers(None) == {}
+
+
+class TestLiteLLMClient:
+    """Test suite for LiteLLMClient against a fake LiteLLM server."""
+
+    @pytest.mark.asyncio
+    async def test_request_buffers_json_response(self, fake_litellm_server):
+        """Test a buffered JSON request."""
+        client = LiteLLMClient(base_url=fake_litellm_server.url)
+        try:
+            response = await client.request("GET", "model/info", headers={"Authorization": "Bearer key"})
+        finally:
+            await client.close()
+
+        assert response.status_code == 200
+        assert response.json()["data"][0]["model_name"] == "test-model"
+        assert "application/json" in response.headers["content-type"]
+        assert fake_litellm_server.requests[0]["headers"]["Authorization"] == "Bearer key"
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, fake_litellm_server):
+        """Test that sequential and concurrent requests share pooled keep-alive connections."""
+        client = LiteLLMClient(base_url=fake_litellm_server.url, max_connections_per_host=4)
+        try:
+            for _ in range(10):
+                await client.request("GET", "model/info")
+            await asyncio.gather(*(client.request("GET", "model/info") for _ in range(40)))
+        finally:
+            await client.close()
+
+        assert len(fake_litellm_server.requests) == 50
+        assert len(fake_litellm_server.connections) <= 4
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_lines_and_releases_connection(self, fake_litellm_server):
+        """Test that a streamed response yields SSE lines and returns its connection to the pool."""
+        client = LiteLLMClient(base_url=fake_litellm_server.url, max_connections_per_host=1)
+        try:
+            upstream = await client.stream("POST", "v1/chat/completions", json={"model": "test-model", "stream": True})
+            lines = [line async for line in upstream.iter_lines() if line]
+            # With a single pooled connection this would block if the stream had not released it
+            response = await asyncio.wait_for(client.request("GET", "model/info"), timeout=5)
+        finally:
+            await client.close()
+
+        assert upstream.status_code == 200
+        assert len(lines) == 4
+        assert lines[-1] == b"data: [DONE]"
+        assert response.status_code == 200
+        assert len(fake_litellm_server.connections) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_aclose_before_consuming(self, fake_litellm_server):
+        """Test that closing an unconsumed stream frees its pool slot."""
+        client = LiteLLMClient(base_url=fake_litellm_server.url, max_connections_per_host=1)
+        try:
+            upstream = await client.stream("POST", "v1/chat/completions", json={"model": "test-model", "stream": True})
+            await upstream.aclose()
+            response = await asyncio.wait_for(client.request("GET", "model/info"), timeout=5)
+        finally:
+            await client.close()
+
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_stream_read_buffers_error_body(self, fake_litellm_server):
+        """Test that an error response on a streaming request can be buffered and parsed."""
+        fake_litellm_server.error_response = (400, {"error": {"message": "bad request"}})
+        client = LiteLLMClient(base_url=fake_litellm_server.url)
+        try:
+            upstream = await client.stream("POST", "v1/chat/completions", json={"model": "test-model", "stream": True})
+            buffered = await upstream.read()
+        finally:
+            await client.close()
+
+        assert buffered.status_code == 400
+        assert buffered.json()["error"]["message"] == "bad request"
+        assert [line async for line in buffered.iter_lines()] == [buffered.content]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("timeout", [None, 30.0])
+    async def test_request_times_out_on_stalled_upstream(self, fake_litellm_server, timeout):
+        """Test that the read timeout applies to buffered requests, with or without a per-request timeout."""
+        fake_litellm_server.model_info_delay = 2.0
+        client = LiteLLMClient(base_url=fake_litellm_server.url, read_timeout=0.2)
+        try:
+            # The read timeout fires, not the outer guard that would otherwise wait out the stalled upstream
+            with pytest.raises(aiohttp.ServerTimeoutError):
+                await asyncio.wait_for(client.request("GET", "model/info", timeout=timeout), timeout=1.5)
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_multipart_request(self, fake_litellm_server):
+        """Test that form fields and files are sent as multipart data."""
+        client = LiteLLMClient(base_url=fake_litellm_server.url)
+        try:
+            response = await client.request(
+                "POST",
+                "v1/images/edits",
+                data={"prompt": "a cat"},
+                files={"image": ("cat.png", b"png-bytes", "image/png")},
+            )
+        finally:
+            await client.close()
+
+        assert response.json() == {"fields": {"prompt": "a cat", "image": "png-bytes"}}
+
+    @pytest.mark.asyncio
+    async def test_session_recreated_after_close(self, fake_litellm_server):
+        """Test that the client lazily recreates its session after being closed."""
+        client = LiteLLMClient(base_url=fake_litellm_server.url)
+        try:
+            await client.request("GET", "model/info")
+            await client.close()
+            response = await client.request("GET", "model/info")
+        finally:
+            await client.close()
+
+        assert response.status_code == 200
+        assert len(fake_litellm_server.requests) == 2
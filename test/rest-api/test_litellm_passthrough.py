@@ -0,0 +1,331 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the LiteLLM passthrough route."""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+# Add REST API src to path
+rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
+sys.path.insert(0, str(rest_api_src))
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("LITELLM_KEY", "test-litellm-key")
+
+from api.endpoints.v2 import litellm_passthrough
+from utils.litellm_client import LiteLLMClient
+
+
+@pytest.fixture
+def mock_publish_metrics():
+    """Capture metrics events instead of sending them to SQS."""
+    with patch.object(litellm_passthrough, "publish_metrics_event") as mock_publish:
+        yield mock_publish
+
+
+@pytest_asyncio.fixture
+async def passthrough_client(fake_litellm_server, mock_publish_metrics):
+    """Serve the passthrough router against the fake LiteLLM server."""
+    app = FastAPI()
+    app.include_router(litellm_passthrough.router, prefix="/v2/serve")
+    upstream = LiteLLMClient(base_url=fake_litellm_server.url)
+    litellm_passthrough.invalidate_model_cache()
+    with patch.object(litellm_passthrough, "get_litellm_client", return_value=upstream):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://lisa") as client:
+            yield client
+    await upstream.close()
+    litellm_passthrough.invalidate_model_cache()
+
+
+@pytest_asyncio.fixture
+async def model_info_upstream(fake_litellm_server):
+    """Point model info lookups at the fake LiteLLM server with an empty cache."""
+    upstream = LiteLLMClient(base_url=fake_litellm_server.url)
+    litellm_passthrough.invalidate_model_cache()
+    with patch.object(litellm_passthrough, "get_litellm_client", return_value=upstream):
+        yield fake_litellm_server
+    await upstream.close()
+    litellm_passthrough.invalidate_model_cache()
+
+
+def _model_info_fetches(server):
+    return sum(1 for request in server.requests if request["path"] == "/model/info")
+
+
+class TestModelInfoCache:
+    """Test suite for the single-flight model info cache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_lookups_share_one_fetch(self, model_info_upstream):
+        """Test that 500 concurrent lookups on an empty cache cause exactly one upstream fetch."""
+        model_info_upstream.model_info_delay = 0.05
+
+        results = await asyncio.gather(
+            *(litellm_passthrough.get_model_info("vllm-model" if i % 2 else "test-model") for i in range(500))
+        )
+
+        assert _model_info_fetches(model_info_upstream) == 1
+        assert results[0]["litellm_params"]["model"] == "bedrock/test-model"
+        assert results[1]["litellm_params"]["model"] == "hosted_vllm/vllm-model"
+        assert all(result is not None for result in results)
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_serves_stale_during_refresh(self, model_info_upstream, monkeypatch):
+        """Test that lookups after expiry return the stale entry while a single refresh runs."""
+        await litellm_passthrough.get_model_info("test-model")
+        model_info_upstream.models = [{"model_name": "test-model", "litellm_params": {"model": "bedrock/new"}}]
+        model_info_upstream.model_info_delay = 0.05
+        monkeypatch.setattr(litellm_passthrough, "_model_info_refreshed_at", -float("inf"))
+
+        stale = await asyncio.gather(*(litellm_passthrough.get_model_info("test-model") for _ in range(500)))
+        await litellm_passthrough._model_info_refresh_task
+        fresh = await litellm_passthrough.get_model_info("test-model")
+
+        assert all(result["litellm_params"]["model"] == "bedrock/test-model" for result in stale)
+        assert fresh["litellm_params"]["model"] == "bedrock/new"
+        assert _model_info_fetches(model_info_upstream) == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_model_refresh_is_throttled(self, model_info_upstream, monkeypatch):
+        """Test that repeated lookups for a missing model do not refetch within the miss interval."""
+        assert await litellm_passthrough.get_model_info("missing-model") is None
+        assert await litellm_passthrough.get_model_info("missing-model") is None
+        assert _model_info_fetches(model_info_upstream) == 1
+
+        model_info_upstream.models.append({"model_name": "missing-model", "litellm_params": {"model": "m"}})
+        monkeypatch.setattr(litellm_passthrough, "MODEL_INFO_MISS_REFRESH_INTERVAL", 0)
+
+        assert await litellm_passthrough.get_model_info("missing-model") is not None
+        assert _model_info_fetches(model_info_upstream) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_index(self, model_info_upstream, monkeypatch):
+        """Test that an upstream failure during refresh leaves the previous index in place."""
+        await litellm_passthrough.get_model_info("test-model")
+        monkeypatch.setattr(litellm_passthrough, "_model_info_refreshed_at", -float("inf"))
+        await model_info_upstream.stop()
+
+        result = await litellm_passthrough.get_model_info("test-model")
+        await litellm_passthrough._model_info_refresh_task
+
+        assert result["model_name"] == "test-model"
+        assert await litellm_passthrough.get_model_info("test-model") == result
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_and_invalidate_force_refresh(self, model_info_upstream):
+        """Test that bypassing or invalidating the cache fetches the model list again."""
+        await litellm_passthrough.get_model_info("test-model")
+        await litellm_passthrough.get_model_info("test-model", use_cache=False)
+        litellm_passthrough.invalidate_model_cache("test-model")
+        await litellm_passthrough.get_model_info("test-model")
+
+        assert _model_info_fetches(model_info_upstream) == 3
+
+
+class TestLiteLLMPassthrough:
+    """Test suite for requests proxied through the pooled upstream client."""
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_chat(self, passthrough_client, fake_litellm_server, mock_publish_metrics):
+        """Test a non-streaming chat completion is proxied with the LiteLLM key injected."""
+        response = await passthrough_client.post(
+            "/v2/serve/v1/chat/completions",
+            json={"model": "test-model", "messages": [{"role": "user", "content": "hi"}]},
+            headers={"Authorization": "Bearer user-token"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["choices"][0]["message"]["content"] == "Hello world"
+        chat_request = fake_litellm_server.requests[-1]
+        assert chat_request["path"] == "/v1/chat/completions"
+        assert chat_request["headers"]["Authorization"] == "Bearer test-litellm-key"
+        mock_publish_metrics.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_streaming_chat_relays_chunks_and_captures_usage(
+        self, passthrough_client, fake_litellm_server, mock_publish_metrics
+    ):
+        """Test a streaming chat completion is relayed line by line and usage is published."""
+        response = await passthrough_client.post(
+            "/v2/serve/v1/chat/completions",
+            json={"model": "test-model", "stream": True, "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+        events = [line for line in response.text.split("\n\n") if line]
+        assert response.status_code == 200
+        assert len(events) == len(fake_litellm_server.stream_chunks) + 1
+        assert json.loads(events[0][len("data: ") :]) == fake_litellm_server.stream_chunks[0]
+        assert events[-1] == "data: [DONE]"
+        kwargs = mock_publish_metrics.call_args.kwargs
+        assert kwargs["prompt_tokens"] == 5
+        assert kwargs["completion_tokens"] == 2
+
+    @pytest.mark.asyncio
+    async def test_token_usage_charged_to_rate_limits(self, passthrough_client):
+        """Test that completed chat completions report their token usage to the rate limiter."""
+        with patch.object(litellm_passthrough, "record_token_usage", new_callable=AsyncMock) as mock_record:
+            for stream in (False, True):
+                await passthrough_client.post(
+                    "/v2/serve/v1/chat/completions",
+                    json={"model": "test-model", "stream": stream, "messages": [{"role": "user", "content": "hi"}]},
+                )
+
+        assert mock_record.await_count == 2
+        assert mock_record.await_args.args[1:] == ("test-model", 5, 2)
+
+    @pytest.mark.asyncio
+    async def test_streaming_guardrail_violation(self, passthrough_client, fake_litellm_server):
+        """Test a guardrail 400 on a streaming request is converted into a guardrail stream."""
+        fake_litellm_server.error_response = (
+            400,
+            {"error": {"message": "Violated guardrail policy {'bedrock_guardrail_response': 'Blocked'}"}},
+        )
+
+        response = await passthrough_client.post(
+            "/v2/serve/v1/chat/completions",
+            json={"model": "test-model", "stream": True, "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+        assert response.status_code == 200
+        first_event = json.loads(response.text.split("\n\n")[0][len("data: ") :])
+        assert first_event["choices"][0]["delta"]["content"] == "Blocked"
+        assert first_event["lisa_guardrail_triggered"] is True
+
+    @pytest.mark.asyncio
+    async def test_streaming_error_is_relayed(self, passthrough_client, fake_litellm_server):
+        """Test a non-guardrail upstream error on a streaming request is relayed with its status."""
+        fake_litellm_server.error_response = (500, {"error": {"message": "boom"}})
+
+        response = await passthrough_client.post(
+            "/v2/serve/v1/chat/completions",
+            json={"model": "test-model", "stream": True, "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+        assert response.status_code == 500
+        assert "boom" in response.text
+
+    @pytest.mark.asyncio
+    async def test_get_request(self, passthrough_client):
+        """Test a GET request is proxied and returned as JSON."""
+        response = await passthrough_client.get("/v2/serve/model/info")
+
+        assert response.status_code == 200
+        assert response.json()["data"][0]["model_name"] == "test-model"
+
+    @pytest.mark.asyncio
+    async def test_hosted_vllm_generation_prompt(self, passthrough_client, fake_litellm_server):
+        """Test model info lookup drives hosted_vllm parameter injection."""
+        await passthrough_client.post(
+            "/v2/serve/v1/chat/completions",
+            json={"model": "vllm-model", "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+        forwarded = fake_litellm_server.requests[-1]["body"]
+        assert forwarded["add_generation_prompt"] is True
+        assert "add_generation_prompt" in forwarded["allowed_openai_params"]
+
+
+async def _lines(*lines):
+    for line in lines:
+        yield line
+
+
+async def _relay(lines, mock_request):
+    generator = litellm_passthrough.generate_response_with_guardrail_handling(
+        _lines(*lines), "test-model", mock_request, {"model": "test-model"}
+    )
+    return [chunk async for chunk in generator]
+
+
+class TestStreamingRelay:
+    """Test suite for the SSE relay generators."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_relayed_byte_for_byte(self, mock_request, mock_publish_metrics):
+        """Test that token chunks are forwarded unchanged without being parsed."""
+        lines = [
+            b'data: {"id":"1","choices":[{"delta":{"content":"caf\xc3\xa9"}}],"usage":null}',
+            b"",
+            b'data: {"id": "1", "choices": [{"delta": {"content": "!"}}], "usage": null}',
+            b": keep-alive comment",
+            b"data: [DONE]",
+        ]
+
+        with patch.object(litellm_passthrough.json, "loads", wraps=json.loads) as mock_loads:
+            chunks = await _relay(lines, mock_request)
+
+        assert chunks == [line + b"\n\n" for line in lines if line]
+        mock_loads.assert_not_called()
+        assert mock_publish_metrics.call_args.kwargs["prompt_tokens"] is None
+
+    @pytest.mark.asyncio
+    async def test_usage_chunk_is_parsed(self, mock_request, mock_publish_metrics):
+        """Test that the usage chunk is parsed for token counts and still relayed."""
+        usage_line = b'data: {"id":"1","choices":[],"usage": {"prompt_tokens": 11, "completion_tokens": 3}}'
+
+        chunks = await _relay([b'data: {"choices":[{"delta":{"content":"hi"}}]}', usage_line], mock_request)
+
+        assert chunks[-1] == usage_line + b"\n\n"
+        kwargs = mock_publish_metrics.call_args.kwargs
+        assert kwargs["prompt_tokens"] == 11
+        assert kwargs["completion_tokens"] == 3
+
+    @pytest.mark.asyncio
+    async def test_str_lines_are_accepted(self, mock_request, mock_publish_metrics):
+        """Test that decoded string lines are relayed as bytes."""
+        chunks = await _relay(['data: {"choices":[]}'], mock_request)
+
+        assert chunks == [b'data: {"choices":[]}\n\n']
+
+    @pytest.mark.asyncio
+    async def test_mid_stream_guardrail_error(self, mock_request, mock_publish_metrics):
+        """Test that a guardrail error chunk ends the stream with the guardrail response."""
+        error = {"error": {"message": "Violated guardrail policy {'bedrock_guardrail_response': 'Nope'}"}}
+
+        chunks = await _relay(
+            [b'data: {"choices":[{"delta":{"content":"a"}}]}', f"data: {json.dumps(error)}".encode(), b"data: [DONE]"],
+            mock_request,
+        )
+
+        assert chunks[0] == b'data: {"choices":[{"delta":{"content":"a"}}]}\n\n'
+        assert "Nope" in chunks[1]
+        assert chunks[-1] == "data: [DONE]\n\n"
+        assert mock_publish_metrics.call_args.kwargs["prompt_tokens"] is None
+
+    @pytest.mark.asyncio
+    async def test_non_guardrail_error_and_invalid_json_are_relayed(self, mock_request, mock_publish_metrics):
+        """Test that other error chunks and unparseable candidates pass through unchanged."""
+        lines = [b'data: {"error": {"message": "rate limited"}}', b'data: {"error": broken']
+
+        chunks = await _relay(lines, mock_request)
+
+        assert chunks == [line + b"\n\n" for line in lines]
+
+    @pytest.mark.asyncio
+    async def test_generate_response(self):
+        """Test the plain relay used for non-chat streams."""
+        chunks = [chunk async for chunk in litellm_passthrough.generate_response(_lines(b"data: a", b"", "data: b"))]
+
+        assert chunks == [b"data: a\n\n", b"data: b\n\n"]
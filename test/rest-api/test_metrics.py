@@ -16,9 +16,15 @@
 
 import json
 import sys
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import boto3
+import pytest
+from moto import mock_aws
+
 # Add REST API src to path
 rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
 sys.path.insert(0, str(rest_api_src))
@@ -28,7 +34,33 @@ import os
 
 os.environ.setdefault("AWS_REGION", "us-east-1")
 
-from utils.metrics import extract_messages_for_metrics, extract_token_usage, publish_metrics_event
+import utils.metrics as metrics_module
+from utils.metrics import (
+    extract_messages_for_metrics,
+    extract_token_usage,
+    get_metrics_publisher,
+    MetricsPublisher,
+    publish_metrics_event,
+)
+
+
+@pytest.fixture(autouse=True)
+def metrics_publisher(monkeypatch):
+    """Give every test its own publisher that sends without lingering, and stop it afterwards."""
+    publisher = MetricsPublisher(linger_seconds=0)
+    monkeypatch.setattr(metrics_module, "_metrics_publisher", publisher)
+    yield publisher
+    publisher.shutdown()
+
+
+def _published_bodies(mock_sqs):
+    """Wait for queued events to be sent and return the decoded message bodies."""
+    get_metrics_publisher().flush()
+    return [
+        json.loads(entry["MessageBody"])
+        for call in mock_sqs.send_message_batch.call_args_list
+        for entry in call[1]["Entries"]
+    ]
 
 
 class TestExtractMessagesForMetrics:
@@ -172,13 +204,15 @@ class TestPublishMetricsEvent:
 
             publish_metrics_event(mock_request, params, 200)
 
-            mock_sqs.send_message.assert_called_once()
-            call_args = mock_sqs.send_message.call_args
+            get_metrics_publisher().flush()
+
+            mock_sqs.send_message_batch.assert_called_once()
+            call_args = mock_sqs.send_message_batch.call_args
 
             assert call_args[1]["QueueUrl"] == mock_env_vars["USAGE_METRICS_QUEUE_URL"]
 
             # Verify message body structure
-            message_body = json.loads(call_args[1]["MessageBody"])
+            message_body = json.loads(call_args[1]["Entries"][0]["MessageBody"])
             assert message_body["userId"] == "test-user"
             assert message_body["userGroups"] == ["users"]
             assert "sessionId" in message_body
@@ -196,7 +230,8 @@ class TestPublishMetricsEvent:
 
             publish_metrics_event(mock_request, params, 400)
 
-            mock_sqs.send_message.assert_not_called()
+            get_metrics_publisher().flush()
+            mock_sqs.send_message_batch.assert_not_called()
 
     def test_publish_metrics_no_queue_url(self, mock_env_vars, mock_request):
         """Test metrics not published when queue URL not configured."""
@@ -209,7 +244,8 @@ class TestPublishMetricsEvent:
 
             publish_metrics_event(mock_request, params, 200)
 
-            mock_sqs.send_message.assert_not_called()
+            get_metrics_publisher().flush()
+            mock_sqs.send_message_batch.assert_not_called()
 
     def test_publish_metrics_error_handling(self, mock_env_vars, mock_request):
         """Test error handling during metrics publishing."""
@@ -217,14 +253,17 @@ class TestPublishMetricsEvent:
 
         params = {"messages": []}
         mock_sqs = MagicMock()
-        mock_sqs.send_message.side_effect = Exception("SQS error")
+        mock_sqs.send_message_batch.side_effect = Exception("SQS error")
 
         with patch.dict("os.environ", mock_env_vars), patch("utils.metrics.sqs_client", mock_sqs), patch(
             "utils.metrics.get_user_context", return_value=("test-user", [])
-        ):
+        ), patch("utils.metrics.is_api_user", return_value=True):
 
             # Should not raise exception
             publish_metrics_event(mock_request, params, 200)
+            get_metrics_publisher().flush()
+
+            assert get_metrics_publisher().stats()["failed"] == 1
 
     def test_publish_metrics_session_id_format(self, mock_env_vars, mock_request):
         """Test session ID format for API users."""
@@ -239,8 +278,7 @@ class TestPublishMetricsEvent:
 
             publish_metrics_event(mock_request, params, 200)
 
-            call_args = mock_sqs.send_message.call_args
-            message_body = json.loads(call_args[1]["MessageBody"])
+            message_body = _published_bodies(mock_sqs)[0]
 
             # Session ID should start with "api-"
             assert message_body["sessionId"].startswith("api-")
@@ -264,8 +302,7 @@ class TestPublishMetricsEvent:
 
             publish_metrics_event(mock_request, params, 200)
 
-            call_args = mock_sqs.send_message.call_args
-            message_body = json.loads(call_args[1]["MessageBody"])
+            message_body = _published_bodies(mock_sqs)[0]
 
             assert len(message_body["messages"]) == 2
             assert "toolCalls" in message_body["messages"][1]
@@ -360,8 +397,9 @@ class TestPublishMetricsEventTokenPaths:
 
             publish_metrics_event(mock_request, params, 200, prompt_tokens=50, completion_tokens=20)
 
-            mock_sqs.send_message.assert_called_once()
-            body = json.loads(mock_sqs.send_message.call_args[1]["MessageBody"])
+            bodies = _published_bodies(mock_sqs)
+            assert len(bodies) == 1
+            body = bodies[0]
 
             assert body["eventType"] == "token_only"
             assert body["messages"] == []
@@ -372,7 +410,7 @@ class TestPublishMetricsEventTokenPaths:
     def test_jwt_user_without_tokens_skips_publish(self, mock_env_vars, mock_request):
         """JWT/UI user with no token counts must not publish anything (no point — session lambda owns prompts).
 
-        Expected: SQS send_message is never called.
+        Expected: SQS send_message_batch is never called.
         """
         mock_env_vars["USAGE_METRICS_QUEUE_URL"] = "https://sqs.us-east-1.amazonaws.com/123456789/metrics"
         params = {"messages": [{"role": "user", "content": "Hello"}]}
@@ -384,7 +422,8 @@ class TestPublishMetricsEventTokenPaths:
 
             publish_metrics_event(mock_request, params, 200)  # no tokens passed
 
-            mock_sqs.send_message.assert_not_called()
+            get_metrics_publisher().flush()
+            mock_sqs.send_message_batch.assert_not_called()
 
     def test_tokens_extracted_from_response_body_for_non_streaming(self, mock_env_vars, mock_request):
         """When response_body is provided and prompt_tokens is not passed directly,
@@ -406,7 +445,7 @@ class TestPublishMetricsEventTokenPaths:
 
             publish_metrics_event(mock_request, params, 200, response_body=response_body)
 
-            body = json.loads(mock_sqs.send_message.call_args[1]["MessageBody"])
+            body = _published_bodies(mock_sqs)[0]
             assert body["promptTokens"] == 30
             assert body["completionTokens"] == 10
 
@@ -425,7 +464,149 @@ class TestPublishMetricsEventTokenPaths:
 
             publish_metrics_event(mock_request, params, 200)
 
-            body = json.loads(mock_sqs.send_message.call_args[1]["MessageBody"])
+            body = _published_bodies(mock_sqs)[0]
             assert body["eventType"] == "full"
             assert len(body["messages"]) == 1
             assert body["sessionId"].startswith("api-")
+
+
+@pytest.fixture
+def metrics_queue(mock_env_vars):
+    """Create a moto SQS queue and point the metrics publisher at it."""
+    with mock_aws():
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        queue_url = sqs.create_queue(QueueName="usage-metrics")["QueueUrl"]
+        mock_env_vars["USAGE_METRICS_QUEUE_URL"] = queue_url
+        with patch.dict("os.environ", mock_env_vars), patch("utils.metrics.sqs_client", sqs), patch(
+            "utils.metrics.get_user_context", return_value=("api-user", ["users"])
+        ), patch("utils.metrics.is_api_user", return_value=True):
+            yield sqs, queue_url
+
+
+def _receive_all(sqs, queue_url):
+    bodies = []
+    while True:
+        messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages", [])
+        if not messages:
+            return bodies
+        bodies += [json.loads(message["Body"]) for message in messages]
+        sqs.delete_message_batch(
+            QueueUrl=queue_url,
+            Entries=[{"Id": str(i), "ReceiptHandle": m["ReceiptHandle"]} for i, m in enumerate(messages)],
+        )
+
+
+def _block_until(event):
+    # Event handlers must return None, or botocore treats the return value as replacement params
+    event.wait(5)
+
+
+class TestMetricsPublisher:
+    """Test suite for the background batched metrics publisher against a moto SQS queue."""
+
+    def test_events_are_sent_in_batches_of_ten(self, metrics_queue, mock_request, metrics_publisher):
+        """Test that queued events are delivered with send_message_batch in groups of at most 10."""
+        sqs, queue_url = metrics_queue
+        metrics_publisher.linger_seconds = 1
+        batch_sizes = []
+        sqs.meta.events.register(
+            "provide-client-params.sqs.SendMessageBatch",
+            lambda params, **kwargs: batch_sizes.append(len(params["Entries"])),
+        )
+
+        for i in range(25):
+            publish_metrics_event(mock_request, {"messages": [{"role": "user", "content": f"m{i}"}]}, 200)
+        metrics_publisher.flush()
+
+        bodies = _receive_all(sqs, queue_url)
+        assert len(bodies) == 25
+        assert {body["messages"][0]["content"] for body in bodies} == {f"m{i}" for i in range(25)}
+        assert max(batch_sizes) == 10
+        assert sum(batch_sizes) == 25
+        assert metrics_publisher.stats() == {
+            "queue_depth": 0,
+            "enqueued": 25,
+            "published": 25,
+            "dropped": 0,
+            "failed": 0,
+        }
+
+    def test_partial_batch_sent_after_linger(self, metrics_queue, mock_request, metrics_publisher):
+        """Test that a single event is sent once the linger time passes without waiting for a full batch."""
+        sqs, queue_url = metrics_queue
+        metrics_publisher.linger_seconds = 0.05
+
+        publish_metrics_event(mock_request, {"messages": []}, 200, prompt_tokens=3, completion_tokens=1)
+
+        deadline = time.monotonic() + 5
+        while metrics_publisher.stats()["published"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        bodies = _receive_all(sqs, queue_url)
+        assert len(bodies) == 1
+        assert bodies[0]["promptTokens"] == 3
+
+    def test_publish_does_not_wait_for_sqs(self, metrics_queue, mock_request, metrics_publisher):
+        """Test that request-path latency is independent of SQS latency."""
+        sqs, queue_url = metrics_queue
+        release = threading.Event()
+        sqs.meta.events.register("provide-client-params.sqs.SendMessageBatch", lambda **kwargs: _block_until(release))
+
+        start = time.perf_counter()
+        for _ in range(20):
+            publish_metrics_event(mock_request, {"messages": [{"role": "user", "content": "Hello"}]}, 200)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert metrics_publisher.stats()["enqueued"] == 20
+        release.set()
+        metrics_publisher.flush()
+        assert len(_receive_all(sqs, queue_url)) == 20
+
+    def test_full_queue_drops_events(self, metrics_queue, mock_request, monkeypatch):
+        """Test that events beyond the queue bound are dropped and counted instead of blocking."""
+        sqs, queue_url = metrics_queue
+        publisher = MetricsPublisher(max_queue_size=2, linger_seconds=0)
+        monkeypatch.setattr(metrics_module, "_metrics_publisher", publisher)
+        release = threading.Event()
+        sqs.meta.events.register("provide-client-params.sqs.SendMessageBatch", lambda **kwargs: _block_until(release))
+
+        publish_metrics_event(mock_request, {"messages": []}, 200)
+        # Wait until the sender thread is blocked on the first batch, leaving the queue empty
+        deadline = time.monotonic() + 5
+        while publisher.stats()["queue_depth"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for _ in range(5):
+            publish_metrics_event(mock_request, {"messages": []}, 200)
+
+        stats = publisher.stats()
+        assert stats["queue_depth"] == 2
+        assert stats["dropped"] == 3
+        release.set()
+        publisher.shutdown()
+        assert len(_receive_all(sqs, queue_url)) == 3
+
+    def test_shutdown_drains_queue(self, metrics_queue, mock_request, metrics_publisher):
+        """Test that shutdown sends every queued event before stopping the sender thread."""
+        sqs, queue_url = metrics_queue
+        metrics_publisher.linger_seconds = 60
+
+        for _ in range(15):
+            publish_metrics_event(mock_request, {"messages": []}, 200)
+        metrics_publisher.shutdown()
+
+        assert len(_receive_all(sqs, queue_url)) == 15
+        assert metrics_publisher.stats()["published"] == 15
+        assert not metrics_publisher._thread.is_alive()
+
+    def test_oversized_batch_is_split(self, metrics_queue, mock_request, metrics_publisher):
+        """Test that a batch larger than the SQS payload limit is split across calls."""
+        sqs, queue_url = metrics_queue
+        metrics_publisher.linger_seconds = 60
+        content = "x" * 100_000
+
+        for _ in range(4):
+            publish_metrics_event(mock_request, {"messages": [{"role": "user", "content": content}]}, 200)
+        metrics_publisher.shutdown()
+
+        assert len(_receive_all(sqs, queue_url)) == 4
+        assert metrics_publisher.stats()["failed"] == 0
@@ -0,0 +1,237 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the rate limit token bucket backends."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the REST API source to the path
+rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
+sys.path.insert(0, str(rest_api_src))
+
+from utils.rate_limit_backends import InMemoryRateLimitBackend, SQLiteRateLimitBackend, TokenBucket  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# Token bucket unit tests
+# ---------------------------------------------------------------------------
+
+
+class TestTokenBucket:
+    """Tests for the TokenBucket class."""
+
+    def test_initial_tokens_available(self):
+        bucket = TokenBucket(max_tokens=10.0)
+        allowed, _ = bucket.try_consume(10.0, 1.0)
+        assert allowed is True
+
+    def test_exhaustion(self):
+        bucket = TokenBucket(max_tokens=2.0)
+        bucket.try_consume(2.0, 1.0)
+        bucket.try_consume(2.0, 1.0)
+        allowed, retry_after = bucket.try_consume(2.0, 1.0)
+        assert allowed is False
+        assert retry_after > 0
+
+    def test_refill_over_time(self):
+        bucket = TokenBucket(max_tokens=2.0)
+        # Drain all tokens
+        bucket.try_consume(2.0, 1.0)
+        bucket.try_consume(2.0, 1.0)
+        # Simulate time passing by backdating last_refill
+        bucket.last_refill = time.monotonic() - 2.0  # 2 seconds ago at 1 token/sec
+        allowed, _ = bucket.try_consume(2.0, 1.0)
+        assert allowed is True
+
+    def test_tokens_capped_at_max(self):
+        bucket = TokenBucket(max_tokens=5.0)
+        # Simulate a long idle period
+        bucket.last_refill = time.monotonic() - 1000.0
+        bucket.try_consume(5.0, 1.0)
+        # Should have been capped at 5, consumed 1 → 4 left
+        assert bucket.tokens == pytest.approx(4.0, abs=0.1)
+
+    def test_retry_after_is_reasonable(self):
+        refill_rate = 1.0  # 1 token/sec
+        bucket = TokenBucket(max_tokens=1.0)
+        bucket.try_consume(1.0, refill_rate)  # drain it
+        allowed, retry_after = bucket.try_consume(1.0, refill_rate)
+        assert allowed is False
+        # Should be ~1 second to get the next token
+        assert 0 < retry_after <= 1.1
+
+    def test_debit_can_go_negative(self):
+        bucket = TokenBucket(max_tokens=10.0, now=0.0)
+        bucket.debit(25.0, 10.0, 1.0, now=0.0)
+        assert bucket.tokens == pytest.approx(-15.0)
+        allowed, retry_after = bucket.try_consume(10.0, 1.0, cost=0.0, now=5.0)
+        assert allowed is False
+        assert retry_after == pytest.approx(10.0)
+        allowed, _ = bucket.try_consume(10.0, 1.0, cost=0.0, now=15.0)
+        assert allowed is True
+
+
+# ---------------------------------------------------------------------------
+# In-memory backend tests
+# ---------------------------------------------------------------------------
+
+
+class TestInMemoryRateLimitBackend:
+    """Tests for the sharded in-memory backend."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_until_exhausted(self):
+        backend = InMemoryRateLimitBackend(shards=4)
+        results = [await backend.acquire("token:a", 1.0, 3.0, 0.0) for _ in range(4)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self):
+        backend = InMemoryRateLimitBackend(shards=1)
+        await backend.acquire("token:a", 1.0, 1.0, 0.0)
+        allowed, _ = await backend.acquire("token:b", 1.0, 1.0, 0.0)
+        assert allowed is True
+
+    @pytest.mark.asyncio
+    async def test_charge_puts_bucket_in_debt(self):
+        backend = InMemoryRateLimitBackend()
+        await backend.charge("tpm:token:a", 150.0, 100.0, 100.0 / 60.0)
+        allowed, retry_after = await backend.acquire("tpm:token:a", 0.0, 100.0, 100.0 / 60.0)
+        assert allowed is False
+        assert retry_after == pytest.approx(30.0, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_stale_buckets_evicted_before_live_ones(self):
+        backend = InMemoryRateLimitBackend(shards=1, max_buckets=3, stale_seconds=300.0)
+        for key in ("stale-1", "stale-2", "live"):
+            await backend.acquire(key, 1.0, 10.0, 1.0)
+        shard = backend._shards[0]
+        for key in ("stale-1", "stale-2"):
+            shard.buckets[key].last_refill = time.monotonic() - 600.0
+        # "live" was used last, so touching it keeps the stale buckets at the front
+        await backend.acquire("live", 1.0, 10.0, 1.0)
+
+        await backend.acquire("new", 1.0, 10.0, 1.0)
+
+        assert "stale-1" not in backend
+        assert "stale-2" not in backend
+        assert "live" in backend
+        assert "new" in backend
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_evicted_when_none_stale(self):
+        backend = InMemoryRateLimitBackend(shards=1, max_buckets=2)
+        await backend.acquire("a", 1.0, 10.0, 1.0)
+        await backend.acquire("b", 1.0, 10.0, 1.0)
+        await backend.acquire("a", 1.0, 10.0, 1.0)
+
+        await backend.acquire("c", 1.0, 10.0, 1.0)
+
+        assert len(backend) == 2
+        assert "a" in backend
+        assert "b" not in backend
+
+    @pytest.mark.asyncio
+    async def test_prune_removes_stale_buckets(self):
+        backend = InMemoryRateLimitBackend(shards=8, stale_seconds=300.0)
+        for i in range(20):
+            await backend.acquire(f"key-{i}", 1.0, 10.0, 1.0)
+        # Buckets are created in key order, so the first ten sit at the front of their shards
+        for shard in backend._shards:
+            for key, bucket in shard.buckets.items():
+                if int(key.split("-")[1]) < 10:
+                    bucket.last_refill = time.monotonic() - 600.0
+
+        backend.prune()
+
+        assert len(backend) == 10
+        assert "key-0" not in backend
+        assert "key-19" in backend
+
+    @pytest.mark.asyncio
+    async def test_concurrent_acquires_are_exact(self):
+        """Concurrent callers across threads never take more tokens than the bucket holds."""
+        backend = InMemoryRateLimitBackend(shards=4)
+
+        def take():
+            return asyncio.run(backend.acquire("shared", 1.0, 100.0, 0.0))[0]
+
+        results = await asyncio.gather(*(asyncio.to_thread(take) for _ in range(150)))
+        assert sum(results) == 100
+
+
+# ---------------------------------------------------------------------------
+# SQLite backend tests
+# ---------------------------------------------------------------------------
+
+
+class TestSQLiteRateLimitBackend:
+    """Tests for the SQLite backend shared between processes on a host."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "rate-limit.sqlite3")
+
+    @pytest.mark.asyncio
+    async def test_acquire_until_exhausted(self, db_path):
+        backend = SQLiteRateLimitBackend(db_path)
+        try:
+            results = [await backend.acquire("token:a", 1.0, 2.0, 0.0) for _ in range(3)]
+        finally:
+            backend.close()
+        assert [allowed for allowed, _ in results] == [True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_buckets_shared_between_backends(self, db_path):
+        """Two backends on the same file, like two worker processes, draw from one bucket."""
+        first = SQLiteRateLimitBackend(db_path)
+        second = SQLiteRateLimitBackend(db_path)
+        try:
+            assert (await first.acquire("token:a", 1.0, 2.0, 0.0))[0] is True
+            assert (await second.acquire("token:a", 1.0, 2.0, 0.0))[0] is True
+            assert (await first.acquire("token:a", 1.0, 2.0, 0.0))[0] is False
+            assert (await second.acquire("token:a", 1.0, 2.0, 0.0))[0] is False
+        finally:
+            first.close()
+            second.close()
+
+    @pytest.mark.asyncio
+    async def test_charge_puts_bucket_in_debt(self, db_path):
+        backend = SQLiteRateLimitBackend(db_path)
+        try:
+            await backend.charge("model-tpm:m", 500.0, 100.0, 0.0)
+            allowed, retry_after = await backend.acquire("model-tpm:m", 0.0, 100.0, 0.0)
+        finally:
+            backend.close()
+        assert allowed is False
+        assert retry_after == 60.0
+
+    @pytest.mark.asyncio
+    async def test_prune_removes_stale_buckets(self, db_path):
+        backend = SQLiteRateLimitBackend(db_path, stale_seconds=300.0)
+        try:
+            await backend.acquire("old", 1.0, 10.0, 1.0)
+            await backend.acquire("new", 1.0, 10.0, 1.0)
+            backend._connect().execute(
+                "UPDATE rate_limit_buckets SET last_refill = ? WHERE key = 'old'", (time.time() - 600.0,)
+            )
+            backend.prune()
+            keys = {row[0] for row in backend._connect().execute("SELECT key FROM rate_limit_buckets")}
+        finally:
+            backend.close()
+        assert keys == {"new"}
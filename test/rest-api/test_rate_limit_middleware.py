@@ -15,7 +15,6 @@
 """Tests for per-user rate limiting middleware."""
 
 import sys
-import time
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -26,6 +25,7 @@ from fastapi import Response
 rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
 sys.path.insert(0, str(rest_api_src))
 
+from middleware.rate_limit_middleware import rate_limit_middleware  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -53,65 +53,6 @@ async def _call_next_ok(request):
     return _ok_response()
 
 
-# ---------------------------------------------------------------------------
-# Token bucket unit tests
-# ---------------------------------------------------------------------------
-
-
-class TestTokenBucket:
-    """Tests for the _TokenBucket internal class."""
-
-    def test_initial_tokens_available(self):
-        from middleware.rate_limit_middleware import _TokenBucket
-
-        bucket = _TokenBucket(max_tokens=10.0)
-        allowed, _ = bucket.try_consume(10.0, 1.0)
-        assert allowed is True
-
-    def test_exhaustion(self):
-        from middleware.rate_limit_middleware import _TokenBucket
-
-        bucket = _TokenBucket(max_tokens=2.0)
-        bucket.try_consume(2.0, 1.0)
-        bucket.try_consume(2.0, 1.0)
-        allowed, retry_after = bucket.try_consume(2.0, 1.0)
-        assert allowed is False
-        assert retry_after > 0
-
-    def test_refill_over_time(self):
-        from middleware.rate_limit_middleware import _TokenBucket
-
-        bucket = _TokenBucket(max_tokens=2.0)
-        # Drain all tokens
-        bucket.try_consume(2.0, 1.0)
-        bucket.try_consume(2.0, 1.0)
-        # Simulate time passing by backdating last_refill
-        bucket.last_refill = time.monotonic() - 2.0  # 2 seconds ago at 1 token/sec
-        allowed, _ = bucket.try_consume(2.0, 1.0)
-        assert allowed is True
-
-    def test_tokens_capped_at_max(self):
-        from middleware.rate_limit_middleware import _TokenBucket
-
-        bucket = _TokenBucket(max_tokens=5.0)
-        # Simulate a long idle period
-        bucket.last_refill = time.monotonic() - 1000.0
-        bucket.try_consume(5.0, 1.0)
-        # Should have been capped at 5, consumed 1 → 4 left
-        assert bucket.tokens == pytest.approx(4.0, abs=0.1)
-
-    def test_retry_after_is_reasonable(self):
-        from middleware.rate_limit_middleware import _TokenBucket
-
-        refill_rate = 1.0  # 1 token/sec
-        bucket = _TokenBucket(max_tokens=1.0)
-        bucket.try_consume(1.0, refill_rate)  # drain it
-        allowed, retry_after = bucket.try_consume(1.0, refill_rate)
-        assert allowed is False
-        # Should be ~1 second to get the next token
-        assert 0 < retry_after <= 1.1
-
-
 # ---------------------------------------------------------------------------
 # _get_user_key tests
 # ---------------------------------------------------------------------------
@@ -121,48 +62,48 @@ class TestGetUserKey:
     """Tests for user identity extraction from request state."""
 
     def test_api_token_user_keyed_on_uuid(self):
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
         request.state.api_token_info = {"tokenUUID": "abc-123", "username": "api-user"}
-        assert _get_user_key(request) == "token:abc-123"
+        assert get_user_key(request) == "token:abc-123"
 
     def test_api_token_fallback_to_username(self):
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
         request.state.api_token_info = {"username": "api-user"}
-        assert _get_user_key(request) == "token:api-user"
+        assert get_user_key(request) == "token:api-user"
 
     def test_oidc_user_keyed_on_sub(self):
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
         request.state.jwt_data = {"sub": "user-456", "username": "jdoe"}
-        assert _get_user_key(request) == "oidc:user-456"
+        assert get_user_key(request) == "oidc:user-456"
 
     def test_oidc_user_fallback_to_username(self):
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
         request.state.jwt_data = {"username": "jdoe"}
-        assert _get_user_key(request) == "oidc:jdoe"
+        assert get_user_key(request) == "oidc:jdoe"
 
     def test_fallback_to_state_username(self):
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
         request.state.username = "fallback-user"
-        assert _get_user_key(request) == "user:fallback-user"
+        assert get_user_key(request) == "user:fallback-user"
 
     def test_management_token_returns_none(self):
         """Management tokens are authenticated but carry no per-user identity."""
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
@@ -170,15 +111,15 @@ class TestGetUserKey:
         request.state.jwt_data = None
         request.state.username = "management-token"
         request.state.is_management_token = True
-        assert _get_user_key(request) is None
+        assert get_user_key(request) is None
 
     def test_no_identity_returns_none(self):
-        from middleware.rate_limit_middleware import _get_user_key
+        from utils.rate_limit import get_user_key
 
         request = _make_request()
         request.state.authenticated = True
         # No token info, jwt_data, or username
-        assert _get_user_key(request) is None
+        assert get_user_key(request) is None
 
 
 # ---------------------------------------------------------------------------
@@ -191,18 +132,16 @@ class TestRateLimitMiddleware:
 
     @pytest.fixture(autouse=True)
     def _clear_buckets(self):
-        """Clear the global bucket store between tests."""
+        """Start every test with an empty bucket store."""
         import importlib
 
-        mod = importlib.import_module("middleware.rate_limit_middleware")
-        mod._buckets.clear()
+        mod = importlib.import_module("utils.rate_limit")
+        mod._backend = None
         yield
-        mod._buckets.clear()
+        mod._backend = None
 
     @pytest.mark.asyncio
     async def test_allows_request_within_limit(self):
-        from middleware.rate_limit_middleware import rate_limit_middleware
-
         request = _make_request()
         request.state.authenticated = True
         request.state.api_token_info = {"tokenUUID": "test-uuid", "username": "u"}
@@ -212,10 +151,7 @@ class TestRateLimitMiddleware:
 
     @pytest.mark.asyncio
     async def test_blocks_after_burst_exceeded(self):
-        from middleware.rate_limit_middleware import (
-            _get_max_tokens,
-            rate_limit_middleware,
-        )
+        from utils.rate_limit import _get_max_tokens
 
         request = _make_request()
         request.state.authenticated = True
@@ -238,10 +174,7 @@ class TestRateLimitMiddleware:
         """Verify the 429 body is OpenAI-compatible."""
         import json
 
-        from middleware.rate_limit_middleware import (
-            _get_max_tokens,
-            rate_limit_middleware,
-        )
+        from utils.rate_limit import _get_max_tokens
 
         request = _make_request()
         request.state.authenticated = True
@@ -258,8 +191,6 @@ class TestRateLimitMiddleware:
 
     @pytest.mark.asyncio
     async def test_health_endpoint_bypassed(self):
-        from middleware.rate_limit_middleware import rate_limit_middleware
-
         request = _make_request(path="/health")
         request.state.authenticated = True
         request.state.api_token_info = {"tokenUUID": "health-test", "username": "u"}
@@ -269,8 +200,6 @@ class TestRateLimitMiddleware:
 
     @pytest.mark.asyncio
     async def test_options_request_bypassed(self):
-        from middleware.rate_limit_middleware import rate_limit_middleware
-
         request = _make_request(method="OPTIONS")
         request.state.authenticated = True
         request.state.api_token_info = {"tokenUUID": "opts-test", "username": "u"}
@@ -302,10 +231,7 @@ class TestRateLimitMiddleware:
     @pytest.mark.asyncio
     async def test_separate_buckets_per_user(self):
         """Two different users should have independent rate limits."""
-        from middleware.rate_limit_middleware import (
-            _get_max_tokens,
-            rate_limit_middleware,
-        )
+        from utils.rate_limit import _get_max_tokens
 
         max_tokens = int(_get_max_tokens())
 
@@ -329,8 +255,6 @@ class TestRateLimitMiddleware:
     @pytest.mark.asyncio
     async def test_management_token_bypassed(self):
         """Management tokens should never be throttled."""
-        from middleware.rate_limit_middleware import rate_limit_middleware
-
         request = _make_request()
         request.state.authenticated = True
         request.state.api_token_info = None
@@ -345,10 +269,7 @@ class TestRateLimitMiddleware:
     @pytest.mark.asyncio
     async def test_oidc_user_rate_limited(self):
         """OIDC users should be rate limited by their sub claim."""
-        from middleware.rate_limit_middleware import (
-            _get_max_tokens,
-            rate_limit_middleware,
-        )
+        from utils.rate_limit import _get_max_tokens
 
         request = _make_request()
         request.state.authenticated = True
@@ -367,40 +288,6 @@ class TestRateLimitMiddleware:
 # ---------------------------------------------------------------------------
 
 
-class TestBucketPruning:
-    """Tests for stale bucket cleanup."""
-
-    @pytest.fixture(autouse=True)
-    def _clear_buckets(self):
-        import importlib
-
-        mod = importlib.import_module("middleware.rate_limit_middleware")
-        mod._buckets.clear()
-        yield
-        mod._buckets.clear()
-
-    def test_stale_buckets_pruned(self):
-        from middleware.rate_limit_middleware import (
-            _buckets,
-            _prune_stale_buckets,
-            _STALE_SECONDS,
-            _TokenBucket,
-        )
-
-        # Add a stale bucket
-        bucket = _TokenBucket(10.0)
-        bucket.last_refill = time.monotonic() - _STALE_SECONDS - 10
-        _buckets["stale-user"] = bucket
-
-        # Add a fresh bucket
-        _buckets["fresh-user"] = _TokenBucket(10.0)
-
-        _prune_stale_buckets()
-
-        assert "stale-user" not in _buckets
-        assert "fresh-user" in _buckets
-
-
 # ---------------------------------------------------------------------------
 # Override parsing tests
 # ---------------------------------------------------------------------------
@@ -410,12 +297,12 @@ class TestParseOverrides:
     """Tests for _parse_overrides JSON parsing."""
 
     def test_empty_string(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         assert _parse_overrides("") == {}
 
     def test_valid_overrides(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         raw = '{"token:abc-123": {"rpm": 120, "burst": 20}, "oidc:user-1": {"rpm": 10}}'
         result = _parse_overrides(raw)
@@ -425,17 +312,17 @@ class TestParseOverrides:
         }
 
     def test_invalid_json(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         assert _parse_overrides("not json") == {}
 
     def test_non_object_root(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         assert _parse_overrides("[1, 2, 3]") == {}
 
     def test_non_object_value_skipped(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         raw = '{"token:good": {"rpm": 100}, "token:bad": "not-an-object"}'
         result = _parse_overrides(raw)
@@ -443,14 +330,14 @@ class TestParseOverrides:
         assert "token:bad" not in result
 
     def test_rpm_only_override(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         raw = '{"token:x": {"rpm": 200}}'
         result = _parse_overrides(raw)
         assert result["token:x"] == {"rpm": 200}
 
     def test_burst_only_override(self):
-        from middleware.rate_limit_middleware import _parse_overrides
+        from utils.rate_limit import _parse_overrides
 
         raw = '{"token:x": {"burst": 50}}'
         result = _parse_overrides(raw)
@@ -469,7 +356,7 @@ class TestGetUserLimits:
     def _set_overrides(self):
         import importlib
 
-        mod = importlib.import_module("middleware.rate_limit_middleware")
+        mod = importlib.import_module("utils.rate_limit")
         self._mod = mod
         self._original_overrides = mod.RATE_LIMIT_OVERRIDES.copy()
         yield
@@ -528,12 +415,12 @@ class TestRateLimitMiddlewareOverrides:
     def _clear_and_set(self):
         import importlib
 
-        mod = importlib.import_module("middleware.rate_limit_middleware")
-        mod._buckets.clear()
+        mod = importlib.import_module("utils.rate_limit")
+        mod._backend = None
         self._mod = mod
         self._original_overrides = mod.RATE_LIMIT_OVERRIDES.copy()
         yield
-        mod._buckets.clear()
+        mod._backend = None
         mod.RATE_LIMIT_OVERRIDES = self._original_overrides
 
     @pytest.mark.asyncio
@@ -552,11 +439,11 @@ class TestRateLimitMiddlewareOverrides:
 
         # Should be able to make more requests than the system default
         for i in range(higher_max):
-            resp = await mod.rate_limit_middleware(request, _call_next_ok)
+            resp = await rate_limit_middleware(request, _call_next_ok)
             assert resp.status_code == 200, f"Failed at request {i + 1} of {higher_max}"
 
         # Now should be throttled
-        resp = await mod.rate_limit_middleware(request, _call_next_ok)
+        resp = await rate_limit_middleware(request, _call_next_ok)
         assert resp.status_code == 429
 
     @pytest.mark.asyncio
@@ -571,10 +458,10 @@ class TestRateLimitMiddlewareOverrides:
 
         # Should allow exactly 3 requests (rpm=3, burst=0 → max_tokens=3)
         for _ in range(3):
-            resp = await mod.rate_limit_middleware(request, _call_next_ok)
+            resp = await rate_limit_middleware(request, _call_next_ok)
             assert resp.status_code == 200
 
-        resp = await mod.rate_limit_middleware(request, _call_next_ok)
+        resp = await rate_limit_middleware(request, _call_next_ok)
         assert resp.status_code == 429
 
     @pytest.mark.asyncio
@@ -589,8 +476,8 @@ class TestRateLimitMiddlewareOverrides:
         req_restricted.state.api_token_info = {"tokenUUID": "restricted", "username": "r"}
 
         for _ in range(2):
-            await mod.rate_limit_middleware(req_restricted, _call_next_ok)
-        resp = await mod.rate_limit_middleware(req_restricted, _call_next_ok)
+            await rate_limit_middleware(req_restricted, _call_next_ok)
+        resp = await rate_limit_middleware(req_restricted, _call_next_ok)
         assert resp.status_code == 429
 
         # Normal user should still have the full system default
@@ -600,7 +487,7 @@ class TestRateLimitMiddlewareOverrides:
 
         system_max = int(mod._get_max_tokens())
         for _ in range(system_max):
-            resp = await mod.rate_limit_middleware(req_normal, _call_next_ok)
+            resp = await rate_limit_middleware(req_normal, _call_next_ok)
             assert resp.status_code == 200
 
     @pytest.mark.asyncio
@@ -614,10 +501,10 @@ class TestRateLimitMiddlewareOverrides:
         request.state.jwt_data = {"sub": "power-user"}
 
         for _ in range(5):
-            resp = await mod.rate_limit_middleware(request, _call_next_ok)
+            resp = await rate_limit_middleware(request, _call_next_ok)
             assert resp.status_code == 200
 
-        resp = await mod.rate_limit_middleware(request, _call_next_ok)
+        resp = await rate_limit_middleware(request, _call_next_ok)
         assert resp.status_code == 429
 
     @pytest.mark.asyncio
@@ -630,7 +517,132 @@ class TestRateLimitMiddlewareOverrides:
         request.state.authenticated = True
         request.state.api_token_info = {"tokenUUID": "zero-rpm", "username": "z"}
 
-        first = await mod.rate_limit_middleware(request, _call_next_ok)
-        second = await mod.rate_limit_middleware(request, _call_next_ok)
+        first = await rate_limit_middleware(request, _call_next_ok)
+        second = await rate_limit_middleware(request, _call_next_ok)
         assert first.status_code == 200
         assert second.status_code == 429
+
+
+# ---------------------------------------------------------------------------
+# LLM token limit tests
+# ---------------------------------------------------------------------------
+
+
+class TestParseModelTpm:
+    """Tests for parsing RATE_LIMIT_MODEL_TPM."""
+
+    def test_empty_string(self):
+        from utils.rate_limit import _parse_model_tpm
+
+        assert _parse_model_tpm("") == {}
+
+    def test_valid_limits(self):
+        from utils.rate_limit import _parse_model_tpm
+
+        assert _parse_model_tpm('{"claude-3-7": 200000, "llama": "5000"}') == {"claude-3-7": 200000, "llama": 5000}
+
+    def test_invalid_json(self):
+        from utils.rate_limit import _parse_model_tpm
+
+        assert _parse_model_tpm("{bad") == {}
+
+    def test_non_object_root(self):
+        from utils.rate_limit import _parse_model_tpm
+
+        assert _parse_model_tpm("[1, 2]") == {}
+
+    def test_tpm_override_parsed(self):
+        from utils.rate_limit import _parse_overrides
+
+        assert _parse_overrides('{"token:x": {"tpm": 1000}}') == {"token:x": {"tpm": 1000}}
+
+
+class TestTokenRateLimits:
+    """Tests for per-user and per-model LLM tokens-per-minute limits."""
+
+    @pytest.fixture(autouse=True)
+    def _reset(self, monkeypatch):
+        import importlib
+
+        mod = importlib.import_module("utils.rate_limit")
+        monkeypatch.setattr(mod, "_backend", None)
+        monkeypatch.setattr(mod, "RATE_LIMIT_OVERRIDES", {})
+        monkeypatch.setattr(mod, "RATE_LIMIT_MODEL_TPM", {})
+        monkeypatch.setattr(mod, "RATE_LIMIT_TPM", 0)
+        self._mod = mod
+        yield
+
+    def _request(self, token_uuid, model=None):
+        request = _make_request()
+        request.state.authenticated = True
+        request.state.api_token_info = {"tokenUUID": token_uuid, "username": "u"}
+        request.scope = {"lisa.request_json": {"model": model, "messages": []}}
+        return request
+
+    @pytest.mark.asyncio
+    async def test_user_tpm_blocks_after_usage_recorded(self, monkeypatch):
+        mod = self._mod
+        monkeypatch.setattr(mod, "RATE_LIMIT_TPM", 1000)
+        request = self._request("tpm-user")
+
+        assert (await rate_limit_middleware(request, _call_next_ok)).status_code == 200
+        await mod.record_token_usage(request, "m", 800, 400)
+
+        resp = await rate_limit_middleware(request, _call_next_ok)
+        assert resp.status_code == 429
+        # 200 tokens of debt at 1000 tokens/minute take 12 seconds to repay
+        assert 12 <= int(resp.headers["Retry-After"]) <= 13
+
+    @pytest.mark.asyncio
+    async def test_user_tpm_override(self, monkeypatch):
+        mod = self._mod
+        monkeypatch.setattr(mod, "RATE_LIMIT_OVERRIDES", {"token:small": {"tpm": 100}})
+        small, other = self._request("small"), self._request("other")
+
+        await mod.record_token_usage(small, "m", 150, 0)
+        await mod.record_token_usage(other, "m", 150, 0)
+
+        assert (await rate_limit_middleware(small, _call_next_ok)).status_code == 429
+        assert (await rate_limit_middleware(other, _call_next_ok)).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_model_tpm_shared_across_users(self, monkeypatch):
+        mod = self._mod
+        monkeypatch.setattr(mod, "RATE_LIMIT_MODEL_TPM", {"busy-model": 500})
+
+        await mod.record_token_usage(self._request("a", "busy-model"), "busy-model", 400, 200)
+
+        resp = await rate_limit_middleware(self._request("b", "busy-model"), _call_next_ok)
+        assert resp.status_code == 429
+        resp = await rate_limit_middleware(self._request("b", "quiet-model"), _call_next_ok)
+        assert resp.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_token_denial_does_not_use_request_token(self, monkeypatch):
+        mod = self._mod
+        monkeypatch.setattr(mod, "RATE_LIMIT_OVERRIDES", {"token:r": {"rpm": 1, "burst": 0, "tpm": 10}})
+        request = self._request("r")
+
+        await mod.record_token_usage(request, "m", 20, 0)
+        assert (await rate_limit_middleware(request, _call_next_ok)).status_code == 429
+
+        await mod.get_rate_limit_backend().charge("tpm:token:r", -20.0, 10.0, 10 / 60.0)
+        assert (await rate_limit_middleware(request, _call_next_ok)).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_no_limits_records_nothing(self):
+        mod = self._mod
+        await mod.record_token_usage(self._request("a", "m"), "m", 1000, 1000)
+        assert len(mod.get_rate_limit_backend()) == 0
+
+    @pytest.mark.asyncio
+    async def test_record_usage_never_raises(self, monkeypatch):
+        mod = self._mod
+        monkeypatch.setattr(mod, "RATE_LIMIT_TPM", 10)
+
+        class BrokenBackend:
+            async def charge(self, *args):
+                raise RuntimeError("store unavailable")
+
+        monkeypatch.setattr(mod, "_backend", BrokenBackend())
+        await mod.record_token_usage(self._request("a"), "m", 5, 5)
@@ -16,7 +16,7 @@
 
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -25,6 +25,23 @@ rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api
 sys.path.insert(0, str(rest_api_src))
 
 
+def _request_app(handler):
+    """Wrap a Starlette endpoint with the request processing middleware."""
+    from middleware.request_middleware import ProcessRequestMiddleware
+    from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.routing import Route
+
+    return Starlette(routes=[Route("/test", handler)], middleware=[Middleware(ProcessRequestMiddleware)])
+
+
+async def _get(app):
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/test")
+
+
 class TestRequestMiddleware:
     """Tests for request processing middleware."""
 
@@ -32,66 +49,61 @@ class TestRequestMiddleware:
     async def test_process_request_success(self):
         """Test successful request processing."""
         from fastapi import Response
-        from middleware.request_middleware import process_request_middleware
-
-        # Create mock request and real response
-        mock_request = MagicMock()
-        mock_request.url.path = "/test"
-
-        mock_response = Response(content="test", status_code=200)
 
-        async def mock_call_next(request):
-            return mock_response
+        async def handler(request):
+            return Response(content="test", status_code=200)
 
         # Process the request
-        result = await process_request_middleware(mock_request, mock_call_next)
+        result = await _get(_request_app(handler))
 
         # Verify response has request ID header
         assert "X-Request-ID" in result.headers
-        assert result == mock_response
+        assert result.status_code == 200
+        assert result.text == "test"
 
     @pytest.mark.asyncio
     async def test_process_request_with_exception(self):
         """Test request processing when handler raises exception."""
-        from fastapi.responses import JSONResponse
-        from middleware.request_middleware import process_request_middleware
 
-        # Create mock request
-        mock_request = MagicMock()
-        mock_request.url.path = "/test"
-
-        async def mock_call_next_error(request):
+        async def handler_error(request):
             raise ValueError("Test error")
 
         # Process the request
-        result = await process_request_middleware(mock_request, mock_call_next_error)
+        result = await _get(_request_app(handler_error))
 
         # Verify error response
-        assert isinstance(result, JSONResponse)
         assert result.status_code == 500
+        assert result.json() == {"detail": "Internal server error"}
         assert "X-Request-ID" in result.headers
 
+    @pytest.mark.asyncio
+    async def test_process_request_error_after_response_started(self):
+        """Test that an error raised mid-stream is re-raised since the response cannot be replaced."""
+        from fastapi.responses import StreamingResponse
+
+        async def body():
+            yield b"partial"
+            raise ValueError("Test error")
+
+        async def handler(request):
+            return StreamingResponse(body())
+
+        with pytest.raises(ValueError):
+            await _get(_request_app(handler))
+
     @pytest.mark.asyncio
     async def test_process_request_adds_unique_id(self):
         """Test that each request gets a unique ID."""
         from fastapi import Response
-        from middleware.request_middleware import process_request_middleware
 
-        mock_request = MagicMock()
-        mock_request.url.path = "/test"
+        async def handler(request):
+            return Response(content="test", status_code=200)
 
-        mock_response1 = Response(content="test1", status_code=200)
-        mock_response2 = Response(content="test2", status_code=200)
-
-        async def mock_call_next1(request):
-            return mock_response1
-
-        async def mock_call_next2(request):
-            return mock_response2
+        app = _request_app(handler)
 
         # Process two requests
-        result1 = await process_request_middleware(mock_request, mock_call_next1)
-        result2 = await process_request_middleware(mock_request, mock_call_next2)
+        result1 = await _get(app)
+        result2 = await _get(app)
 
         # Verify different request IDs
         assert result1.headers["X-Request-ID"] != result2.headers["X-Request-ID"]
@@ -100,18 +112,12 @@ class TestRequestMiddleware:
     async def test_process_request_logs_timing(self):
         """Test that request timing is logged."""
         from fastapi import Response
-        from middleware.request_middleware import process_request_middleware
-
-        mock_request = MagicMock()
-        mock_request.url.path = "/test"
-
-        mock_response = Response(content="test", status_code=200)
 
-        async def mock_call_next(request):
-            return mock_response
+        async def handler(request):
+            return Response(content="test", status_code=200)
 
         with patch("middleware.request_middleware.logger") as mock_logger:
-            await process_request_middleware(mock_request, mock_call_next)
+            await _get(_request_app(handler))
 
             # Verify logging was called
             assert mock_logger.contextualize.called
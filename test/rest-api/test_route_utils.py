@@ -0,0 +1,166 @@
+#   Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License").
+#   You may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Unit tests for the precompiled route classifier."""
+
+import fnmatch
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add REST API src to path
+rest_api_src = Path(__file__).parent.parent.parent / "lib" / "serve" / "rest-api" / "src"
+sys.path.insert(0, str(rest_api_src))
+
+from utils.route_utils import (  # noqa: E402
+    ANTHROPIC_ROUTES,
+    CHAT_ROUTES,
+    compile_wildcard_routes,
+    is_anthropic_route,
+    is_chat_route,
+    is_lisa_public_route,
+    is_openai_or_anthropic_route,
+    is_openai_route,
+    LISA_PUBLIC_ROUTES,
+    OPENAI_ROUTES,
+)
+
+# ---------------------------------------------------------------------------
+# Reference implementation: the classifier before the route tables were compiled
+# ---------------------------------------------------------------------------
+
+
+def _legacy_is_openai_route(api_path):
+    if api_path in OPENAI_ROUTES:
+        return True
+    if "video" not in api_path:
+        return False
+    wildcard_patterns = [pattern for pattern in OPENAI_ROUTES if "*" in pattern]
+    wildcard_patterns.sort(key=len, reverse=True)
+    for route_pattern in wildcard_patterns:
+        if fnmatch.fnmatch(api_path, route_pattern):
+            if route_pattern.endswith("/*") and not route_pattern.endswith("/*/"):
+                if api_path.count("/") != route_pattern.count("/"):
+                    continue
+            return True
+    return False
+
+
+def _legacy_is_lisa_public_route(api_path):
+    if api_path in LISA_PUBLIC_ROUTES:
+        return True
+    return any(fnmatch.fnmatch(api_path, pattern) for pattern in LISA_PUBLIC_ROUTES if "*" in pattern)
+
+
+def _legacy_is_openai_or_anthropic_route(api_path):
+    api_path = api_path.lstrip("/")
+    return _legacy_is_openai_route(api_path) or api_path in ANTHROPIC_ROUTES or _legacy_is_lisa_public_route(api_path)
+
+
+_SEGMENTS = [
+    "",
+    "v1",
+    "videos",
+    "video",
+    "content",
+    "remix",
+    "models",
+    "metadata",
+    "instances",
+    "chat",
+    "completions",
+    "messages",
+    "anthropic",
+    "health",
+    "mcp",
+    "vid_123",
+    "a.b",
+    "x*y",
+    "[abc]",
+    "line\nbreak",
+]
+
+
+def _random_paths(count, seed=0):
+    """Generate paths built from route segments, plus every route table entry with small mutations."""
+    rng = random.Random(seed)
+    tables = OPENAI_ROUTES + LISA_PUBLIC_ROUTES + ANTHROPIC_ROUTES + CHAT_ROUTES
+    paths = list(tables)
+    for route in tables:
+        paths += [
+            route.replace("*", "abc"),
+            route.replace("*", "a/b"),
+            route.replace("*", ""),
+            route + "/",
+            "/" + route,
+        ]
+    for _ in range(count):
+        if rng.random() < 0.5:
+            segments = rng.choice(tables).replace("*", rng.choice(_SEGMENTS)).split("/")
+            segments.insert(rng.randrange(len(segments) + 1), rng.choice(_SEGMENTS))
+            if rng.random() < 0.5:
+                segments.pop(rng.randrange(len(segments)))
+        else:
+            segments = [rng.choice(_SEGMENTS) for _ in range(rng.randint(1, 5))]
+        paths.append("/" * rng.randint(0, 2) + "/".join(segments))
+    return paths
+
+
+class TestRouteClassifierEquivalence:
+    """Property tests: the compiled classifier agrees with the original fnmatch-based one."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_legacy_classifier_on_random_paths(self, seed):
+        for path in _random_paths(2000, seed):
+            assert is_openai_route(path) == _legacy_is_openai_route(path), path
+            assert is_lisa_public_route(path) == _legacy_is_lisa_public_route(path), path
+            assert is_anthropic_route(path) == (path in ANTHROPIC_ROUTES), path
+            assert is_chat_route(path) == (path in CHAT_ROUTES), path
+            assert is_openai_or_anthropic_route(path) == _legacy_is_openai_or_anthropic_route(path), path
+
+
+class TestRouteClassifier:
+    """Test suite for specific route classifications."""
+
+    @pytest.mark.parametrize(
+        "path,expected",
+        [
+            ("v1/chat/completions", True),
+            ("videos/vid_123", True),
+            ("v1/videos/vid_123/content", True),
+            ("videos/vid_123/remix", True),
+            ("videos/vid_123/content/extra", False),
+            ("videos/a/b", False),
+            ("v1/key/generate", False),
+        ],
+    )
+    def test_openai_routes(self, path, expected):
+        assert is_openai_route(path) is expected
+
+    def test_lisa_public_wildcard_spans_segments(self):
+        assert is_lisa_public_route("models/metadata/instances")
+        assert is_lisa_public_route("models/metadata/a/b")
+        assert not is_lisa_public_route("models/metadata")
+
+    def test_leading_slash_ignored_for_combined_check(self):
+        assert is_openai_or_anthropic_route("/v1/messages")
+        assert is_openai_or_anthropic_route("/models/metadata/x")
+        assert not is_openai_or_anthropic_route("/v1/key/generate")
+
+    def test_compile_without_wildcards_never_matches(self):
+        pattern = compile_wildcard_routes(["health", "models"])
+        assert pattern.fullmatch("health") is None
+        assert pattern.fullmatch("") is None
@@ -161,6 +161,12 @@ class TestLisaApiBackendValidation:
         with pytest.raises(ValidationError, match="api_url"):
             self._make_backend(api_url="http://insecure.example.com")
 
+    def test_search_mode(self):
+        assert self._make_backend().search_mode is None
+        assert self._make_backend(search_mode="hybrid").search_mode == "hybrid"
+        with pytest.raises(ValidationError, match="search_mode"):
+            self._make_backend(search_mode="keyword")
+
 
 class TestEvalConfigValidation:
     """Tests for k and documents validation on EvalConfig."""
@@ -141,6 +141,31 @@ class TestLisaApiEvaluator:
         assert result.precision == pytest.approx(0.5)
         assert result.recall == 1.0
 
+    @responses.activate
+    def test_search_options_sent(self, lisa_api: LisaApi, api_url: str, source_map):
+        """The evaluator's search mode and rerank choice are passed to similarity_search."""
+        responses.add(
+            responses.GET,
+            f"{api_url}/repository/test-repo/similaritySearch",
+            json={"docs": [_make_similarity_result("s3://bucket/doc_a.pdf")]},
+            status=200,
+        )
+
+        golden = [GoldenDatasetEntry(query="E2210", expected=["doc_a"], relevance={"doc_a": 3}, type="lexical")]
+        evaluator = LisaApiEvaluator(
+            client=lisa_api,
+            repo_id="test-repo",
+            collection_id="default",
+            source_map=source_map,
+            k=5,
+            search_mode="hybrid",
+            rerank=True,
+        )
+        evaluator.evaluate(golden)
+
+        assert responses.calls[0].request.params["searchMode"] == "hybrid"
+        assert responses.calls[0].request.params["rerank"] == "true"
+
     def test_evaluate_empty_golden_raises(self, lisa_api: LisaApi, source_map):
         """Passing an empty golden dataset should raise ValueError."""
         evaluator = LisaApiEvaluator(
@@ -223,3 +248,34 @@ class TestLisaApiEvaluator:
         )
         with pytest.raises(ConnectionError):
             evaluator.evaluate(golden)
+
+    @responses.activate
+    def test_evaluate_counts_collection_chunks(self, lisa_api: LisaApi, api_url: str, source_map):
+        responses.add(
+            responses.GET,
+            f"{api_url}/repository/test-repo/similaritySearch",
+            json={"docs": [_make_similarity_result("s3://bucket/doc_a.pdf")]},
+            status=200,
+        )
+        strategy = {"type": "token", "size": 512, "overlap": 51, "encoding": "cl100k_base"}
+        responses.add(
+            responses.GET,
+            f"{api_url}/repository/test-repo/document",
+            json={
+                "documents": [{"chunks": 40, "chunk_strategy": strategy}, {"chunks": 2, "chunk_strategy": strategy}],
+                "lastEvaluated": None,
+                "hasNextPage": False,
+            },
+            status=200,
+        )
+
+        golden = [GoldenDatasetEntry(query="q", expected=["doc_a"], relevance={"doc_a": 3})]
+        evaluator = LisaApiEvaluator(
+            client=lisa_api, repo_id="test-repo", collection_id="col", source_map=source_map, k=5, count_chunks=True
+        )
+        result = evaluator.evaluate(golden)
+
+        assert result.recall == 1.0
+        assert result.chunk_count == 42
+        assert result.chunking_strategy == "token 512/51"
+        assert responses.calls[1].request.params["collectionId"] == "col"
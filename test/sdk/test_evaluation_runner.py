@@ -244,3 +244,22 @@ class TestFormatComparison:
         assert "OS" in output
         assert "Cross-Backend Comparison" in output
         assert "Pairwise Deltas" in output
+
+    def test_comparison_includes_chunk_counts_when_known(self):
+        results = {
+            "KB": EvalResult(precision=0.8, recall=0.9, ndcg=0.85),
+            "Structured": EvalResult(
+                precision=0.7, recall=0.8, ndcg=0.75, chunk_count=1234, chunking_strategy="structured 512/0"
+            ),
+        }
+        output = format_comparison(results, k=5)
+        chunk_row = next(line for line in output.splitlines() if line.strip().startswith("chunks"))
+        assert chunk_row.split()[1:] == ["-", "1234"]
+        assert "structured 5" in output
+
+    def test_comparison_omits_chunk_counts_when_unknown(self):
+        results = {
+            "KB": EvalResult(precision=0.8, recall=0.9, ndcg=0.85),
+            "OS": EvalResult(precision=0.7, recall=0.8, ndcg=0.75),
+        }
+        assert "chunks" not in format_comparison(results, k=5)
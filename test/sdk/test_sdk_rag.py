@@ -14,6 +14,7 @@
 
 """Unit tests for RagMixin."""
 
+import json
 import tempfile
 
 import pytest
@@ -42,6 +43,33 @@ class TestRagMixin:
         # Verify query params
         assert responses.calls[0].request.params["collectionId"] == collection_id
 
+    @responses.activate
+    def test_list_all_documents_follows_pages(self, lisa_api: LisaApi, api_url: str):
+        """Test listing every document in a collection across pages."""
+        repo_id = "pgvector-rag"
+        last_evaluated = {"pk": "pgvector-rag#col-123", "document_id": "doc-1", "repository_id": "pgvector-rag"}
+
+        responses.add(
+            responses.GET,
+            f"{api_url}/repository/{repo_id}/document",
+            json={"documents": [{"document_id": "doc-1"}], "lastEvaluated": last_evaluated, "hasNextPage": True},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{api_url}/repository/{repo_id}/document",
+            json={"documents": [{"document_id": "doc-2"}], "lastEvaluated": None, "hasNextPage": False},
+            status=200,
+        )
+
+        documents = lisa_api.list_all_documents(repo_id, "col-123")
+
+        assert [doc["document_id"] for doc in documents] == ["doc-1", "doc-2"]
+        assert "lastEvaluatedKeyPk" not in responses.calls[0].request.params
+        assert responses.calls[1].request.params["lastEvaluatedKeyPk"] == "pgvector-rag#col-123"
+        assert responses.calls[1].request.params["lastEvaluatedKeyDocumentId"] == "doc-1"
+        assert responses.calls[1].request.params["pageSize"] == "100"
+
     @responses.activate
     def test_get_document(self, lisa_api: LisaApi, api_url: str):
         """Test getting a single document by ID."""
@@ -278,6 +306,82 @@ class TestRagMixin:
         # Verify model_name was sent
         assert responses.calls[0].request.params["modelName"] == model_name
 
+    @responses.activate
+    def test_similarity_search_with_search_mode(self, lisa_api: LisaApi, api_url: str):
+        """Test similarity search with an explicit search mode."""
+        repo_id = "pgvector-rag"
+
+        responses.add(responses.GET, f"{api_url}/repository/{repo_id}/similaritySearch", json={"docs": []}, status=200)
+        responses.add(responses.GET, f"{api_url}/repository/{repo_id}/similaritySearch", json={"docs": []}, status=200)
+
+        lisa_api.similarity_search(repo_id=repo_id, query="E2210", collection_id="default", search_mode="hybrid")
+        lisa_api.similarity_search(repo_id=repo_id, query="E2210", collection_id="default")
+
+        assert responses.calls[0].request.params["searchMode"] == "hybrid"
+        # Omitted so the repository's default applies
+        assert "searchMode" not in responses.calls[1].request.params
+
+    @responses.activate
+    def test_similarity_search_with_rerank(self, lisa_api: LisaApi, api_url: str):
+        """Test similarity search with reranking turned on, off, and left to the repository."""
+        repo_id = "pgvector-rag"
+
+        for _ in range(3):
+            responses.add(
+                responses.GET, f"{api_url}/repository/{repo_id}/similaritySearch", json={"docs": []}, status=200
+            )
+
+        lisa_api.similarity_search(
+            repo_id=repo_id, query="E2210", collection_id="default", rerank=True, rerank_budget_ms=200
+        )
+        lisa_api.similarity_search(repo_id=repo_id, query="E2210", collection_id="default", rerank=False)
+        lisa_api.similarity_search(repo_id=repo_id, query="E2210", collection_id="default")
+
+        assert responses.calls[0].request.params["rerank"] == "true"
+        assert responses.calls[0].request.params["rerankBudgetMs"] == "200"
+        assert responses.calls[1].request.params["rerank"] == "false"
+        assert "rerank" not in responses.calls[2].request.params
+
+    @responses.activate
+    def test_batch_similarity_search(self, lisa_api: LisaApi, api_url: str):
+        """Test running several similarity searches in one request."""
+        repo_id = "pgvector-rag"
+        doc = {"Document": {"page_content": "E2210 means power loss", "metadata": {"source": "s3://b/e2210.txt"}}}
+
+        responses.add(
+            responses.POST,
+            f"{api_url}/repository/{repo_id}/similaritySearch/batch",
+            json={"results": [{"query": "E2210", "docs": [doc]}, {"query": "reset", "docs": []}]},
+            status=200,
+        )
+
+        results = lisa_api.batch_similarity_search(
+            repo_id=repo_id, queries=["E2210", "reset"], k=2, collection_id="default", search_mode="hybrid"
+        )
+
+        assert results == [[doc], []]
+        assert json.loads(responses.calls[0].request.body) == {
+            "queries": ["E2210", "reset"],
+            "topK": 2,
+            "collectionId": "default",
+            "searchMode": "hybrid",
+        }
+
+    @responses.activate
+    def test_batch_similarity_search_error(self, lisa_api: LisaApi, api_url: str):
+        """Test error handling when a batch search is rejected."""
+        repo_id = "pgvector-rag"
+
+        responses.add(
+            responses.POST,
+            f"{api_url}/repository/{repo_id}/similaritySearch/batch",
+            json={"error": "Invalid request"},
+            status=400,
+        )
+
+        with pytest.raises(Exception):
+            lisa_api.batch_similarity_search(repo_id=repo_id, queries=[""], model_name="embed")
+
     @responses.activate
     def test_list_documents_error(self, lisa_api: LisaApi, api_url: str):
         """Test error handling when listing documents fails."""